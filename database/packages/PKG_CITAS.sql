@@ -9,8 +9,8 @@
     - CRUD completo de citas
     - Busqueda por paciente, doctor, fecha
     - Gestion de estados (pendiente, confirmada, completada, cancelada)
-    - Verificacion de disponibilidad
-    - Recordatorios
+    - Verificacion de disponibilidad y busqueda de horarios libres
+    - Recordatorios (cola con reclamo por lotes para emisores en paralelo)
 ================================================================================
 */
 
@@ -47,6 +47,9 @@ CREATE OR REPLACE PACKAGE PKG_CITAS AS
     c_estado_cancelada   CONSTANT VARCHAR2(20) := 'CANCELADA';
     c_estado_no_asistio  CONSTANT VARCHAR2(20) := 'NO_ASISTIO';
 
+    -- Un reclamo de recordatorio sin confirmar vence a los N minutos
+    c_minutos_reclamo    CONSTANT PLS_INTEGER := 15;
+
     -- ========================================================================
     -- PROCEDIMIENTOS DE CONSULTA
     -- ========================================================================
@@ -204,6 +207,22 @@ CREATE OR REPLACE PACKAGE PKG_CITAS AS
         p_excluir_cita_id   IN ODO_CITAS.CITA_ID%TYPE DEFAULT NULL
     ) RETURN BOOLEAN;
 
+    -- Horarios libres de uno o varios doctores en un rango de fechas.
+    -- p_doctor_ids: lista separada por comas (NULL = doctores de la empresa).
+    -- Cursor: DOCTOR_ID, DOCTOR_NOMBRE, FECHA, HORA_INICIO, HORA_FIN
+    PROCEDURE get_horarios_libres(
+        p_empresa_id        IN  ODO_CITAS.EMPRESA_ID%TYPE,
+        p_doctor_ids        IN  VARCHAR2 DEFAULT NULL,
+        p_fecha_desde       IN  DATE DEFAULT SYSDATE,
+        p_fecha_hasta       IN  DATE DEFAULT NULL,
+        p_duracion_minutos  IN  NUMBER DEFAULT 30,
+        p_hora_inicio       IN  VARCHAR2 DEFAULT '08:00',
+        p_hora_fin          IN  VARCHAR2 DEFAULT '18:00',
+        p_cursor            OUT t_cita_cursor,
+        p_resultado         OUT NUMBER,
+        p_mensaje           OUT VARCHAR2
+    );
+
     -- Obtener proxima cita del paciente
     FUNCTION get_proxima_cita_paciente(
         p_paciente_id IN ODO_CITAS.PACIENTE_ID%TYPE
@@ -234,6 +253,32 @@ CREATE OR REPLACE PACKAGE PKG_CITAS AS
         p_mensaje           OUT VARCHAR2
     );
 
+    -- Reclamar hasta p_max recordatorios que vencen en las próximas
+    -- p_horas_anticipacion horas (FOR UPDATE SKIP LOCKED). Las citas quedan
+    -- en RECORDATORIO_ENVIADO = 'P' hasta que se marcan con
+    -- marcar_recordatorios_lote; si el emisor no las marca en
+    -- c_minutos_reclamo minutos vuelven a estar disponibles. Las citas de
+    -- pacientes sin TELEFONO_PRINCIPAL no se reclaman.
+    -- Cursor: CITA_ID, PACIENTE_ID, PACIENTE_NOMBRE, PACIENTE_TELEFONO,
+    --         DOCTOR_NOMBRE, FECHA_CITA, HORA_CITA, EMPRESA_ID
+    PROCEDURE reclamar_recordatorios(
+        p_empresa_id         IN  ODO_CITAS.EMPRESA_ID%TYPE DEFAULT NULL,
+        p_horas_anticipacion IN  NUMBER DEFAULT 24,
+        p_max                IN  PLS_INTEGER DEFAULT 50,
+        p_cursor             OUT t_cita_cursor,
+        p_resultado          OUT NUMBER,
+        p_mensaje            OUT VARCHAR2
+    );
+
+    -- Cierra un lote reclamado en una sola sentencia por lista:
+    -- p_enviados pasan a 'S', p_fallidos se liberan ('N') para reintentar.
+    PROCEDURE marcar_recordatorios_lote(
+        p_enviados      IN  SYS.ODCINUMBERLIST,
+        p_fallidos      IN  SYS.ODCINUMBERLIST DEFAULT NULL,
+        p_resultado     OUT NUMBER,
+        p_mensaje       OUT VARCHAR2
+    );
+
 END PKG_CITAS;
 /
 
@@ -242,6 +287,22 @@ END PKG_CITAS;
 -- ============================================================================
 CREATE OR REPLACE PACKAGE BODY PKG_CITAS AS
 
+    -- Ninguna cita dura más que esto: check_disponibilidad y
+    -- get_horarios_libres solo miran las citas que empiezan hasta este
+    -- intervalo antes, así que una más larga no se detectaría como
+    -- solapamiento. insert_cita y update_cita rechazan duraciones mayores y
+    -- el CHECK CHK_CITAS_DURACION_MAX (16_citas_duracion_maxima.sql) lo
+    -- garantiza para cualquier otra escritura.
+    c_max_duracion_cita  CONSTANT INTERVAL DAY TO SECOND := INTERVAL '1' DAY;
+    c_max_duracion_minutos CONSTANT PLS_INTEGER := 24 * 60;
+    c_max_dias_libres    CONSTANT PLS_INTEGER := 31;
+
+    FUNCTION duracion_valida(p_duracion_minutos IN NUMBER) RETURN BOOLEAN IS
+    BEGIN
+        RETURN p_duracion_minutos > 0
+           AND NUMTODSINTERVAL(p_duracion_minutos, 'MINUTE') <= c_max_duracion_cita;
+    END duracion_valida;
+
     -- ========================================================================
     -- PROCEDIMIENTOS DE CONSULTA
     -- ========================================================================
@@ -328,8 +389,8 @@ CREATE OR REPLACE PACKAGE BODY PKG_CITAS AS
             LEFT JOIN ODO_USUARIOS u ON c.DOCTOR_ID = u.USUARIO_ID
             WHERE c.EMPRESA_ID = p_empresa_id
               AND (p_sucursal_id IS NULL OR c.SUCURSAL_ID = p_sucursal_id)
-              AND (p_fecha_desde IS NULL OR TRUNC(c.FECHA_HORA_INICIO) >= p_fecha_desde)
-              AND (p_fecha_hasta IS NULL OR TRUNC(c.FECHA_HORA_INICIO) <= p_fecha_hasta)
+              AND (p_fecha_desde IS NULL OR c.FECHA_HORA_INICIO >= TRUNC(p_fecha_desde))
+              AND (p_fecha_hasta IS NULL OR c.FECHA_HORA_INICIO < TRUNC(p_fecha_hasta) + 1)
               AND (p_estado IS NULL OR c.ESTADO = p_estado)
             ORDER BY c.FECHA_HORA_INICIO;
 
@@ -376,8 +437,8 @@ CREATE OR REPLACE PACKAGE BODY PKG_CITAS AS
             LEFT JOIN ODO_PACIENTES p ON c.PACIENTE_ID = p.PACIENTE_ID
             LEFT JOIN ODO_USUARIOS u ON c.DOCTOR_ID = u.USUARIO_ID
             WHERE c.PACIENTE_ID = p_paciente_id
-              AND (p_fecha_desde IS NULL OR TRUNC(c.FECHA_HORA_INICIO) >= p_fecha_desde)
-              AND (p_fecha_hasta IS NULL OR TRUNC(c.FECHA_HORA_INICIO) <= p_fecha_hasta)
+              AND (p_fecha_desde IS NULL OR c.FECHA_HORA_INICIO >= TRUNC(p_fecha_desde))
+              AND (p_fecha_hasta IS NULL OR c.FECHA_HORA_INICIO < TRUNC(p_fecha_hasta) + 1)
               AND (p_estado IS NULL OR c.ESTADO = p_estado)
             ORDER BY c.FECHA_HORA_INICIO DESC;
 
@@ -424,8 +485,8 @@ CREATE OR REPLACE PACKAGE BODY PKG_CITAS AS
             LEFT JOIN ODO_PACIENTES p ON c.PACIENTE_ID = p.PACIENTE_ID
             LEFT JOIN ODO_USUARIOS u ON c.DOCTOR_ID = u.USUARIO_ID
             WHERE c.DOCTOR_ID = p_doctor_id
-              AND (p_fecha_desde IS NULL OR TRUNC(c.FECHA_HORA_INICIO) >= p_fecha_desde)
-              AND (p_fecha_hasta IS NULL OR TRUNC(c.FECHA_HORA_INICIO) <= p_fecha_hasta)
+              AND (p_fecha_desde IS NULL OR c.FECHA_HORA_INICIO >= TRUNC(p_fecha_desde))
+              AND (p_fecha_hasta IS NULL OR c.FECHA_HORA_INICIO < TRUNC(p_fecha_hasta) + 1)
               AND (p_estado IS NULL OR c.ESTADO = p_estado)
             ORDER BY c.FECHA_HORA_INICIO;
 
@@ -475,7 +536,8 @@ CREATE OR REPLACE PACKAGE BODY PKG_CITAS AS
             LEFT JOIN ODO_PACIENTES p ON c.PACIENTE_ID = p.PACIENTE_ID
             LEFT JOIN ODO_USUARIOS u ON c.DOCTOR_ID = u.USUARIO_ID
             WHERE c.DOCTOR_ID = p_doctor_id
-              AND TRUNC(c.FECHA_HORA_INICIO) = TRUNC(p_fecha)
+              AND c.FECHA_HORA_INICIO >= TRUNC(p_fecha)
+              AND c.FECHA_HORA_INICIO < TRUNC(p_fecha) + 1
               AND (p_empresa_id IS NULL OR c.EMPRESA_ID = p_empresa_id)
               AND c.ESTADO NOT IN ('CANCELADA')
             ORDER BY c.FECHA_HORA_INICIO;
@@ -535,6 +597,12 @@ CREATE OR REPLACE PACKAGE BODY PKG_CITAS AS
             RETURN;
         END IF;
 
+        IF NOT duracion_valida(p_duracion_minutos) THEN
+            p_resultado := 0;
+            p_mensaje := 'La duración debe estar entre 1 minuto y ' || c_max_duracion_minutos || ' minutos';
+            RETURN;
+        END IF;
+
         -- Validar disponibilidad del doctor
         IF NOT check_disponibilidad(p_doctor_id, p_fecha_hora_inicio, p_duracion_minutos) THEN
             p_resultado := 0;
@@ -632,6 +700,12 @@ CREATE OR REPLACE PACKAGE BODY PKG_CITAS AS
             RETURN;
         END IF;
 
+        IF p_duracion_minutos IS NOT NULL AND NOT duracion_valida(p_duracion_minutos) THEN
+            p_resultado := 0;
+            p_mensaje := 'La duración debe estar entre 1 minuto y ' || c_max_duracion_minutos || ' minutos';
+            RETURN;
+        END IF;
+
         -- Si se cambia fecha/hora, verificar disponibilidad
         IF p_fecha_hora_inicio IS NOT NULL THEN
             IF NOT check_disponibilidad(
@@ -865,22 +939,139 @@ CREATE OR REPLACE PACKAGE BODY PKG_CITAS AS
         WHERE DOCTOR_ID = p_doctor_id
           AND ESTADO NOT IN (c_estado_cancelada, c_estado_no_asistio)
           AND (p_excluir_cita_id IS NULL OR CITA_ID != p_excluir_cita_id)
-          AND (
-              -- Nueva cita empieza durante una existente
-              (p_fecha_hora_inicio >= FECHA_HORA_INICIO AND p_fecha_hora_inicio < FECHA_HORA_FIN)
-              OR
-              -- Nueva cita termina durante una existente
-              (v_fecha_hora_fin > FECHA_HORA_INICIO AND v_fecha_hora_fin <= FECHA_HORA_FIN)
-              OR
-              -- Nueva cita engloba una existente
-              (p_fecha_hora_inicio <= FECHA_HORA_INICIO AND v_fecha_hora_fin >= FECHA_HORA_FIN)
-          );
+          -- Dos intervalos se solapan si cada uno empieza antes de que termine el otro.
+          -- La cota inferior acota el rango de IDX_CITAS_DOCTOR_FECHA.
+          AND FECHA_HORA_INICIO >= p_fecha_hora_inicio - c_max_duracion_cita
+          AND FECHA_HORA_INICIO < v_fecha_hora_fin
+          AND FECHA_HORA_FIN > p_fecha_hora_inicio;
 
         RETURN v_conflictos = 0;
     END check_disponibilidad;
 
     -- ------------------------------------------------------------------------
 
+    PROCEDURE get_horarios_libres(
+        p_empresa_id        IN  ODO_CITAS.EMPRESA_ID%TYPE,
+        p_doctor_ids        IN  VARCHAR2 DEFAULT NULL,
+        p_fecha_desde       IN  DATE DEFAULT SYSDATE,
+        p_fecha_hasta       IN  DATE DEFAULT NULL,
+        p_duracion_minutos  IN  NUMBER DEFAULT 30,
+        p_hora_inicio       IN  VARCHAR2 DEFAULT '08:00',
+        p_hora_fin          IN  VARCHAR2 DEFAULT '18:00',
+        p_cursor            OUT t_cita_cursor,
+        p_resultado         OUT NUMBER,
+        p_mensaje           OUT VARCHAR2
+    ) IS
+        v_desde     DATE := TRUNC(NVL(p_fecha_desde, SYSDATE));
+        v_hasta     DATE := TRUNC(NVL(p_fecha_hasta, NVL(p_fecha_desde, SYSDATE)));
+        v_duracion  INTERVAL DAY TO SECOND;
+        v_abre      INTERVAL DAY TO SECOND;
+        v_cierra    INTERVAL DAY TO SECOND;
+        v_max_slots PLS_INTEGER;
+    BEGIN
+        IF p_duracion_minutos IS NULL OR p_duracion_minutos < 5 OR p_duracion_minutos > 480 THEN
+            p_resultado := 0;
+            p_mensaje := 'La duracion debe estar entre 5 y 480 minutos';
+            RETURN;
+        END IF;
+        IF v_hasta < v_desde OR v_hasta - v_desde >= c_max_dias_libres THEN
+            p_resultado := 0;
+            p_mensaje := 'El rango de fechas debe ser de 1 a ' || c_max_dias_libres || ' dias';
+            RETURN;
+        END IF;
+
+        v_duracion := NUMTODSINTERVAL(p_duracion_minutos, 'MINUTE');
+        v_abre := TO_DSINTERVAL('0 ' || p_hora_inicio || ':00');
+        v_cierra := TO_DSINTERVAL('0 ' || p_hora_fin || ':00');
+        IF v_cierra <= v_abre THEN
+            p_resultado := 0;
+            p_mensaje := 'La hora de fin debe ser posterior a la hora de inicio';
+            RETURN;
+        END IF;
+        v_max_slots := FLOOR((EXTRACT(HOUR FROM v_cierra - v_abre) * 60
+                              + EXTRACT(MINUTE FROM v_cierra - v_abre)) / p_duracion_minutos);
+
+        -- Barrido único: las citas de cada doctor/día se leen por
+        -- IDX_CITAS_DOCTOR_FECHA ya ordenadas; el máximo acumulado de
+        -- FECHA_HORA_FIN marca hasta dónde está ocupado el día, y cada inicio
+        -- posterior a ese máximo abre un hueco que se parte en turnos.
+        OPEN p_cursor FOR
+            WITH doctores AS (
+                SELECT TO_NUMBER(TRIM(REGEXP_SUBSTR(p_doctor_ids, '[^,]+', 1, LEVEL))) AS doctor_id
+                FROM DUAL
+                WHERE p_doctor_ids IS NOT NULL
+                CONNECT BY LEVEL <= REGEXP_COUNT(p_doctor_ids, '[^,]+')
+                UNION
+                SELECT u.USUARIO_ID
+                FROM ODO_USUARIOS u
+                JOIN ODO_ROLES r ON u.ROL_ID = r.ROL_ID
+                JOIN ODO_USUARIO_EMPRESAS ue ON ue.USUARIO_ID = u.USUARIO_ID
+                WHERE p_doctor_ids IS NULL
+                  AND r.CODIGO = 'DOCTOR'
+                  AND u.ACTIVO = 'S'
+                  AND ue.EMPRESA_ID = p_empresa_id
+                  AND ue.ACTIVO = 'S'
+            ),
+            jornadas AS (
+                SELECT d.doctor_id,
+                       CAST(v_desde + n.dia AS TIMESTAMP) + v_abre AS abre,
+                       CAST(v_desde + n.dia AS TIMESTAMP) + v_cierra AS cierra
+                FROM doctores d
+                CROSS JOIN (SELECT LEVEL - 1 AS dia FROM DUAL
+                            CONNECT BY LEVEL <= v_hasta - v_desde + 1) n
+            ),
+            bordes AS (
+                -- Citas que tocan la jornada, recortadas a ella
+                SELECT j.doctor_id, j.abre,
+                       GREATEST(CAST(c.FECHA_HORA_INICIO AS TIMESTAMP), j.abre) AS ini,
+                       LEAST(CAST(c.FECHA_HORA_FIN AS TIMESTAMP), j.cierra) AS fin
+                FROM jornadas j
+                JOIN ODO_CITAS c
+                  ON c.DOCTOR_ID = j.doctor_id
+                 AND c.FECHA_HORA_INICIO >= j.abre - c_max_duracion_cita
+                 AND c.FECHA_HORA_INICIO < j.cierra
+                 AND c.FECHA_HORA_FIN > j.abre
+                 AND c.ESTADO NOT IN (c_estado_cancelada, c_estado_no_asistio)
+                UNION ALL
+                -- Centinelas: apertura y cierre de la jornada
+                SELECT doctor_id, abre, abre, abre FROM jornadas
+                UNION ALL
+                SELECT doctor_id, abre, cierra, cierra FROM jornadas
+            ),
+            huecos AS (
+                SELECT doctor_id, ini AS hueco_fin,
+                       MAX(fin) OVER (PARTITION BY doctor_id, abre ORDER BY ini, fin
+                                      ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING) AS hueco_ini
+                FROM bordes
+            ),
+            turnos AS (
+                SELECT h.doctor_id, h.hueco_ini + v_duracion * t.n AS inicio
+                FROM huecos h
+                JOIN (SELECT LEVEL - 1 AS n FROM DUAL CONNECT BY LEVEL <= v_max_slots) t
+                  ON h.hueco_ini + v_duracion * (t.n + 1) <= h.hueco_fin
+                WHERE h.hueco_fin > h.hueco_ini
+            )
+            SELECT t.doctor_id AS DOCTOR_ID,
+                   u.NOMBRE || ' ' || u.APELLIDO AS DOCTOR_NOMBRE,
+                   TO_CHAR(t.inicio, 'YYYY-MM-DD') AS FECHA,
+                   TO_CHAR(t.inicio, 'HH24:MI') AS HORA_INICIO,
+                   TO_CHAR(t.inicio + v_duracion, 'HH24:MI') AS HORA_FIN
+            FROM turnos t
+            LEFT JOIN ODO_USUARIOS u ON u.USUARIO_ID = t.doctor_id
+            WHERE t.inicio >= SYSDATE
+            ORDER BY t.inicio, t.doctor_id;
+
+        p_resultado := 1;
+        p_mensaje := 'Horarios libres obtenidos exitosamente';
+
+    EXCEPTION
+        WHEN OTHERS THEN
+            p_resultado := 0;
+            p_mensaje := 'Error al obtener horarios libres: ' || SQLERRM;
+    END get_horarios_libres;
+
+    -- ------------------------------------------------------------------------
+
     FUNCTION get_proxima_cita_paciente(
         p_paciente_id IN ODO_CITAS.PACIENTE_ID%TYPE
     ) RETURN DATE IS
@@ -906,7 +1097,8 @@ CREATE OR REPLACE PACKAGE BODY PKG_CITAS AS
         SELECT COUNT(*) INTO v_count
         FROM ODO_CITAS
         WHERE DOCTOR_ID = p_doctor_id
-          AND TRUNC(FECHA_HORA_INICIO) = TRUNC(p_fecha)
+          AND FECHA_HORA_INICIO >= TRUNC(p_fecha)
+          AND FECHA_HORA_INICIO < TRUNC(p_fecha) + 1
           AND ESTADO NOT IN (c_estado_cancelada);
 
         RETURN v_count;
@@ -971,9 +1163,13 @@ CREATE OR REPLACE PACKAGE BODY PKG_CITAS AS
             FROM ODO_CITAS c
             JOIN ODO_PACIENTES p ON c.PACIENTE_ID = p.PACIENTE_ID
             LEFT JOIN ODO_USUARIOS u ON c.DOCTOR_ID = u.USUARIO_ID
-            WHERE c.ESTADO IN (c_estado_pendiente, c_estado_confirmada)
+            WHERE CASE WHEN c.ESTADO IN ('PENDIENTE', 'CONFIRMADA')
+                            AND NVL(c.RECORDATORIO_ENVIADO, 'N') <> 'S'
+                       THEN c.FECHA_HORA_INICIO END >= TRUNC(SYSDATE) + p_dias_anticipacion
+              AND CASE WHEN c.ESTADO IN ('PENDIENTE', 'CONFIRMADA')
+                            AND NVL(c.RECORDATORIO_ENVIADO, 'N') <> 'S'
+                       THEN c.FECHA_HORA_INICIO END < TRUNC(SYSDATE) + p_dias_anticipacion + 1
               AND NVL(c.RECORDATORIO_ENVIADO, 'N') = 'N'
-              AND TRUNC(c.FECHA_HORA_INICIO) = TRUNC(SYSDATE + p_dias_anticipacion)
             ORDER BY c.FECHA_HORA_INICIO;
 
         p_resultado := 1;
@@ -985,5 +1181,133 @@ CREATE OR REPLACE PACKAGE BODY PKG_CITAS AS
             p_mensaje := 'Error al obtener citas para recordatorio: ' || SQLERRM;
     END get_citas_para_recordatorio;
 
+    -- ------------------------------------------------------------------------
+    -- La expresión CASE de los filtros es la de IDX_CITAS_RECORDATORIO_PEND
+    -- (ensure_schema.py, citas_recordatorios): solo las citas activas con
+    -- recordatorio sin enviar tienen clave, así que el índice contiene
+    -- únicamente la cola pendiente. FECHA_HORA_INICIO es TIMESTAMP sin zona:
+    -- los límites se calculan con LOCALTIMESTAMP para que la comparación sea
+    -- TIMESTAMP contra TIMESTAMP y el índice se pueda usar (con SYSTIMESTAMP
+    -- la columna se convertiría a TIMESTAMP WITH TIME ZONE).
+    -- ------------------------------------------------------------------------
+
+    PROCEDURE reclamar_recordatorios(
+        p_empresa_id         IN  ODO_CITAS.EMPRESA_ID%TYPE DEFAULT NULL,
+        p_horas_anticipacion IN  NUMBER DEFAULT 24,
+        p_max                IN  PLS_INTEGER DEFAULT 50,
+        p_cursor             OUT t_cita_cursor,
+        p_resultado          OUT NUMBER,
+        p_mensaje            OUT VARCHAR2
+    ) IS
+        v_ahora   TIMESTAMP := LOCALTIMESTAMP;
+        v_hasta   TIMESTAMP := v_ahora + NUMTODSINTERVAL(NVL(p_horas_anticipacion, 24), 'HOUR');
+        v_vencido TIMESTAMP := v_ahora - NUMTODSINTERVAL(c_minutos_reclamo, 'MINUTE');
+        v_ids     SYS.ODCINUMBERLIST;
+
+        CURSOR c_pendientes IS
+            SELECT c.CITA_ID
+            FROM ODO_CITAS c
+            WHERE CASE WHEN c.ESTADO IN ('PENDIENTE', 'CONFIRMADA')
+                            AND NVL(c.RECORDATORIO_ENVIADO, 'N') <> 'S'
+                       THEN c.FECHA_HORA_INICIO END >= v_ahora
+              AND CASE WHEN c.ESTADO IN ('PENDIENTE', 'CONFIRMADA')
+                            AND NVL(c.RECORDATORIO_ENVIADO, 'N') <> 'S'
+                       THEN c.FECHA_HORA_INICIO END < v_hasta
+              AND (p_empresa_id IS NULL OR c.EMPRESA_ID = p_empresa_id)
+              AND (NVL(c.RECORDATORIO_ENVIADO, 'N') = 'N'
+                   OR c.FECHA_RECORDATORIO < v_vencido)
+              -- Sin teléfono no hay envío posible: reclamarlas solo haría
+              -- que se liberen y se vuelvan a reclamar en cada corrida
+              AND EXISTS (SELECT 1
+                          FROM ODO_PACIENTES p
+                          WHERE p.PACIENTE_ID = c.PACIENTE_ID
+                            AND TRIM(p.TELEFONO_PRINCIPAL) IS NOT NULL)
+            FOR UPDATE SKIP LOCKED;
+    BEGIN
+        -- Con SKIP LOCKED las filas se bloquean al leerlas: el FETCH con
+        -- LIMIT toma solo p_max, y otro emisor en paralelo salta esas
+        OPEN c_pendientes;
+        FETCH c_pendientes BULK COLLECT INTO v_ids LIMIT GREATEST(NVL(p_max, 50), 1);
+        CLOSE c_pendientes;
+
+        FORALL i IN 1 .. v_ids.COUNT
+            UPDATE ODO_CITAS
+            SET RECORDATORIO_ENVIADO = 'P',
+                FECHA_RECORDATORIO = v_ahora
+            WHERE CITA_ID = v_ids(i);
+        COMMIT;
+
+        OPEN p_cursor FOR
+            SELECT
+                c.CITA_ID,
+                c.PACIENTE_ID,
+                p.NOMBRE || ' ' || p.APELLIDO AS PACIENTE_NOMBRE,
+                p.TELEFONO_PRINCIPAL AS PACIENTE_TELEFONO,
+                u.NOMBRE || ' ' || u.APELLIDO AS DOCTOR_NOMBRE,
+                TO_CHAR(c.FECHA_HORA_INICIO, 'DD/MM/YYYY') AS FECHA_CITA,
+                TO_CHAR(c.FECHA_HORA_INICIO, 'HH24:MI') AS HORA_CITA,
+                c.EMPRESA_ID
+            FROM ODO_CITAS c
+            JOIN TABLE(v_ids) ids ON ids.COLUMN_VALUE = c.CITA_ID
+            JOIN ODO_PACIENTES p ON c.PACIENTE_ID = p.PACIENTE_ID
+            LEFT JOIN ODO_USUARIOS u ON c.DOCTOR_ID = u.USUARIO_ID
+            ORDER BY c.FECHA_HORA_INICIO;
+
+        p_resultado := 1;
+        p_mensaje := v_ids.COUNT || ' recordatorios reclamados';
+
+    EXCEPTION
+        WHEN OTHERS THEN
+            IF c_pendientes%ISOPEN THEN
+                CLOSE c_pendientes;
+            END IF;
+            ROLLBACK;
+            p_resultado := 0;
+            p_mensaje := 'Error al reclamar recordatorios: ' || SQLERRM;
+    END reclamar_recordatorios;
+
+    -- ------------------------------------------------------------------------
+
+    PROCEDURE marcar_recordatorios_lote(
+        p_enviados      IN  SYS.ODCINUMBERLIST,
+        p_fallidos      IN  SYS.ODCINUMBERLIST DEFAULT NULL,
+        p_resultado     OUT NUMBER,
+        p_mensaje       OUT VARCHAR2
+    ) IS
+        v_enviados PLS_INTEGER := 0;
+        v_fallidos PLS_INTEGER := 0;
+    BEGIN
+        IF p_enviados IS NOT NULL THEN
+            FORALL i IN 1 .. p_enviados.COUNT
+                UPDATE ODO_CITAS
+                SET RECORDATORIO_ENVIADO = 'S',
+                    FECHA_RECORDATORIO = SYSTIMESTAMP
+                WHERE CITA_ID = p_enviados(i);
+            v_enviados := SQL%ROWCOUNT;
+        END IF;
+
+        IF p_fallidos IS NOT NULL THEN
+            -- Solo se liberan los que siguen reclamados (no los ya enviados)
+            FORALL i IN 1 .. p_fallidos.COUNT
+                UPDATE ODO_CITAS
+                SET RECORDATORIO_ENVIADO = 'N',
+                    FECHA_RECORDATORIO = NULL
+                WHERE CITA_ID = p_fallidos(i)
+                  AND RECORDATORIO_ENVIADO = 'P';
+            v_fallidos := SQL%ROWCOUNT;
+        END IF;
+
+        COMMIT;
+
+        p_resultado := 1;
+        p_mensaje := v_enviados || ' recordatorios enviados, ' || v_fallidos || ' liberados';
+
+    EXCEPTION
+        WHEN OTHERS THEN
+            ROLLBACK;
+            p_resultado := 0;
+            p_mensaje := 'Error al marcar recordatorios: ' || SQLERRM;
+    END marcar_recordatorios_lote;
+
 END PKG_CITAS;
 /
@@ -0,0 +1,144 @@
+-- =============================================================================
+-- PKG_CONTADORES - Numeración no fiscal por empresa y tipo de documento
+-- =============================================================================
+-- ODO_CONTADORES guarda el último número entregado por (EMPRESA_ID, TIPO,
+-- PERIODO). siguiente() lo incrementa con un UPDATE ... RETURNING en una
+-- transacción autónoma: el bloqueo de la fila dura solo ese UPDATE, no la
+-- transacción del llamador, y dos sesiones nunca reciben el mismo número.
+--
+-- Si la transacción del llamador hace rollback el número se pierde (quedan
+-- huecos). Por eso no se usa para numeración fiscal (facturas / timbrado).
+--
+-- reservar() entrega un bloque de N números consecutivos en un solo UPDATE
+-- (cargas masivas: importación de pacientes).
+--
+-- Tipos en uso:
+--   HISTORIA_CLINICA          PKG_PACIENTES.generate_numero_historia
+--   TRATAMIENTO:<PREFIJO>     códigos AUTO del catálogo de tratamientos
+--
+-- Los contadores de datos existentes se inicializan en
+-- scripts/14_contadores_documentos.sql.
+-- =============================================================================
+
+CREATE OR REPLACE PACKAGE PKG_CONTADORES AS
+
+    c_sin_periodo CONSTANT VARCHAR2(1) := '-';
+
+    -- Próximo número para (empresa, tipo, periodo). Si el contador no
+    -- existe se crea en p_inicial + 1.
+    FUNCTION siguiente(
+        p_empresa_id IN NUMBER,
+        p_tipo       IN VARCHAR2,
+        p_periodo    IN VARCHAR2 DEFAULT NULL,
+        p_inicial    IN NUMBER DEFAULT 0
+    ) RETURN NUMBER;
+
+    -- Reserva p_cantidad números consecutivos y devuelve el último; el
+    -- bloque es (resultado - p_cantidad, resultado].
+    FUNCTION reservar(
+        p_empresa_id IN NUMBER,
+        p_tipo       IN VARCHAR2,
+        p_cantidad   IN NUMBER,
+        p_periodo    IN VARCHAR2 DEFAULT NULL,
+        p_inicial    IN NUMBER DEFAULT 0
+    ) RETURN NUMBER;
+
+    -- Lleva el contador al menos hasta p_valor (p.ej. tras cargar un
+    -- número manual o importar datos).
+    PROCEDURE ajustar(
+        p_empresa_id IN NUMBER,
+        p_tipo       IN VARCHAR2,
+        p_valor      IN NUMBER,
+        p_periodo    IN VARCHAR2 DEFAULT NULL
+    );
+
+END PKG_CONTADORES;
+/
+
+CREATE OR REPLACE PACKAGE BODY PKG_CONTADORES AS
+
+    FUNCTION reservar(
+        p_empresa_id IN NUMBER,
+        p_tipo       IN VARCHAR2,
+        p_cantidad   IN NUMBER,
+        p_periodo    IN VARCHAR2 DEFAULT NULL,
+        p_inicial    IN NUMBER DEFAULT 0
+    ) RETURN NUMBER IS
+        PRAGMA AUTONOMOUS_TRANSACTION;
+        v_periodo ODO_CONTADORES.PERIODO%TYPE := NVL(p_periodo, c_sin_periodo);
+        v_numero  NUMBER;
+    BEGIN
+        UPDATE ODO_CONTADORES
+        SET ULTIMO = ULTIMO + p_cantidad,
+            FECHA_MODIFICACION = SYSTIMESTAMP
+        WHERE EMPRESA_ID = p_empresa_id
+          AND TIPO = p_tipo
+          AND PERIODO = v_periodo
+        RETURNING ULTIMO INTO v_numero;
+
+        IF SQL%ROWCOUNT = 0 THEN
+            BEGIN
+                v_numero := NVL(p_inicial, 0) + p_cantidad;
+                INSERT INTO ODO_CONTADORES (EMPRESA_ID, TIPO, PERIODO, ULTIMO)
+                VALUES (p_empresa_id, p_tipo, v_periodo, v_numero);
+            EXCEPTION
+                WHEN DUP_VAL_ON_INDEX THEN
+                    -- Otra sesión lo creó entre el UPDATE y el INSERT
+                    UPDATE ODO_CONTADORES
+                    SET ULTIMO = ULTIMO + p_cantidad,
+                        FECHA_MODIFICACION = SYSTIMESTAMP
+                    WHERE EMPRESA_ID = p_empresa_id
+                      AND TIPO = p_tipo
+                      AND PERIODO = v_periodo
+                    RETURNING ULTIMO INTO v_numero;
+            END;
+        END IF;
+
+        COMMIT;
+        RETURN v_numero;
+    EXCEPTION
+        WHEN OTHERS THEN
+            ROLLBACK;
+            RAISE;
+    END reservar;
+
+    -- ------------------------------------------------------------------------
+
+    FUNCTION siguiente(
+        p_empresa_id IN NUMBER,
+        p_tipo       IN VARCHAR2,
+        p_periodo    IN VARCHAR2 DEFAULT NULL,
+        p_inicial    IN NUMBER DEFAULT 0
+    ) RETURN NUMBER IS
+    BEGIN
+        RETURN reservar(p_empresa_id, p_tipo, 1, p_periodo, p_inicial);
+    END siguiente;
+
+    -- ------------------------------------------------------------------------
+
+    PROCEDURE ajustar(
+        p_empresa_id IN NUMBER,
+        p_tipo       IN VARCHAR2,
+        p_valor      IN NUMBER,
+        p_periodo    IN VARCHAR2 DEFAULT NULL
+    ) IS
+        PRAGMA AUTONOMOUS_TRANSACTION;
+    BEGIN
+        MERGE INTO ODO_CONTADORES c
+        USING (SELECT p_empresa_id AS empresa_id, p_tipo AS tipo,
+                      NVL(p_periodo, c_sin_periodo) AS periodo FROM DUAL) s
+        ON (c.EMPRESA_ID = s.empresa_id AND c.TIPO = s.tipo AND c.PERIODO = s.periodo)
+        WHEN MATCHED THEN UPDATE SET
+            c.ULTIMO = GREATEST(c.ULTIMO, p_valor),
+            c.FECHA_MODIFICACION = SYSTIMESTAMP
+        WHEN NOT MATCHED THEN INSERT (EMPRESA_ID, TIPO, PERIODO, ULTIMO)
+            VALUES (s.empresa_id, s.tipo, s.periodo, p_valor);
+        COMMIT;
+    EXCEPTION
+        WHEN OTHERS THEN
+            ROLLBACK;
+            RAISE;
+    END ajustar;
+
+END PKG_CONTADORES;
+/
@@ -0,0 +1,338 @@
+-- =============================================================================
+-- PKG_JSON_RESPONSE - Escritura de respuestas JSON de los handlers ORDS
+-- =============================================================================
+-- Los documentos se generan en SQL (JSON_OBJECT / JSON_ARRAYAGG) y se
+-- envían a htp en bloques, sin armar la respuesta completa en memoria ni
+-- pasar un CLOB de más de 32K a htp.p.
+--
+-- Uso típico en un handler GET:
+--
+--     DECLARE
+--         v_cursor SYS_REFCURSOR;
+--     BEGIN
+--         OPEN v_cursor FOR
+--             SELECT JSON_OBJECT(
+--                        'CITA_ID' VALUE c.CITA_ID,
+--                        'ESTADO'  VALUE c.ESTADO
+--                        ABSENT ON NULL RETURNING CLOB)
+--             FROM ODO_CITAS c
+--             WHERE c.EMPRESA_ID = :empresa_id
+--             ORDER BY c.FECHA_HORA_INICIO;
+--         PKG_JSON_RESPONSE.print_items(v_cursor, 'items');
+--     END;
+--
+-- Respuesta: {"items":[{...},{...}]}
+--
+-- Listados paginados (keyset): el cursor devuelve el documento y la clave
+-- de orden como arreglo JSON, y pide una fila más que la página para saber
+-- si hay siguiente (FETCH FIRST corta la lectura ahí). El total es
+-- opcional: solo con ?incluir_total=S se hace un COUNT aparte con los
+-- mismos filtros.
+--
+--     v_limit := PKG_JSON_RESPONSE.page_size(:limit);
+--     v_key   := PKG_JSON_RESPONSE.token_key(:next);
+--     v_desde := JSON_VALUE(v_key, '$[0]' RETURNING TIMESTAMP);
+--     v_id    := JSON_VALUE(v_key, '$[1]' RETURNING NUMBER);
+--     IF PKG_JSON_RESPONSE.include_total(:incluir_total) THEN
+--         SELECT COUNT(*) INTO v_total FROM ODO_CITAS c WHERE ...;
+--     END IF;
+--     OPEN v_cursor FOR
+--         SELECT JSON_OBJECT(... RETURNING CLOB),
+--                JSON_ARRAY(c.FECHA_HORA_INICIO, c.CITA_ID NULL ON NULL)
+--         FROM ODO_CITAS c
+--         WHERE ...
+--           AND (v_key IS NULL OR c.FECHA_HORA_INICIO > v_desde
+--                OR (c.FECHA_HORA_INICIO = v_desde AND c.CITA_ID > v_id))
+--         ORDER BY c.FECHA_HORA_INICIO, c.CITA_ID
+--         FETCH FIRST v_limit + 1 ROWS ONLY;
+--     PKG_JSON_RESPONSE.print_page(v_cursor, v_limit, :next, p_total => v_total);
+--
+-- Respuesta: {"items":[...],"count":50,"total":812,"next":"eyJrIjpb..."}
+-- "total" solo si se pidió; "next" se omite en la última página y el
+-- cliente lo reenvía como ?next=
+-- =============================================================================
+
+CREATE OR REPLACE PACKAGE PKG_JSON_RESPONSE AS
+
+    -- Envía un CLOB a htp en bloques (reemplaza htp.p(v_clob))
+    PROCEDURE print_clob(
+        p_clob         IN CLOB
+    );
+
+    -- Escribe {"<p_key>":[doc1,doc2,...]} leyendo el cursor por lotes.
+    -- El cursor debe devolver una sola columna con un documento JSON por
+    -- fila (VARCHAR2 o CLOB). El cursor se cierra al terminar.
+    PROCEDURE print_items(
+        p_cursor       IN OUT SYS_REFCURSOR,
+        p_key          IN VARCHAR2 DEFAULT 'items'
+    );
+
+    -- =========================================================================
+    -- PAGINACIÓN
+    -- =========================================================================
+
+    -- Tamaño de página acotado a 1..c_max_page (NULL = p_default)
+    FUNCTION page_size(
+        p_limit        IN NUMBER,
+        p_default      IN NUMBER DEFAULT 50
+    ) RETURN PLS_INTEGER;
+
+    -- Token opaco (base64url) con la clave de la última fila entregada
+    -- (arreglo JSON) y la cantidad de filas ya vistas
+    FUNCTION encode_token(
+        p_sort_key     IN VARCHAR2,
+        p_seen         IN NUMBER
+    ) RETURN VARCHAR2;
+
+    -- Clave de orden del token como arreglo JSON (NULL = primera página)
+    FUNCTION token_key(
+        p_token        IN VARCHAR2
+    ) RETURN VARCHAR2;
+
+    -- Filas entregadas en las páginas anteriores (0 = primera página)
+    FUNCTION token_seen(
+        p_token        IN VARCHAR2
+    ) RETURN NUMBER;
+
+    -- TRUE si el parámetro incluir_total pide el total (S, SI, Y, TRUE, 1)
+    FUNCTION include_total(
+        p_flag         IN VARCHAR2
+    ) RETURN BOOLEAN;
+
+    -- Escribe {"<p_key>":[...],"count":n,"total":t,"next":"..."}. El cursor
+    -- devuelve (documento, clave de orden JSON) con hasta p_limit + 1 filas;
+    -- la fila extra solo indica que hay otra página. "total" se escribe
+    -- solo si p_total no es NULL.
+    PROCEDURE print_page(
+        p_cursor       IN OUT SYS_REFCURSOR,
+        p_limit        IN PLS_INTEGER,
+        p_token        IN VARCHAR2 DEFAULT NULL,
+        p_key          IN VARCHAR2 DEFAULT 'items',
+        p_total        IN NUMBER DEFAULT NULL
+    );
+
+END PKG_JSON_RESPONSE;
+/
+
+CREATE OR REPLACE PACKAGE BODY PKG_JSON_RESPONSE AS
+
+    -- htp trabaja con VARCHAR2: bloques por debajo de 32767 bytes aun con
+    -- caracteres multibyte
+    c_chunk_size   CONSTANT PLS_INTEGER := 8000;
+    c_fetch_limit  CONSTANT PLS_INTEGER := 200;
+    c_max_page     CONSTANT PLS_INTEGER := 500;
+
+    TYPE t_docs IS TABLE OF CLOB;
+    TYPE t_keys IS TABLE OF VARCHAR2(4000);
+
+    -- =========================================================================
+    -- print_clob
+    -- =========================================================================
+    PROCEDURE print_clob(
+        p_clob         IN CLOB
+    ) IS
+        v_length  PLS_INTEGER;
+        v_offset  PLS_INTEGER := 1;
+    BEGIN
+        IF p_clob IS NULL THEN
+            RETURN;
+        END IF;
+
+        v_length := DBMS_LOB.GETLENGTH(p_clob);
+        WHILE v_offset <= v_length LOOP
+            htp.prn(DBMS_LOB.SUBSTR(p_clob, c_chunk_size, v_offset));
+            v_offset := v_offset + c_chunk_size;
+        END LOOP;
+    END print_clob;
+
+    -- =========================================================================
+    -- print_items
+    -- =========================================================================
+    PROCEDURE print_items(
+        p_cursor       IN OUT SYS_REFCURSOR,
+        p_key          IN VARCHAR2 DEFAULT 'items'
+    ) IS
+        v_docs    t_docs;
+        v_buffer  VARCHAR2(32767);
+        v_length  PLS_INTEGER;
+        v_first   BOOLEAN := TRUE;
+
+        PROCEDURE flush IS
+        BEGIN
+            IF v_buffer IS NOT NULL THEN
+                htp.prn(v_buffer);
+                v_buffer := NULL;
+            END IF;
+        END flush;
+    BEGIN
+        v_buffer := '{"' || p_key || '":[';
+
+        LOOP
+            FETCH p_cursor BULK COLLECT INTO v_docs LIMIT c_fetch_limit;
+
+            FOR i IN 1 .. v_docs.COUNT LOOP
+                IF NOT v_first THEN
+                    v_buffer := v_buffer || ',';
+                END IF;
+                v_first := FALSE;
+
+                -- Los documentos chicos se acumulan y se envían juntos; los
+                -- grandes se envían directamente en bloques
+                v_length := DBMS_LOB.GETLENGTH(v_docs(i));
+                IF v_length <= c_chunk_size THEN
+                    IF NVL(LENGTH(v_buffer), 0) + v_length > c_chunk_size THEN
+                        flush;
+                    END IF;
+                    v_buffer := v_buffer || DBMS_LOB.SUBSTR(v_docs(i), c_chunk_size, 1);
+                ELSE
+                    flush;
+                    print_clob(v_docs(i));
+                END IF;
+
+                IF DBMS_LOB.ISTEMPORARY(v_docs(i)) = 1 THEN
+                    DBMS_LOB.FREETEMPORARY(v_docs(i));
+                END IF;
+            END LOOP;
+
+            EXIT WHEN v_docs.COUNT < c_fetch_limit;
+        END LOOP;
+        CLOSE p_cursor;
+
+        v_buffer := v_buffer || ']}';
+        flush;
+    EXCEPTION
+        WHEN OTHERS THEN
+            IF p_cursor%ISOPEN THEN
+                CLOSE p_cursor;
+            END IF;
+            RAISE;
+    END print_items;
+
+    -- =========================================================================
+    -- page_size
+    -- =========================================================================
+    FUNCTION page_size(
+        p_limit        IN NUMBER,
+        p_default      IN NUMBER DEFAULT 50
+    ) RETURN PLS_INTEGER IS
+    BEGIN
+        RETURN GREATEST(1, LEAST(TRUNC(NVL(p_limit, p_default)), c_max_page));
+    END page_size;
+
+    -- =========================================================================
+    -- encode_token / decode_token
+    -- =========================================================================
+    FUNCTION encode_token(
+        p_sort_key     IN VARCHAR2,
+        p_seen         IN NUMBER
+    ) RETURN VARCHAR2 IS
+        v_json  VARCHAR2(4000);
+        v_b64   VARCHAR2(32767);
+    BEGIN
+        v_json := '{"k":' || p_sort_key || ',"n":' || TO_CHAR(p_seen) || '}';
+        v_b64 := UTL_RAW.CAST_TO_VARCHAR2(
+                     UTL_ENCODE.BASE64_ENCODE(UTL_I18N.STRING_TO_RAW(v_json, 'AL32UTF8')));
+        v_b64 := REPLACE(REPLACE(v_b64, CHR(13)), CHR(10));
+        RETURN RTRIM(TRANSLATE(v_b64, '+/', '-_'), '=');
+    END encode_token;
+
+    FUNCTION decode_token(
+        p_token        IN VARCHAR2
+    ) RETURN VARCHAR2 IS
+        v_b64  VARCHAR2(32767);
+    BEGIN
+        IF p_token IS NULL THEN
+            RETURN NULL;
+        END IF;
+        v_b64 := TRANSLATE(p_token, '-_', '+/');
+        v_b64 := v_b64 || RPAD('=', MOD(4 - MOD(LENGTH(v_b64), 4), 4), '=');
+        RETURN UTL_I18N.RAW_TO_CHAR(
+                   UTL_ENCODE.BASE64_DECODE(UTL_RAW.CAST_TO_RAW(v_b64)), 'AL32UTF8');
+    EXCEPTION
+        WHEN OTHERS THEN
+            -- Token inválido: se trata como primera página
+            RETURN NULL;
+    END decode_token;
+
+    FUNCTION token_key(
+        p_token        IN VARCHAR2
+    ) RETURN VARCHAR2 IS
+    BEGIN
+        RETURN JSON_QUERY(decode_token(p_token), '$.k');
+    END token_key;
+
+    FUNCTION token_seen(
+        p_token        IN VARCHAR2
+    ) RETURN NUMBER IS
+    BEGIN
+        RETURN NVL(JSON_VALUE(decode_token(p_token), '$.n' RETURNING NUMBER), 0);
+    END token_seen;
+
+    FUNCTION include_total(
+        p_flag         IN VARCHAR2
+    ) RETURN BOOLEAN IS
+    BEGIN
+        RETURN UPPER(TRIM(p_flag)) IN ('S', 'SI', 'Y', 'YES', 'TRUE', '1');
+    END include_total;
+
+    -- =========================================================================
+    -- print_page
+    -- =========================================================================
+    PROCEDURE print_page(
+        p_cursor       IN OUT SYS_REFCURSOR,
+        p_limit        IN PLS_INTEGER,
+        p_token        IN VARCHAR2 DEFAULT NULL,
+        p_key          IN VARCHAR2 DEFAULT 'items',
+        p_total        IN NUMBER DEFAULT NULL
+    ) IS
+        v_docs      t_docs;
+        v_keys      t_keys;
+        v_count     PLS_INTEGER := 0;
+        v_last_key  VARCHAR2(4000);
+        v_more      BOOLEAN := FALSE;
+        v_seen      NUMBER := token_seen(p_token);
+    BEGIN
+        htp.prn('{"' || p_key || '":[');
+
+        LOOP
+            FETCH p_cursor BULK COLLECT INTO v_docs, v_keys LIMIT c_fetch_limit;
+
+            FOR i IN 1 .. v_docs.COUNT LOOP
+                IF v_count = p_limit THEN
+                    v_more := TRUE;
+                ELSE
+                    IF v_count > 0 THEN
+                        htp.prn(',');
+                    END IF;
+                    print_clob(v_docs(i));
+                    v_count := v_count + 1;
+                    v_last_key := v_keys(i);
+                END IF;
+
+                IF DBMS_LOB.ISTEMPORARY(v_docs(i)) = 1 THEN
+                    DBMS_LOB.FREETEMPORARY(v_docs(i));
+                END IF;
+            END LOOP;
+
+            EXIT WHEN v_docs.COUNT < c_fetch_limit OR v_more;
+        END LOOP;
+        CLOSE p_cursor;
+
+        htp.prn('],"count":' || v_count);
+        IF p_total IS NOT NULL THEN
+            htp.prn(',"total":' || TO_CHAR(p_total));
+        END IF;
+        IF v_more THEN
+            htp.prn(',"next":"' || encode_token(v_last_key, v_seen + v_count) || '"');
+        END IF;
+        htp.prn('}');
+    EXCEPTION
+        WHEN OTHERS THEN
+            IF p_cursor%ISOPEN THEN
+                CLOSE p_cursor;
+            END IF;
+            RAISE;
+    END print_page;
+
+END PKG_JSON_RESPONSE;
+/
@@ -0,0 +1,340 @@
+-- =============================================================================
+-- PKG_METRICAS - Métricas diarias por empresa para el dashboard
+-- =============================================================================
+-- ODO_METRICAS_DIARIAS guarda una fila por (EMPRESA_ID, FECHA) con los
+-- totales del día. El dashboard lee esta tabla por su clave primaria en lugar
+-- de contar citas, pagos y pacientes en cada carga.
+--
+-- Mantenimiento:
+--   - Los triggers TRG_*_METRICAS (al final de este archivo) marcan en
+--     ODO_METRICAS_PENDIENTES cada (EMPRESA_ID, FECHA) afectado por un alta,
+--     cambio o baja en ODO_CITAS, ODO_PAGOS y ODO_PACIENTES, con la fecha
+--     vieja y la nueva. Son compound triggers: un solo registro por clave
+--     y sentencia aunque la sentencia toque miles de filas.
+--   - refrescar_pendientes lo corre el job ODO_JOB_METRICAS cada pocos
+--     minutos: toma las claves marcadas y recalcula solo esos días, sin
+--     importar cuán atrás estén (pagos con fecha pasada, citas finalizadas
+--     o canceladas tarde, pacientes borrados).
+--   - refrescar(empresa, desde, hasta) recalcula los días del rango con un
+--     único MERGE (las fuentes se leen por rango de fecha indexado).
+--   - refrescar_todo reconstruye desde el primer dato (carga inicial).
+--
+-- TRATAMIENTOS_ACTIVOS es una foto: se actualiza solo en la fila de hoy, y
+-- los días pasados conservan el valor del último refresco de ese día.
+--
+-- Las tablas se crean con ensure_schema.py (metricas_diarias).
+-- =============================================================================
+
+CREATE OR REPLACE PACKAGE PKG_METRICAS AS
+
+    c_job_name CONSTANT VARCHAR2(30) := 'ODO_JOB_METRICAS';
+
+    -- Claves (empresa, día) acumuladas por un trigger durante una sentencia
+    TYPE t_marca IS RECORD (empresa_id NUMBER, fecha DATE);
+    TYPE t_marcas IS TABLE OF t_marca INDEX BY VARCHAR2(40);
+
+    -- Recalcula los días [p_desde, p_hasta] (NULL en empresa = todas).
+    -- Devuelve la cantidad de filas insertadas o actualizadas.
+    FUNCTION refrescar(
+        p_empresa_id IN NUMBER DEFAULT NULL,
+        p_desde      IN DATE,
+        p_hasta      IN DATE
+    ) RETURN NUMBER;
+
+    -- Acumula la clave (empresa, TRUNC(fecha)) en p_marcas (ignora NULL)
+    PROCEDURE marcar(
+        p_marcas     IN OUT NOCOPY t_marcas,
+        p_empresa_id IN NUMBER,
+        p_fecha      IN DATE
+    );
+
+    -- Registra las claves acumuladas en ODO_METRICAS_PENDIENTES
+    PROCEDURE registrar(p_marcas IN OUT NOCOPY t_marcas);
+
+    -- Recalcula los días marcados y la foto de hoy (lo ejecuta el job)
+    PROCEDURE refrescar_pendientes;
+
+    -- Todo el historial de una empresa (o de todas)
+    FUNCTION refrescar_todo(p_empresa_id IN NUMBER DEFAULT NULL) RETURN NUMBER;
+
+    -- Crea el job de refresco si no existe (o le apunta a refrescar_pendientes)
+    PROCEDURE crear_job(p_intervalo_minutos IN PLS_INTEGER DEFAULT 5);
+
+END PKG_METRICAS;
+/
+
+CREATE OR REPLACE PACKAGE BODY PKG_METRICAS AS
+
+    FUNCTION refrescar(
+        p_empresa_id IN NUMBER DEFAULT NULL,
+        p_desde      IN DATE,
+        p_hasta      IN DATE
+    ) RETURN NUMBER IS
+        v_desde DATE := TRUNC(p_desde);
+        v_hasta DATE := TRUNC(p_hasta) + 1;    -- exclusivo
+        v_hoy   DATE := TRUNC(SYSDATE);
+    BEGIN
+        MERGE INTO ODO_METRICAS_DIARIAS m
+        USING (
+            SELECT empresa_id, fecha,
+                   SUM(citas_total) AS citas_total,
+                   SUM(citas_finalizadas) AS citas_finalizadas,
+                   SUM(citas_canceladas) AS citas_canceladas,
+                   SUM(ingresos) AS ingresos,
+                   SUM(pacientes_nuevos) AS pacientes_nuevos,
+                   MAX(tratamientos_activos) AS tratamientos_activos
+            FROM (
+                SELECT c.EMPRESA_ID AS empresa_id,
+                       TRUNC(CAST(c.FECHA_HORA_INICIO AS DATE)) AS fecha,
+                       COUNT(*) AS citas_total,
+                       COUNT(CASE WHEN c.ESTADO IN ('COMPLETADA', 'FINALIZADA') THEN 1 END) AS citas_finalizadas,
+                       COUNT(CASE WHEN c.ESTADO = 'CANCELADA' THEN 1 END) AS citas_canceladas,
+                       0 AS ingresos, 0 AS pacientes_nuevos, NULL AS tratamientos_activos
+                FROM ODO_CITAS c
+                WHERE (p_empresa_id IS NULL OR c.EMPRESA_ID = p_empresa_id)
+                  AND c.FECHA_HORA_INICIO >= v_desde
+                  AND c.FECHA_HORA_INICIO < v_hasta
+                GROUP BY c.EMPRESA_ID, TRUNC(CAST(c.FECHA_HORA_INICIO AS DATE))
+                UNION ALL
+                SELECT pg.EMPRESA_ID, TRUNC(CAST(pg.FECHA_PAGO AS DATE)),
+                       0, 0, 0, SUM(pg.MONTO), 0, NULL
+                FROM ODO_PAGOS pg
+                WHERE (p_empresa_id IS NULL OR pg.EMPRESA_ID = p_empresa_id)
+                  AND pg.FECHA_PAGO >= v_desde
+                  AND pg.FECHA_PAGO < v_hasta
+                GROUP BY pg.EMPRESA_ID, TRUNC(CAST(pg.FECHA_PAGO AS DATE))
+                UNION ALL
+                SELECT p.EMPRESA_ID, TRUNC(CAST(p.FECHA_REGISTRO AS DATE)),
+                       0, 0, 0, 0, COUNT(*), NULL
+                FROM ODO_PACIENTES p
+                WHERE (p_empresa_id IS NULL OR p.EMPRESA_ID = p_empresa_id)
+                  AND p.FECHA_REGISTRO >= v_desde
+                  AND p.FECHA_REGISTRO < v_hasta
+                GROUP BY p.EMPRESA_ID, TRUNC(CAST(p.FECHA_REGISTRO AS DATE))
+                UNION ALL
+                -- Foto de tratamientos en proceso, solo para hoy
+                SELECT p.EMPRESA_ID, v_hoy, 0, 0, 0, 0, 0, COUNT(*)
+                FROM ODO_TRATAMIENTOS_PACIENTE t
+                JOIN ODO_PACIENTES p ON t.PACIENTE_ID = p.PACIENTE_ID
+                WHERE t.ESTADO = 'EN_PROCESO'
+                  AND (p_empresa_id IS NULL OR p.EMPRESA_ID = p_empresa_id)
+                  AND v_hoy >= v_desde AND v_hoy < v_hasta
+                GROUP BY p.EMPRESA_ID
+                UNION ALL
+                -- Días ya registrados que quedaron sin actividad vuelven a cero
+                SELECT EMPRESA_ID, FECHA, 0, 0, 0, 0, 0, NULL
+                FROM ODO_METRICAS_DIARIAS
+                WHERE (p_empresa_id IS NULL OR EMPRESA_ID = p_empresa_id)
+                  AND FECHA >= v_desde
+                  AND FECHA < v_hasta
+            )
+            GROUP BY empresa_id, fecha
+        ) s
+        ON (m.EMPRESA_ID = s.empresa_id AND m.FECHA = s.fecha)
+        WHEN MATCHED THEN UPDATE SET
+            m.CITAS_TOTAL = s.citas_total,
+            m.CITAS_FINALIZADAS = s.citas_finalizadas,
+            m.CITAS_CANCELADAS = s.citas_canceladas,
+            m.INGRESOS = s.ingresos,
+            m.PACIENTES_NUEVOS = s.pacientes_nuevos,
+            m.TRATAMIENTOS_ACTIVOS = CASE WHEN s.fecha = v_hoy
+                                          THEN NVL(s.tratamientos_activos, 0)
+                                          ELSE m.TRATAMIENTOS_ACTIVOS END,
+            m.FECHA_ACTUALIZACION = SYSTIMESTAMP
+        WHEN NOT MATCHED THEN INSERT (
+            EMPRESA_ID, FECHA, CITAS_TOTAL, CITAS_FINALIZADAS, CITAS_CANCELADAS,
+            INGRESOS, PACIENTES_NUEVOS, TRATAMIENTOS_ACTIVOS, FECHA_ACTUALIZACION
+        ) VALUES (
+            s.empresa_id, s.fecha, s.citas_total, s.citas_finalizadas, s.citas_canceladas,
+            s.ingresos, s.pacientes_nuevos, NVL(s.tratamientos_activos, 0), SYSTIMESTAMP
+        );
+
+        RETURN SQL%ROWCOUNT;
+    END refrescar;
+
+    -- ------------------------------------------------------------------------
+
+    PROCEDURE marcar(
+        p_marcas     IN OUT NOCOPY t_marcas,
+        p_empresa_id IN NUMBER,
+        p_fecha      IN DATE
+    ) IS
+        v_clave VARCHAR2(40);
+    BEGIN
+        IF p_empresa_id IS NULL OR p_fecha IS NULL THEN
+            RETURN;
+        END IF;
+        v_clave := p_empresa_id || '|' || TO_CHAR(p_fecha, 'YYYYMMDD');
+        IF NOT p_marcas.EXISTS(v_clave) THEN
+            p_marcas(v_clave).empresa_id := p_empresa_id;
+            p_marcas(v_clave).fecha := TRUNC(p_fecha);
+        END IF;
+    END marcar;
+
+    -- ------------------------------------------------------------------------
+
+    PROCEDURE registrar(p_marcas IN OUT NOCOPY t_marcas) IS
+        v_clave VARCHAR2(40) := p_marcas.FIRST;
+        v_marca t_marca;
+    BEGIN
+        WHILE v_clave IS NOT NULL LOOP
+            v_marca := p_marcas(v_clave);
+            -- El UPDATE bloquea la fila marcada: refrescar_pendientes no puede
+            -- borrarla hasta que esta transacción confirme, así que el
+            -- recálculo siempre ve el cambio. Si no existe se inserta; si otra
+            -- sesión la insertó primero se vuelve a intentar el UPDATE.
+            LOOP
+                UPDATE ODO_METRICAS_PENDIENTES
+                SET FECHA_MARCA = SYSTIMESTAMP
+                WHERE EMPRESA_ID = v_marca.empresa_id
+                  AND FECHA = v_marca.fecha;
+                EXIT WHEN SQL%ROWCOUNT > 0;
+                BEGIN
+                    INSERT INTO ODO_METRICAS_PENDIENTES (EMPRESA_ID, FECHA)
+                    VALUES (v_marca.empresa_id, v_marca.fecha);
+                    EXIT;
+                EXCEPTION
+                    WHEN DUP_VAL_ON_INDEX THEN
+                        NULL;
+                END;
+            END LOOP;
+            v_clave := p_marcas.NEXT(v_clave);
+        END LOOP;
+        p_marcas.DELETE;
+    END registrar;
+
+    -- ------------------------------------------------------------------------
+
+    PROCEDURE refrescar_pendientes IS
+        v_empresas SYS.ODCINUMBERLIST;
+        v_fechas   SYS.ODCIDATELIST;
+        v_filas    NUMBER;
+    BEGIN
+        -- Tomar las claves: el DELETE espera a las transacciones que las
+        -- marcaron, y las marcadas después quedan para la próxima corrida.
+        -- Si el recálculo falla, el ROLLBACK las devuelve a la cola.
+        DELETE FROM ODO_METRICAS_PENDIENTES
+        RETURNING EMPRESA_ID, FECHA BULK COLLECT INTO v_empresas, v_fechas;
+
+        FOR i IN 1 .. v_empresas.COUNT LOOP
+            v_filas := refrescar(v_empresas(i), v_fechas(i), v_fechas(i));
+        END LOOP;
+
+        -- Foto de tratamientos activos del día
+        v_filas := refrescar(NULL, TRUNC(SYSDATE), TRUNC(SYSDATE));
+        COMMIT;
+    EXCEPTION
+        WHEN OTHERS THEN
+            ROLLBACK;
+            RAISE;
+    END refrescar_pendientes;
+
+    -- ------------------------------------------------------------------------
+
+    FUNCTION refrescar_todo(p_empresa_id IN NUMBER DEFAULT NULL) RETURN NUMBER IS
+        v_desde DATE;
+        v_hasta DATE;
+    BEGIN
+        SELECT MIN(desde), MAX(hasta) INTO v_desde, v_hasta
+        FROM (
+            SELECT CAST(MIN(FECHA_HORA_INICIO) AS DATE) AS desde,
+                   CAST(MAX(FECHA_HORA_INICIO) AS DATE) AS hasta
+            FROM ODO_CITAS WHERE (p_empresa_id IS NULL OR EMPRESA_ID = p_empresa_id)
+            UNION ALL
+            SELECT CAST(MIN(FECHA_PAGO) AS DATE), CAST(MAX(FECHA_PAGO) AS DATE)
+            FROM ODO_PAGOS WHERE (p_empresa_id IS NULL OR EMPRESA_ID = p_empresa_id)
+            UNION ALL
+            SELECT CAST(MIN(FECHA_REGISTRO) AS DATE), CAST(MAX(FECHA_REGISTRO) AS DATE)
+            FROM ODO_PACIENTES WHERE (p_empresa_id IS NULL OR EMPRESA_ID = p_empresa_id)
+        );
+
+        RETURN refrescar(p_empresa_id, NVL(v_desde, SYSDATE),
+                         GREATEST(NVL(v_hasta, SYSDATE), SYSDATE));
+    END refrescar_todo;
+
+    -- ------------------------------------------------------------------------
+
+    PROCEDURE crear_job(p_intervalo_minutos IN PLS_INTEGER DEFAULT 5) IS
+        v_existe NUMBER;
+    BEGIN
+        SELECT COUNT(*) INTO v_existe
+        FROM user_scheduler_jobs
+        WHERE job_name = c_job_name;
+
+        IF v_existe = 0 THEN
+            DBMS_SCHEDULER.create_job(
+                job_name        => c_job_name,
+                job_type        => 'STORED_PROCEDURE',
+                job_action      => 'PKG_METRICAS.REFRESCAR_PENDIENTES',
+                repeat_interval => 'FREQ=MINUTELY;INTERVAL=' || p_intervalo_minutos,
+                enabled         => TRUE,
+                comments        => 'Refresca ODO_METRICAS_DIARIAS (días marcados)'
+            );
+        ELSE
+            DBMS_SCHEDULER.set_attribute(c_job_name, 'job_action', 'PKG_METRICAS.REFRESCAR_PENDIENTES');
+            DBMS_SCHEDULER.set_attribute(c_job_name, 'comments', 'Refresca ODO_METRICAS_DIARIAS (días marcados)');
+        END IF;
+    END crear_job;
+
+END PKG_METRICAS;
+/
+
+-- ============================================================================
+-- TRIGGERS: marcan los días afectados de cada fuente
+-- ============================================================================
+CREATE OR REPLACE TRIGGER TRG_CITAS_METRICAS
+FOR INSERT OR DELETE OR UPDATE OF EMPRESA_ID, FECHA_HORA_INICIO, ESTADO
+ON ODO_CITAS
+COMPOUND TRIGGER
+    v_marcas PKG_METRICAS.t_marcas;
+
+    AFTER EACH ROW IS
+    BEGIN
+        PKG_METRICAS.marcar(v_marcas, :OLD.EMPRESA_ID, :OLD.FECHA_HORA_INICIO);
+        PKG_METRICAS.marcar(v_marcas, :NEW.EMPRESA_ID, :NEW.FECHA_HORA_INICIO);
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        PKG_METRICAS.registrar(v_marcas);
+    END AFTER STATEMENT;
+END TRG_CITAS_METRICAS;
+/
+
+CREATE OR REPLACE TRIGGER TRG_PAGOS_METRICAS
+FOR INSERT OR DELETE OR UPDATE OF EMPRESA_ID, FECHA_PAGO, MONTO
+ON ODO_PAGOS
+COMPOUND TRIGGER
+    v_marcas PKG_METRICAS.t_marcas;
+
+    AFTER EACH ROW IS
+    BEGIN
+        PKG_METRICAS.marcar(v_marcas, :OLD.EMPRESA_ID, :OLD.FECHA_PAGO);
+        PKG_METRICAS.marcar(v_marcas, :NEW.EMPRESA_ID, :NEW.FECHA_PAGO);
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        PKG_METRICAS.registrar(v_marcas);
+    END AFTER STATEMENT;
+END TRG_PAGOS_METRICAS;
+/
+
+CREATE OR REPLACE TRIGGER TRG_PACIENTES_METRICAS
+FOR INSERT OR DELETE OR UPDATE OF EMPRESA_ID, FECHA_REGISTRO
+ON ODO_PACIENTES
+COMPOUND TRIGGER
+    v_marcas PKG_METRICAS.t_marcas;
+
+    AFTER EACH ROW IS
+    BEGIN
+        PKG_METRICAS.marcar(v_marcas, :OLD.EMPRESA_ID, :OLD.FECHA_REGISTRO);
+        PKG_METRICAS.marcar(v_marcas, :NEW.EMPRESA_ID, :NEW.FECHA_REGISTRO);
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        PKG_METRICAS.registrar(v_marcas);
+    END AFTER STATEMENT;
+END TRG_PACIENTES_METRICAS;
+/
@@ -77,6 +77,7 @@ CREATE OR REPLACE PACKAGE PKG_ODONTOGRAMA AS
     );
 
     -- Actualizar múltiples dientes a la vez
+    -- p_dientes_json: [{"numero_fdi": 16, "estado": "CARIES", "observaciones": "..."}, ...]
     PROCEDURE actualizar_dientes_bulk(
         p_odontograma_id    IN  ODO_ODONTOGRAMAS.ODONTOGRAMA_ID%TYPE,
         p_dientes_json      IN  CLOB,
@@ -218,24 +219,6 @@ CREATE OR REPLACE PACKAGE BODY PKG_ODONTOGRAMA AS
             p_mensaje := 'Error al crear odontograma: ' || SQLERRM;
     END crear_odontograma;
 
-    -- ============================================
-    -- Función auxiliar para obtener tipo de diente
-    -- ============================================
-    FUNCTION get_tipo_diente(p_posicion NUMBER) RETURN VARCHAR2 IS
-    BEGIN
-        RETURN CASE p_posicion
-            WHEN 1 THEN 'INCISIVO_CENTRAL'
-            WHEN 2 THEN 'INCISIVO_LATERAL'
-            WHEN 3 THEN 'CANINO'
-            WHEN 4 THEN 'PRIMER_PREMOLAR'
-            WHEN 5 THEN 'SEGUNDO_PREMOLAR'
-            WHEN 6 THEN 'PRIMER_MOLAR'
-            WHEN 7 THEN 'SEGUNDO_MOLAR'
-            WHEN 8 THEN 'TERCER_MOLAR'
-            ELSE 'DESCONOCIDO'
-        END;
-    END get_tipo_diente;
-
     -- ============================================
     -- Inicializar dientes permanentes (32 dientes)
     -- ============================================
@@ -243,38 +226,30 @@ CREATE OR REPLACE PACKAGE BODY PKG_ODONTOGRAMA AS
         p_odontograma_id    IN  ODO_ODONTOGRAMAS.ODONTOGRAMA_ID%TYPE,
         p_creado_por        IN  NUMBER DEFAULT NULL
     ) IS
-        v_tipo VARCHAR2(30);
     BEGIN
-        -- Cuadrantes: 1 (sup-der), 2 (sup-izq), 3 (inf-izq), 4 (inf-der)
-        -- Posiciones: 1-8 por cuadrante
-        FOR cuadrante IN 1..4 LOOP
-            FOR posicion IN 1..8 LOOP
-                -- Obtener tipo de diente según posición
-                v_tipo := get_tipo_diente(posicion);
-
-                INSERT INTO ODO_DIENTES (
-                    ODONTOGRAMA_ID,
-                    NUMERO_FDI,
-                    TIPO_DIENTE,
-                    ESTADO,
-                    CUADRANTE,
-                    POSICION,
-                    ACTIVO,
-                    FECHA_CREACION,
-                    CREADO_POR
-                ) VALUES (
-                    p_odontograma_id,
-                    cuadrante * 10 + posicion,  -- FDI: 11-18, 21-28, 31-38, 41-48
-                    v_tipo,
-                    c_estado_sano,
-                    cuadrante,
-                    posicion,
-                    'S',
-                    SYSTIMESTAMP,
-                    p_creado_por
-                );
-            END LOOP;
-        END LOOP;
+        -- Cuadrantes 1-4, posiciones 1-8 (FDI 11-18, 21-28, 31-38, 41-48)
+        INSERT INTO ODO_DIENTES (
+            ODONTOGRAMA_ID,
+            NUMERO_FDI,
+            TIPO_DIENTE,
+            ESTADO,
+            CUADRANTE,
+            POSICION,
+            ACTIVO,
+            FECHA_CREACION,
+            CREADO_POR
+        )
+        SELECT p_odontograma_id,
+               NUMERO_FDI,
+               TIPO_DIENTE,
+               c_estado_sano,
+               CUADRANTE,
+               POSICION,
+               'S',
+               SYSTIMESTAMP,
+               p_creado_por
+        FROM ODO_DIENTES_FDI
+        WHERE DENTICION = 'PERMANENTE';
     END inicializar_dientes_permanente;
 
     -- ============================================
@@ -284,43 +259,30 @@ CREATE OR REPLACE PACKAGE BODY PKG_ODONTOGRAMA AS
         p_odontograma_id    IN  ODO_ODONTOGRAMAS.ODONTOGRAMA_ID%TYPE,
         p_creado_por        IN  NUMBER DEFAULT NULL
     ) IS
-        v_tipo VARCHAR2(30);
     BEGIN
-        -- Cuadrantes temporales: 5 (sup-der), 6 (sup-izq), 7 (inf-izq), 8 (inf-der)
-        -- Posiciones: 1-5 por cuadrante
-        FOR cuadrante IN 5..8 LOOP
-            FOR posicion IN 1..5 LOOP
-                v_tipo := CASE posicion
-                    WHEN 1 THEN 'INCISIVO_CENTRAL'
-                    WHEN 2 THEN 'INCISIVO_LATERAL'
-                    WHEN 3 THEN 'CANINO'
-                    WHEN 4 THEN 'PRIMER_MOLAR'
-                    WHEN 5 THEN 'SEGUNDO_MOLAR'
-                END;
-
-                INSERT INTO ODO_DIENTES (
-                    ODONTOGRAMA_ID,
-                    NUMERO_FDI,
-                    TIPO_DIENTE,
-                    ESTADO,
-                    CUADRANTE,
-                    POSICION,
-                    ACTIVO,
-                    FECHA_CREACION,
-                    CREADO_POR
-                ) VALUES (
-                    p_odontograma_id,
-                    cuadrante * 10 + posicion,  -- FDI: 51-55, 61-65, 71-75, 81-85
-                    v_tipo,
-                    c_estado_sano,
-                    cuadrante,
-                    posicion,
-                    'S',
-                    SYSTIMESTAMP,
-                    p_creado_por
-                );
-            END LOOP;
-        END LOOP;
+        -- Cuadrantes 5-8, posiciones 1-5 (FDI 51-55, 61-65, 71-75, 81-85)
+        INSERT INTO ODO_DIENTES (
+            ODONTOGRAMA_ID,
+            NUMERO_FDI,
+            TIPO_DIENTE,
+            ESTADO,
+            CUADRANTE,
+            POSICION,
+            ACTIVO,
+            FECHA_CREACION,
+            CREADO_POR
+        )
+        SELECT p_odontograma_id,
+               NUMERO_FDI,
+               TIPO_DIENTE,
+               c_estado_sano,
+               CUADRANTE,
+               POSICION,
+               'S',
+               SYSTIMESTAMP,
+               p_creado_por
+        FROM ODO_DIENTES_FDI
+        WHERE DENTICION = 'TEMPORAL';
     END inicializar_dientes_temporal;
 
     -- ============================================
@@ -539,31 +501,37 @@ CREATE OR REPLACE PACKAGE BODY PKG_ODONTOGRAMA AS
     ) IS
         v_count NUMBER := 0;
     BEGIN
-        -- Parsear JSON y actualizar cada diente
-        FOR rec IN (
-            SELECT
-                jt.numero_fdi,
-                jt.estado,
-                jt.observaciones
-            FROM JSON_TABLE(p_dientes_json, '$[*]'
-                COLUMNS (
-                    numero_fdi NUMBER PATH '$.numero_fdi',
-                    estado VARCHAR2(30) PATH '$.estado',
-                    observaciones VARCHAR2(500) PATH '$.observaciones'
-                )
-            ) jt
-        ) LOOP
-            UPDATE ODO_DIENTES
-            SET ESTADO = rec.estado,
-                OBSERVACIONES = rec.observaciones,
-                FECHA_MODIFICACION = SYSTIMESTAMP,
-                MODIFICADO_POR = p_modificado_por
-            WHERE ODONTOGRAMA_ID = p_odontograma_id
-              AND NUMERO_FDI = rec.numero_fdi
-              AND ACTIVO = 'S';
-
-            v_count := v_count + SQL%ROWCOUNT;
-        END LOOP;
+        -- Todos los dientes en una sola sentencia. Si un diente viene más de
+        -- una vez en el JSON gana el último (MERGE no admite filas repetidas).
+        MERGE INTO ODO_DIENTES d
+        USING (
+            SELECT numero_fdi, estado, observaciones
+            FROM (
+                SELECT jt.numero_fdi, jt.estado, jt.observaciones,
+                       ROW_NUMBER() OVER (PARTITION BY jt.numero_fdi ORDER BY jt.orden DESC) AS rn
+                FROM JSON_TABLE(p_dientes_json, '$[*]'
+                    COLUMNS (
+                        orden FOR ORDINALITY,
+                        numero_fdi NUMBER PATH '$.numero_fdi',
+                        estado VARCHAR2(30) PATH '$.estado',
+                        observaciones VARCHAR2(500) PATH '$.observaciones'
+                    )
+                ) jt
+                WHERE jt.numero_fdi IS NOT NULL
+                  AND jt.estado IS NOT NULL
+            )
+            WHERE rn = 1
+        ) s
+        ON (d.ODONTOGRAMA_ID = p_odontograma_id
+            AND d.NUMERO_FDI = s.numero_fdi
+            AND d.ACTIVO = 'S')
+        WHEN MATCHED THEN UPDATE SET
+            d.ESTADO = s.estado,
+            d.OBSERVACIONES = NVL(s.observaciones, d.OBSERVACIONES),
+            d.FECHA_MODIFICACION = SYSTIMESTAMP,
+            d.MODIFICADO_POR = p_modificado_por;
+
+        v_count := SQL%ROWCOUNT;
 
         COMMIT;
 
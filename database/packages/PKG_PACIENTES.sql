@@ -54,6 +54,9 @@ CREATE OR REPLACE PACKAGE PKG_PACIENTES AS
 
     -- ========================================================================
     -- GET_PACIENTES_BY_EMPRESA: Listar todos los pacientes de una empresa
+    -- Paginación keyset: p_token es el p_next_token de la página anterior
+    -- (NULL = primera página; p_offset solo se usa sin token). p_total solo
+    -- se calcula si p_incluir_total = 'S' (COUNT aparte); si no, NULL.
     -- ========================================================================
     PROCEDURE get_pacientes_by_empresa(
         p_empresa_id    IN  NUMBER,
@@ -63,11 +66,19 @@ CREATE OR REPLACE PACKAGE PKG_PACIENTES AS
         p_cursor        OUT SYS_REFCURSOR,
         p_total         OUT NUMBER,
         p_status        OUT VARCHAR2,
-        p_message       OUT VARCHAR2
+        p_message       OUT VARCHAR2,
+        p_token         IN  VARCHAR2 DEFAULT NULL,
+        p_next_token    OUT VARCHAR2,
+        p_incluir_total IN  VARCHAR2 DEFAULT NULL
     );
 
     -- ========================================================================
-    -- SEARCH_PACIENTES: Buscar pacientes por criterios
+    -- SEARCH_PACIENTES: Buscar pacientes por criterios (paginación keyset
+    -- igual que get_pacientes_by_empresa). El término usa el índice Oracle
+    -- Text de 13_busqueda_pacientes_text.sql y los resultados vienen
+    -- ordenados por relevancia. Solo se paginan los 500 de mayor score:
+    -- p_total, si se pide, se limita a 500 (los resultados alcanzables) y
+    -- p_message lo indica cuando hay más coincidencias.
     -- ========================================================================
     PROCEDURE search_pacientes(
         p_empresa_id        IN  NUMBER,
@@ -78,7 +89,10 @@ CREATE OR REPLACE PACKAGE PKG_PACIENTES AS
         p_cursor            OUT SYS_REFCURSOR,
         p_total             OUT NUMBER,
         p_status            OUT VARCHAR2,
-        p_message           OUT VARCHAR2
+        p_message           OUT VARCHAR2,
+        p_token             IN  VARCHAR2 DEFAULT NULL,
+        p_next_token        OUT VARCHAR2,
+        p_incluir_total     IN  VARCHAR2 DEFAULT NULL
     );
 
     -- ========================================================================
@@ -184,6 +198,81 @@ END PKG_PACIENTES;
 -- ============================================================================
 CREATE OR REPLACE PACKAGE BODY PKG_PACIENTES AS
 
+    -- Búsqueda por texto: solo se ordenan y paginan los mejores candidatos
+    -- por score, así el índice devuelve top-N sin puntuar todo lo que
+    -- coincide con un término corto
+    c_max_candidatos CONSTANT PLS_INTEGER := 500;
+    c_indice_busqueda CONSTANT VARCHAR2(30) := 'IDX_PACIENTES_BUSQUEDA';
+
+    -- Largo mínimo de una palabra para buscarla como prefijo (w%) y como
+    -- subcadena (%w%). Más cortas expanden a miles de términos en un índice
+    -- compartido por todas las empresas (p. ej. "0" contra los números de
+    -- historia 000123...) y superan WILDCARD_MAXTERMS (DRG-51030).
+    c_min_prefijo    CONSTANT PLS_INTEGER := 2;
+    c_min_subcadena  CONSTANT PLS_INTEGER := 4;
+
+    -- Página de un listado: id y clave de orden (apellido, nombre, id)
+    TYPE t_page_rec IS RECORD (
+        paciente_id     NUMBER,
+        sort_key        VARCHAR2(4000)
+    );
+    TYPE t_page IS TABLE OF t_page_rec;
+
+    -- ========================================================================
+    -- FUNCIÓN AUXILIAR: Cerrar una página
+    -- Deja en p_ids los ids de la página (sin la fila extra) y calcula el
+    -- token de la página siguiente.
+    -- ========================================================================
+    PROCEDURE close_page(
+        p_page          IN  t_page,
+        p_limit         IN  PLS_INTEGER,
+        p_seen          IN  NUMBER,
+        p_ids           OUT SYS.ODCINUMBERLIST,
+        p_next_token    OUT VARCHAR2
+    ) IS
+    BEGIN
+        p_ids := SYS.ODCINUMBERLIST();
+        FOR i IN 1 .. LEAST(p_page.COUNT, p_limit) LOOP
+            p_ids.EXTEND;
+            p_ids(i) := p_page(i).paciente_id;
+        END LOOP;
+
+        IF p_page.COUNT > p_limit THEN
+            p_next_token := PKG_JSON_RESPONSE.encode_token(p_page(p_limit).sort_key, p_seen + p_limit);
+        END IF;
+    END close_page;
+
+    -- ========================================================================
+    -- FUNCIÓN AUXILIAR: Consulta Oracle Text para la búsqueda
+    -- Cada palabra del término (máx. 6) debe aparecer en nombre, apellido,
+    -- historia, email o documento; pesa más la palabra exacta, luego el
+    -- prefijo (desde c_min_prefijo) y luego la subcadena (desde
+    -- c_min_subcadena). Con p_solo_exacta no se usan comodines. Mayúsculas
+    -- y acentos los normaliza el lexer del índice (ODO_PAC_LEXER).
+    -- ========================================================================
+    FUNCTION text_query(
+        p_term        IN VARCHAR2,
+        p_solo_exacta IN BOOLEAN DEFAULT FALSE
+    ) RETURN VARCHAR2 IS
+        v_query VARCHAR2(4000);
+        v_word  VARCHAR2(64);
+    BEGIN
+        FOR i IN 1 .. 6 LOOP
+            v_word := SUBSTR(LOWER(REGEXP_SUBSTR(p_term, '[[:alnum:]]+', 1, i)), 1, 64);
+            EXIT WHEN v_word IS NULL;
+            v_query := v_query || CASE WHEN i > 1 THEN ' AND ' END
+                       || '(({' || v_word || '})*3';
+            IF NOT p_solo_exacta AND LENGTH(v_word) >= c_min_prefijo THEN
+                v_query := v_query || ' OR (' || v_word || '%)*2';
+            END IF;
+            IF NOT p_solo_exacta AND LENGTH(v_word) >= c_min_subcadena THEN
+                v_query := v_query || ' OR (%' || v_word || '%)';
+            END IF;
+            v_query := v_query || ')';
+        END LOOP;
+        RETURN v_query;
+    END text_query;
+
     -- ========================================================================
     -- FUNCIÓN AUXILIAR: Calcular edad
     -- ========================================================================
@@ -199,10 +288,9 @@ CREATE OR REPLACE PACKAGE BODY PKG_PACIENTES AS
         v_secuencia NUMBER;
         v_numero VARCHAR2(20);
     BEGIN
-        SELECT NVL(MAX(TO_NUMBER(REGEXP_SUBSTR(numero_historia, '\d+'))), 0) + 1
-        INTO v_secuencia
-        FROM odo_pacientes
-        WHERE empresa_id = p_empresa_id;
+        -- Contador por empresa (ver PKG_CONTADORES): O(1) y sin duplicados
+        -- entre altas concurrentes
+        v_secuencia := PKG_CONTADORES.siguiente(p_empresa_id, 'HISTORIA_CLINICA');
 
         v_numero := 'HC-' || LPAD(v_secuencia, 6, '0');
         RETURN v_numero;
@@ -281,17 +369,49 @@ CREATE OR REPLACE PACKAGE BODY PKG_PACIENTES AS
         p_cursor        OUT SYS_REFCURSOR,
         p_total         OUT NUMBER,
         p_status        OUT VARCHAR2,
-        p_message       OUT VARCHAR2
+        p_message       OUT VARCHAR2,
+        p_token         IN  VARCHAR2 DEFAULT NULL,
+        p_next_token    OUT VARCHAR2,
+        p_incluir_total IN  VARCHAR2 DEFAULT NULL
     ) IS
+        v_key       VARCHAR2(4000) := PKG_JSON_RESPONSE.token_key(p_token);
+        v_apellido  odo_pacientes.apellido%TYPE := JSON_VALUE(v_key, '$[0]');
+        v_nombre    odo_pacientes.nombre%TYPE := JSON_VALUE(v_key, '$[1]');
+        v_id        NUMBER := JSON_VALUE(v_key, '$[2]' RETURNING NUMBER);
+        v_limit     PLS_INTEGER := PKG_JSON_RESPONSE.page_size(p_limit, 100);
+        v_offset    NUMBER := CASE WHEN v_key IS NULL THEN NVL(p_offset, 0) ELSE 0 END;
+        v_seen      NUMBER;
+        v_page      t_page;
+        v_ids       SYS.ODCINUMBERLIST;
     BEGIN
-        -- Contar total
-        SELECT COUNT(*)
-        INTO p_total
+        v_seen := CASE WHEN v_key IS NULL THEN v_offset
+                       ELSE PKG_JSON_RESPONSE.token_seen(p_token) END;
+
+        IF PKG_JSON_RESPONSE.include_total(p_incluir_total) THEN
+            SELECT COUNT(*) INTO p_total
+            FROM odo_pacientes
+            WHERE empresa_id = p_empresa_id
+              AND (p_activo IS NULL OR activo = p_activo);
+        END IF;
+
+        -- Ids de la página (más uno para saber si hay otra); FETCH corta la
+        -- lectura del índice ahí
+        SELECT paciente_id,
+               JSON_ARRAY(apellido, nombre, paciente_id NULL ON NULL)
+        BULK COLLECT INTO v_page
         FROM odo_pacientes
         WHERE empresa_id = p_empresa_id
-          AND (p_activo IS NULL OR activo = p_activo);
+          AND (p_activo IS NULL OR activo = p_activo)
+          AND (v_key IS NULL
+               OR apellido > v_apellido
+               OR (apellido = v_apellido AND nombre > v_nombre)
+               OR (apellido = v_apellido AND nombre = v_nombre AND paciente_id > v_id))
+        ORDER BY apellido, nombre, paciente_id
+        OFFSET v_offset ROWS FETCH NEXT v_limit + 1 ROWS ONLY;
 
-        -- Obtener datos paginados
+        close_page(v_page, v_limit, v_seen, v_ids, p_next_token);
+
+        -- Los saldos se calculan solo para las filas de la página
         OPEN p_cursor FOR
             SELECT
                 p.paciente_id,
@@ -317,13 +437,11 @@ CREATE OR REPLACE PACKAGE BODY PKG_PACIENTES AS
                      WHERE f.paciente_id = p.paciente_id
                        AND f.estado IN ('PENDIENTE', 'PARCIAL')), 0) AS saldo_pendiente
             FROM odo_pacientes p
-            WHERE p.empresa_id = p_empresa_id
-              AND (p_activo IS NULL OR p.activo = p_activo)
-            ORDER BY p.apellido, p.nombre
-            OFFSET p_offset ROWS FETCH NEXT p_limit ROWS ONLY;
+            JOIN TABLE(v_ids) ids ON ids.COLUMN_VALUE = p.paciente_id
+            ORDER BY p.apellido, p.nombre, p.paciente_id;
 
         p_status := 'SUCCESS';
-        p_message := 'Pacientes obtenidos correctamente. Total: ' || p_total;
+        p_message := 'Pacientes obtenidos correctamente';
 
     EXCEPTION
         WHEN OTHERS THEN
@@ -343,56 +461,153 @@ CREATE OR REPLACE PACKAGE BODY PKG_PACIENTES AS
         p_cursor            OUT SYS_REFCURSOR,
         p_total             OUT NUMBER,
         p_status            OUT VARCHAR2,
-        p_message           OUT VARCHAR2
+        p_message           OUT VARCHAR2,
+        p_token             IN  VARCHAR2 DEFAULT NULL,
+        p_next_token        OUT VARCHAR2,
+        p_incluir_total     IN  VARCHAR2 DEFAULT NULL
     ) IS
-        v_search VARCHAR2(200);
+        v_query     VARCHAR2(4000) := text_query(p_search_term);
+        v_truncado  BOOLEAN := FALSE;
+        v_key       VARCHAR2(4000) := PKG_JSON_RESPONSE.token_key(p_token);
+        v_score     NUMBER := JSON_VALUE(v_key, '$[0]' RETURNING NUMBER);
+        v_apellido  odo_pacientes.apellido%TYPE := JSON_VALUE(v_key, '$[1]');
+        v_nombre    odo_pacientes.nombre%TYPE := JSON_VALUE(v_key, '$[2]');
+        v_id        NUMBER := JSON_VALUE(v_key, '$[3]' RETURNING NUMBER);
+        v_limit     PLS_INTEGER := PKG_JSON_RESPONSE.page_size(p_limit, 50);
+        v_offset    NUMBER := CASE WHEN v_key IS NULL THEN NVL(p_offset, 0) ELSE 0 END;
+        v_seen      NUMBER;
+        v_page      t_page;
+        v_ids       SYS.ODCINUMBERLIST;
     BEGIN
-        v_search := '%' || UPPER(p_search_term) || '%';
+        v_seen := CASE WHEN v_key IS NULL THEN v_offset
+                       ELSE PKG_JSON_RESPONSE.token_seen(p_token) END;
+
+        -- Filtro, ranking y página en una consulta. Con término se usa el
+        -- índice Oracle Text IDX_PACIENTES_BUSQUEDA (filtrado por EMPRESA_ID
+        -- y ACTIVO dentro del índice); sin término, el orden alfabético con
+        -- score 0. La clave de página es (score, apellido, nombre, id). El
+        -- total es un COUNT aparte, solo si se pide.
+        IF v_query IS NOT NULL THEN
+            -- Si los comodines expanden a más de WILDCARD_MAXTERMS términos
+            -- (DRG-51030) se repite la búsqueda solo con palabras exactas
+            FOR v_intento IN 1 .. 2 LOOP
+                BEGIN
+                    IF PKG_JSON_RESPONSE.include_total(p_incluir_total)
+                       AND p_documento_numero IS NULL THEN
+                        -- Conteo dentro del índice (EMPRESA_ID y ACTIVO son SDATA
+                        -- por el FILTER BY), sin puntuar ni leer la tabla
+                        p_total := CTX_QUERY.count_hits(
+                            index_name => c_indice_busqueda,
+                            text_query => '(' || v_query || ') AND SDATA(EMPRESA_ID = '
+                                          || TO_CHAR(p_empresa_id) || ') AND SDATA(ACTIVO = ''S'')',
+                            exact      => TRUE
+                        );
+                    ELSIF PKG_JSON_RESPONSE.include_total(p_incluir_total) THEN
+                        SELECT COUNT(*) INTO p_total
+                        FROM odo_pacientes
+                        WHERE CONTAINS(busqueda, v_query) > 0
+                          AND empresa_id = p_empresa_id
+                          AND activo = 'S'
+                          AND documento_numero = p_documento_numero;
+                    END IF;
+
+                    -- Los c_max_candidatos de mayor score (FIRST_ROWS + ROWNUM: el
+                    -- índice devuelve solo esos, ya ordenados); el desempate y la
+                    -- página se resuelven sobre ese conjunto acotado
+                    SELECT paciente_id,
+                           JSON_ARRAY(score, apellido, nombre, paciente_id NULL ON NULL)
+                    BULK COLLECT INTO v_page
+                    FROM (
+                        SELECT score, apellido, nombre, paciente_id
+                        FROM (
+                            SELECT /*+ FIRST_ROWS(500) */
+                                   SCORE(1) AS score, apellido, nombre, paciente_id
+                            FROM odo_pacientes
+                            WHERE CONTAINS(busqueda, v_query, 1) > 0
+                              AND empresa_id = p_empresa_id
+                              AND activo = 'S'
+                              AND (p_documento_numero IS NULL OR documento_numero = p_documento_numero)
+                            ORDER BY SCORE(1) DESC
+                        )
+                        WHERE ROWNUM <= c_max_candidatos
+                    )
+                    WHERE v_key IS NULL
+                       OR score < v_score
+                       OR (score = v_score AND apellido > v_apellido)
+                       OR (score = v_score AND apellido = v_apellido AND nombre > v_nombre)
+                       OR (score = v_score AND apellido = v_apellido AND nombre = v_nombre
+                           AND paciente_id > v_id)
+                    ORDER BY score DESC, apellido, nombre, paciente_id
+                    OFFSET v_offset ROWS FETCH NEXT v_limit + 1 ROWS ONLY;
+                    EXIT;
+                EXCEPTION
+                    WHEN OTHERS THEN
+                        IF v_intento = 1
+                           AND INSTR(DBMS_UTILITY.format_error_stack, 'DRG-51030') > 0 THEN
+                            v_query := text_query(p_search_term, p_solo_exacta => TRUE);
+                            p_total := NULL;
+                        ELSE
+                            RAISE;
+                        END IF;
+                END;
+            END LOOP;
+
+            -- Solo se puede paginar hasta c_max_candidatos
+            IF p_total > c_max_candidatos THEN
+                p_total := c_max_candidatos;
+                v_truncado := TRUE;
+            END IF;
+        ELSE
+            IF PKG_JSON_RESPONSE.include_total(p_incluir_total) THEN
+                SELECT COUNT(*) INTO p_total
+                FROM odo_pacientes
+                WHERE empresa_id = p_empresa_id
+                  AND activo = 'S'
+                  AND (p_documento_numero IS NULL OR documento_numero = p_documento_numero);
+            END IF;
 
-        -- Contar total
-        SELECT COUNT(*)
-        INTO p_total
-        FROM odo_pacientes
-        WHERE empresa_id = p_empresa_id
-          AND activo = 'S'
-          AND (
-              p_search_term IS NULL
-              OR UPPER(nombre || ' ' || apellido) LIKE v_search
-              OR UPPER(numero_historia) LIKE v_search
-              OR UPPER(email) LIKE v_search
-          )
-          AND (p_documento_numero IS NULL OR documento_numero = p_documento_numero);
-
-        -- Obtener datos
-        OPEN p_cursor FOR
-            SELECT
-                paciente_id,
-                numero_historia,
-                nombre,
-                apellido,
-                nombre || ' ' || apellido AS nombre_completo,
-                documento_tipo,
-                documento_numero,
-                fecha_nacimiento,
-                TRUNC(MONTHS_BETWEEN(SYSDATE, fecha_nacimiento) / 12) AS edad,
-                email,
-                telefono_principal,
-                activo
+            SELECT paciente_id,
+                   JSON_ARRAY(0, apellido, nombre, paciente_id NULL ON NULL)
+            BULK COLLECT INTO v_page
             FROM odo_pacientes
             WHERE empresa_id = p_empresa_id
               AND activo = 'S'
-              AND (
-                  p_search_term IS NULL
-                  OR UPPER(nombre || ' ' || apellido) LIKE v_search
-                  OR UPPER(numero_historia) LIKE v_search
-                  OR UPPER(email) LIKE v_search
-              )
               AND (p_documento_numero IS NULL OR documento_numero = p_documento_numero)
-            ORDER BY apellido, nombre
-            OFFSET p_offset ROWS FETCH NEXT p_limit ROWS ONLY;
+              AND (v_key IS NULL
+                   OR apellido > v_apellido
+                   OR (apellido = v_apellido AND nombre > v_nombre)
+                   OR (apellido = v_apellido AND nombre = v_nombre AND paciente_id > v_id))
+            ORDER BY apellido, nombre, paciente_id
+            OFFSET v_offset ROWS FETCH NEXT v_limit + 1 ROWS ONLY;
+        END IF;
+
+        close_page(v_page, v_limit, v_seen, v_ids, p_next_token);
+
+        -- Obtener datos de la página, en el orden del ranking
+        OPEN p_cursor FOR
+            SELECT
+                p.paciente_id,
+                p.numero_historia,
+                p.nombre,
+                p.apellido,
+                p.nombre || ' ' || p.apellido AS nombre_completo,
+                p.documento_tipo,
+                p.documento_numero,
+                p.fecha_nacimiento,
+                TRUNC(MONTHS_BETWEEN(SYSDATE, p.fecha_nacimiento) / 12) AS edad,
+                p.email,
+                p.telefono_principal,
+                p.activo
+            FROM odo_pacientes p
+            JOIN (SELECT COLUMN_VALUE AS paciente_id, ROWNUM AS pos
+                  FROM TABLE(v_ids)) ids ON ids.paciente_id = p.paciente_id
+            ORDER BY ids.pos;
 
         p_status := 'SUCCESS';
-        p_message := 'Búsqueda completada. Total: ' || p_total;
+        p_message := CASE WHEN v_truncado
+                          THEN 'Búsqueda completada (se muestran los ' || c_max_candidatos
+                               || ' resultados más relevantes)'
+                          ELSE 'Búsqueda completada' END;
 
     EXCEPTION
         WHEN OTHERS THEN
@@ -0,0 +1,173 @@
+-- =============================================================================
+-- PKG_PACIENTES_IMPORT - Importación masiva de pacientes desde staging
+-- =============================================================================
+-- scripts/import_pacientes.py valida y normaliza el archivo (CSV / XLSX),
+-- carga las filas válidas en ODO_PACIENTES_IMPORT con array binds (un
+-- IMPORT_ID por corrida) y llama a importar(), que resuelve todo el lote
+-- en SQL:
+--
+--   1. Clasifica cada fila: EXISTE (ya hay un paciente de la empresa con ese
+--      documento), DUPLICADO (el documento se repite en el archivo; queda la
+--      primera fila) o NUEVO, con su ORDEN entre las nuevas.
+--   2. Reserva en PKG_CONTADORES un bloque de números de historia para todas
+--      las nuevas (un solo UPDATE del contador).
+--   3. Un único MERGE inserta las nuevas en ODO_PACIENTES con
+--      NUMERO_HISTORIA = 'HC-' || LPAD(base + ORDEN, 6, '0').
+--   4. Las filas que el MERGE no insertó (alta concurrente con el mismo
+--      documento) pasan a EXISTE; el resto a INSERTADO.
+--
+-- El script lee las filas EXISTE / DUPLICADO para el archivo de rechazos y
+-- después borra el lote con limpiar().
+--
+-- La tabla de staging se crea con ensure_schema.py (pacientes_import).
+-- =============================================================================
+
+CREATE OR REPLACE PACKAGE PKG_PACIENTES_IMPORT AS
+
+    c_tipo_contador CONSTANT VARCHAR2(30) := 'HISTORIA_CLINICA';
+
+    -- Inserta las filas NUEVO del lote p_import_id en la empresa.
+    -- p_status: SUCCESS / ERROR
+    PROCEDURE importar(
+        p_import_id      IN  NUMBER,
+        p_empresa_id     IN  NUMBER,
+        p_registrado_por IN  NUMBER,
+        p_insertados     OUT NUMBER,
+        p_existentes     OUT NUMBER,
+        p_duplicados     OUT NUMBER,
+        p_status         OUT VARCHAR2,
+        p_message        OUT VARCHAR2
+    );
+
+    -- Borra el lote de la tabla de staging
+    PROCEDURE limpiar(p_import_id IN NUMBER);
+
+END PKG_PACIENTES_IMPORT;
+/
+
+CREATE OR REPLACE PACKAGE BODY PKG_PACIENTES_IMPORT AS
+
+    PROCEDURE importar(
+        p_import_id      IN  NUMBER,
+        p_empresa_id     IN  NUMBER,
+        p_registrado_por IN  NUMBER,
+        p_insertados     OUT NUMBER,
+        p_existentes     OUT NUMBER,
+        p_duplicados     OUT NUMBER,
+        p_status         OUT VARCHAR2,
+        p_message        OUT VARCHAR2
+    ) IS
+        v_nuevos NUMBER;
+        v_base   NUMBER;
+    BEGIN
+        p_insertados := 0;
+
+        -- 1. Clasificar el lote
+        MERGE INTO ODO_PACIENTES_IMPORT s
+        USING (
+            SELECT rid, estado,
+                   CASE WHEN estado = 'NUEVO'
+                        THEN ROW_NUMBER() OVER (PARTITION BY estado ORDER BY fila) END AS orden
+            FROM (
+                SELECT i.ROWID AS rid, i.FILA AS fila,
+                       CASE
+                           WHEN EXISTS (
+                               SELECT 1 FROM ODO_PACIENTES p
+                               WHERE p.EMPRESA_ID = p_empresa_id
+                                 AND p.DOCUMENTO_TIPO = i.DOCUMENTO_TIPO
+                                 AND p.DOCUMENTO_NUMERO = i.DOCUMENTO_NUMERO)
+                           THEN 'EXISTE'
+                           WHEN ROW_NUMBER() OVER (
+                                    PARTITION BY i.DOCUMENTO_TIPO, i.DOCUMENTO_NUMERO
+                                    ORDER BY i.FILA) > 1
+                           THEN 'DUPLICADO'
+                           ELSE 'NUEVO'
+                       END AS estado
+                FROM ODO_PACIENTES_IMPORT i
+                WHERE i.IMPORT_ID = p_import_id
+            )
+        ) x
+        ON (s.ROWID = x.rid)
+        WHEN MATCHED THEN UPDATE SET
+            s.ESTADO = x.estado,
+            s.ORDEN = x.orden;
+
+        SELECT COUNT(CASE WHEN ESTADO = 'NUEVO' THEN 1 END),
+               COUNT(CASE WHEN ESTADO = 'DUPLICADO' THEN 1 END)
+        INTO v_nuevos, p_duplicados
+        FROM ODO_PACIENTES_IMPORT
+        WHERE IMPORT_ID = p_import_id;
+
+        IF v_nuevos > 0 THEN
+            -- 2. Un bloque de números para todo el lote: (v_base, v_base + v_nuevos]
+            v_base := PKG_CONTADORES.reservar(p_empresa_id, c_tipo_contador, v_nuevos) - v_nuevos;
+
+            -- 3. Alta de todas las filas nuevas en una sentencia
+            MERGE INTO ODO_PACIENTES p
+            USING (
+                SELECT * FROM ODO_PACIENTES_IMPORT
+                WHERE IMPORT_ID = p_import_id
+                  AND ESTADO = 'NUEVO'
+            ) s
+            ON (p.EMPRESA_ID = p_empresa_id
+                AND p.DOCUMENTO_TIPO = s.DOCUMENTO_TIPO
+                AND p.DOCUMENTO_NUMERO = s.DOCUMENTO_NUMERO)
+            WHEN NOT MATCHED THEN INSERT (
+                NUMERO_HISTORIA, NOMBRE, APELLIDO, DOCUMENTO_TIPO, DOCUMENTO_NUMERO,
+                FECHA_NACIMIENTO, GENERO, GRUPO_SANGUINEO, EMAIL,
+                TELEFONO_PRINCIPAL, TELEFONO_SECUNDARIO, DIRECCION, OBSERVACIONES,
+                ACTIVO, FECHA_REGISTRO, REGISTRADO_POR, EMPRESA_ID
+            ) VALUES (
+                'HC-' || LPAD(v_base + s.ORDEN, 6, '0'),
+                INITCAP(s.NOMBRE), INITCAP(s.APELLIDO), s.DOCUMENTO_TIPO, s.DOCUMENTO_NUMERO,
+                s.FECHA_NACIMIENTO, s.GENERO, s.GRUPO_SANGUINEO, LOWER(s.EMAIL),
+                s.TELEFONO_PRINCIPAL, s.TELEFONO_SECUNDARIO, s.DIRECCION, s.OBSERVACIONES,
+                'S', SYSTIMESTAMP, p_registrado_por, p_empresa_id
+            );
+            p_insertados := SQL%ROWCOUNT;
+
+            -- 4. Resultado por fila: el número de historia es único por
+            --    fila del bloque, así que identifica exactamente a las insertadas
+            UPDATE ODO_PACIENTES_IMPORT s
+            SET s.ESTADO = CASE
+                    WHEN EXISTS (
+                        SELECT 1 FROM ODO_PACIENTES p
+                        WHERE p.EMPRESA_ID = p_empresa_id
+                          AND p.NUMERO_HISTORIA = 'HC-' || LPAD(v_base + s.ORDEN, 6, '0')
+                          AND p.DOCUMENTO_TIPO = s.DOCUMENTO_TIPO
+                          AND p.DOCUMENTO_NUMERO = s.DOCUMENTO_NUMERO)
+                    THEN 'INSERTADO'
+                    ELSE 'EXISTE'
+                END
+            WHERE s.IMPORT_ID = p_import_id
+              AND s.ESTADO = 'NUEVO';
+        END IF;
+
+        SELECT COUNT(*) INTO p_existentes
+        FROM ODO_PACIENTES_IMPORT
+        WHERE IMPORT_ID = p_import_id
+          AND ESTADO = 'EXISTE';
+
+        COMMIT;
+
+        p_status := 'SUCCESS';
+        p_message := p_insertados || ' pacientes importados, ' || p_existentes ||
+                     ' ya existían, ' || p_duplicados || ' duplicados en el archivo';
+
+    EXCEPTION
+        WHEN OTHERS THEN
+            ROLLBACK;
+            p_status := 'ERROR';
+            p_message := 'Error al importar pacientes: ' || SQLERRM;
+    END importar;
+
+    -- ------------------------------------------------------------------------
+
+    PROCEDURE limpiar(p_import_id IN NUMBER) IS
+    BEGIN
+        DELETE FROM ODO_PACIENTES_IMPORT WHERE IMPORT_ID = p_import_id;
+        COMMIT;
+    END limpiar;
+
+END PKG_PACIENTES_IMPORT;
+/
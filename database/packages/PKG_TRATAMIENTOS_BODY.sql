@@ -138,14 +138,18 @@ CREATE OR REPLACE PACKAGE BODY PKG_TRATAMIENTOS AS
         IF p_codigo IS NULL OR TRIM(p_codigo) = '' OR p_codigo = 'AUTO' THEN
             v_prefix := UPPER(SUBSTR(p_categoria, 1, 4));
             
-            -- Buscar el número más alto para este prefijo y SUMAR 1 (FILTRADO POR EMPRESA)
-            SELECT NVL(MAX(TO_NUMBER(REGEXP_SUBSTR(CODIGO, '[0-9]+$'))), 0) + 1 
-            INTO v_count
-            FROM ODO_CATALOGOS_TRATAMIENTOS
-            WHERE EMPRESA_ID = p_empresa_id
-              AND CODIGO LIKE v_prefix || '-%';
-            
-            v_codigo := v_prefix || '-' || LPAD(v_count, 3, '0');
+            -- Próximo número del prefijo (contador por empresa, PKG_CONTADORES).
+            -- Si el código ya se cargó a mano, se toma el siguiente.
+            LOOP
+                v_count := PKG_CONTADORES.siguiente(p_empresa_id, 'TRATAMIENTO:' || v_prefix);
+                v_codigo := v_prefix || '-' || LPAD(v_count, 3, '0');
+
+                SELECT COUNT(*) INTO v_codigo_existe
+                FROM ODO_CATALOGOS_TRATAMIENTOS
+                WHERE EMPRESA_ID = p_empresa_id
+                  AND CODIGO = v_codigo;
+                EXIT WHEN v_codigo_existe = 0;
+            END LOOP;
         ELSE
             v_codigo := UPPER(TRIM(p_codigo));
         END IF;
@@ -0,0 +1,116 @@
+-- =============================================================================
+-- GET /facturas/lista - Paginación keyset
+-- =============================================================================
+-- Reemplaza la paginación por OFFSET/ROWNUM de PKG_FACTURAS.get_facturas_empresa
+-- (un COUNT(*) y un SELECT por página) por una consulta keyset que devuelve
+-- los ids de la página y la clave de orden, cortando en limit + 1 filas. Los
+-- datos completos se leen después solo para esos ids. El COUNT(*) se hace
+-- solo si se pide con incluir_total=S.
+--
+-- Parámetros: empresa_id, estado, fecha_desde, fecha_hasta (YYYY-MM-DD),
+--             limit (default 50, máx. 500), next (token de la página anterior),
+--             incluir_total (S = agregar "total")
+-- Respuesta:  {"resultado":1,"mensaje":"...","total":812,"count":50,
+--              "next":"eyJrIjpb...","items":[...]}
+--
+-- Requiere PKG_JSON_RESPONSE (database/packages/PKG_JSON_RESPONSE.sql).
+-- =============================================================================
+
+BEGIN
+    ORDS.DEFINE_TEMPLATE(p_module_name => 'facturas', p_pattern => 'lista');
+    ORDS.DEFINE_HANDLER(
+        p_module_name    => 'facturas',
+        p_pattern        => 'lista',
+        p_method         => 'GET',
+        p_source_type    => 'plsql/block',
+        p_items_per_page => 0,
+        p_source         => q'[
+DECLARE
+    TYPE t_page_rec IS RECORD (
+        factura_id  NUMBER,
+        sort_key    VARCHAR2(4000)
+    );
+    TYPE t_page IS TABLE OF t_page_rec;
+
+    v_token   VARCHAR2(4000) := :next;
+    v_limit   PLS_INTEGER := PKG_JSON_RESPONSE.page_size(:limit, 50);
+    v_key     VARCHAR2(4000) := PKG_JSON_RESPONSE.token_key(v_token);
+    v_fecha   ODO_FACTURAS.FECHA_EMISION%TYPE := JSON_VALUE(v_key, '$[0]' RETURNING TIMESTAMP);
+    v_id      NUMBER := JSON_VALUE(v_key, '$[1]' RETURNING NUMBER);
+    v_seen    NUMBER := PKG_JSON_RESPONSE.token_seen(v_token);
+    v_desde   DATE := TO_DATE(:fecha_desde, 'YYYY-MM-DD');
+    v_hasta   DATE := TO_DATE(:fecha_hasta, 'YYYY-MM-DD');
+    v_estado  VARCHAR2(50) := :estado;
+    v_page    t_page;
+    v_ids     SYS.ODCINUMBERLIST := SYS.ODCINUMBERLIST();
+    v_total   NUMBER;
+    v_cursor  SYS_REFCURSOR;
+BEGIN
+    IF PKG_JSON_RESPONSE.include_total(:incluir_total) THEN
+        SELECT COUNT(*) INTO v_total
+        FROM ODO_FACTURAS f
+        WHERE f.EMPRESA_ID = :empresa_id
+          AND (v_estado IS NULL OR f.ESTADO = v_estado)
+          AND (v_desde IS NULL OR TRUNC(f.FECHA_EMISION) >= v_desde)
+          AND (v_hasta IS NULL OR TRUNC(f.FECHA_EMISION) <= v_hasta);
+    END IF;
+
+    -- Ids de la página (+1 para saber si hay otra)
+    SELECT f.FACTURA_ID,
+           JSON_ARRAY(f.FECHA_EMISION, f.FACTURA_ID NULL ON NULL)
+    BULK COLLECT INTO v_page
+    FROM ODO_FACTURAS f
+    WHERE f.EMPRESA_ID = :empresa_id
+      AND (v_estado IS NULL OR f.ESTADO = v_estado)
+      AND (v_desde IS NULL OR TRUNC(f.FECHA_EMISION) >= v_desde)
+      AND (v_hasta IS NULL OR TRUNC(f.FECHA_EMISION) <= v_hasta)
+      AND (v_key IS NULL
+           OR f.FECHA_EMISION < v_fecha
+           OR (f.FECHA_EMISION = v_fecha AND f.FACTURA_ID < v_id))
+    ORDER BY f.FECHA_EMISION DESC, f.FACTURA_ID DESC
+    FETCH FIRST v_limit + 1 ROWS ONLY;
+
+    FOR i IN 1 .. LEAST(v_page.COUNT, v_limit) LOOP
+        v_ids.EXTEND;
+        v_ids(i) := v_page(i).factura_id;
+    END LOOP;
+
+    OPEN v_cursor FOR
+        SELECT f.*,
+               p.NOMBRE || ' ' || p.APELLIDO AS PACIENTE_NOMBRE
+        FROM ODO_FACTURAS f
+        JOIN TABLE(v_ids) ids ON ids.COLUMN_VALUE = f.FACTURA_ID
+        LEFT JOIN ODO_PACIENTES p ON f.PACIENTE_ID = p.PACIENTE_ID
+        ORDER BY f.FECHA_EMISION DESC, f.FACTURA_ID DESC;
+
+    APEX_JSON.initialize_clob_output;
+    APEX_JSON.open_object;
+    APEX_JSON.write('resultado', 1);
+    APEX_JSON.write('mensaje', 'Facturas obtenidas');
+    IF v_total IS NOT NULL THEN
+        APEX_JSON.write('total', v_total);
+    END IF;
+    APEX_JSON.write('count', v_ids.COUNT);
+    IF v_page.COUNT > v_limit THEN
+        APEX_JSON.write('next', PKG_JSON_RESPONSE.encode_token(v_page(v_limit).sort_key,
+                                                               v_seen + v_limit));
+    END IF;
+    APEX_JSON.write('items', v_cursor);
+    APEX_JSON.close_object;
+    :status := 200;
+    :content_type := 'application/json';
+    PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
+    APEX_JSON.free_output;
+EXCEPTION
+    WHEN OTHERS THEN
+        APEX_JSON.free_output;
+        :status := 500;
+        :content_type := 'application/json';
+        htp.prn('{"resultado":0,"mensaje":"Error al obtener facturas: '
+                || REPLACE(SQLERRM, '"', '''') || '"}');
+END;
+        ]'
+    );
+    COMMIT;
+END;
+/
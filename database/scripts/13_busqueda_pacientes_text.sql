@@ -0,0 +1,129 @@
+-- =============================================================================
+-- BÚSQUEDA DE PACIENTES - ÍNDICE ORACLE TEXT
+-- =============================================================================
+-- PKG_PACIENTES.search_pacientes busca con CONTAINS sobre este índice en
+-- lugar de UPPER(...) LIKE '%term%' (que recorría toda ODO_PACIENTES):
+--
+--   - MULTI_COLUMN_DATASTORE: indexa nombre, apellido, número de historia,
+--     email y documento en un solo documento por paciente.
+--   - BASIC_LEXER con base_letter: "José", "JOSE" y "jose" son el mismo
+--     término (sin distinguir mayúsculas ni acentos).
+--   - BASIC_WORDLIST con substring_index y prefix_index: '%term%' y
+--     'term%' se resuelven en el índice.
+--   - FILTER BY EMPRESA_ID, ACTIVO: el filtro por empresa se aplica dentro
+--     del índice.
+--   - SYNC (ON COMMIT): los pacientes nuevos o modificados se ven en la
+--     búsqueda apenas se confirma la transacción.
+--
+-- El índice se define sobre la columna BUSQUEDA; el trigger
+-- TRG_PACIENTES_BUSQUEDA la toca cuando cambia alguna columna indexada para
+-- que Oracle Text reindexe la fila.
+--
+-- Requiere el rol CTXAPP (o EXECUTE sobre CTXSYS.CTX_DDL).
+-- =============================================================================
+
+-- ============================================================================
+-- COLUMNA Y TRIGGER
+-- ============================================================================
+DECLARE
+    v_existe NUMBER;
+BEGIN
+    SELECT COUNT(*) INTO v_existe
+    FROM user_tab_columns
+    WHERE table_name = 'ODO_PACIENTES' AND column_name = 'BUSQUEDA';
+
+    IF v_existe = 0 THEN
+        EXECUTE IMMEDIATE 'ALTER TABLE ODO_PACIENTES ADD (BUSQUEDA CHAR(1) DEFAULT ''S'' NOT NULL)';
+    END IF;
+END;
+/
+
+CREATE OR REPLACE TRIGGER TRG_PACIENTES_BUSQUEDA
+BEFORE INSERT OR UPDATE OF NOMBRE, APELLIDO, NUMERO_HISTORIA, EMAIL, DOCUMENTO_NUMERO
+ON ODO_PACIENTES
+FOR EACH ROW
+BEGIN
+    :NEW.BUSQUEDA := 'S';
+END;
+/
+
+-- ============================================================================
+-- PREFERENCIAS ORACLE TEXT
+-- ============================================================================
+BEGIN
+    FOR p IN (
+        SELECT pre_name FROM ctx_user_preferences
+        WHERE pre_name IN ('ODO_PAC_DATASTORE', 'ODO_PAC_LEXER', 'ODO_PAC_WORDLIST')
+    ) LOOP
+        CTX_DDL.drop_preference(p.pre_name);
+    END LOOP;
+
+    CTX_DDL.create_preference('ODO_PAC_DATASTORE', 'MULTI_COLUMN_DATASTORE');
+    CTX_DDL.set_attribute('ODO_PAC_DATASTORE', 'COLUMNS',
+        'NOMBRE, APELLIDO, NUMERO_HISTORIA, EMAIL, DOCUMENTO_NUMERO');
+
+    CTX_DDL.create_preference('ODO_PAC_LEXER', 'BASIC_LEXER');
+    CTX_DDL.set_attribute('ODO_PAC_LEXER', 'BASE_LETTER', 'YES');
+    CTX_DDL.set_attribute('ODO_PAC_LEXER', 'MIXED_CASE', 'NO');
+    CTX_DDL.set_attribute('ODO_PAC_LEXER', 'PRINTJOINS', '_');
+
+    CTX_DDL.create_preference('ODO_PAC_WORDLIST', 'BASIC_WORDLIST');
+    CTX_DDL.set_attribute('ODO_PAC_WORDLIST', 'SUBSTRING_INDEX', 'TRUE');
+    CTX_DDL.set_attribute('ODO_PAC_WORDLIST', 'PREFIX_INDEX', 'TRUE');
+    CTX_DDL.set_attribute('ODO_PAC_WORDLIST', 'PREFIX_MIN_LENGTH', '1');
+    CTX_DDL.set_attribute('ODO_PAC_WORDLIST', 'PREFIX_MAX_LENGTH', '8');
+    CTX_DDL.set_attribute('ODO_PAC_WORDLIST', 'WILDCARD_MAXTERMS', '5000');
+END;
+/
+
+-- ============================================================================
+-- ÍNDICE
+-- ============================================================================
+BEGIN
+    EXECUTE IMMEDIATE 'DROP INDEX IDX_PACIENTES_BUSQUEDA';
+EXCEPTION
+    WHEN OTHERS THEN
+        IF SQLCODE != -1418 THEN   -- ORA-01418: el índice no existe
+            RAISE;
+        END IF;
+END;
+/
+
+CREATE INDEX IDX_PACIENTES_BUSQUEDA ON ODO_PACIENTES (BUSQUEDA)
+    INDEXTYPE IS CTXSYS.CONTEXT
+    FILTER BY EMPRESA_ID, ACTIVO
+    PARAMETERS ('DATASTORE ODO_PAC_DATASTORE
+                 LEXER ODO_PAC_LEXER
+                 WORDLIST ODO_PAC_WORDLIST
+                 STOPLIST CTXSYS.EMPTY_STOPLIST
+                 SYNC (ON COMMIT)')
+/
+
+-- ============================================================================
+-- OPTIMIZACIÓN PERIÓDICA
+-- SYNC (ON COMMIT) fragmenta el índice; se compacta una vez por noche.
+-- ============================================================================
+DECLARE
+    v_existe NUMBER;
+BEGIN
+    SELECT COUNT(*) INTO v_existe
+    FROM user_scheduler_jobs
+    WHERE job_name = 'ODO_JOB_OPTIMIZAR_BUSQUEDA';
+
+    IF v_existe = 0 THEN
+        DBMS_SCHEDULER.create_job(
+            job_name        => 'ODO_JOB_OPTIMIZAR_BUSQUEDA',
+            job_type        => 'PLSQL_BLOCK',
+            job_action      => 'BEGIN CTX_DDL.optimize_index(''IDX_PACIENTES_BUSQUEDA'', ''FULL''); END;',
+            repeat_interval => 'FREQ=DAILY;BYHOUR=3',
+            enabled         => TRUE,
+            comments        => 'Compacta el índice Oracle Text de búsqueda de pacientes'
+        );
+    END IF;
+END;
+/
+
+-- ============================================================================
+-- PKG_PACIENTES usa la columna BUSQUEDA: se recompila después del índice
+-- ============================================================================
+@PKG_PACIENTES.sql
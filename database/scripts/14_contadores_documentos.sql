@@ -0,0 +1,80 @@
+-- =============================================================================
+-- CONTADORES DE DOCUMENTOS (numeración no fiscal)
+-- =============================================================================
+-- Reemplaza los MAX(REGEXP_SUBSTR(...)) + 1 que recorrían la tabla en cada
+-- alta (número de historia clínica, códigos AUTO del catálogo de
+-- tratamientos) por PKG_CONTADORES.siguiente: un UPDATE de una fila por
+-- (empresa, tipo) en transacción autónoma.
+--
+-- Las órdenes de compra y recepciones ya usan secuencias (sin colisiones);
+-- se les agrega CACHE para que cada NEXTVAL no actualice el diccionario.
+-- Su numeración sigue siendo global porque NUMERO_ORDEN y NUMERO_RECEPCION
+-- son UNIQUE en toda la tabla.
+-- =============================================================================
+
+-- ============================================================================
+-- TABLA ODO_CONTADORES
+-- ============================================================================
+DECLARE
+    v_existe NUMBER;
+BEGIN
+    SELECT COUNT(*) INTO v_existe FROM user_tables WHERE table_name = 'ODO_CONTADORES';
+
+    IF v_existe = 0 THEN
+        EXECUTE IMMEDIATE '
+            CREATE TABLE ODO_CONTADORES (
+                EMPRESA_ID          NUMBER NOT NULL,
+                TIPO                VARCHAR2(50) NOT NULL,
+                PERIODO             VARCHAR2(10) DEFAULT ''-'' NOT NULL,
+                ULTIMO              NUMBER DEFAULT 0 NOT NULL,
+                FECHA_MODIFICACION  TIMESTAMP DEFAULT SYSTIMESTAMP,
+                CONSTRAINT PK_CONTADORES PRIMARY KEY (EMPRESA_ID, TIPO, PERIODO)
+            ) ORGANIZATION INDEX';
+    END IF;
+END;
+/
+
+-- ============================================================================
+-- INICIALIZAR CON LOS DATOS EXISTENTES (re-ejecutable: nunca retrocede)
+-- ============================================================================
+MERGE INTO ODO_CONTADORES c
+USING (
+    SELECT EMPRESA_ID AS empresa_id, 'HISTORIA_CLINICA' AS tipo,
+           MAX(TO_NUMBER(REGEXP_SUBSTR(NUMERO_HISTORIA, '\d+'))) AS ultimo
+    FROM ODO_PACIENTES
+    WHERE EMPRESA_ID IS NOT NULL
+    GROUP BY EMPRESA_ID
+    UNION ALL
+    SELECT EMPRESA_ID, 'TRATAMIENTO:' || REGEXP_SUBSTR(CODIGO, '^[^-]+'),
+           MAX(TO_NUMBER(REGEXP_SUBSTR(CODIGO, '[0-9]+$')))
+    FROM ODO_CATALOGOS_TRATAMIENTOS
+    WHERE EMPRESA_ID IS NOT NULL
+      AND REGEXP_LIKE(CODIGO, '^[^-]{1,4}-[0-9]+$')
+    GROUP BY EMPRESA_ID, REGEXP_SUBSTR(CODIGO, '^[^-]+')
+) s
+ON (c.EMPRESA_ID = s.empresa_id AND c.TIPO = s.tipo AND c.PERIODO = '-')
+WHEN MATCHED THEN UPDATE SET
+    c.ULTIMO = GREATEST(c.ULTIMO, NVL(s.ultimo, 0)),
+    c.FECHA_MODIFICACION = SYSTIMESTAMP
+WHEN NOT MATCHED THEN INSERT (EMPRESA_ID, TIPO, PERIODO, ULTIMO)
+    VALUES (s.empresa_id, s.tipo, '-', NVL(s.ultimo, 0))
+/
+
+COMMIT
+/
+
+-- ============================================================================
+-- SECUENCIAS DE COMPRAS CON CACHE
+-- ============================================================================
+ALTER SEQUENCE SEQ_NUMERO_ORDEN_COMPRA CACHE 20
+/
+
+ALTER SEQUENCE SEQ_NUMERO_RECEPCION CACHE 20
+/
+
+-- ============================================================================
+-- PACKAGES
+-- ============================================================================
+@PKG_CONTADORES.sql
+@PKG_PACIENTES.sql
+@PKG_TRATAMIENTOS_BODY.sql
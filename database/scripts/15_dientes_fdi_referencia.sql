@@ -0,0 +1,89 @@
+-- =============================================================================
+-- REFERENCIA FDI DE DIENTES
+-- =============================================================================
+-- PKG_ODONTOGRAMA.inicializar_dientes_permanente / _temporal insertaban los
+-- 32 / 20 dientes de un odontograma nuevo de a uno (un INSERT por diente,
+-- con el tipo calculado en PL/SQL). Con esta tabla de referencia cada
+-- inicialización es un único INSERT ... SELECT.
+--
+-- Dentición permanente: cuadrantes 1-4, posiciones 1-8 (FDI 11-18 ... 41-48)
+-- Dentición temporal:   cuadrantes 5-8, posiciones 1-5 (FDI 51-55 ... 81-85)
+-- =============================================================================
+
+-- ============================================================================
+-- TABLA ODO_DIENTES_FDI
+-- ============================================================================
+DECLARE
+    v_existe NUMBER;
+BEGIN
+    SELECT COUNT(*) INTO v_existe FROM user_tables WHERE table_name = 'ODO_DIENTES_FDI';
+
+    IF v_existe = 0 THEN
+        EXECUTE IMMEDIATE '
+            CREATE TABLE ODO_DIENTES_FDI (
+                NUMERO_FDI   NUMBER(2) NOT NULL,
+                DENTICION    VARCHAR2(20) NOT NULL,
+                CUADRANTE    NUMBER(1) NOT NULL,
+                POSICION     NUMBER(1) NOT NULL,
+                TIPO_DIENTE  VARCHAR2(30) NOT NULL,
+                CONSTRAINT PK_DIENTES_FDI PRIMARY KEY (NUMERO_FDI),
+                CONSTRAINT CHK_DIENTES_FDI_DENTICION
+                    CHECK (DENTICION IN (''PERMANENTE'', ''TEMPORAL''))
+            ) ORGANIZATION INDEX';
+    END IF;
+END;
+/
+
+-- ============================================================================
+-- DATOS (re-ejecutable)
+-- ============================================================================
+MERGE INTO ODO_DIENTES_FDI f
+USING (
+    SELECT c.cuadrante * 10 + p.posicion AS numero_fdi,
+           'PERMANENTE' AS denticion,
+           c.cuadrante,
+           p.posicion,
+           CASE p.posicion
+               WHEN 1 THEN 'INCISIVO_CENTRAL'
+               WHEN 2 THEN 'INCISIVO_LATERAL'
+               WHEN 3 THEN 'CANINO'
+               WHEN 4 THEN 'PRIMER_PREMOLAR'
+               WHEN 5 THEN 'SEGUNDO_PREMOLAR'
+               WHEN 6 THEN 'PRIMER_MOLAR'
+               WHEN 7 THEN 'SEGUNDO_MOLAR'
+               WHEN 8 THEN 'TERCER_MOLAR'
+           END AS tipo_diente
+    FROM (SELECT LEVEL AS cuadrante FROM DUAL CONNECT BY LEVEL <= 4) c
+    CROSS JOIN (SELECT LEVEL AS posicion FROM DUAL CONNECT BY LEVEL <= 8) p
+    UNION ALL
+    SELECT c.cuadrante * 10 + p.posicion,
+           'TEMPORAL',
+           c.cuadrante,
+           p.posicion,
+           CASE p.posicion
+               WHEN 1 THEN 'INCISIVO_CENTRAL'
+               WHEN 2 THEN 'INCISIVO_LATERAL'
+               WHEN 3 THEN 'CANINO'
+               WHEN 4 THEN 'PRIMER_MOLAR'
+               WHEN 5 THEN 'SEGUNDO_MOLAR'
+           END
+    FROM (SELECT LEVEL + 4 AS cuadrante FROM DUAL CONNECT BY LEVEL <= 4) c
+    CROSS JOIN (SELECT LEVEL AS posicion FROM DUAL CONNECT BY LEVEL <= 5) p
+) s
+ON (f.NUMERO_FDI = s.numero_fdi)
+WHEN MATCHED THEN UPDATE SET
+    f.DENTICION = s.denticion,
+    f.CUADRANTE = s.cuadrante,
+    f.POSICION = s.posicion,
+    f.TIPO_DIENTE = s.tipo_diente
+WHEN NOT MATCHED THEN INSERT (NUMERO_FDI, DENTICION, CUADRANTE, POSICION, TIPO_DIENTE)
+    VALUES (s.numero_fdi, s.denticion, s.cuadrante, s.posicion, s.tipo_diente)
+/
+
+COMMIT
+/
+
+-- ============================================================================
+-- PACKAGES
+-- ============================================================================
+@PKG_ODONTOGRAMA.sql
@@ -0,0 +1,41 @@
+-- =============================================================================
+-- DURACIÓN MÁXIMA DE UNA CITA
+-- =============================================================================
+-- PKG_CITAS.check_disponibilidad busca solapamientos solo entre las citas
+-- que empiezan hasta c_max_duracion_cita (1 día) antes del nuevo inicio,
+-- para acotar el rango de IDX_CITAS_DOCTOR_FECHA. Una cita más larga no se
+-- vería y se podría agendar otra encima. El CHECK garantiza el supuesto
+-- también para los handlers ORDS que insertan en ODO_CITAS directamente.
+--
+-- Si ya hay citas más largas el constraint se crea ENABLE NOVALIDATE (rige
+-- para filas nuevas y modificadas). Para encontrarlas y corregirlas:
+--   SELECT CITA_ID, FECHA_HORA_INICIO, FECHA_HORA_FIN FROM ODO_CITAS
+--   WHERE FECHA_HORA_FIN > FECHA_HORA_INICIO + INTERVAL '1' DAY;
+-- =============================================================================
+
+DECLARE
+    v_existe     NUMBER;
+    v_invalidas  NUMBER;
+BEGIN
+    SELECT COUNT(*) INTO v_existe
+    FROM user_constraints
+    WHERE table_name = 'ODO_CITAS'
+      AND constraint_name = 'CHK_CITAS_DURACION_MAX';
+
+    IF v_existe = 0 THEN
+        SELECT COUNT(*) INTO v_invalidas
+        FROM ODO_CITAS
+        WHERE FECHA_HORA_FIN > FECHA_HORA_INICIO + INTERVAL '1' DAY;
+
+        EXECUTE IMMEDIATE '
+            ALTER TABLE ODO_CITAS ADD CONSTRAINT CHK_CITAS_DURACION_MAX
+                CHECK (FECHA_HORA_FIN <= FECHA_HORA_INICIO + INTERVAL ''1'' DAY)'
+            || CASE WHEN v_invalidas > 0 THEN ' ENABLE NOVALIDATE' END;
+    END IF;
+END;
+/
+
+-- ============================================================================
+-- PACKAGES
+-- ============================================================================
+@PKG_CITAS.sql
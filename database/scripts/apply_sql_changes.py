@@ -1,67 +1,348 @@
-import oracledb
-import os
+"""
+Ejecuta scripts .sql (estilo SQL*Plus) contra la base de datos.
+
+Los statements se obtienen con sql_script.read_script, que entiende
+literales, q-quotes, comentarios, bloques PL/SQL terminados en '/' y
+SQL terminado en ';' mezclados en el mismo archivo. Directivas soportadas:
+PROMPT, @/@@archivo, SHOW ERRORS, WHENEVER SQLERROR EXIT|CONTINUE, EXIT.
+El resto (SET, SPOOL, COLUMN...) se ignora.
+
+Cada script aplicado se registra en ODO_SCHEMA_MIGRACIONES (nombre,
+checksum SHA-256, duración y fecha). Con --pending solo se ejecutan los
+scripts nuevos o cuyo contenido cambió, en orden numérico (00_, 01_, ...,
+10b_, 11_) y después los fix_*.sql en orden alfabético.
+Un CREATE que queda con errores de compilación cuenta como statement
+fallido, y un script con statements fallidos no se registra.
+
+Uso:
+    python3 apply_sql_changes.py <script_path1> <script_path2> ...
+    python3 apply_sql_changes.py --pending              # solo nuevos/modificados
+    python3 apply_sql_changes.py --pending --dry-run    # listar sin ejecutar
+    python3 apply_sql_changes.py --baseline             # registrar sin ejecutar
+"""
+import argparse
+import hashlib
+import re
 import sys
+import time
 from pathlib import Path
+
 from connect_db import get_connection
+from sql_script import SQLPLUS, read_script
 
-def run_script(conn, script_path):
-    print(f"Executing {script_path}...")
-    with open(script_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-
-    # Split by '/' on a line by itself
-    blocks = []
-    current_block = []
-    for line in lines:
-        if line.strip() == '/':
-            blocks.append("\n".join(current_block))
-            current_block = []
-        else:
-            current_block.append(line)
-    
-    if current_block:
-        blocks.append("\n".join(current_block))
+SCRIPTS_DIR = Path(__file__).resolve().parent
+PACKAGES_DIR = SCRIPTS_DIR.parent / 'packages'
+
+LEDGER_TABLE = 'ODO_SCHEMA_MIGRACIONES'
+
+LEDGER_DDL = f"""
+    CREATE TABLE {LEDGER_TABLE} (
+        SCRIPT              VARCHAR2(255) PRIMARY KEY,
+        CHECKSUM            VARCHAR2(64) NOT NULL,
+        DURACION_MS         NUMBER,
+        STATEMENTS          NUMBER,
+        FECHA_APLICACION    TIMESTAMP WITH TIME ZONE DEFAULT SYSTIMESTAMP,
+        APLICADO_POR        VARCHAR2(128) DEFAULT SYS_CONTEXT('USERENV', 'OS_USER')
+    )
+"""
+
+# 00_compras_secuencias.sql, 10b_caja_movimientos.sql, ...
+NUMBERED_SCRIPT = re.compile(r"^(\d+)([a-z]?)_.+\.sql$", re.IGNORECASE)
+FIX_SCRIPT = re.compile(r"^fix_.+\.sql$", re.IGNORECASE)
+
+MAX_PRINT_ROWS = 50
+
+
+class ScriptError(Exception):
+    """Error de un statement, con el archivo y la línea donde empieza."""
+
+    def __init__(self, script_path, stmt, error):
+        self.script_path = script_path
+        self.stmt = stmt
+        self.error = error
+        super().__init__(f"{script_path}:{stmt.line}: {error}\n    {stmt.summary()}")
+
+
+class ScriptStop(Exception):
+    """EXIT / QUIT dentro de un script."""
+
+
+class CompilationError(Exception):
+    """CREATE ... que quedó con errores de compilación (cursor.warning)."""
+
+
+class MigrationError(Exception):
+    """Script con statements fallidos: no se registra en el ledger."""
 
+
+def resolve_include(script_path, name):
+    """Resuelve @archivo / @@archivo relativo al script o a database/packages."""
+    name = name.split()[0]
+    if not Path(name).suffix:
+        name += '.sql'
+    for base in (Path(script_path).parent, PACKAGES_DIR, Path.cwd()):
+        candidate = base / name
+        if candidate.exists():
+            return candidate
+    raise FileNotFoundError(f"No se encontró el script incluido: {name}")
+
+
+def show_errors(cursor, argument=''):
+    """SHOW ERRORS [tipo] [nombre]: muestra user_errors."""
+    words = argument.rstrip(';').split()
+    name = words[-1].upper() if words else None
+    if name:
+        cursor.execute("""
+            SELECT name, type, line, position, text FROM user_errors
+            WHERE name = :name ORDER BY type, sequence
+        """, name=name)
+    else:
+        cursor.execute("""
+            SELECT name, type, line, position, text FROM user_errors
+            ORDER BY name, type, sequence
+        """)
+    rows = cursor.fetchall()
+    if not rows:
+        print("  No errors.")
+    for name, otype, line, pos, text in rows:
+        print(f"  {name} ({otype}) {line}/{pos}: {text.strip()}")
+
+
+def print_rows(cursor):
+    """Imprime el resultado de un SELECT incluido en el script."""
+    columns = [d[0] for d in cursor.description]
+    print("  " + " | ".join(columns))
+    rows = cursor.fetchmany(MAX_PRINT_ROWS)
+    for row in rows:
+        print("  " + " | ".join("" if v is None else str(v) for v in row))
+    if len(rows) == MAX_PRINT_ROWS:
+        print(f"  ... (solo se muestran {MAX_PRINT_ROWS} filas)")
+
+
+def run_statement(cursor, stmt):
+    cursor.execute(stmt.text)
+    if cursor.description:
+        print_rows(cursor)
+    elif getattr(cursor, 'warning', None):
+        # CREATE ... con errores de compilación: el objeto queda INVALID
+        raise CompilationError(cursor.warning)
+    else:
+        print(f"  [OK] línea {stmt.line}: {stmt.summary()}")
+
+
+def run_script(conn, script_path, encoding='utf-8', stop_on_error=True):
+    """
+    Ejecuta un script statement por statement, leyéndolo en streaming.
+
+    Args:
+        conn: Conexión abierta
+        script_path: Ruta del .sql
+        encoding: Codificación del archivo
+        stop_on_error: Valor inicial de WHENEVER SQLERROR (EXIT = True)
+
+    Returns:
+        tuple: (statements ejecutados, statements fallidos o con errores
+        de compilación) incluyendo los scripts incluidos con @
+    """
+    print(f"Executing {script_path}...")
+    executed = 0
+    failed = 0
     cursor = conn.cursor()
     try:
-        for block in blocks:
-            clean_block = block.strip()
-            if not clean_block: continue
-            
-            # Standard Oracle DB-API:
-            # - PL/SQL blocks (BEGIN/DECLARE/CREATE) MUST end with a semicolon
-            # - Simple SQL statements (SELECT/INSERT/etc) MUST NOT end with a semicolon
-            
-            upper_block = clean_block.upper()
-            if upper_block.startswith(('BEGIN', 'DECLARE', 'CREATE')) or 'BEGIN' in upper_block[:50]:
-                # Ensure it ends with a semicolon
-                if not clean_block.endswith(';'):
-                    clean_block += ';'
-            else:
-                # Remove trailing semicolon for simple statements
-                clean_block = clean_block.rstrip(';')
-            
-            cursor.execute(clean_block)
-            print("Successfully executed a block")
-        print(f"Finished {script_path}")
+        for stmt in read_script(script_path, encoding):
+            if stmt.kind == SQLPLUS:
+                command = stmt.command
+                if command in ('PROMPT', 'PRO'):
+                    print(stmt.argument.strip("'"))
+                elif command in ('@', '@@', 'START'):
+                    include = resolve_include(script_path, stmt.argument)
+                    sub_executed, sub_failed = run_script(conn, include, encoding, stop_on_error)
+                    executed += sub_executed
+                    failed += sub_failed
+                elif command in ('SHOW', 'SHO') and stmt.argument.upper().startswith('ERR'):
+                    show_errors(cursor, " ".join(stmt.argument.split()[1:]))
+                elif command == 'WHENEVER' and 'SQLERROR' in stmt.argument.upper():
+                    stop_on_error = 'CONTINUE' not in stmt.argument.upper()
+                elif command in ('EXIT', 'QUIT'):
+                    raise ScriptStop(f"{script_path}:{stmt.line}: {stmt.text}")
+                continue
+
+            try:
+                run_statement(cursor, stmt)
+                executed += 1
+            except Exception as e:
+                error = ScriptError(script_path, stmt, e)
+                if stop_on_error:
+                    print(f"Error executing {error}")
+                    raise error from e
+                print(f"  [ERROR] {error}")
+                failed += 1
+
+        print(f"Finished {script_path} ({executed} statements, {failed} con error)")
+        return executed, failed
+    finally:
+        cursor.close()
+
+
+# ----------------------------------------------------------------------
+# Registro de migraciones
+# ----------------------------------------------------------------------
+def file_checksum(path):
+    """SHA-256 del archivo, leído en bloques."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def ensure_ledger(cursor):
+    """Crea la tabla de migraciones si no existe."""
+    try:
+        cursor.execute(LEDGER_DDL)
+        print(f"[OK] Tabla {LEDGER_TABLE} creada")
     except Exception as e:
-        print(f"Error executing {script_path}: {e}")
-        raise
+        if "ORA-00955" not in str(e):
+            raise
+
+
+def load_ledger(cursor):
+    """Devuelve {script: checksum} de los scripts ya aplicados."""
+    cursor.execute(f"SELECT SCRIPT, CHECKSUM FROM {LEDGER_TABLE}")
+    return dict(cursor.fetchall())
+
+
+def record_migration(cursor, script, checksum, duration_ms, statements):
+    cursor.execute(f"""
+        MERGE INTO {LEDGER_TABLE} m
+        USING (SELECT :script AS SCRIPT FROM DUAL) s
+        ON (m.SCRIPT = s.SCRIPT)
+        WHEN MATCHED THEN UPDATE SET
+            CHECKSUM = :checksum, DURACION_MS = :duration_ms,
+            STATEMENTS = :statements, FECHA_APLICACION = SYSTIMESTAMP,
+            APLICADO_POR = SYS_CONTEXT('USERENV', 'OS_USER')
+        WHEN NOT MATCHED THEN INSERT (SCRIPT, CHECKSUM, DURACION_MS, STATEMENTS)
+            VALUES (:script, :checksum, :duration_ms, :statements)
+    """, script=script, checksum=checksum, duration_ms=duration_ms,
+         statements=statements)
+
+
+def migration_order(path):
+    """Clave de orden: numerados por número y letra, luego fix_* por nombre."""
+    match = NUMBERED_SCRIPT.match(path.name)
+    if match:
+        return (0, int(match.group(1)), match.group(2).lower(), path.name)
+    return (1, 0, '', path.name)
+
+
+def discover_scripts(directory=SCRIPTS_DIR):
+    """Scripts de migración del directorio en orden de aplicación."""
+    scripts = [p for p in Path(directory).glob('*.sql')
+               if NUMBERED_SCRIPT.match(p.name) or FIX_SCRIPT.match(p.name)]
+    return sorted(scripts, key=migration_order)
+
+
+def pending_scripts(cursor, scripts):
+    """
+    Filtra los scripts nuevos o modificados según el registro.
+
+    Returns:
+        list: Tuplas (path, checksum, estado) con estado 'nuevo' o 'modificado'
+    """
+    applied = load_ledger(cursor)
+    pending = []
+    for path in scripts:
+        checksum = file_checksum(path)
+        previous = applied.get(path.name)
+        if previous is None:
+            pending.append((path, checksum, 'nuevo'))
+        elif previous != checksum:
+            pending.append((path, checksum, 'modificado'))
+    return pending
+
+
+def apply_migration(conn, path, checksum=None):
+    """
+    Ejecuta un script, hace COMMIT y lo registra en el ledger.
+
+    Si algún statement falló (con WHENEVER SQLERROR CONTINUE) o dejó un
+    objeto con errores de compilación, el script no se registra y se lanza
+    MigrationError: --pending lo vuelve a intentar en la próxima corrida.
+    """
+    checksum = checksum or file_checksum(path)
+    started = time.perf_counter()
+    statements, failed = run_script(conn, path)
+    duration_ms = round((time.perf_counter() - started) * 1000)
+    if failed:
+        raise MigrationError(f"{Path(path).name}: {failed} statements con error; no se registra")
+
+    cursor = conn.cursor()
+    try:
+        record_migration(cursor, Path(path).name, checksum, duration_ms, statements)
     finally:
         cursor.close()
+    conn.commit()
+    print(f"[OK] {Path(path).name} registrado ({duration_ms} ms)")
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python3 apply_sql_changes.py <script_path1> <script_path2> ...")
+
+def main():
+    parser = argparse.ArgumentParser(description="Aplica scripts .sql y los registra")
+    parser.add_argument('scripts', nargs='*', help="Scripts a ejecutar (siempre se ejecutan)")
+    parser.add_argument('--pending', action='store_true',
+                        help="Ejecutar solo los scripts nuevos o modificados")
+    parser.add_argument('--baseline', action='store_true',
+                        help="Registrar los scripts como aplicados sin ejecutarlos")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Con --pending/--baseline: solo listar")
+    parser.add_argument('--dir', default=str(SCRIPTS_DIR),
+                        help="Directorio de scripts (default: database/scripts)")
+    args = parser.parse_args()
+
+    if not (args.scripts or args.pending or args.baseline):
+        parser.print_usage()
         sys.exit(1)
 
+    conn = get_connection()
+    cursor = conn.cursor()
     try:
-        conn = get_connection()
-        for script_path in sys.argv[1:]:
-            run_script(conn, script_path)
-        conn.commit()
+        ensure_ledger(cursor)
+
+        if args.scripts:
+            todo = [(Path(p), None, 'manual') for p in args.scripts]
+        else:
+            todo = pending_scripts(cursor, discover_scripts(args.dir))
+
+        if not todo:
+            print("Sin scripts pendientes.")
+            return
+
+        print(f"{len(todo)} scripts:")
+        for path, _, status in todo:
+            print(f"  [{status}] {path.name}")
+        if args.dry_run:
+            return
+
+        if args.baseline:
+            for path, checksum, _ in todo:
+                record_migration(cursor, path.name, checksum or file_checksum(path), None, None)
+            conn.commit()
+            print(f"[OK] {len(todo)} scripts registrados como aplicados")
+            return
+
+        for path, checksum, _ in todo:
+            apply_migration(conn, path, checksum)
         print("All scripts executed and committed successfully.")
-        conn.close()
+    except ScriptStop as e:
+        conn.commit()
+        print(f"EXIT: {e}")
     except Exception as e:
+        conn.rollback()
         print(f"Failed to apply changes: {e}")
         sys.exit(1)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Snapshot local (SQLite) del diccionario de datos y de la metadata ORDS.
+
+Las herramientas de diagnóstico consultan el snapshot en lugar de ir al
+diccionario remoto consulta por consulta, y funcionan sin conexión.
+
+Contenido (mismos nombres de tabla y columna que en Oracle):
+    user_objects, user_errors, user_tables, user_tab_columns,
+    user_indexes, user_ind_columns,
+    user_ords_modules, user_ords_templates, user_ords_handlers
+
+Refresco:
+  - user_objects y user_errors se leen completos (una consulta cada uno).
+  - user_tables, user_tab_columns, user_indexes y user_ind_columns solo
+    para tablas cuyo last_ddl_time (o el de alguno de sus índices) es
+    posterior al último refresco; las tablas eliminadas se borran.
+  - Las vistas ORDS no tienen last_ddl_time: se leen completas, una
+    consulta por vista.
+
+Uso:
+    python3 catalog_snapshot.py            # refresco incremental
+    python3 catalog_snapshot.py --full     # reconstruir
+    python3 catalog_snapshot.py --info     # fecha y cantidad de filas
+
+Desde Python:
+    from catalog_snapshot import query
+    rows = query("SELECT table_name FROM user_tables ORDER BY 1")
+"""
+import argparse
+import os
+import sqlite3
+from datetime import datetime
+
+import oracledb
+
+from connect_db import PROJECT_ROOT, acquire
+
+SNAPSHOT_PATH = os.environ.get(
+    'ORACLE_CATALOG_SNAPSHOT',
+    str(PROJECT_ROOT / 'config' / 'oracle' / 'catalog_snapshot.sqlite')
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshot_meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS user_objects (
+    object_name TEXT, object_type TEXT, status TEXT, created TEXT, last_ddl_time TEXT,
+    PRIMARY KEY (object_name, object_type));
+CREATE TABLE IF NOT EXISTS user_errors (
+    name TEXT, type TEXT, sequence INTEGER, line INTEGER, position INTEGER, text TEXT);
+CREATE TABLE IF NOT EXISTS user_tables (
+    table_name TEXT PRIMARY KEY, tablespace_name TEXT, num_rows INTEGER, last_analyzed TEXT);
+CREATE TABLE IF NOT EXISTS user_tab_columns (
+    table_name TEXT, column_name TEXT, column_id INTEGER, data_type TEXT,
+    data_length INTEGER, data_precision INTEGER, data_scale INTEGER, nullable TEXT,
+    PRIMARY KEY (table_name, column_name));
+CREATE TABLE IF NOT EXISTS user_indexes (
+    index_name TEXT PRIMARY KEY, table_name TEXT, index_type TEXT,
+    uniqueness TEXT, status TEXT);
+CREATE TABLE IF NOT EXISTS user_ind_columns (
+    index_name TEXT, table_name TEXT, column_name TEXT, column_position INTEGER,
+    descend TEXT);
+CREATE TABLE IF NOT EXISTS user_ords_modules (
+    id INTEGER PRIMARY KEY, name TEXT, uri_prefix TEXT, items_per_page INTEGER,
+    status TEXT);
+CREATE TABLE IF NOT EXISTS user_ords_templates (
+    id INTEGER PRIMARY KEY, module_id INTEGER, uri_template TEXT);
+CREATE TABLE IF NOT EXISTS user_ords_handlers (
+    id INTEGER PRIMARY KEY, template_id INTEGER, method TEXT, source_type TEXT,
+    items_per_page INTEGER, source TEXT);
+CREATE INDEX IF NOT EXISTS ix_tab_columns_table ON user_tab_columns (table_name);
+CREATE INDEX IF NOT EXISTS ix_indexes_table ON user_indexes (table_name);
+CREATE INDEX IF NOT EXISTS ix_ind_columns_table ON user_ind_columns (table_name);
+CREATE INDEX IF NOT EXISTS ix_errors_name ON user_errors (name);
+"""
+
+# Tablas con DDL (o índices) modificados desde :since (>= para no perder
+# cambios hechos en el mismo segundo que el último refresco)
+CHANGED_TABLES = """
+    SELECT object_name FROM user_objects
+    WHERE object_type = 'TABLE' AND last_ddl_time >= :since
+    UNION
+    SELECT i.table_name FROM user_indexes i
+    JOIN user_objects o ON o.object_name = i.index_name AND o.object_type = 'INDEX'
+    WHERE o.last_ddl_time >= :since
+"""
+
+# (tabla sqlite, SELECT remoto filtrado por CHANGED_TABLES)
+TABLE_QUERIES = [
+    ('user_tables', """
+        SELECT table_name, tablespace_name, num_rows, last_analyzed
+        FROM user_tables WHERE table_name IN ({changed})"""),
+    ('user_tab_columns', """
+        SELECT table_name, column_name, column_id, data_type,
+               data_length, data_precision, data_scale, nullable
+        FROM user_tab_columns WHERE table_name IN ({changed})"""),
+    ('user_indexes', """
+        SELECT index_name, table_name, index_type, uniqueness, status
+        FROM user_indexes WHERE table_name IN ({changed})"""),
+    ('user_ind_columns', """
+        SELECT index_name, table_name, column_name, column_position, descend
+        FROM user_ind_columns WHERE table_name IN ({changed})"""),
+]
+
+FULL_QUERIES = [
+    ('user_objects', """
+        SELECT object_name, object_type, status, created, last_ddl_time
+        FROM user_objects"""),
+    ('user_errors', """
+        SELECT name, type, sequence, line, position, text FROM user_errors"""),
+    ('user_ords_modules', """
+        SELECT id, name, uri_prefix, items_per_page, status FROM user_ords_modules"""),
+    ('user_ords_templates', """
+        SELECT id, module_id, uri_template FROM user_ords_templates"""),
+    ('user_ords_handlers', """
+        SELECT id, template_id, method, source_type, items_per_page, source
+        FROM user_ords_handlers"""),
+]
+
+FETCH_ARRAYSIZE = 1000
+
+EPOCH = datetime(1900, 1, 1)
+
+
+def _lobs_as_strings(cursor, name, default_type, size, precision, scale):
+    if default_type == oracledb.DB_TYPE_CLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG, arraysize=cursor.arraysize)
+
+
+def _sqlite_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    return value
+
+
+def open_snapshot(path=None, create=False):
+    """
+    Abre el snapshot SQLite.
+
+    Args:
+        path: Ruta del archivo (default SNAPSHOT_PATH)
+        create: Crear el archivo y el esquema si no existe
+
+    Returns:
+        sqlite3.Connection
+    """
+    path = path or SNAPSHOT_PATH
+    if not create and not os.path.exists(path):
+        raise FileNotFoundError(
+            f"Snapshot no encontrado: {path}. Ejecutar: python3 catalog_snapshot.py")
+    db = sqlite3.connect(path)
+    if create:
+        db.executescript(SCHEMA)
+    return db
+
+
+def snapshot_exists(path=None):
+    return os.path.exists(path or SNAPSHOT_PATH)
+
+
+def _get_meta(db, key):
+    row = db.execute("SELECT value FROM snapshot_meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _set_meta(db, key, value):
+    db.execute("INSERT OR REPLACE INTO snapshot_meta (key, value) VALUES (?, ?)", (key, value))
+
+
+def _copy(cursor, db, table, sql, binds=None):
+    """Copia el resultado de sql a la tabla sqlite en bloques. Devuelve filas copiadas."""
+    cursor.arraysize = FETCH_ARRAYSIZE
+    cursor.prefetchrows = FETCH_ARRAYSIZE
+    cursor.execute(sql, binds or {})
+    columns = [d[0].lower() for d in cursor.description]
+    insert = (f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) "
+              f"VALUES ({', '.join('?' for _ in columns)})")
+    total = 0
+    while True:
+        rows = cursor.fetchmany()
+        if not rows:
+            break
+        db.executemany(insert, [tuple(_sqlite_value(v) for v in row) for row in rows])
+        total += len(rows)
+    return total
+
+
+def refresh(full=False, path=None, verbose=True):
+    """
+    Refresca el snapshot desde la base.
+
+    Args:
+        full: Reconstruir todo en lugar de refrescar por last_ddl_time
+        path: Ruta del snapshot
+
+    Returns:
+        dict: {tabla: filas copiadas}
+    """
+    db = open_snapshot(path, create=True)
+    stats = {}
+    try:
+        last = _get_meta(db, 'last_ddl_time')
+        since = EPOCH if full or not last else datetime.fromisoformat(last)
+
+        with acquire() as conn:
+            cursor = conn.cursor()
+            cursor.outputtypehandler = _lobs_as_strings
+            try:
+                cursor.execute("SELECT SYSTIMESTAMP, MAX(last_ddl_time) FROM user_objects")
+                db_now, max_ddl = cursor.fetchone()
+
+                # Tablas con cambios: se reemplazan todas sus filas
+                cursor.execute(CHANGED_TABLES, since=since)
+                changed = [row[0] for row in cursor.fetchall()]
+                for table, _ in TABLE_QUERIES:
+                    if full:
+                        db.execute(f"DELETE FROM {table}")
+                    else:
+                        db.executemany(f"DELETE FROM {table} WHERE table_name = ?",
+                                       [(t,) for t in changed])
+                if changed:
+                    for table, sql in TABLE_QUERIES:
+                        stats[table] = _copy(cursor, db, table,
+                                             sql.format(changed=CHANGED_TABLES),
+                                             {'since': since})
+
+                for table, sql in FULL_QUERIES:
+                    db.execute(f"DELETE FROM {table}")
+                    stats[table] = _copy(cursor, db, table, sql)
+            finally:
+                cursor.close()
+
+        # Tablas eliminadas en la base
+        for table, _ in TABLE_QUERIES:
+            db.execute(f"""
+                DELETE FROM {table} WHERE table_name NOT IN (
+                    SELECT object_name FROM user_objects WHERE object_type = 'TABLE')
+            """)
+
+        if max_ddl:
+            _set_meta(db, 'last_ddl_time', max_ddl.isoformat(sep=' '))
+        _set_meta(db, 'refreshed_at', db_now.isoformat(sep=' '))
+        db.commit()
+    finally:
+        db.close()
+
+    if verbose:
+        mode = "completo" if full or since == EPOCH else "incremental"
+        print(f"Snapshot {mode}: {len(changed)} tablas con cambios")
+        for table, count in stats.items():
+            print(f"  {table:22s} {count:6d} filas")
+    return stats
+
+
+def query(sql, params=(), path=None):
+    """Ejecuta una consulta sobre el snapshot. Devuelve lista de tuplas."""
+    db = open_snapshot(path)
+    try:
+        return db.execute(sql, params).fetchall()
+    finally:
+        db.close()
+
+
+def ensure_snapshot(refresh_first=False, path=None):
+    """Refresca el snapshot si se pide o si todavía no existe."""
+    if refresh_first or not snapshot_exists(path):
+        refresh(path=path)
+
+
+def snapshot_info(path=None):
+    db = open_snapshot(path)
+    try:
+        print(f"Snapshot: {path or SNAPSHOT_PATH}")
+        print(f"  Refrescado: {_get_meta(db, 'refreshed_at')}")
+        print(f"  Último DDL: {_get_meta(db, 'last_ddl_time')}")
+        tables = [r[0] for r in db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'user_%' ORDER BY name")]
+        for table in tables:
+            count = db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            print(f"  {table:22s} {count:6d} filas")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot local del diccionario de datos")
+    parser.add_argument('--full', action='store_true', help="Reconstruir el snapshot completo")
+    parser.add_argument('--info', action='store_true', help="Mostrar estado sin refrescar")
+    parser.add_argument('--path', default=None, help=f"Archivo SQLite (default {SNAPSHOT_PATH})")
+    args = parser.parse_args()
+
+    if args.info:
+        snapshot_info(args.path)
+    else:
+        refresh(full=args.full, path=args.path)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,25 +1,18 @@
+import sys
+
 from connect_db import get_connection
+from recompile import DEFAULT_PATTERN, fetch_errors, print_errors
 
-def check_errors():
+def check_errors(names=None):
+    """Errores de compilación de todos los PKG_* (o de los nombres dados) en una consulta."""
     conn = get_connection()
     cursor = conn.cursor()
-    
-    print("--- USER_ERRORS (PKG_FACTURAS) ---")
-    cursor.execute("""
-        SELECT NAME, TYPE, LINE, POSITION, TEXT 
-        FROM USER_ERRORS 
-        WHERE NAME = 'PKG_FACTURAS'
-        ORDER BY TYPE, LINE
-    """)
-    errors = cursor.fetchall()
-    if not errors:
-        print("No errors found in USER_ERRORS for PKG_FACTURAS.")
-    else:
-        for row in errors:
-            print(row)
-            
+
+    print(f"--- USER_ERRORS ({', '.join(names) if names else DEFAULT_PATTERN}) ---")
+    print_errors(fetch_errors(cursor, names=names))
+
     cursor.close()
     conn.close()
 
 if __name__ == "__main__":
-    check_errors()
+    check_errors(sys.argv[1:])
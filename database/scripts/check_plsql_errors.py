@@ -1,41 +1,29 @@
-import oracledb
+import sys
+
 from connect_db import get_connection
+from recompile import fetch_errors
 
-def check_errors():
+def check_errors(names=None):
+    """Errores de spec y body de los packages indicados (default PKG_FACTURAS)."""
+    names = names or ['PKG_FACTURAS']
     try:
         conn = get_connection()
         cursor = conn.cursor()
-        
-        print("--- ERRORES EN PKG_FACTURAS (BODY) ---")
-        cursor.execute("""
-            SELECT line, position, text 
-            FROM user_errors 
-            WHERE name = 'PKG_FACTURAS' 
-              AND type = 'PACKAGE BODY' 
-            ORDER BY line
-        """)
-        errors = cursor.fetchall()
-        if not errors:
-            print("No se encontraron errores en el cuerpo del paquete (según user_errors).")
-        else:
-            for line, pos, text in errors:
-                print(f"Línea {line}, Pos {pos}: {text}")
 
-        print("\n--- ERRORES EN PKG_FACTURAS (SPEC) ---")
-        cursor.execute("""
-            SELECT line, position, text 
-            FROM user_errors 
-            WHERE name = 'PKG_FACTURAS' 
-              AND type = 'PACKAGE' 
-            ORDER BY line
-        """)
-        for line, pos, text in cursor.fetchall():
-            print(f"Línea {line}, Pos {pos}: {text}")
-            
+        errors = fetch_errors(cursor, names=names)
+        for name in names:
+            for otype, label in (('PACKAGE BODY', 'BODY'), ('PACKAGE', 'SPEC')):
+                print(f"\n--- ERRORES EN {name.upper()} ({label}) ---")
+                rows = [e for e in errors if e[0] == name.upper() and e[1] == otype]
+                if not rows:
+                    print("No se encontraron errores (según user_errors).")
+                for _, _, line, pos, text in rows:
+                    print(f"Línea {line}, Pos {pos}: {text}")
+
         cursor.close()
         conn.close()
     except Exception as e:
         print(f"Error: {e}")
 
 if __name__ == "__main__":
-    check_errors()
+    check_errors(sys.argv[1:])
@@ -1,19 +1,17 @@
-from connect_db import get_connection
+import sys
 
-# Check structure of ODO_ROLES table
-conn = get_connection()
-cursor = conn.cursor()
+from catalog_snapshot import ensure_snapshot
+from connect_db import get_connection, get_table_structure
+
+# Check structure of ODO_ROLES table (snapshot local; --refresh para actualizarlo)
+ensure_snapshot('--refresh' in sys.argv)
 
 print("Estructura de ODO_ROLES:")
-cursor.execute("""
-    SELECT COLUMN_NAME, DATA_TYPE, NULLABLE
-    FROM USER_TAB_COLUMNS
-    WHERE TABLE_NAME = 'ODO_ROLES'
-    ORDER BY COLUMN_ID
-""")
+for column, data_type, _, nullable in get_table_structure('ODO_ROLES', snapshot=True):
+    print(f"  - {column}: {data_type} (NULL={nullable})")
 
-for row in cursor.fetchall():
-    print(f"  - {row[0]}: {row[1]} (NULL={row[2]})")
+conn = get_connection()
+cursor = conn.cursor()
 
 print("\nRoles existentes:")
 cursor.execute("SELECT ROL_ID, NOMBRE, CODIGO FROM ODO_ROLES")
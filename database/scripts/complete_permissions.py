@@ -1,4 +1,4 @@
-from connect_db import get_connection
+from connect_db import get_connection, execute_many
 import time
 
 def safe_insert(cursor, sql, description):
@@ -31,6 +31,33 @@ def safe_insert(cursor, sql, description):
             print(f"✗ Error en {description}: {e}")
             return False
 
+def safe_insert_batch(cursor, sql, rows, describe):
+    """Execute an insert for many rows in one round trip, retrying deadlocked rows once"""
+    result = execute_many(sql, rows, cursor=cursor)
+    statuses = result['rows']
+
+    retry = [i for i, status in enumerate(statuses)
+             if status['status'] == 'error'
+             and ("ORA-12801" in status['error'] or "ORA-12860" in status['error'])]
+    if retry:
+        # Deadlock, retry after small delay
+        time.sleep(0.5)
+        again = execute_many(sql, [rows[i] for i in retry], cursor=cursor)
+        for i, status in zip(retry, again['rows']):
+            statuses[i] = status
+
+    success = True
+    for row, status in zip(rows, statuses):
+        description = describe(row)
+        if status['status'] == 'existe':
+            print(f"⊙  {description} (ya existe)")
+        elif status['status'] == 'error':
+            print(f"✗ Error en {description}: {status['error']}")
+            success = False
+        elif status['count'] > 0:
+            print(f"✓ {description} ({status['count']} fila(s))")
+    return success
+
 def main():
     print("="*60)
     print("COMPLETANDO DATOS DE SEGURIDAD - PERMISOS Y ASIGNACIONES")
@@ -60,84 +87,42 @@ def main():
         print("\n2. Insertando Permisos Específicos para Empresas...")
         print("-"*60)
         
+        insert_permiso = """
+            INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID)
+            VALUES (:1, :2, :3, :4)
+        """
+
         if empresa_prog_id:
-            safe_insert(cursor, f"""
-                INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID)
-                VALUES ('Crear empresas', 'EMPRESA_CREAR', 'Crear nuevas empresas en el sistema', {empresa_prog_id})
-            """, "EMPRESA_CREAR")
-            
-            safe_insert(cursor, f"""
-                INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID)
-                VALUES ('Editar todas las empresas', 'EMPRESA_EDITAR_TODAS', 'Editar cualquier empresa del sistema', {empresa_prog_id})
-            """, "EMPRESA_EDITAR_TODAS")
-            
-            safe_insert(cursor, f"""
-                INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID)
-                VALUES ('Editar solo su empresa', 'EMPRESA_EDITAR_PROPIA', 'Editar solo los datos de su empresa', {empresa_prog_id})
-            """, "EMPRESA_EDITAR_PROPIA")
-            
-            safe_insert(cursor, f"""
-                INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID)
-                VALUES ('Activar/Inactivar empresas', 'EMPRESA_ACTIVAR', 'Activar o inactivar empresas', {empresa_prog_id})
-            """, "EMPRESA_ACTIVAR")
-            
-            safe_insert(cursor, f"""
-                INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID)
-                VALUES ('Ver todas las empresas', 'EMPRESA_VER_TODAS', 'Ver listado completo de empresas', {empresa_prog_id})
-            """, "EMPRESA_VER_TODAS")
+            safe_insert_batch(cursor, insert_permiso, [
+                ('Crear empresas', 'EMPRESA_CREAR', 'Crear nuevas empresas en el sistema', empresa_prog_id),
+                ('Editar todas las empresas', 'EMPRESA_EDITAR_TODAS', 'Editar cualquier empresa del sistema', empresa_prog_id),
+                ('Editar solo su empresa', 'EMPRESA_EDITAR_PROPIA', 'Editar solo los datos de su empresa', empresa_prog_id),
+                ('Activar/Inactivar empresas', 'EMPRESA_ACTIVAR', 'Activar o inactivar empresas', empresa_prog_id),
+                ('Ver todas las empresas', 'EMPRESA_VER_TODAS', 'Ver listado completo de empresas', empresa_prog_id),
+            ], lambda row: row[1])
         
         print("\n3. Insertando Permisos Específicos para Facturación...")
         print("-"*60)
         
         if facturacion_prog_id:
-            safe_insert(cursor, f"""
-                INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID)
-                VALUES ('Crear facturas', 'FACTURA_CREAR', 'Crear nuevas facturas', {facturacion_prog_id})
-            """, "FACTURA_CREAR")
-            
-            safe_insert(cursor, f"""
-                INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID)
-                VALUES ('Anular facturas', 'FACTURA_ANULAR', 'Anular facturas existentes', {facturacion_prog_id})
-            """, "FACTURA_ANULAR")
-            
-            safe_insert(cursor, f"""
-                INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID)
-                VALUES ('Ver todas las facturas', 'FACTURA_VER_TODAS', 'Ver facturas de todas las empresas', {facturacion_prog_id})
-            """, "FACTURA_VER_TODAS")
-            
-            safe_insert(cursor, f"""
-                INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID)
-                VALUES ('Aplicar descuentos', 'FACTURA_DESCUENTO', 'Aplicar descuentos en facturas', {facturacion_prog_id})
-            """, "FACTURA_DESCUENTO")
+            safe_insert_batch(cursor, insert_permiso, [
+                ('Crear facturas', 'FACTURA_CREAR', 'Crear nuevas facturas', facturacion_prog_id),
+                ('Anular facturas', 'FACTURA_ANULAR', 'Anular facturas existentes', facturacion_prog_id),
+                ('Ver todas las facturas', 'FACTURA_VER_TODAS', 'Ver facturas de todas las empresas', facturacion_prog_id),
+                ('Aplicar descuentos', 'FACTURA_DESCUENTO', 'Aplicar descuentos en facturas', facturacion_prog_id),
+            ], lambda row: row[1])
         
         print("\n4. Insertando Permisos Específicos para Caja...")
         print("-"*60)
         
         if caja_prog_id:
-            safe_insert(cursor, f"""
-                INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID)
-                VALUES ('Abrir caja', 'CAJA_ABRIR', 'Abrir una caja al inicio del día', {caja_prog_id})
-            """, "CAJA_ABRIR")
-            
-            safe_insert(cursor, f"""
-                INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID)
-                VALUES ('Cerrar caja', 'CAJA_CERRAR', 'Cerrar caja al final del día', {caja_prog_id})
-            """, "CAJA_CERRAR")
-            
-            safe_insert(cursor, f"""
-                INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID)
-                VALUES ('Registrar ingresos', 'CAJA_INGRESO', 'Registrar ingresos en caja', {caja_prog_id})
-            """, "CAJA_INGRESO")
-            
-            safe_insert(cursor, f"""
-                INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID)
-                VALUES ('Registrar egresos', 'CAJA_EGRESO', 'Registrar egresos/gastos', {caja_prog_id})
-            """, "CAJA_EGRESO")
-            
-            safe_insert(cursor, f"""
-                INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID)
-                VALUES ('Ver arqueo de otras cajas', 'CAJA_VER_TODAS', 'Ver movimientos de todas las cajas', {caja_prog_id})
-            """, "CAJA_VER_TODAS")
+            safe_insert_batch(cursor, insert_permiso, [
+                ('Abrir caja', 'CAJA_ABRIR', 'Abrir una caja al inicio del día', caja_prog_id),
+                ('Cerrar caja', 'CAJA_CERRAR', 'Cerrar caja al final del día', caja_prog_id),
+                ('Registrar ingresos', 'CAJA_INGRESO', 'Registrar ingresos en caja', caja_prog_id),
+                ('Registrar egresos', 'CAJA_EGRESO', 'Registrar egresos/gastos', caja_prog_id),
+                ('Ver arqueo de otras cajas', 'CAJA_VER_TODAS', 'Ver movimientos de todas las cajas', caja_prog_id),
+            ], lambda row: row[1])
         
         # Assign role to admin user
         print("\n5. Asignando rol ADMIN al usuario 1...")
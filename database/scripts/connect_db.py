@@ -10,64 +10,356 @@ Uso:
     cursor.execute("SELECT * FROM odo_pacientes")
     # ... usar la conexión
     cursor.close()
-    conn.close()
+    conn.close()   # devuelve la sesión al pool
+
+    # O con context managers (la sesión vuelve al pool al salir)
+    from connect_db import acquire_cursor, print_pool_stats
+
+    with acquire_cursor(commit=True) as cursor:
+        cursor.execute("UPDATE ...")
+
+    print_pool_stats()
+
+    # Tablas grandes en memoria constante (lotes de 5000 filas por round trip)
+    from connect_db import iter_query
+
+    for row in iter_query("SELECT * FROM odo_auditoria", arraysize=5000, rows='dict'):
+        ...
+
+    # API asíncrona (requiere thin mode): operaciones independientes en paralelo
+    import asyncio
+    from connect_db import execute_query_async
+
+    async def main():
+        return await asyncio.gather(
+            execute_query_async("SELECT COUNT(*) FROM odo_citas", fetch_one=True),
+            execute_query_async("SELECT COUNT(*) FROM odo_pacientes", fetch_one=True),
+        )
+
+    asyncio.run(main())
 """
 
 import oracledb
+import atexit
 import json
 import os
+import threading
+import time
+from collections import namedtuple
+from contextlib import asynccontextmanager, contextmanager
 from pathlib import Path
 
-# Variable global para controlar si ya se inicializó el cliente
-_oracle_client_initialized = False
+# Rutas del proyecto
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+CONFIG_PATH = PROJECT_ROOT / "config" / "oracle" / "credentials.json"
+INSTANT_CLIENT_DIR = os.environ.get('ORACLE_INSTANT_CLIENT', '/opt/oracle/instantclient_23_6')
+
+# Modos de cliente soportados: thin (python puro + ewallet.pem), thick (Instant Client)
+# o auto (thin si el wallet trae ewallet.pem, thick en caso contrario)
+CLIENT_MODES = ('auto', 'thin', 'thick')
+
+# Caché de credentials.json (se invalida si cambia el mtime del archivo)
+_config_cache = {'mtime': None, 'config': None}
+_config_lock = threading.Lock()
+
+# Modo del cliente Oracle elegido para el proceso ('thick' o 'thin'); None = sin inicializar
+_client_mode = None
+
+# Pool de sesiones compartido por todo el proceso
+_pool = None
+_pool_lock = threading.Lock()
+_pool_stats = {'acquires': 0, 'waits': 0, 'wait_time': 0.0}
+
+# Pool asíncrono (solo thin mode), independiente del pool síncrono
+_async_pool = None
+
+# Valores por defecto del pool (se pueden sobrescribir en credentials.json -> "pool")
+POOL_DEFAULTS = {'min': 1, 'max': 4, 'increment': 1}
+
+
+def load_config():
+    """
+    Carga la sección oracle_cloud de credentials.json.
+
+    El archivo se parsea una sola vez por proceso; solo se vuelve a leer si
+    cambia su fecha de modificación. Las rutas del wallet (config_dir,
+    wallet_location) se resuelven respecto a la raíz del proyecto.
+
+    Returns:
+        dict: Configuración de conexión
+
+    Raises:
+        FileNotFoundError: Si no existe credentials.json
+    """
+    try:
+        mtime = CONFIG_PATH.stat().st_mtime
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Archivo de credenciales no encontrado: {CONFIG_PATH}")
+
+    with _config_lock:
+        if _config_cache['mtime'] != mtime:
+            with open(CONFIG_PATH) as f:
+                config = json.load(f)['oracle_cloud']
+
+            for key in ('config_dir', 'wallet_location'):
+                if config.get(key):
+                    path = Path(config[key])
+                    if not path.is_absolute():
+                        path = PROJECT_ROOT / path
+                    config[key] = str(path.resolve())
+
+            _config_cache.update(mtime=mtime, config=config)
+
+        return _config_cache['config']
+
+
+def _resolve_client_mode(config):
+    """
+    Determina el modo de cliente solicitado.
+
+    Prioridad: variable de entorno ORACLE_CLIENT_MODE, luego la clave
+    "client_mode" de credentials.json y por último 'auto'.
+    """
+    mode = (os.environ.get('ORACLE_CLIENT_MODE') or config.get('client_mode') or 'auto').lower()
+    if mode not in CLIENT_MODES:
+        raise ValueError(f"client_mode inválido: {mode} (usar {', '.join(CLIENT_MODES)})")
+
+    if mode == 'auto':
+        wallet_dir = config.get('wallet_location') or config.get('config_dir')
+        if wallet_dir and (Path(wallet_dir) / 'ewallet.pem').exists():
+            return 'thin'
+        return 'thick'
+    return mode
+
+
+def _init_thick(config):
+    """Carga Oracle Instant Client (thick mode)."""
+    # Configurar LD_LIBRARY_PATH
+    os.environ['LD_LIBRARY_PATH'] = f"{INSTANT_CLIENT_DIR}:{os.environ.get('LD_LIBRARY_PATH', '')}"
+
+    try:
+        oracledb.init_oracle_client(
+            lib_dir=config.get('lib_dir', INSTANT_CLIENT_DIR),
+            config_dir=config.get('config_dir')
+        )
+    except Exception as e:
+        # Si ya estaba inicializado, ignorar
+        if "already been initialized" not in str(e):
+            raise
+
+
+def init_client(config=None):
+    """
+    Inicializa el cliente Oracle una sola vez por proceso.
+
+    En thin mode no se carga ninguna librería nativa: el driver usa el
+    ewallet.pem del wallet. Si se pidió thin pero el wallet no trae
+    ewallet.pem, se recurre a thick mode.
+
+    Args:
+        config (dict, optional): Configuración ya cargada con load_config()
+
+    Returns:
+        str: Modo del cliente ('thick' o 'thin')
+    """
+    global _client_mode
+
+    if _client_mode is not None:
+        return _client_mode
+
+    config = config or load_config()
+    mode = _resolve_client_mode(config)
+
+    if mode == 'thin':
+        wallet_dir = config.get('wallet_location') or config.get('config_dir')
+        if wallet_dir and not (Path(wallet_dir) / 'ewallet.pem').exists():
+            print(f"⚠️  {wallet_dir} no contiene ewallet.pem, usando thick mode")
+            mode = 'thick'
+
+    if mode == 'thick':
+        _init_thick(config)
+
+    _client_mode = mode
+    return _client_mode
+
+
+def connect_params(config=None):
+    """
+    Arma los parámetros de conexión según el modo del cliente.
+
+    Args:
+        config (dict, optional): Configuración ya cargada con load_config()
+
+    Returns:
+        dict: Argumentos para oracledb.connect() / oracledb.create_pool()
+    """
+    config = config or load_config()
+    params = {
+        'user': config['user'],
+        'password': config['password'],
+        'dsn': config['dsn'],
+    }
+
+    if init_client(config) == 'thin':
+        wallet_dir = config.get('wallet_location') or config.get('config_dir')
+        params['config_dir'] = config.get('config_dir') or wallet_dir
+        params['wallet_location'] = wallet_dir
+        if config.get('wallet_password'):
+            params['wallet_password'] = config['wallet_password']
+
+    return params
+
+
+def get_pool():
+    """
+    Obtiene el pool de sesiones del proceso, creándolo la primera vez.
+
+    Los tamaños se leen de la clave opcional "pool" de credentials.json
+    (min, max, increment).
+
+    Returns:
+        oracledb.ConnectionPool: Pool de sesiones compartido
+    """
+    global _pool
+
+    if _pool is not None:
+        return _pool
+
+    with _pool_lock:
+        if _pool is None:
+            config = load_config()
+            sizes = {**POOL_DEFAULTS, **config.get('pool', {})}
+            _pool = oracledb.create_pool(
+                **connect_params(config),
+                min=sizes['min'],
+                max=sizes['max'],
+                increment=sizes['increment'],
+                getmode=oracledb.POOL_GETMODE_WAIT
+            )
+    return _pool
+
+
+def reserve_pool(sessions):
+    """
+    Amplía el máximo del pool para poder tener `sessions` sesiones a la vez.
+
+    Los tamaños de credentials.json son para uso secuencial; un despliegue
+    con N hilos necesita N sesiones más la del hilo principal. El pool nunca
+    se achica.
+
+    Returns:
+        int: Máximo del pool tras el ajuste
+    """
+    pool = get_pool()
+    with _pool_lock:
+        if pool.max < sessions:
+            pool.reconfigure(max=sessions)
+    return pool.max
+
+
+def close_pool():
+    """Cierra el pool de sesiones si fue creado."""
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            try:
+                _pool.close(force=True)
+            finally:
+                _pool = None
+
+
+atexit.register(close_pool)
 
 
 def get_connection():
     """
     Obtiene una conexión a la base de datos Oracle Cloud.
 
+    La conexión sale del pool de sesiones del proceso; al llamar a
+    conn.close() vuelve al pool en lugar de cerrar la sesión.
+
     Returns:
         oracledb.Connection: Conexión activa a Oracle
 
     Raises:
         Exception: Si no puede conectarse
     """
-    global _oracle_client_initialized
+    pool = get_pool()
 
-    # Cargar credenciales
-    config_path = Path(__file__).parent.parent.parent / "config" / "oracle" / "credentials.json"
+    if pool.busy >= pool.max:
+        _pool_stats['waits'] += 1
 
-    if not config_path.exists():
-        raise FileNotFoundError(f"Archivo de credenciales no encontrado: {config_path}")
+    start = time.perf_counter()
+    connection = pool.acquire()
+    _pool_stats['wait_time'] += time.perf_counter() - start
+    _pool_stats['acquires'] += 1
 
-    with open(config_path) as f:
-        config = json.load(f)['oracle_cloud']
+    return connection
 
-    # Configurar LD_LIBRARY_PATH
-    lib_path = '/opt/oracle/instantclient_23_6'
-    os.environ['LD_LIBRARY_PATH'] = f"{lib_path}:{os.environ.get('LD_LIBRARY_PATH', '')}"
 
-    # Inicializar cliente Oracle (solo la primera vez)
-    if not _oracle_client_initialized:
+@contextmanager
+def acquire():
+    """
+    Context manager que toma una conexión del pool y la devuelve al salir.
+
+    Uso:
+        with acquire() as conn:
+            ...
+    """
+    conn = get_connection()
+    try:
+        yield conn
+    finally:
+        get_pool().release(conn)
+
+
+@contextmanager
+def acquire_cursor(commit=False):
+    """
+    Context manager que entrega un cursor sobre una conexión del pool.
+
+    Args:
+        commit (bool): Si True, hace commit al salir sin errores
+
+    Uso:
+        with acquire_cursor(commit=True) as cursor:
+            cursor.execute(...)
+    """
+    with acquire() as conn:
+        cursor = conn.cursor()
         try:
-            oracledb.init_oracle_client(
-                lib_dir=lib_path,
-                config_dir=config['config_dir']
-            )
-            _oracle_client_initialized = True
-        except Exception as e:
-            # Si ya estaba inicializado, ignorar
-            if "already been initialized" not in str(e):
-                raise
+            yield cursor
+            if commit:
+                conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
 
-    # Conectar
-    connection = oracledb.connect(
-        user=config['user'],
-        password=config['password'],
-        dsn=config['dsn']
-    )
 
-    return connection
+def get_pool_stats():
+    """
+    Retorna estadísticas del pool de sesiones.
+
+    Returns:
+        dict: open, busy, max, acquires, waits y wait_time (segundos)
+    """
+    stats = dict(_pool_stats)
+    if _pool is not None:
+        stats.update(open=_pool.opened, busy=_pool.busy, max=_pool.max)
+    else:
+        stats.update(open=0, busy=0, max=0)
+    return stats
+
+
+def print_pool_stats():
+    """Imprime las estadísticas del pool (útil al final de un script)."""
+    stats = get_pool_stats()
+    print(f"📊 Pool: abiertas={stats['open']} ocupadas={stats['busy']} max={stats['max']} "
+          f"acquires={stats['acquires']} esperas={stats['waits']} "
+          f"tiempo_espera={stats['wait_time']:.3f}s")
 
 
 def execute_query(query, params=None, fetch_one=False):
@@ -82,10 +374,7 @@ def execute_query(query, params=None, fetch_one=False):
     Returns:
         list o tuple: Resultados de la query
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    try:
+    with acquire_cursor() as cursor:
         if params:
             cursor.execute(query, params)
         else:
@@ -97,9 +386,85 @@ def execute_query(query, params=None, fetch_one=False):
             result = cursor.fetchall()
 
         return result
-    finally:
-        cursor.close()
-        conn.close()
+
+
+def _column_names(cursor):
+    return [d[0].lower() for d in cursor.description]
+
+
+def _namedtuple_factory(cursor):
+    Row = namedtuple('Row', _column_names(cursor), rename=True)
+    return Row
+
+
+def _dict_factory(cursor):
+    names = _column_names(cursor)
+    return lambda *values: dict(zip(names, values))
+
+
+# Fábricas de filas de iter_query: reciben el cursor ya ejecutado y devuelven
+# el rowfactory del driver (None = tuplas)
+ROW_FACTORIES = {
+    'tuple': lambda cursor: None,
+    'namedtuple': _namedtuple_factory,
+    'dict': _dict_factory,
+}
+
+
+def iter_query(query, params=None, arraysize=1000, prefetchrows=None,
+               rows='tuple', batches=False, cursor=None):
+    """
+    Ejecuta una query y entrega las filas a medida que llegan (generador).
+
+    A diferencia de execute_query no hace fetchall(): en memoria hay como
+    máximo un lote de arraysize filas, así que sirve para recorrer tablas
+    grandes (ODO_AUDITORIA, ODO_CITAS, movimientos) en memoria constante.
+    Cada round trip trae arraysize filas (el default del driver es 100).
+
+    La conexión sale del pool y vuelve al terminar de iterar (o al cerrar
+    el generador si se corta antes).
+
+    Args:
+        query (str): Query SQL a ejecutar
+        params (dict, optional): Parámetros para la query
+        arraysize (int): Filas por round trip
+        prefetchrows (int, optional): Filas que viajan con la respuesta del
+            execute; por defecto igual a arraysize
+        rows (str): Formato de cada fila: 'tuple', 'namedtuple' o 'dict'
+            (claves / atributos con el nombre de columna en minúsculas)
+        batches (bool): Si True, entrega listas de hasta arraysize filas
+        cursor (oracledb.Cursor, optional): Cursor de una conexión ya
+            tomada (p.ej. dentro de una transacción); no se cierra
+
+    Yields:
+        tuple, namedtuple, dict o list: Una fila, o un lote si batches=True
+    """
+    if rows not in ROW_FACTORIES:
+        raise ValueError(f"rows inválido: {rows} (usar {', '.join(ROW_FACTORIES)})")
+
+    def run(cur):
+        cur.arraysize = arraysize
+        cur.prefetchrows = arraysize if prefetchrows is None else prefetchrows
+        cur.execute(query, params or {})
+        cur.rowfactory = ROW_FACTORIES[rows](cur)
+
+        if batches:
+            while True:
+                batch = cur.fetchmany(arraysize)
+                if not batch:
+                    break
+                yield batch
+        else:
+            yield from cur
+
+    if cursor is not None:
+        try:
+            yield from run(cursor)
+        finally:
+            cursor.rowfactory = None
+    else:
+        with acquire_cursor() as cur:
+            yield from run(cur)
 
 
 def execute_dml(query, params=None, commit=True):
@@ -114,32 +479,82 @@ def execute_dml(query, params=None, commit=True):
     Returns:
         int: Número de filas afectadas
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    try:
+    with acquire_cursor(commit=commit) as cursor:
         if params:
             cursor.execute(query, params)
         else:
             cursor.execute(query)
 
-        rows_affected = cursor.rowcount
+        return cursor.rowcount
 
-        if commit:
-            conn.commit()
 
-        return rows_affected
-    finally:
-        cursor.close()
-        conn.close()
+def execute_many(query, rows, batch_size=500, cursor=None, commit=True, ignore_codes=(1,)):
+    """
+    Ejecuta un DML con arrays de binds (executemany), un round trip por lote.
 
+    Usa batcherrors=True: las filas con error no abortan el lote y se
+    reportan individualmente. Los códigos ORA en ignore_codes (por defecto
+    ORA-00001, clave duplicada) se marcan como 'existe' en lugar de error.
 
-def get_table_structure(table_name):
+    Args:
+        query (str): DML con binds posicionales (:1, :2) o por nombre
+        rows (list): Lista de tuplas o dicts con los valores de cada fila
+        batch_size (int): Filas por round trip
+        cursor (oracledb.Cursor, optional): Cursor de una transacción en curso;
+            si se indica, no se hace commit (lo maneja el llamador)
+        commit (bool): Si True y no se pasó cursor, hace commit al final
+        ignore_codes (tuple): Códigos ORA tratados como "ya existe"
+
+    Returns:
+        dict: rowcount (total de filas afectadas) y rows, una lista alineada
+            con rows de dicts {'status': 'ok'|'existe'|'error', 'count', 'error'}
+    """
+    rows = list(rows)
+    result = {'rowcount': 0, 'rows': []}
+
+    def run(cur):
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            cur.executemany(query, batch, batcherrors=True, arraydmlrowcounts=True)
+
+            statuses = [{'status': 'ok', 'count': 0, 'error': None} for _ in batch]
+            for error in cur.getbatcherrors():
+                status = statuses[error.offset]
+                status['error'] = error.message
+                status['status'] = 'existe' if error.code in ignore_codes else 'error'
+
+            # Según el driver, los conteos incluyen o no las filas con error
+            counts = cur.getarraydmlrowcounts()
+            if len(counts) != len(batch):
+                ok = iter(counts)
+                counts = [0 if st['error'] else next(ok, 0) for st in statuses]
+            for status, count in zip(statuses, counts):
+                if status['error'] is None:
+                    status['count'] = count
+                    result['rowcount'] += count
+
+            result['rows'].extend(statuses)
+
+    if cursor is not None:
+        run(cursor)
+    else:
+        with acquire_cursor(commit=commit) as cur:
+            run(cur)
+
+    return result
+
+
+def get_table_structure(table_name, snapshot=False):
     """
     Obtiene la estructura de una tabla.
 
+    Por defecto consulta la base. Con snapshot=True, si existe el snapshot
+    local del catálogo (catalog_snapshot.py) se lee de ahí, sin ir a la
+    base; solo para diagnóstico, porque puede estar desactualizado.
+
     Args:
         table_name (str): Nombre de la tabla
+        snapshot (bool): Usar el snapshot local si existe
 
     Returns:
         list: Lista de tuplas con (columna, tipo, longitud, nullable)
@@ -150,21 +565,154 @@ def get_table_structure(table_name):
         WHERE table_name = :table_name
         ORDER BY column_id
     """
+    if snapshot:
+        import catalog_snapshot
+        if catalog_snapshot.snapshot_exists():
+            return catalog_snapshot.query(query.replace(':table_name', '?'),
+                                          (table_name.upper(),))
     return execute_query(query, {'table_name': table_name.upper()})
 
 
-def list_tables():
+def list_tables(snapshot=False):
     """
-    Lista todas las tablas del usuario.
+    Lista todas las tablas del usuario (snapshot=True: del snapshot local
+    del catálogo si existe, solo para diagnóstico).
+
+    Args:
+        snapshot (bool): Usar el snapshot local si existe
 
     Returns:
         list: Lista de nombres de tablas
     """
     query = "SELECT table_name FROM user_tables ORDER BY table_name"
+    if snapshot:
+        import catalog_snapshot
+        if catalog_snapshot.snapshot_exists():
+            return [row[0] for row in catalog_snapshot.query(query)]
     results = execute_query(query)
     return [row[0] for row in results]
 
 
+# ============================================================================
+# API ASÍNCRONA (asyncio)
+# ============================================================================
+
+def get_pool_async():
+    """
+    Obtiene el pool asíncrono del proceso, creándolo la primera vez.
+
+    python-oracledb solo soporta asyncio en thin mode, por lo que el
+    cliente debe estar (o quedar) en thin mode.
+
+    Returns:
+        oracledb.AsyncConnectionPool: Pool asíncrono compartido
+
+    Raises:
+        RuntimeError: Si el cliente ya fue inicializado en thick mode
+    """
+    global _async_pool
+
+    if _async_pool is not None:
+        return _async_pool
+
+    with _pool_lock:
+        if _async_pool is None:
+            config = load_config()
+            if init_client(config) != 'thin':
+                raise RuntimeError("La API asíncrona requiere thin mode (ORACLE_CLIENT_MODE=thin)")
+            sizes = {**POOL_DEFAULTS, **config.get('pool', {})}
+            _async_pool = oracledb.create_pool_async(
+                **connect_params(config),
+                min=sizes['min'],
+                max=sizes['max'],
+                increment=sizes['increment'],
+                getmode=oracledb.POOL_GETMODE_WAIT
+            )
+    return _async_pool
+
+
+async def close_pool_async():
+    """Cierra el pool asíncrono si fue creado."""
+    global _async_pool
+
+    if _async_pool is not None:
+        pool, _async_pool = _async_pool, None
+        await pool.close(force=True)
+
+
+async def get_connection_async():
+    """
+    Obtiene una conexión asíncrona del pool.
+
+    Returns:
+        oracledb.AsyncConnection: Conexión activa (await conn.close() la devuelve al pool)
+    """
+    return await get_pool_async().acquire()
+
+
+@asynccontextmanager
+async def acquire_async():
+    """
+    Context manager asíncrono que toma una conexión del pool y la devuelve al salir.
+
+    Uso:
+        async with acquire_async() as conn:
+            ...
+    """
+    pool = get_pool_async()
+    conn = await pool.acquire()
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
+
+
+async def execute_query_async(query, params=None, fetch_one=False):
+    """
+    Versión asíncrona de execute_query.
+
+    Args:
+        query (str): Query SQL a ejecutar
+        params (dict, optional): Parámetros para la query
+        fetch_one (bool): Si True, retorna solo la primera fila
+
+    Returns:
+        list o tuple: Resultados de la query
+    """
+    async with acquire_async() as conn:
+        with conn.cursor() as cursor:
+            await cursor.execute(query, params or {})
+
+            if fetch_one:
+                return await cursor.fetchone()
+            return await cursor.fetchall()
+
+
+async def execute_dml_async(query, params=None, commit=True):
+    """
+    Versión asíncrona de execute_dml.
+
+    Args:
+        query (str): Query DML (o bloque PL/SQL) a ejecutar
+        params (dict, optional): Parámetros para la query
+        commit (bool): Si True, hace commit automáticamente
+
+    Returns:
+        int: Número de filas afectadas
+    """
+    async with acquire_async() as conn:
+        with conn.cursor() as cursor:
+            try:
+                await cursor.execute(query, params or {})
+                if commit:
+                    await conn.commit()
+            except Exception:
+                await conn.rollback()
+                raise
+
+            return cursor.rowcount
+
+
 # Ejemplo de uso
 if __name__ == "__main__":
     print("🔄 Probando conexión...")
@@ -177,7 +725,7 @@ if __name__ == "__main__":
         cursor.execute("SELECT user, sys_context('userenv', 'db_name') FROM dual")
         user, db = cursor.fetchone()
 
-        print(f"✅ Conectado como {user} a {db}")
+        print(f"✅ Conectado como {user} a {db} ({init_client()} mode)")
 
         # Listar tablas
         tables = list_tables()
@@ -188,6 +736,8 @@ if __name__ == "__main__":
         cursor.close()
         conn.close()
 
+        print()
+        print_pool_stats()
         print("\n✅ Test completado exitosamente")
 
     except Exception as e:
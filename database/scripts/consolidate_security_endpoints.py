@@ -1,4 +1,5 @@
 from connect_db import get_connection
+from ords_deploy import ensure_packages
 
 conn = get_connection()
 cursor = conn.cursor()
@@ -12,22 +13,31 @@ endpoints = [
     # 1. USUARIOS
     ('usuarios', 'GET', """
 DECLARE
+    v_token VARCHAR2(4000) := :next;
+    v_limit PLS_INTEGER := PKG_JSON_RESPONSE.page_size(:limit, 100);
+    v_after NUMBER := JSON_VALUE(PKG_JSON_RESPONSE.token_key(v_token), '$[0]' RETURNING NUMBER);
+    v_total NUMBER;
     v_cursor SYS_REFCURSOR;
 BEGIN
+    IF PKG_JSON_RESPONSE.include_total(:incluir_total) THEN
+        SELECT COUNT(*) INTO v_total FROM ODO_USUARIOS;
+    END IF;
+
     OPEN v_cursor FOR
-        SELECT USUARIO_ID, NOMBRE, APELLIDO, EMAIL, ROL_ID, ACTIVO 
-        FROM ODO_USUARIOS 
-        ORDER BY USUARIO_ID;
-        
-    APEX_JSON.initialize_clob_output;
-    APEX_JSON.open_object;
-    APEX_JSON.write('items', v_cursor);
-    APEX_JSON.close_object;
-    
+        SELECT JSON_OBJECT(
+                   'USUARIO_ID' VALUE USUARIO_ID, 'NOMBRE' VALUE NOMBRE,
+                   'APELLIDO' VALUE APELLIDO, 'EMAIL' VALUE EMAIL,
+                   'ROL_ID' VALUE ROL_ID, 'ACTIVO' VALUE ACTIVO
+                   ABSENT ON NULL RETURNING CLOB),
+               JSON_ARRAY(USUARIO_ID NULL ON NULL)
+        FROM ODO_USUARIOS
+        WHERE v_after IS NULL OR USUARIO_ID > v_after
+        ORDER BY USUARIO_ID
+        FETCH FIRST v_limit + 1 ROWS ONLY;
+
     :status := 200;
     :content_type := 'application/json';
-    htp.p(APEX_JSON.get_clob_output);
-    APEX_JSON.free_output;
+    PKG_JSON_RESPONSE.print_page(v_cursor, v_limit, v_token, 'items', v_total);
 EXCEPTION
     WHEN OTHERS THEN
         :status := 500;
@@ -36,7 +46,7 @@ EXCEPTION
         APEX_JSON.write('error', SQLERRM);
         APEX_JSON.write('code', SQLCODE);
         APEX_JSON.close_object;
-        htp.p(APEX_JSON.get_clob_output);
+        PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
         APEX_JSON.free_output;
 END;"""),
     
@@ -46,20 +56,17 @@ DECLARE
     v_cursor SYS_REFCURSOR;
 BEGIN
     OPEN v_cursor FOR
-        SELECT ROL_ID, NOMBRE, CODIGO, DESCRIPCION, ACTIVO 
-        FROM ODO_ROLES 
-        WHERE ACTIVO = 'S' 
+        SELECT JSON_OBJECT(
+                   'ROL_ID' VALUE ROL_ID, 'NOMBRE' VALUE NOMBRE, 'CODIGO' VALUE CODIGO,
+                   'DESCRIPCION' VALUE DESCRIPCION, 'ACTIVO' VALUE ACTIVO
+                   ABSENT ON NULL RETURNING CLOB)
+        FROM ODO_ROLES
+        WHERE ACTIVO = 'S'
         ORDER BY NOMBRE;
-        
-    APEX_JSON.initialize_clob_output;
-    APEX_JSON.open_object;
-    APEX_JSON.write('items', v_cursor);
-    APEX_JSON.close_object;
-    
+
     :status := 200;
     :content_type := 'application/json';
-    htp.p(APEX_JSON.get_clob_output);
-    APEX_JSON.free_output;
+    PKG_JSON_RESPONSE.print_items(v_cursor, 'items');
 EXCEPTION
     WHEN OTHERS THEN
         :status := 500;
@@ -67,7 +74,7 @@ EXCEPTION
         APEX_JSON.open_object;
         APEX_JSON.write('error', SQLERRM);
         APEX_JSON.close_object;
-        htp.p(APEX_JSON.get_clob_output);
+        PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
         APEX_JSON.free_output;
 END;"""),
 
@@ -96,7 +103,7 @@ BEGIN
     APEX_JSON.close_object;
     :status := 201;
     :content_type := 'application/json';
-    htp.p(APEX_JSON.get_clob_output);
+    PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
 END;"""),
 
@@ -126,7 +133,7 @@ BEGIN
     APEX_JSON.close_object;
     :status := 200;
     :content_type := 'application/json';
-    htp.p(APEX_JSON.get_clob_output);
+    PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
 END;"""),
 
@@ -143,18 +150,16 @@ DECLARE
     v_cursor SYS_REFCURSOR;
 BEGIN
     OPEN v_cursor FOR
-        SELECT PROGRAMA_ID, NOMBRE, CODIGO, ICONO, MODULO_PADRE_ID 
-        FROM ODO_PROGRAMAS 
-        WHERE ACTIVO = 'S' 
+        SELECT JSON_OBJECT(
+                   'PROGRAMA_ID' VALUE PROGRAMA_ID, 'NOMBRE' VALUE NOMBRE, 'CODIGO' VALUE CODIGO,
+                   'ICONO' VALUE ICONO, 'MODULO_PADRE_ID' VALUE MODULO_PADRE_ID
+                   ABSENT ON NULL RETURNING CLOB)
+        FROM ODO_PROGRAMAS
+        WHERE ACTIVO = 'S'
         ORDER BY ORDEN, NOMBRE;
-    APEX_JSON.initialize_clob_output;
-    APEX_JSON.open_object;
-    APEX_JSON.write('items', v_cursor);
-    APEX_JSON.close_object;
     :status := 200;
     :content_type := 'application/json';
-    htp.p(APEX_JSON.get_clob_output);
-    APEX_JSON.free_output;
+    PKG_JSON_RESPONSE.print_items(v_cursor, 'items');
 END;"""),
 
     ('permisos', 'GET', """
@@ -162,18 +167,16 @@ DECLARE
     v_cursor SYS_REFCURSOR;
 BEGIN
     OPEN v_cursor FOR
-        SELECT PERMISO_ID, NOMBRE, CODIGO, PROGRAMA_ID 
-        FROM ODO_PERMISOS 
-        WHERE ACTIVO = 'S' 
+        SELECT JSON_OBJECT(
+                   'PERMISO_ID' VALUE PERMISO_ID, 'NOMBRE' VALUE NOMBRE,
+                   'CODIGO' VALUE CODIGO, 'PROGRAMA_ID' VALUE PROGRAMA_ID
+                   ABSENT ON NULL RETURNING CLOB)
+        FROM ODO_PERMISOS
+        WHERE ACTIVO = 'S'
         ORDER BY NOMBRE;
-    APEX_JSON.initialize_clob_output;
-    APEX_JSON.open_object;
-    APEX_JSON.write('items', v_cursor);
-    APEX_JSON.close_object;
     :status := 200;
     :content_type := 'application/json';
-    htp.p(APEX_JSON.get_clob_output);
-    APEX_JSON.free_output;
+    PKG_JSON_RESPONSE.print_items(v_cursor, 'items');
 END;"""),
 
     # 4. USUARIOS PERMISOS/PROGRAMAS
@@ -188,7 +191,7 @@ BEGIN
     APEX_JSON.close_object;
     :status := 200;
     :content_type := 'application/json';
-    htp.p(APEX_JSON.get_clob_output);
+    PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
 END;"""),
     ('usuarios/:id/permisos', 'GET', """
@@ -202,7 +205,7 @@ BEGIN
     APEX_JSON.close_object;
     :status := 200;
     :content_type := 'application/json';
-    htp.p(APEX_JSON.get_clob_output);
+    PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
 END;"""),
     ('usuarios/:id/tiene-permiso/:codigo', 'GET', """
@@ -213,7 +216,7 @@ BEGIN
     APEX_JSON.close_object;
     :status := 200;
     :content_type := 'application/json';
-    htp.p(APEX_JSON.get_clob_output);
+    PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
 END;"""),
     ('usuarios/:id/rol', 'PUT', """
@@ -234,7 +237,7 @@ BEGIN
     APEX_JSON.close_object;
     :status := 200;
     :content_type := 'application/json';
-    htp.p(APEX_JSON.get_clob_output);
+    PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
 END;"""),
 
@@ -244,19 +247,17 @@ DECLARE
     v_cursor SYS_REFCURSOR;
 BEGIN
     OPEN v_cursor FOR
-        SELECT p.PROGRAMA_ID, p.NOMBRE, p.CODIGO, p.ICONO, p.MODULO_PADRE_ID
+        SELECT JSON_OBJECT(
+                   'PROGRAMA_ID' VALUE p.PROGRAMA_ID, 'NOMBRE' VALUE p.NOMBRE, 'CODIGO' VALUE p.CODIGO,
+                   'ICONO' VALUE p.ICONO, 'MODULO_PADRE_ID' VALUE p.MODULO_PADRE_ID
+                   ABSENT ON NULL RETURNING CLOB)
         FROM ODO_ROL_PROGRAMAS rp
         JOIN ODO_PROGRAMAS p ON rp.PROGRAMA_ID = p.PROGRAMA_ID
         WHERE rp.ROL_ID = :id
         ORDER BY p.ORDEN, p.NOMBRE;
-    APEX_JSON.initialize_clob_output;
-    APEX_JSON.open_object;
-    APEX_JSON.write('items', v_cursor);
-    APEX_JSON.close_object;
     :status := 200;
     :content_type := 'application/json';
-    htp.p(APEX_JSON.get_clob_output);
-    APEX_JSON.free_output;
+    PKG_JSON_RESPONSE.print_items(v_cursor, 'items');
 END;"""),
     ('roles/:id/programas', 'POST', """
 DECLARE
@@ -276,7 +277,7 @@ BEGIN
     APEX_JSON.close_object;
     :status := 200;
     :content_type := 'application/json';
-    htp.p(APEX_JSON.get_clob_output);
+    PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
 END;"""),
     ('roles/:id/permisos', 'GET', """
@@ -284,19 +285,17 @@ DECLARE
     v_cursor SYS_REFCURSOR;
 BEGIN
     OPEN v_cursor FOR
-        SELECT p.PERMISO_ID, p.NOMBRE, p.CODIGO, p.PROGRAMA_ID
+        SELECT JSON_OBJECT(
+                   'PERMISO_ID' VALUE p.PERMISO_ID, 'NOMBRE' VALUE p.NOMBRE,
+                   'CODIGO' VALUE p.CODIGO, 'PROGRAMA_ID' VALUE p.PROGRAMA_ID
+                   ABSENT ON NULL RETURNING CLOB)
         FROM ODO_ROL_PERMISOS rp
         JOIN ODO_PERMISOS p ON rp.PERMISO_ID = p.PERMISO_ID
         WHERE rp.ROL_ID = :id
         ORDER BY p.NOMBRE;
-    APEX_JSON.initialize_clob_output;
-    APEX_JSON.open_object;
-    APEX_JSON.write('items', v_cursor);
-    APEX_JSON.close_object;
     :status := 200;
     :content_type := 'application/json';
-    htp.p(APEX_JSON.get_clob_output);
-    APEX_JSON.free_output;
+    PKG_JSON_RESPONSE.print_items(v_cursor, 'items');
 END;"""),
     ('roles/:id/permisos', 'POST', """
 DECLARE
@@ -316,7 +315,7 @@ BEGIN
     APEX_JSON.close_object;
     :status := 200;
     :content_type := 'application/json';
-    htp.p(APEX_JSON.get_clob_output);
+    PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
 END;"""),
 
@@ -326,6 +325,9 @@ END;"""),
 ]
 
 try:
+    # Los handlers escriben la respuesta con PKG_JSON_RESPONSE
+    ensure_packages(conn, ['PKG_JSON_RESPONSE'])
+
     patterns = {}
     for pattern, method, source in endpoints:
         if pattern not in patterns:
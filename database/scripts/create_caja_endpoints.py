@@ -1,4 +1,5 @@
 from connect_db import get_connection
+from ords_deploy import ensure_packages
 
 conn = get_connection()
 cursor = conn.cursor()
@@ -8,6 +9,9 @@ print("CREANDO ENDPOINTS ORDS PARA MÓDULO DE CAJA")
 print("=" * 60)
 
 try:
+    # Los handlers escriben la respuesta con PKG_JSON_RESPONSE
+    ensure_packages(conn, ['PKG_JSON_RESPONSE'])
+
     # ─── 1. GET /caja ─────────────────────────────────────────────────────────
     print("\n1. GET /caja (listar cajas)...")
     cursor.execute("""
@@ -23,28 +27,27 @@ DECLARE
     v_cursor SYS_REFCURSOR;
 BEGIN
     OPEN v_cursor FOR
-        SELECT
-            c.CAJA_ID, c.EMPRESA_ID, c.NOMBRE, c.DESCRIPCION,
-            c.USUARIO_ASIGNADO_ID,
-            u.NOMBRE || '' '' || u.APELLIDO AS NOMBRE_USUARIO,
-            c.SALDO_INICIAL, c.SALDO_FINAL,
-            c.TOTAL_INGRESOS, c.TOTAL_EGRESOS,
-            (c.SALDO_INICIAL + c.TOTAL_INGRESOS - c.TOTAL_EGRESOS) AS SALDO_ACTUAL,
-            c.ESTADO, c.FECHA_APERTURA, c.FECHA_CIERRE, c.OBSERVACIONES, c.FECHA_CREACION
+        SELECT JSON_OBJECT(
+            ''CAJA_ID'' VALUE c.CAJA_ID, ''EMPRESA_ID'' VALUE c.EMPRESA_ID,
+            ''NOMBRE'' VALUE c.NOMBRE, ''DESCRIPCION'' VALUE c.DESCRIPCION,
+            ''USUARIO_ASIGNADO_ID'' VALUE c.USUARIO_ASIGNADO_ID,
+            ''NOMBRE_USUARIO'' VALUE u.NOMBRE || '' '' || u.APELLIDO,
+            ''SALDO_INICIAL'' VALUE c.SALDO_INICIAL, ''SALDO_FINAL'' VALUE c.SALDO_FINAL,
+            ''TOTAL_INGRESOS'' VALUE c.TOTAL_INGRESOS, ''TOTAL_EGRESOS'' VALUE c.TOTAL_EGRESOS,
+            ''SALDO_ACTUAL'' VALUE (c.SALDO_INICIAL + c.TOTAL_INGRESOS - c.TOTAL_EGRESOS),
+            ''ESTADO'' VALUE c.ESTADO, ''FECHA_APERTURA'' VALUE c.FECHA_APERTURA,
+            ''FECHA_CIERRE'' VALUE c.FECHA_CIERRE, ''OBSERVACIONES'' VALUE c.OBSERVACIONES,
+            ''FECHA_CREACION'' VALUE c.FECHA_CREACION
+            ABSENT ON NULL RETURNING CLOB)
         FROM ODO_CAJAS c
         LEFT JOIN ODO_USUARIOS u ON u.USUARIO_ID = c.USUARIO_ASIGNADO_ID
         WHERE c.EMPRESA_ID = :empresa_id
           AND (:estado IS NULL OR c.ESTADO = :estado)
         ORDER BY c.ESTADO DESC, c.FECHA_APERTURA DESC NULLS LAST, c.NOMBRE;
 
-    APEX_JSON.initialize_clob_output;
-    APEX_JSON.open_object;
-    APEX_JSON.write(''items'', v_cursor);
-    APEX_JSON.close_object;
     :status := 200;
     :content_type := ''application/json'';
-    htp.p(APEX_JSON.get_clob_output);
-    APEX_JSON.free_output;
+    PKG_JSON_RESPONSE.print_items(v_cursor, ''items'');
 END;'
             );
             COMMIT;
@@ -90,7 +93,7 @@ BEGIN
     APEX_JSON.close_object;
     :status := CASE WHEN v_resultado = 1 THEN 201 ELSE 400 END;
     :content_type := ''application/json'';
-    htp.p(APEX_JSON.get_clob_output);
+    PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
 END;'
             );
@@ -114,20 +117,18 @@ DECLARE
     v_cursor SYS_REFCURSOR;
 BEGIN
     OPEN v_cursor FOR
-        SELECT CATEGORIA_ID, NOMBRE, TIPO, DESCRIPCION, ACTIVO
+        SELECT JSON_OBJECT(
+            ''CATEGORIA_ID'' VALUE CATEGORIA_ID, ''NOMBRE'' VALUE NOMBRE, ''TIPO'' VALUE TIPO,
+            ''DESCRIPCION'' VALUE DESCRIPCION, ''ACTIVO'' VALUE ACTIVO
+            ABSENT ON NULL RETURNING CLOB)
         FROM ODO_CATEGORIAS_MOVIMIENTO_CAJA
         WHERE (:tipo IS NULL OR TIPO = :tipo)
           AND ACTIVO = ''S''
         ORDER BY TIPO, NOMBRE;
 
-    APEX_JSON.initialize_clob_output;
-    APEX_JSON.open_object;
-    APEX_JSON.write(''items'', v_cursor);
-    APEX_JSON.close_object;
     :status := 200;
     :content_type := ''application/json'';
-    htp.p(APEX_JSON.get_clob_output);
-    APEX_JSON.free_output;
+    PKG_JSON_RESPONSE.print_items(v_cursor, ''items'');
 END;'
             );
             COMMIT;
@@ -150,26 +151,24 @@ DECLARE
     v_cursor SYS_REFCURSOR;
 BEGIN
     OPEN v_cursor FOR
-        SELECT
-            c.CAJA_ID, c.EMPRESA_ID, c.NOMBRE, c.DESCRIPCION,
-            c.USUARIO_ASIGNADO_ID,
-            u.NOMBRE || '' '' || u.APELLIDO AS NOMBRE_USUARIO,
-            c.SALDO_INICIAL, c.SALDO_FINAL,
-            c.TOTAL_INGRESOS, c.TOTAL_EGRESOS,
-            (c.SALDO_INICIAL + c.TOTAL_INGRESOS - c.TOTAL_EGRESOS) AS SALDO_ACTUAL,
-            c.ESTADO, c.FECHA_APERTURA, c.FECHA_CIERRE, c.OBSERVACIONES
+        SELECT JSON_OBJECT(
+            ''CAJA_ID'' VALUE c.CAJA_ID, ''EMPRESA_ID'' VALUE c.EMPRESA_ID,
+            ''NOMBRE'' VALUE c.NOMBRE, ''DESCRIPCION'' VALUE c.DESCRIPCION,
+            ''USUARIO_ASIGNADO_ID'' VALUE c.USUARIO_ASIGNADO_ID,
+            ''NOMBRE_USUARIO'' VALUE u.NOMBRE || '' '' || u.APELLIDO,
+            ''SALDO_INICIAL'' VALUE c.SALDO_INICIAL, ''SALDO_FINAL'' VALUE c.SALDO_FINAL,
+            ''TOTAL_INGRESOS'' VALUE c.TOTAL_INGRESOS, ''TOTAL_EGRESOS'' VALUE c.TOTAL_EGRESOS,
+            ''SALDO_ACTUAL'' VALUE (c.SALDO_INICIAL + c.TOTAL_INGRESOS - c.TOTAL_EGRESOS),
+            ''ESTADO'' VALUE c.ESTADO, ''FECHA_APERTURA'' VALUE c.FECHA_APERTURA,
+            ''FECHA_CIERRE'' VALUE c.FECHA_CIERRE, ''OBSERVACIONES'' VALUE c.OBSERVACIONES
+            ABSENT ON NULL RETURNING CLOB)
         FROM ODO_CAJAS c
         LEFT JOIN ODO_USUARIOS u ON u.USUARIO_ID = c.USUARIO_ASIGNADO_ID
         WHERE c.CAJA_ID = :id;
 
-    APEX_JSON.initialize_clob_output;
-    APEX_JSON.open_object;
-    APEX_JSON.write(''items'', v_cursor);
-    APEX_JSON.close_object;
     :status := 200;
     :content_type := ''application/json'';
-    htp.p(APEX_JSON.get_clob_output);
-    APEX_JSON.free_output;
+    PKG_JSON_RESPONSE.print_items(v_cursor, ''items'');
 END;'
             );
             COMMIT;
@@ -212,7 +211,7 @@ BEGIN
     APEX_JSON.close_object;
     :status := CASE WHEN v_resultado = 1 THEN 200 ELSE 400 END;
     :content_type := ''application/json'';
-    htp.p(APEX_JSON.get_clob_output);
+    PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
 END;'
             );
@@ -256,7 +255,7 @@ BEGIN
     APEX_JSON.close_object;
     :status := CASE WHEN v_resultado = 1 THEN 200 ELSE 400 END;
     :content_type := ''application/json'';
-    htp.p(APEX_JSON.get_clob_output);
+    PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
 END;'
             );
@@ -302,7 +301,7 @@ BEGIN
     APEX_JSON.close_object;
     :status := CASE WHEN v_resultado = 1 THEN 200 ELSE 400 END;
     :content_type := ''application/json'';
-    htp.p(APEX_JSON.get_clob_output);
+    PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
 END;'
             );
@@ -323,32 +322,48 @@ END;'
                 p_source_type => 'plsql/block',
                 p_source      => '
 DECLARE
-    v_cursor SYS_REFCURSOR;
+    v_token   VARCHAR2(4000) := :next;
+    v_limit   PLS_INTEGER := PKG_JSON_RESPONSE.page_size(:limit, 200);
+    v_key     VARCHAR2(4000) := PKG_JSON_RESPONSE.token_key(v_token);
+    v_hasta   ODO_MOVIMIENTOS_CAJA.FECHA_HORA%TYPE :=
+                  JSON_VALUE(v_key, ''$[0]'' RETURNING TIMESTAMP WITH TIME ZONE);
+    v_mov_id  NUMBER := JSON_VALUE(v_key, ''$[1]'' RETURNING NUMBER);
+    v_total   NUMBER;
+    v_cursor  SYS_REFCURSOR;
 BEGIN
+    IF PKG_JSON_RESPONSE.include_total(:incluir_total) THEN
+        SELECT COUNT(*) INTO v_total
+        FROM ODO_MOVIMIENTOS_CAJA m
+        WHERE m.CAJA_ID = :id
+          AND (:tipo IS NULL OR m.TIPO = :tipo);
+    END IF;
+
     OPEN v_cursor FOR
-        SELECT
-            m.MOVIMIENTO_ID, m.CAJA_ID, m.TIPO,
-            m.CATEGORIA_ID,
-            cat.NOMBRE AS CATEGORIA_NOMBRE,
-            m.CONCEPTO, m.MONTO, m.REFERENCIA, m.FACTURA_ID,
-            m.REGISTRADO_POR,
-            u.NOMBRE || '' '' || u.APELLIDO AS NOMBRE_USUARIO,
-            m.FECHA_HORA, m.OBSERVACIONES
+        SELECT JSON_OBJECT(
+            ''MOVIMIENTO_ID'' VALUE m.MOVIMIENTO_ID, ''CAJA_ID'' VALUE m.CAJA_ID,
+            ''TIPO'' VALUE m.TIPO, ''CATEGORIA_ID'' VALUE m.CATEGORIA_ID,
+            ''CATEGORIA_NOMBRE'' VALUE cat.NOMBRE,
+            ''CONCEPTO'' VALUE m.CONCEPTO, ''MONTO'' VALUE m.MONTO,
+            ''REFERENCIA'' VALUE m.REFERENCIA, ''FACTURA_ID'' VALUE m.FACTURA_ID,
+            ''REGISTRADO_POR'' VALUE m.REGISTRADO_POR,
+            ''NOMBRE_USUARIO'' VALUE u.NOMBRE || '' '' || u.APELLIDO,
+            ''FECHA_HORA'' VALUE m.FECHA_HORA, ''OBSERVACIONES'' VALUE m.OBSERVACIONES
+            ABSENT ON NULL RETURNING CLOB),
+            JSON_ARRAY(m.FECHA_HORA, m.MOVIMIENTO_ID NULL ON NULL)
         FROM ODO_MOVIMIENTOS_CAJA m
         LEFT JOIN ODO_CATEGORIAS_MOVIMIENTO_CAJA cat ON cat.CATEGORIA_ID = m.CATEGORIA_ID
         LEFT JOIN ODO_USUARIOS u ON u.USUARIO_ID = m.REGISTRADO_POR
         WHERE m.CAJA_ID = :id
           AND (:tipo IS NULL OR m.TIPO = :tipo)
-        ORDER BY m.FECHA_HORA DESC;
+          AND (v_key IS NULL
+               OR m.FECHA_HORA < v_hasta
+               OR (m.FECHA_HORA = v_hasta AND m.MOVIMIENTO_ID < v_mov_id))
+        ORDER BY m.FECHA_HORA DESC, m.MOVIMIENTO_ID DESC
+        FETCH FIRST v_limit + 1 ROWS ONLY;
 
-    APEX_JSON.initialize_clob_output;
-    APEX_JSON.open_object;
-    APEX_JSON.write(''items'', v_cursor);
-    APEX_JSON.close_object;
     :status := 200;
     :content_type := ''application/json'';
-    htp.p(APEX_JSON.get_clob_output);
-    APEX_JSON.free_output;
+    PKG_JSON_RESPONSE.print_page(v_cursor, v_limit, v_token, ''items'', v_total);
 END;'
             );
             COMMIT;
@@ -398,7 +413,7 @@ BEGIN
     APEX_JSON.close_object;
     :status := CASE WHEN v_resultado = 1 THEN 201 ELSE 400 END;
     :content_type := ''application/json'';
-    htp.p(APEX_JSON.get_clob_output);
+    PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
 END;'
             );
@@ -422,25 +437,21 @@ DECLARE
     v_cursor SYS_REFCURSOR;
 BEGIN
     OPEN v_cursor FOR
-        SELECT
-            m.TIPO,
-            NVL(cat.NOMBRE, ''Sin categoría'') AS CATEGORIA,
-            COUNT(*) AS CANTIDAD,
-            SUM(m.MONTO) AS TOTAL
+        SELECT JSON_OBJECT(
+            ''TIPO'' VALUE m.TIPO,
+            ''CATEGORIA'' VALUE NVL(cat.NOMBRE, ''Sin categoría''),
+            ''CANTIDAD'' VALUE COUNT(*),
+            ''TOTAL'' VALUE SUM(m.MONTO)
+            ABSENT ON NULL RETURNING CLOB)
         FROM ODO_MOVIMIENTOS_CAJA m
         LEFT JOIN ODO_CATEGORIAS_MOVIMIENTO_CAJA cat ON cat.CATEGORIA_ID = m.CATEGORIA_ID
         WHERE m.CAJA_ID = :id
         GROUP BY m.TIPO, cat.NOMBRE
         ORDER BY m.TIPO, cat.NOMBRE;
 
-    APEX_JSON.initialize_clob_output;
-    APEX_JSON.open_object;
-    APEX_JSON.write(''items'', v_cursor);
-    APEX_JSON.close_object;
     :status := 200;
     :content_type := ''application/json'';
-    htp.p(APEX_JSON.get_clob_output);
-    APEX_JSON.free_output;
+    PKG_JSON_RESPONSE.print_items(v_cursor, ''items'');
 END;'
             );
             COMMIT;
@@ -463,11 +474,12 @@ DECLARE
     v_cursor SYS_REFCURSOR;
 BEGIN
     OPEN v_cursor FOR
-        SELECT
-            c.CAJA_ID,
-            c.NOMBRE,
-            c.FECHA_APERTURA,
-            TRUNC(SYSDATE) - TRUNC(c.FECHA_APERTURA) AS DIAS_PENDIENTE
+        SELECT JSON_OBJECT(
+            ''CAJA_ID'' VALUE c.CAJA_ID,
+            ''NOMBRE'' VALUE c.NOMBRE,
+            ''FECHA_APERTURA'' VALUE c.FECHA_APERTURA,
+            ''DIAS_PENDIENTE'' VALUE TRUNC(SYSDATE) - TRUNC(c.FECHA_APERTURA)
+            ABSENT ON NULL RETURNING CLOB)
         FROM ODO_CAJAS c
         WHERE c.EMPRESA_ID            = :empresa_id
           AND c.USUARIO_ASIGNADO_ID   = :usuario_id
@@ -475,14 +487,9 @@ BEGIN
           AND TRUNC(c.FECHA_APERTURA) < TRUNC(SYSDATE)
         ORDER BY c.FECHA_APERTURA;
 
-    APEX_JSON.initialize_clob_output;
-    APEX_JSON.open_object;
-    APEX_JSON.write(''items'', v_cursor);
-    APEX_JSON.close_object;
     :status := 200;
     :content_type := ''application/json'';
-    htp.p(APEX_JSON.get_clob_output);
-    APEX_JSON.free_output;
+    PKG_JSON_RESPONSE.print_items(v_cursor, ''items'');
 END;'
             );
             COMMIT;
@@ -503,7 +510,7 @@ END;'
     print("  PUT    /facturas/caja/:id                      - Editar caja")
     print("  POST   /facturas/caja/:id/abrir                - Abrir caja")
     print("  POST   /facturas/caja/:id/cerrar               - Cerrar caja")
-    print("  GET    /facturas/caja/:id/movimientos          - Listar movimientos")
+    print("  GET    /facturas/caja/:id/movimientos          - Listar movimientos (limit/next)")
     print("  POST   /facturas/caja/:id/movimientos          - Registrar movimiento")
     print("  GET    /facturas/caja/:id/resumen              - Resumen por categoría")
 
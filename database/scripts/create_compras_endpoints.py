@@ -1,75 +1,65 @@
-from connect_db import execute_dml
+#!/usr/bin/env python3
+"""
+Deploy ORDS endpoints for the Compras module (api/v1/compras/).
 
-def deploy_compras_endpoints():
-    sql = """
-    BEGIN
-        -- Eliminar módulo si existe para recrearlo
-        BEGIN
-            ORDS.DELETE_MODULE(p_module_name => 'compras');
-            COMMIT;
-        EXCEPTION WHEN OTHERS THEN NULL;
-        END;
-
-        ORDS.DEFINE_MODULE(
-            p_module_name    => 'compras',
-            p_base_path      => 'api/v1/compras/',
-            p_items_per_page => 50,
-            p_status         => 'PUBLISHED',
-            p_comments       => 'Módulo de Compras y Proveedores'
-        );
+Los endpoints se registran en un manifiesto y se despliegan con
+ords_deploy de forma incremental: solo se definen los handlers nuevos o
+modificados, sin borrar el módulo (antes se hacía ORDS.DELETE_MODULE y
+todo el módulo quedaba caído durante el redeploy).
 
-        -- =============================================
-        -- PROVEEDORES
-        -- =============================================
-        ORDS.DEFINE_TEMPLATE(p_module_name => 'compras', p_pattern => 'proveedores');
-        
-        -- GET Proveedores
-        ORDS.DEFINE_HANDLER(
-            p_module_name => 'compras',
-            p_pattern     => 'proveedores',
-            p_method      => 'GET',
-            p_source_type => 'plsql/block',
-            p_source      => '
+Uso:
+    python3 create_compras_endpoints.py            # incremental
+    python3 create_compras_endpoints.py --dry-run  # solo mostrar cambios
+"""
+import sys
+
+from connect_db import acquire
+from ords_deploy import Manifest, deploy_manifest, print_summary
+
+
+def build_manifest():
+    manifest = Manifest()
+    manifest.define_module('compras', 'api/v1/compras/', items_per_page=50,
+                           comments='Módulo de Compras y Proveedores')
+
+    # =============================================
+    # PROVEEDORES
+    # =============================================
+    manifest.add('compras', 'proveedores', 'GET', 'plsql/block', """
 BEGIN
     APEX_JSON.initialize_clob_output;
     APEX_JSON.open_object;
-    APEX_JSON.write(''success'', true);
-    APEX_JSON.open_array(''items'');
+    APEX_JSON.write('success', true);
+    APEX_JSON.open_array('items');
     
     FOR r IN (SELECT * FROM ODO_PROVEEDORES WHERE (:activo IS NULL OR ACTIVO = :activo) ORDER BY NOMBRE) LOOP
         APEX_JSON.open_object;
-        APEX_JSON.write(''proveedor_id'', r.PROVEEDOR_ID);
-        APEX_JSON.write(''nombre'', r.NOMBRE);
-        APEX_JSON.write(''ruc'', r.RUC);
-        APEX_JSON.write(''nombre_contacto'', r.NOMBRE_CONTACTO);
-        APEX_JSON.write(''telefono'', r.TELEFONO);
-        APEX_JSON.write(''email'', r.EMAIL);
-        APEX_JSON.write(''direccion'', r.DIRECCION);
-        APEX_JSON.write(''ciudad'', r.CIUDAD);
-        APEX_JSON.write(''departamento'', r.DEPARTAMENTO);
-        APEX_JSON.write(''pais'', r.PAIS);
-        APEX_JSON.write(''condiciones_pago'', r.CONDICIONES_PAGO);
-        APEX_JSON.write(''moneda'', r.MONEDA);
-        APEX_JSON.write(''activo'', r.ACTIVO);
+        APEX_JSON.write('proveedor_id', r.PROVEEDOR_ID);
+        APEX_JSON.write('nombre', r.NOMBRE);
+        APEX_JSON.write('ruc', r.RUC);
+        APEX_JSON.write('nombre_contacto', r.NOMBRE_CONTACTO);
+        APEX_JSON.write('telefono', r.TELEFONO);
+        APEX_JSON.write('email', r.EMAIL);
+        APEX_JSON.write('direccion', r.DIRECCION);
+        APEX_JSON.write('ciudad', r.CIUDAD);
+        APEX_JSON.write('departamento', r.DEPARTAMENTO);
+        APEX_JSON.write('pais', r.PAIS);
+        APEX_JSON.write('condiciones_pago', r.CONDICIONES_PAGO);
+        APEX_JSON.write('moneda', r.MONEDA);
+        APEX_JSON.write('activo', r.ACTIVO);
         APEX_JSON.close_object;
     END LOOP;
     
     APEX_JSON.close_array;
     APEX_JSON.close_object;
     :status := 200;
-    :content_type := ''application/json'';
+    :content_type := 'application/json';
     htp.p(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
-END;'
-        );
+END;
+""", "Listar proveedores", items_per_page=None)
 
-        -- POST/PUT Proveedor (Upsert)
-        ORDS.DEFINE_HANDLER(
-            p_module_name => 'compras',
-            p_pattern     => 'proveedores',
-            p_method      => 'POST',
-            p_source_type => 'plsql/block',
-            p_source      => '
+    manifest.add('compras', 'proveedores', 'POST', 'plsql/block', """
 DECLARE
     v_id NUMBER := :proveedor_id;
     v_res NUMBER;
@@ -97,42 +87,27 @@ BEGIN
     
     APEX_JSON.initialize_clob_output;
     APEX_JSON.open_object;
-    APEX_JSON.write(''success'', v_res = 1);
-    APEX_JSON.write(''message'', v_msg);
-    APEX_JSON.write(''proveedor_id'', v_id);
+    APEX_JSON.write('success', v_res = 1);
+    APEX_JSON.write('message', v_msg);
+    APEX_JSON.write('proveedor_id', v_id);
     APEX_JSON.close_object;
     
     :status := CASE WHEN v_res = 1 THEN 200 ELSE 400 END;
-    :content_type := ''application/json'';
+    :content_type := 'application/json';
     htp.p(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
-END;'
-        );
+END;
+""", "Crear/actualizar proveedor", items_per_page=None)
 
-        -- =============================================
-        -- CATEGORIAS Y ARTICULOS
-        -- =============================================
-        -- =============================================
-        -- CATEGORIAS Y ARTICULOS
-        -- =============================================
-        ORDS.DEFINE_TEMPLATE(p_module_name => 'compras', p_pattern => 'categorias');
-        
-        -- GET Categorias
-        ORDS.DEFINE_HANDLER(
-            p_module_name => 'compras',
-            p_pattern     => 'categorias',
-            p_method      => 'GET',
-            p_source_type => 'json/query',
-            p_source      => 'SELECT * FROM ODO_CATEGORIAS_ARTICULOS WHERE ACTIVO = ''S'' ORDER BY NOMBRE'
-        );
 
-        -- POST Categorias (Upsert)
-        ORDS.DEFINE_HANDLER(
-            p_module_name => 'compras',
-            p_pattern     => 'categorias',
-            p_method      => 'POST',
-            p_source_type => 'plsql/block',
-            p_source      => '
+    # =============================================
+    # CATEGORÍAS
+    # =============================================
+    manifest.add('compras', 'categorias', 'GET', 'json/query', """
+SELECT * FROM ODO_CATEGORIAS_ARTICULOS WHERE ACTIVO = 'S' ORDER BY NOMBRE
+""", "Listar categorías", items_per_page=None)
+
+    manifest.add('compras', 'categorias', 'POST', 'plsql/block', """
 BEGIN
     DECLARE
         v_id NUMBER := :categoria_id;
@@ -150,27 +125,20 @@ BEGIN
         
         APEX_JSON.initialize_clob_output;
         APEX_JSON.open_object;
-        APEX_JSON.write(''success'', v_res = 1);
-        APEX_JSON.write(''message'', v_msg);
-        APEX_JSON.write(''categoria_id'', v_id);
+        APEX_JSON.write('success', v_res = 1);
+        APEX_JSON.write('message', v_msg);
+        APEX_JSON.write('categoria_id', v_id);
         APEX_JSON.close_object;
         
         :status := CASE WHEN v_res = 1 THEN 200 ELSE 400 END;
-        :content_type := ''application/json'';
+        :content_type := 'application/json';
         htp.p(APEX_JSON.get_clob_output);
         APEX_JSON.free_output;
     END;
-END;'
-        );
+END;
+""", "Crear/actualizar categoría", items_per_page=None)
 
-        -- DELETE Categoria
-        ORDS.DEFINE_TEMPLATE(p_module_name => 'compras', p_pattern => 'categorias/:id');
-        ORDS.DEFINE_HANDLER(
-            p_module_name => 'compras',
-            p_pattern     => 'categorias/:id',
-            p_method      => 'DELETE',
-            p_source_type => 'plsql/block',
-            p_source      => '
+    manifest.add('compras', 'categorias/:id', 'DELETE', 'plsql/block', """
 BEGIN
     DECLARE
         v_res NUMBER;
@@ -184,48 +152,40 @@ BEGIN
         
         APEX_JSON.initialize_clob_output;
         APEX_JSON.open_object;
-        APEX_JSON.write(''success'', v_res = 1);
-        APEX_JSON.write(''message'', v_msg);
+        APEX_JSON.write('success', v_res = 1);
+        APEX_JSON.write('message', v_msg);
         APEX_JSON.close_object;
         
         :status := CASE WHEN v_res = 1 THEN 200 ELSE 400 END;
-        :content_type := ''application/json'';
+        :content_type := 'application/json';
         htp.p(APEX_JSON.get_clob_output);
         APEX_JSON.free_output;
     END;
-END;'
-        );
+END;
+""", "Eliminar categoría", items_per_page=None)
 
-        -- UNIDADES DE MEDIDA
-        ORDS.DEFINE_TEMPLATE(p_module_name => 'compras', p_pattern => 'unidades-medida');
-        ORDS.DEFINE_HANDLER(
-            p_module_name => 'compras',
-            p_pattern     => 'unidades-medida',
-            p_method      => 'GET',
-            p_source_type => 'json/query',
-            p_source      => 'SELECT * FROM ODO_UNIDADES_MEDIDA WHERE ACTIVO = ''S'' ORDER BY NOMBRE'
-        );
 
-        ORDS.DEFINE_TEMPLATE(p_module_name => 'compras', p_pattern => 'articulos');
-        ORDS.DEFINE_HANDLER(
-            p_module_name => 'compras',
-            p_pattern     => 'articulos',
-            p_method      => 'GET',
-            p_source_type => 'json/query',
-            p_source      => 'SELECT a.*, c.NOMBRE as CATEGORIA_NOMBRE 
+    # =============================================
+    # UNIDADES DE MEDIDA
+    # =============================================
+    manifest.add('compras', 'unidades-medida', 'GET', 'json/query', """
+SELECT * FROM ODO_UNIDADES_MEDIDA WHERE ACTIVO = 'S' ORDER BY NOMBRE
+""", "Listar unidades de medida", items_per_page=None)
+
+
+    # =============================================
+    # ARTÍCULOS
+    # =============================================
+    manifest.add('compras', 'articulos', 'GET', 'json/query', """
+SELECT a.*, c.NOMBRE as CATEGORIA_NOMBRE 
                               FROM ODO_ARTICULOS a 
                               JOIN ODO_CATEGORIAS_ARTICULOS c ON a.CATEGORIA_ID = c.CATEGORIA_ID 
                               WHERE (:categoria_id IS NULL OR a.CATEGORIA_ID = :categoria_id) 
                                 AND (:activo IS NULL OR a.ACTIVO = :activo) 
-                              ORDER BY a.NOMBRE'
-        );
+                              ORDER BY a.NOMBRE
+""", "Listar artículos", items_per_page=None)
 
-        ORDS.DEFINE_HANDLER(
-            p_module_name => 'compras',
-            p_pattern     => 'articulos',
-            p_method      => 'POST',
-            p_source_type => 'plsql/block',
-            p_source      => '
+    manifest.add('compras', 'articulos', 'POST', 'plsql/block', """
 DECLARE
     v_id NUMBER := :articulo_id;
     v_res NUMBER;
@@ -250,44 +210,33 @@ BEGIN
     
     APEX_JSON.initialize_clob_output;
     APEX_JSON.open_object;
-    APEX_JSON.write(''success'', v_res = 1);
-    APEX_JSON.write(''message'', v_msg);
-    APEX_JSON.write(''articulo_id'', v_id);
+    APEX_JSON.write('success', v_res = 1);
+    APEX_JSON.write('message', v_msg);
+    APEX_JSON.write('articulo_id', v_id);
     APEX_JSON.close_object;
     
     :status := CASE WHEN v_res = 1 THEN 200 ELSE 400 END;
-    :content_type := ''application/json'';
+    :content_type := 'application/json';
     htp.p(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
-END;'
-        );
+END;
+""", "Crear/actualizar artículo", items_per_page=None)
 
-        -- =============================================
-        -- INVENTARIO
-        -- =============================================
-        ORDS.DEFINE_TEMPLATE(p_module_name => 'compras', p_pattern => 'inventario');
-        ORDS.DEFINE_HANDLER(
-            p_module_name => 'compras',
-            p_pattern     => 'inventario',
-            p_method      => 'GET',
-            p_source_type => 'json/query',
-            p_source      => 'SELECT i.*, a.NOMBRE as ARTICULO_NOMBRE, a.CODIGO as ARTICULO_CODIGO, a.UNIDAD_MEDIDA, a.CATEGORIA_ID
+
+    # =============================================
+    # INVENTARIO
+    # =============================================
+    manifest.add('compras', 'inventario', 'GET', 'json/query', """
+SELECT i.*, a.NOMBRE as ARTICULO_NOMBRE, a.CODIGO as ARTICULO_CODIGO, a.UNIDAD_MEDIDA, a.CATEGORIA_ID
                               FROM ODO_INVENTARIO i
                               JOIN ODO_ARTICULOS a ON i.ARTICULO_ID = a.ARTICULO_ID
                               WHERE i.EMPRESA_ID = :empresa_id
                                 AND (:sucursal_id IS NULL OR i.SUCURSAL_ID = :sucursal_id)
                                 AND (:articulo_id IS NULL OR i.ARTICULO_ID = :articulo_id)
-                              ORDER BY a.NOMBRE'
-        );
+                              ORDER BY a.NOMBRE
+""", "Consultar inventario", items_per_page=None)
 
-        -- Movimiento Manual
-        ORDS.DEFINE_TEMPLATE(p_module_name => 'compras', p_pattern => 'inventario/movimiento');
-        ORDS.DEFINE_HANDLER(
-            p_module_name => 'compras',
-            p_pattern     => 'inventario/movimiento',
-            p_method      => 'POST',
-            p_source_type => 'plsql/block',
-            p_source      => '
+    manifest.add('compras', 'inventario/movimiento', 'POST', 'plsql/block', """
 DECLARE
     v_res NUMBER;
     v_msg VARCHAR2(1000);
@@ -306,46 +255,39 @@ BEGIN
     
     APEX_JSON.initialize_clob_output;
     APEX_JSON.open_object;
-    APEX_JSON.write(''success'', v_res = 1);
-    APEX_JSON.write(''message'', v_msg);
+    APEX_JSON.write('success', v_res = 1);
+    APEX_JSON.write('message', v_msg);
     APEX_JSON.close_object;
     
     :status := CASE WHEN v_res = 1 THEN 200 ELSE 400 END;
-    :content_type := ''application/json'';
+    :content_type := 'application/json';
     htp.p(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
-END;'
-        );
+END;
+""", "Registrar movimiento manual de inventario", items_per_page=None)
+
 
-        -- =============================================
-        -- FACTURAS DE COMPRA
-        -- =============================================
-        ORDS.DEFINE_TEMPLATE(p_module_name => 'compras', p_pattern => 'facturas');
-
-        -- GET Facturas de Compra
-        ORDS.DEFINE_HANDLER(
-            p_module_name => 'compras',
-            p_pattern     => 'facturas',
-            p_method      => 'GET',
-            p_source_type => 'plsql/block',
-            p_source      => '
+    # =============================================
+    # FACTURAS DE COMPRA
+    # =============================================
+    manifest.add('compras', 'facturas', 'GET', 'plsql/block', """
 BEGIN
     APEX_JSON.initialize_clob_output;
     APEX_JSON.open_object;
-    APEX_JSON.write(''success'', true);
-    APEX_JSON.open_array(''items'');
+    APEX_JSON.write('success', true);
+    APEX_JSON.open_array('items');
 
     FOR r IN (
         SELECT fc.FACTURA_COMPRA_ID,
                fc.NUMERO_FACTURA,
-               TO_CHAR(fc.FECHA_FACTURA, ''YYYY-MM-DD'') as FECHA_FACTURA,
+               TO_CHAR(fc.FECHA_FACTURA, 'YYYY-MM-DD') as FECHA_FACTURA,
                fc.PROVEEDOR_ID,
                p.NOMBRE as PROVEEDOR_NOMBRE,
                fc.ESTADO,
                fc.MONEDA,
                fc.TOTAL_GENERAL,
                fc.CONDICION_PAGO,
-               TO_CHAR(fc.FECHA_CREACION, ''YYYY-MM-DD HH24:MI'') as FECHA_CREACION
+               TO_CHAR(fc.FECHA_CREACION, 'YYYY-MM-DD HH24:MI') as FECHA_CREACION
         FROM ODO_FACTURA_COMPRA fc
         JOIN ODO_PROVEEDORES p ON fc.PROVEEDOR_ID = p.PROVEEDOR_ID
         WHERE fc.EMPRESA_ID = :empresa_id
@@ -354,35 +296,29 @@ BEGIN
         FETCH FIRST 200 ROWS ONLY
     ) LOOP
         APEX_JSON.open_object;
-        APEX_JSON.write(''factura_compra_id'', r.FACTURA_COMPRA_ID);
-        APEX_JSON.write(''numero_factura'', r.NUMERO_FACTURA);
-        APEX_JSON.write(''fecha_factura'', r.FECHA_FACTURA);
-        APEX_JSON.write(''proveedor_id'', r.PROVEEDOR_ID);
-        APEX_JSON.write(''proveedor_nombre'', r.PROVEEDOR_NOMBRE);
-        APEX_JSON.write(''estado'', r.ESTADO);
-        APEX_JSON.write(''moneda'', r.MONEDA);
-        APEX_JSON.write(''total_general'', r.TOTAL_GENERAL);
-        APEX_JSON.write(''condicion_pago'', r.CONDICION_PAGO);
-        APEX_JSON.write(''fecha_creacion'', r.FECHA_CREACION);
+        APEX_JSON.write('factura_compra_id', r.FACTURA_COMPRA_ID);
+        APEX_JSON.write('numero_factura', r.NUMERO_FACTURA);
+        APEX_JSON.write('fecha_factura', r.FECHA_FACTURA);
+        APEX_JSON.write('proveedor_id', r.PROVEEDOR_ID);
+        APEX_JSON.write('proveedor_nombre', r.PROVEEDOR_NOMBRE);
+        APEX_JSON.write('estado', r.ESTADO);
+        APEX_JSON.write('moneda', r.MONEDA);
+        APEX_JSON.write('total_general', r.TOTAL_GENERAL);
+        APEX_JSON.write('condicion_pago', r.CONDICION_PAGO);
+        APEX_JSON.write('fecha_creacion', r.FECHA_CREACION);
         APEX_JSON.close_object;
     END LOOP;
 
     APEX_JSON.close_array;
     APEX_JSON.close_object;
     :status := 200;
-    :content_type := ''application/json'';
+    :content_type := 'application/json';
     htp.p(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
-END;'
-        );
+END;
+""", "Listar facturas de compra", items_per_page=None)
 
-        -- POST Factura de Compra
-        ORDS.DEFINE_HANDLER(
-            p_module_name => 'compras',
-            p_pattern     => 'facturas',
-            p_method      => 'POST',
-            p_source_type => 'plsql/block',
-            p_source      => '
+    manifest.add('compras', 'facturas', 'POST', 'plsql/block', """
 DECLARE
     v_res NUMBER;
     v_msg VARCHAR2(1000);
@@ -392,7 +328,7 @@ BEGIN
         p_sucursal_id    => :sucursal_id,
         p_proveedor_id   => :proveedor_id,
         p_numero_factura => :numero_factura,
-        p_fecha_factura  => TO_DATE(:fecha_factura, ''YYYY-MM-DD''),
+        p_fecha_factura  => TO_DATE(:fecha_factura, 'YYYY-MM-DD'),
         p_condicion_pago => :condicion_pago,
         p_moneda         => :moneda,
         p_total_general  => :total_general,
@@ -404,27 +340,18 @@ BEGIN
     
     APEX_JSON.initialize_clob_output;
     APEX_JSON.open_object;
-    APEX_JSON.write(''success'', v_res = 1);
-    APEX_JSON.write(''message'', v_msg);
+    APEX_JSON.write('success', v_res = 1);
+    APEX_JSON.write('message', v_msg);
     APEX_JSON.close_object;
     
     :status := CASE WHEN v_res = 1 THEN 200 ELSE 400 END;
-    :content_type := ''application/json'';
+    :content_type := 'application/json';
     htp.p(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
-END;'
-        );
+END;
+""", "Registrar factura de compra", items_per_page=None)
 
-        -- =============================================
-        -- ANULACIÓN DE FACTURA DE COMPRA
-        -- =============================================
-        ORDS.DEFINE_TEMPLATE(p_module_name => 'compras', p_pattern => 'facturas/:id');
-        ORDS.DEFINE_HANDLER(
-            p_module_name => 'compras',
-            p_pattern     => 'facturas/:id',
-            p_method      => 'DELETE',
-            p_source_type => 'plsql/block',
-            p_source      => '
+    manifest.add('compras', 'facturas/:id', 'DELETE', 'plsql/block', """
 DECLARE
     v_res NUMBER;
     v_msg VARCHAR2(1000);
@@ -438,23 +365,26 @@ BEGIN
 
     APEX_JSON.initialize_clob_output;
     APEX_JSON.open_object;
-    APEX_JSON.write(''success'', v_res = 1);
-    APEX_JSON.write(''message'', v_msg);
+    APEX_JSON.write('success', v_res = 1);
+    APEX_JSON.write('message', v_msg);
     APEX_JSON.close_object;
 
     :status := CASE WHEN v_res = 1 THEN 200 ELSE 400 END;
-    :content_type := ''application/json'';
+    :content_type := 'application/json';
     htp.p(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
-END;'
-        );
+END;
+""", "Anular factura de compra", items_per_page=None)
 
-        COMMIT;
-    END;
-    """
+    return manifest
+
+
+def deploy_compras_endpoints(dry_run=False):
     print("Desplegando endpoints de Compras...")
-    result = execute_dml(sql)
-    print(f"Resultado: {result}")
+    with acquire() as conn:
+        results = deploy_manifest(conn, build_manifest(), dry_run=dry_run)
+    return print_summary(results)
+
 
 if __name__ == "__main__":
-    deploy_compras_endpoints()
+    sys.exit(0 if deploy_compras_endpoints('--dry-run' in sys.argv) else 1)
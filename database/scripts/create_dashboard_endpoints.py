@@ -1,6 +1,12 @@
 import os
-from connect_db import execute_dml
+from connect_db import acquire, execute_dml
+from ensure_schema import ensure_schema, metricas_diarias_spec
+from ords_deploy import ensure_packages
 
+# Los tres endpoints leen ODO_METRICAS_DIARIAS (PKG_METRICAS) por su clave
+# (EMPRESA_ID, FECHA); el job ODO_JOB_METRICAS recalcula los días que los
+# triggers marcan en ODO_METRICAS_PENDIENTES. total_pacientes es un COUNT
+# en vivo (índice por EMPRESA_ID): incluye pacientes sin FECHA_REGISTRO.
 def deploy_dashboard_endpoints():
     sql = """
     BEGIN
@@ -19,25 +25,30 @@ def deploy_dashboard_endpoints():
 BEGIN
     APEX_JSON.initialize_clob_output;
     APEX_JSON.open_object;
-    
+
     FOR r IN (
-        SELECT 
+        SELECT
             (SELECT COUNT(*) FROM ODO_PACIENTES WHERE EMPRESA_ID = :empresa_id) as total_pacientes,
-            (SELECT COUNT(*) FROM ODO_CITAS WHERE EMPRESA_ID = :empresa_id AND TRUNC(FECHA_HORA_INICIO) = TRUNC(SYSDATE) AND (ESTADO IS NULL OR ESTADO != ''CANCELADA'')) as citas_hoy,
-            (SELECT COUNT(*) FROM ODO_TRATAMIENTOS_PACIENTE t JOIN ODO_PACIENTES p ON t.PACIENTE_ID = p.PACIENTE_ID WHERE p.EMPRESA_ID = :empresa_id AND t.ESTADO = ''EN_PROCESO'') as tratamientos_activos,
-            (SELECT NVL(SUM(MONTO), 0) FROM ODO_PAGOS WHERE EMPRESA_ID = :empresa_id AND TRUNC(CAST(FECHA_PAGO AS DATE), ''MM'') = TRUNC(SYSDATE, ''MM'')) as ingresos_mes
-        FROM DUAL
+            m.citas_hoy, m.tratamientos_activos, m.ingresos_mes
+        FROM (
+            SELECT
+                NVL(SUM(CASE WHEN FECHA = TRUNC(SYSDATE) THEN CITAS_TOTAL - CITAS_CANCELADAS END), 0) as citas_hoy,
+                NVL(MAX(CASE WHEN FECHA = TRUNC(SYSDATE) THEN TRATAMIENTOS_ACTIVOS END), 0) as tratamientos_activos,
+                NVL(SUM(CASE WHEN FECHA >= TRUNC(SYSDATE, ''MM'') AND FECHA < ADD_MONTHS(TRUNC(SYSDATE, ''MM''), 1) THEN INGRESOS END), 0) as ingresos_mes
+            FROM ODO_METRICAS_DIARIAS
+            WHERE EMPRESA_ID = :empresa_id
+        ) m
     ) LOOP
         APEX_JSON.write(''total_pacientes'', r.total_pacientes);
         APEX_JSON.write(''citas_hoy'', r.citas_hoy);
         APEX_JSON.write(''tratamientos_activos'', r.tratamientos_activos);
         APEX_JSON.write(''ingresos_mes'', r.ingresos_mes);
     END LOOP;
-    
+
     APEX_JSON.close_object;
     :status := 200;
     :content_type := ''application/json'';
-    htp.p(APEX_JSON.get_clob_output);
+    PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
 END;'
         );
@@ -63,12 +74,15 @@ BEGIN
             FROM DUAL
             CONNECT BY LEVEL <= 7
         )
-        SELECT 
+        SELECT
             TO_CHAR(d.fecha, ''DY'', ''NLS_DATE_LANGUAGE=SPANISH'') as dia_nombre,
             TO_CHAR(d.fecha, ''YYYY-MM-DD'') as fecha,
-            (SELECT COUNT(*) FROM ODO_CITAS c WHERE TRUNC(c.FECHA_HORA_INICIO) = TRUNC(d.fecha) AND c.EMPRESA_ID = :empresa_id) as total_citas,
-            (SELECT COUNT(*) FROM ODO_CITAS c WHERE TRUNC(c.FECHA_HORA_INICIO) = TRUNC(d.fecha) AND c.EMPRESA_ID = :empresa_id AND c.ESTADO = ''FINALIZADA'') as completadas
+            NVL(m.CITAS_TOTAL, 0) as total_citas,
+            NVL(m.CITAS_FINALIZADAS, 0) as completadas
         FROM dias d
+        LEFT JOIN ODO_METRICAS_DIARIAS m
+               ON m.EMPRESA_ID = :empresa_id
+              AND m.FECHA = d.fecha
         ORDER BY d.fecha;
 
     APEX_JSON.initialize_clob_output;
@@ -77,14 +91,71 @@ BEGIN
     APEX_JSON.close_object;
     :status := 200;
     :content_type := ''application/json'';
-    htp.p(APEX_JSON.get_clob_output);
+    PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
     APEX_JSON.free_output;
 END;'
         );
 
+        -- Endpoint: Métricas por día en un rango (dashboard/metricas?desde&hasta)
+        ORDS.DEFINE_TEMPLATE(
+            p_module_name => 'facturas',
+            p_pattern     => 'dashboard/metricas'
+        );
+
+        ORDS.DEFINE_HANDLER(
+            p_module_name => 'facturas',
+            p_pattern     => 'dashboard/metricas',
+            p_method      => 'GET',
+            p_source_type => 'plsql/block',
+            p_source      => '
+DECLARE
+    v_desde  DATE := NVL(TO_DATE(:desde, ''YYYY-MM-DD''), TRUNC(SYSDATE) - 29);
+    v_hasta  DATE := NVL(TO_DATE(:hasta, ''YYYY-MM-DD''), TRUNC(SYSDATE));
+    v_cursor SYS_REFCURSOR;
+BEGIN
+    OPEN v_cursor FOR
+        SELECT JSON_OBJECT(
+                   ''fecha'' VALUE TO_CHAR(FECHA, ''YYYY-MM-DD''),
+                   ''citas_total'' VALUE CITAS_TOTAL,
+                   ''citas_finalizadas'' VALUE CITAS_FINALIZADAS,
+                   ''citas_canceladas'' VALUE CITAS_CANCELADAS,
+                   ''ingresos'' VALUE INGRESOS,
+                   ''pacientes_nuevos'' VALUE PACIENTES_NUEVOS,
+                   ''tratamientos_activos'' VALUE TRATAMIENTOS_ACTIVOS
+                   RETURNING CLOB)
+        FROM ODO_METRICAS_DIARIAS
+        WHERE EMPRESA_ID = :empresa_id
+          AND FECHA >= v_desde
+          AND FECHA <= v_hasta
+        ORDER BY FECHA;
+
+    :status := 200;
+    :content_type := ''application/json'';
+    PKG_JSON_RESPONSE.print_items(v_cursor);
+END;'
+        );
+
         COMMIT;
     END;
     """
+    print("Asegurando tabla de métricas diarias, índices y PKG_METRICAS...")
+    with acquire() as conn:
+        ensure_schema(conn, metricas_diarias_spec())
+        ensure_packages(conn, ['PKG_JSON_RESPONSE', 'PKG_METRICAS'])
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT COUNT(*) FROM ODO_METRICAS_DIARIAS WHERE ROWNUM = 1")
+            if cursor.fetchone()[0] == 0:
+                print("Carga inicial de métricas (todo el historial)...")
+                filas = cursor.callfunc('PKG_METRICAS.refrescar_todo', int)
+                conn.commit()
+                print(f"  [OK] {filas} días calculados")
+            cursor.callproc('PKG_METRICAS.crear_job')
+            print("  [OK] Job ODO_JOB_METRICAS programado")
+        finally:
+            cursor.close()
+
     print("Desplegando endpoints de Dashboard en el módulo ''facturas''...")
     result = execute_dml(sql)
     print(f"Resultado: {result}")
@@ -54,23 +54,33 @@ END;
 /
 
 -- 4. Agregar columnas a ODO_FACTURAS para configuración de cuotas
+--    (una sola lectura del diccionario y un solo ALTER con las que falten;
+--    equivalente Python: python3 ensure_schema.py cuotas)
+DECLARE
+    v_add VARCHAR2(4000);
 BEGIN
-    EXECUTE IMMEDIATE 'ALTER TABLE ODO_FACTURAS ADD CANTIDAD_CUOTAS NUMBER DEFAULT 0';
-    DBMS_OUTPUT.PUT_LINE('Columna CANTIDAD_CUOTAS agregada');
-EXCEPTION WHEN OTHERS THEN
-    IF SQLCODE = -1430 THEN DBMS_OUTPUT.PUT_LINE('CANTIDAD_CUOTAS ya existe');
-    ELSE DBMS_OUTPUT.PUT_LINE('Error: ' || SQLERRM);
-    END IF;
-END;
-/
+    SELECT LISTAGG(d.DEFINICION, ', ') WITHIN GROUP (ORDER BY d.ORDEN)
+    INTO v_add
+    FROM (
+        SELECT 1 AS ORDEN, 'CANTIDAD_CUOTAS' AS COLUMNA,
+               'CANTIDAD_CUOTAS NUMBER DEFAULT 0' AS DEFINICION FROM DUAL
+        UNION ALL
+        SELECT 2, 'FRECUENCIA_CUOTAS',
+               'FRECUENCIA_CUOTAS VARCHAR2(20) DEFAULT ''MENSUAL''' FROM DUAL
+    ) d
+    WHERE NOT EXISTS (
+        SELECT 1 FROM USER_TAB_COLUMNS c
+        WHERE c.TABLE_NAME = 'ODO_FACTURAS' AND c.COLUMN_NAME = d.COLUMNA
+    );
 
-BEGIN
-    EXECUTE IMMEDIATE 'ALTER TABLE ODO_FACTURAS ADD FRECUENCIA_CUOTAS VARCHAR2(20) DEFAULT ''MENSUAL''';
-    DBMS_OUTPUT.PUT_LINE('Columna FRECUENCIA_CUOTAS agregada');
-EXCEPTION WHEN OTHERS THEN
-    IF SQLCODE = -1430 THEN DBMS_OUTPUT.PUT_LINE('FRECUENCIA_CUOTAS ya existe');
-    ELSE DBMS_OUTPUT.PUT_LINE('Error: ' || SQLERRM);
+    IF v_add IS NOT NULL THEN
+        EXECUTE IMMEDIATE 'ALTER TABLE ODO_FACTURAS ADD (' || v_add || ')';
+        DBMS_OUTPUT.PUT_LINE('Columnas agregadas a ODO_FACTURAS: ' || v_add);
+    ELSE
+        DBMS_OUTPUT.PUT_LINE('CANTIDAD_CUOTAS y FRECUENCIA_CUOTAS ya existen');
     END IF;
+EXCEPTION WHEN OTHERS THEN
+    DBMS_OUTPUT.PUT_LINE('Error: ' || SQLERRM);
 END;
 /
 
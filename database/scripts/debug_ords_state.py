@@ -1,26 +1,32 @@
-from connect_db import get_connection
+import sys
+
+from catalog_snapshot import ensure_snapshot, query
+
+def check_ords_state(refresh=False):
+    """Módulos, templates y handlers ORDS leídos del snapshot local (--refresh para actualizarlo)."""
+    ensure_snapshot(refresh)
 
-def check_ords_state():
-    conn = get_connection()
-    cursor = conn.cursor()
-    
     print("--- ORDS MODULES ---")
-    cursor.execute("SELECT name, uri_prefix FROM user_ords_modules")
-    for row in cursor:
+    for row in query("SELECT name, uri_prefix FROM user_ords_modules ORDER BY name"):
         print(row)
-        
+
     print("\n--- ORDS TEMPLATES ---")
-    cursor.execute("SELECT module_name, uri_template FROM user_ords_templates")
-    for row in cursor:
+    for row in query("""
+        SELECT m.name, t.uri_template
+        FROM user_ords_templates t JOIN user_ords_modules m ON m.id = t.module_id
+        ORDER BY m.name, t.uri_template
+    """):
         print(row)
-        
+
     print("\n--- ORDS HANDLERS ---")
-    cursor.execute("SELECT module_name, uri_template, method, source_type FROM user_ords_handlers")
-    for row in cursor:
+    for row in query("""
+        SELECT m.name, t.uri_template, h.method, h.source_type
+        FROM user_ords_handlers h
+        JOIN user_ords_templates t ON t.id = h.template_id
+        JOIN user_ords_modules m ON m.id = t.module_id
+        ORDER BY m.name, t.uri_template, h.method
+    """):
         print(row)
-        
-    cursor.close()
-    conn.close()
 
 if __name__ == "__main__":
-    check_ords_state()
+    check_ords_state('--refresh' in sys.argv)
@@ -4,183 +4,139 @@ Deploy ORDS endpoints for Citas (appointments) and Doctores modules.
 
 Endpoints created:
   GET  /api/v1/doctores                  - List doctors (users with DOCTOR role)
-  GET  /api/v1/citas                     - List citas with filters (empresa_id, fecha, estado)
+  GET  /api/v1/citas                     - List citas with filters (empresa_id, fecha or
+                                           desde/hasta, estado), paginated with limit/next
   GET  /api/v1/citas/:id                 - Get cita by ID
   POST /api/v1/citas                     - Create new cita
   PUT  /api/v1/citas/:id                 - Update cita
   PUT  /api/v1/citas/:id/estado          - Change cita status
   DELETE /api/v1/citas/:id               - Cancel cita
-  GET  /api/v1/citas/agenda/:doctor_id   - Get agenda for a doctor on a date
+  GET  /api/v1/citas/agenda/:doctor_id   - Get agenda for a doctor on a date (fecha) or
+                                           a range (desde/hasta, e.g. a week)
+  GET  /api/v1/citas/disponibilidad      - Free slots (doctores=3,5, desde/hasta,
+                                           duracion_minutos, hora_inicio/hora_fin)
+  POST /api/v1/citas/recordatorios/reclamar - Claim up to `limit` due reminders
+                                           (empresa_id, horas) for one sender
+  POST /api/v1/citas/recordatorios/marcar   - Mark a claimed batch as sent/failed
+
+Date filters are half-open timestamp ranges on FECHA_HORA_INICIO, backed by
+the citas_fechas indexes in ensure_schema.py (created before deploying).
+Reminder claiming uses FOR UPDATE SKIP LOCKED, so several senders can work
+the queue in parallel; the citas_recordatorios index holds only pending rows.
 """
-from connect_db import get_connection
-
-_deployed_templates = set()
-
-
-def deploy(cursor, module, pattern, method, source_type, source, desc):
-    """Helper to deploy an ORDS endpoint, creating template only once per pattern."""
-    if pattern not in _deployed_templates:
-        cursor.execute("""
-BEGIN
-    ORDS.DEFINE_TEMPLATE(
-        p_module_name => :module,
-        p_pattern     => :pattern
-    );
-    COMMIT;
-END;
-""", {'module': module, 'pattern': pattern})
-        _deployed_templates.add(pattern)
-
-    cursor.execute("""
-BEGIN
-    ORDS.DEFINE_HANDLER(
-        p_module_name    => :module,
-        p_pattern        => :pattern,
-        p_method         => :method,
-        p_source_type    => :source_type,
-        p_source         => :source,
-        p_items_per_page => 0
-    );
-    COMMIT;
-END;
-""", {
-        'module': module,
-        'pattern': pattern,
-        'method': method,
-        'source_type': source_type,
-        'source': source,
-    })
-    print(f"  [OK] {method} /{module}/{pattern} - {desc}")
+import argparse
 
+from connect_db import get_connection
+from ords_deploy import Manifest, deploy_manifest, print_summary
 
-def deploy_doctores(cursor):
+def deploy_doctores(manifest):
     print("\n--- Endpoints de Doctores ---")
 
     # GET /api/v1/doctores - List doctors (optionally filtered by empresa_id)
-    deploy(cursor, 'odontologia', 'doctores', 'GET', 'plsql/block', """
+    manifest.add('odontologia', 'doctores', 'GET', 'plsql/block', """
 DECLARE
     v_empresa_id NUMBER := :empresa_id;
+    v_cursor SYS_REFCURSOR;
 BEGIN
-    APEX_JSON.OPEN_OBJECT;
-    APEX_JSON.OPEN_ARRAY('ITEMS');
-
-    IF v_empresa_id IS NOT NULL THEN
-        -- Doctors assigned to this empresa
-        FOR doc IN (
-            SELECT DISTINCT u.USUARIO_ID, u.NOMBRE, u.APELLIDO, u.EMAIL,
-                   r.NOMBRE AS ROL, r.CODIGO AS ROL_CODIGO
-            FROM ODO_USUARIOS u
-            JOIN ODO_ROLES r ON u.ROL_ID = r.ROL_ID
-            JOIN ODO_USUARIO_EMPRESAS ue ON ue.USUARIO_ID = u.USUARIO_ID
-            WHERE r.CODIGO = 'DOCTOR'
-              AND u.ACTIVO = 'S'
-              AND ue.EMPRESA_ID = v_empresa_id
-              AND ue.ACTIVO = 'S'
-            ORDER BY u.APELLIDO, u.NOMBRE
-        ) LOOP
-            APEX_JSON.OPEN_OBJECT;
-            APEX_JSON.WRITE('USUARIO_ID', doc.USUARIO_ID);
-            APEX_JSON.WRITE('NOMBRE', doc.NOMBRE);
-            APEX_JSON.WRITE('APELLIDO', doc.APELLIDO);
-            APEX_JSON.WRITE('EMAIL', doc.EMAIL);
-            APEX_JSON.WRITE('ROL', doc.ROL);
-            APEX_JSON.WRITE('ROL_CODIGO', doc.ROL_CODIGO);
-            APEX_JSON.CLOSE_OBJECT;
-        END LOOP;
-    ELSE
-        -- All active doctors
-        FOR doc IN (
-            SELECT u.USUARIO_ID, u.NOMBRE, u.APELLIDO, u.EMAIL,
-                   r.NOMBRE AS ROL, r.CODIGO AS ROL_CODIGO
-            FROM ODO_USUARIOS u
-            JOIN ODO_ROLES r ON u.ROL_ID = r.ROL_ID
-            WHERE r.CODIGO = 'DOCTOR'
-              AND u.ACTIVO = 'S'
-            ORDER BY u.APELLIDO, u.NOMBRE
-        ) LOOP
-            APEX_JSON.OPEN_OBJECT;
-            APEX_JSON.WRITE('USUARIO_ID', doc.USUARIO_ID);
-            APEX_JSON.WRITE('NOMBRE', doc.NOMBRE);
-            APEX_JSON.WRITE('APELLIDO', doc.APELLIDO);
-            APEX_JSON.WRITE('EMAIL', doc.EMAIL);
-            APEX_JSON.WRITE('ROL', doc.ROL);
-            APEX_JSON.WRITE('ROL_CODIGO', doc.ROL_CODIGO);
-            APEX_JSON.CLOSE_OBJECT;
-        END LOOP;
-    END IF;
-
-    APEX_JSON.CLOSE_ARRAY;
-    APEX_JSON.CLOSE_OBJECT;
+    -- Con empresa_id: doctores asignados a la empresa; sin él: todos los activos
+    OPEN v_cursor FOR
+        SELECT JSON_OBJECT(
+                   'USUARIO_ID' VALUE u.USUARIO_ID,
+                   'NOMBRE' VALUE u.NOMBRE,
+                   'APELLIDO' VALUE u.APELLIDO,
+                   'EMAIL' VALUE u.EMAIL,
+                   'ROL' VALUE r.NOMBRE,
+                   'ROL_CODIGO' VALUE r.CODIGO
+                   ABSENT ON NULL RETURNING CLOB)
+        FROM ODO_USUARIOS u
+        JOIN ODO_ROLES r ON u.ROL_ID = r.ROL_ID
+        WHERE r.CODIGO = 'DOCTOR'
+          AND u.ACTIVO = 'S'
+          AND (v_empresa_id IS NULL OR EXISTS (
+                SELECT 1 FROM ODO_USUARIO_EMPRESAS ue
+                WHERE ue.USUARIO_ID = u.USUARIO_ID
+                  AND ue.EMPRESA_ID = v_empresa_id
+                  AND ue.ACTIVO = 'S'))
+        ORDER BY u.APELLIDO, u.NOMBRE;
+
+    PKG_JSON_RESPONSE.print_items(v_cursor, 'ITEMS');
 END;
 """, "Listar doctores")
 
 
-def deploy_citas(cursor):
+def deploy_citas(manifest):
     print("\n--- Endpoints de Citas ---")
 
     # GET /api/v1/citas - List citas with filters
-    deploy(cursor, 'odontologia', 'citas', 'GET', 'plsql/block', """
+    manifest.add('odontologia', 'citas', 'GET', 'plsql/block', """
 DECLARE
     v_empresa_id NUMBER := :empresa_id;
-    v_fecha VARCHAR2(10) := :fecha;
     v_estado VARCHAR2(50) := :estado;
+    -- Rango semiabierto [desde, hasta + 1 día): fecha = un día; desde/hasta
+    -- (o fecha_desde/fecha_hasta) = varios días
+    v_desde ODO_CITAS.FECHA_HORA_INICIO%TYPE :=
+        TO_DATE(COALESCE(:desde, :fecha_desde, :fecha), 'YYYY-MM-DD');
+    v_hasta ODO_CITAS.FECHA_HORA_INICIO%TYPE :=
+        TO_DATE(COALESCE(:hasta, :fecha_hasta, :fecha), 'YYYY-MM-DD') + 1;
+    v_token VARCHAR2(4000) := :next;
+    v_limit PLS_INTEGER := PKG_JSON_RESPONSE.page_size(:limit);
+    v_key VARCHAR2(4000) := PKG_JSON_RESPONSE.token_key(v_token);
+    v_ult_inicio ODO_CITAS.FECHA_HORA_INICIO%TYPE := JSON_VALUE(v_key, '$[0]' RETURNING TIMESTAMP);
+    v_cita_id NUMBER := JSON_VALUE(v_key, '$[1]' RETURNING NUMBER);
+    v_total NUMBER;
+    v_cursor SYS_REFCURSOR;
 BEGIN
-    APEX_JSON.OPEN_OBJECT;
-    APEX_JSON.OPEN_ARRAY('ITEMS');
+    -- Total opcional (?incluir_total=S): COUNT aparte con los mismos filtros
+    IF PKG_JSON_RESPONSE.include_total(:incluir_total) THEN
+        SELECT COUNT(*) INTO v_total
+        FROM ODO_CITAS c
+        JOIN ODO_PACIENTES p ON c.PACIENTE_ID = p.PACIENTE_ID
+        WHERE c.EMPRESA_ID = v_empresa_id
+          AND (v_desde IS NULL OR c.FECHA_HORA_INICIO >= v_desde)
+          AND (v_hasta IS NULL OR c.FECHA_HORA_INICIO < v_hasta)
+          AND (v_estado IS NULL OR c.ESTADO = v_estado);
+    END IF;
 
-    FOR cita IN (
-        SELECT c.CITA_ID, c.PACIENTE_ID,
-               p.NOMBRE || ' ' || p.APELLIDO AS PACIENTE_NOMBRE,
-               c.DOCTOR_ID,
-               d.NOMBRE || ' ' || d.APELLIDO AS DOCTOR_NOMBRE,
-               TO_CHAR(c.FECHA_HORA_INICIO, 'YYYY-MM-DD') AS FECHA,
-               TO_CHAR(c.FECHA_HORA_INICIO, 'HH24:MI') AS HORA_INICIO,
-               TO_CHAR(c.FECHA_HORA_FIN, 'HH24:MI') AS HORA_FIN,
-               c.DURACION_MINUTOS,
-               c.MOTIVO_CONSULTA,
-               c.TIPO_CITA,
-               c.ESTADO,
-               c.CONSULTORIO,
-               c.OBSERVACIONES,
-               c.EMPRESA_ID,
-               c.SUCURSAL_ID,
-               TO_CHAR(c.FECHA_CREACION, 'YYYY-MM-DD HH24:MI') AS FECHA_CREACION
+    OPEN v_cursor FOR
+        SELECT JSON_OBJECT(
+                   'CITA_ID' VALUE c.CITA_ID,
+                   'PACIENTE_ID' VALUE c.PACIENTE_ID,
+                   'PACIENTE_NOMBRE' VALUE p.NOMBRE || ' ' || p.APELLIDO,
+                   'DOCTOR_ID' VALUE c.DOCTOR_ID,
+                   'DOCTOR_NOMBRE' VALUE d.NOMBRE || ' ' || d.APELLIDO,
+                   'FECHA' VALUE TO_CHAR(c.FECHA_HORA_INICIO, 'YYYY-MM-DD'),
+                   'HORA_INICIO' VALUE TO_CHAR(c.FECHA_HORA_INICIO, 'HH24:MI'),
+                   'HORA_FIN' VALUE TO_CHAR(c.FECHA_HORA_FIN, 'HH24:MI'),
+                   'DURACION_MINUTOS' VALUE c.DURACION_MINUTOS,
+                   'MOTIVO_CONSULTA' VALUE c.MOTIVO_CONSULTA,
+                   'TIPO_CITA' VALUE c.TIPO_CITA,
+                   'ESTADO' VALUE c.ESTADO,
+                   'CONSULTORIO' VALUE c.CONSULTORIO,
+                   'OBSERVACIONES' VALUE c.OBSERVACIONES,
+                   'EMPRESA_ID' VALUE c.EMPRESA_ID,
+                   'SUCURSAL_ID' VALUE c.SUCURSAL_ID,
+                   'FECHA_CREACION' VALUE TO_CHAR(c.FECHA_CREACION, 'YYYY-MM-DD HH24:MI')
+                   ABSENT ON NULL RETURNING CLOB),
+               JSON_ARRAY(c.FECHA_HORA_INICIO, c.CITA_ID NULL ON NULL)
         FROM ODO_CITAS c
         JOIN ODO_PACIENTES p ON c.PACIENTE_ID = p.PACIENTE_ID
         LEFT JOIN ODO_USUARIOS d ON c.DOCTOR_ID = d.USUARIO_ID
         WHERE c.EMPRESA_ID = v_empresa_id
-          AND (v_fecha IS NULL OR TO_CHAR(c.FECHA_HORA_INICIO, 'YYYY-MM-DD') = v_fecha)
+          AND (v_desde IS NULL OR c.FECHA_HORA_INICIO >= v_desde)
+          AND (v_hasta IS NULL OR c.FECHA_HORA_INICIO < v_hasta)
           AND (v_estado IS NULL OR c.ESTADO = v_estado)
-        ORDER BY c.FECHA_HORA_INICIO
-    ) LOOP
-        APEX_JSON.OPEN_OBJECT;
-        APEX_JSON.WRITE('CITA_ID', cita.CITA_ID);
-        APEX_JSON.WRITE('PACIENTE_ID', cita.PACIENTE_ID);
-        APEX_JSON.WRITE('PACIENTE_NOMBRE', cita.PACIENTE_NOMBRE);
-        APEX_JSON.WRITE('DOCTOR_ID', cita.DOCTOR_ID);
-        APEX_JSON.WRITE('DOCTOR_NOMBRE', cita.DOCTOR_NOMBRE);
-        APEX_JSON.WRITE('FECHA', cita.FECHA);
-        APEX_JSON.WRITE('HORA_INICIO', cita.HORA_INICIO);
-        APEX_JSON.WRITE('HORA_FIN', cita.HORA_FIN);
-        APEX_JSON.WRITE('DURACION_MINUTOS', cita.DURACION_MINUTOS);
-        APEX_JSON.WRITE('MOTIVO_CONSULTA', cita.MOTIVO_CONSULTA);
-        APEX_JSON.WRITE('TIPO_CITA', cita.TIPO_CITA);
-        APEX_JSON.WRITE('ESTADO', cita.ESTADO);
-        APEX_JSON.WRITE('CONSULTORIO', cita.CONSULTORIO);
-        APEX_JSON.WRITE('OBSERVACIONES', cita.OBSERVACIONES);
-        APEX_JSON.WRITE('EMPRESA_ID', cita.EMPRESA_ID);
-        APEX_JSON.WRITE('SUCURSAL_ID', cita.SUCURSAL_ID);
-        APEX_JSON.WRITE('FECHA_CREACION', cita.FECHA_CREACION);
-        APEX_JSON.CLOSE_OBJECT;
-    END LOOP;
+          AND (v_key IS NULL
+               OR c.FECHA_HORA_INICIO > v_ult_inicio
+               OR (c.FECHA_HORA_INICIO = v_ult_inicio AND c.CITA_ID > v_cita_id))
+        ORDER BY c.FECHA_HORA_INICIO, c.CITA_ID
+        FETCH FIRST v_limit + 1 ROWS ONLY;
 
-    APEX_JSON.CLOSE_ARRAY;
-    APEX_JSON.CLOSE_OBJECT;
+    PKG_JSON_RESPONSE.print_page(v_cursor, v_limit, v_token, 'ITEMS', v_total);
 END;
 """, "Listar citas con filtros")
 
     # POST /api/v1/citas - Create new cita
-    deploy(cursor, 'odontologia', 'citas', 'POST', 'plsql/block', """
+    manifest.add('odontologia', 'citas', 'POST', 'plsql/block', """
 DECLARE
     v_cita_id NUMBER;
     v_paciente_id NUMBER := :paciente_id;
@@ -231,7 +187,7 @@ END;
 """, "Crear nueva cita")
 
     # GET /api/v1/citas/:id - Get cita by ID
-    deploy(cursor, 'odontologia', 'citas/:id', 'GET', 'plsql/block', """
+    manifest.add('odontologia', 'citas/:id', 'GET', 'plsql/block', """
 DECLARE
     v_cita_id NUMBER := :id;
 BEGIN
@@ -287,7 +243,7 @@ END;
 """, "Obtener cita por ID")
 
     # PUT /api/v1/citas/:id - Update cita details
-    deploy(cursor, 'odontologia', 'citas/:id', 'PUT', 'plsql/block', """
+    manifest.add('odontologia', 'citas/:id', 'PUT', 'plsql/block', """
 DECLARE
     v_cita_id NUMBER := :id;
     v_doctor_id NUMBER := :doctor_id;
@@ -343,7 +299,7 @@ END;
 """, "Actualizar datos de cita")
 
     # PUT /api/v1/citas/:id/estado - Change cita status
-    deploy(cursor, 'odontologia', 'citas/:id/estado', 'PUT', 'plsql/block', """
+    manifest.add('odontologia', 'citas/:id/estado', 'PUT', 'plsql/block', """
 DECLARE
     v_cita_id NUMBER := :id;
     v_estado VARCHAR2(50) := :estado;
@@ -390,7 +346,7 @@ END;
 """, "Cambiar estado de cita")
 
     # DELETE /api/v1/citas/:id - Cancel cita (soft delete)
-    deploy(cursor, 'odontologia', 'citas/:id', 'DELETE', 'plsql/block', """
+    manifest.add('odontologia', 'citas/:id', 'DELETE', 'plsql/block', """
 DECLARE
     v_cita_id NUMBER := :id;
     v_motivo VARCHAR2(500) := :motivo;
@@ -426,66 +382,179 @@ END;
 """, "Cancelar cita")
 
     # GET /api/v1/citas/agenda/:doctor_id - Get doctor's agenda for a date
-    deploy(cursor, 'odontologia', 'citas/agenda/:doctor_id', 'GET', 'plsql/block', """
+    manifest.add('odontologia', 'citas/agenda/:doctor_id', 'GET', 'plsql/block', """
 DECLARE
     v_doctor_id NUMBER := :doctor_id;
-    v_fecha VARCHAR2(10) := :fecha;
+    -- Un día (fecha) o un rango (desde/hasta, p.ej. la semana); sin nada, hoy
+    v_desde ODO_CITAS.FECHA_HORA_INICIO%TYPE :=
+        NVL(TO_DATE(NVL(:desde, :fecha), 'YYYY-MM-DD'), TRUNC(SYSDATE));
+    v_hasta ODO_CITAS.FECHA_HORA_INICIO%TYPE :=
+        NVL(TO_DATE(NVL(:hasta, :fecha), 'YYYY-MM-DD'), TRUNC(SYSDATE)) + 1;
+    v_cursor SYS_REFCURSOR;
 BEGIN
-    APEX_JSON.OPEN_OBJECT;
-    APEX_JSON.OPEN_ARRAY('ITEMS');
-
-    FOR cita IN (
-        SELECT c.CITA_ID, c.PACIENTE_ID,
-               p.NOMBRE || ' ' || p.APELLIDO AS PACIENTE_NOMBRE,
-               TO_CHAR(c.FECHA_HORA_INICIO, 'YYYY-MM-DD') AS FECHA,
-               TO_CHAR(c.FECHA_HORA_INICIO, 'HH24:MI') AS HORA_INICIO,
-               TO_CHAR(c.FECHA_HORA_FIN, 'HH24:MI') AS HORA_FIN,
-               c.DURACION_MINUTOS,
-               c.MOTIVO_CONSULTA,
-               c.TIPO_CITA,
-               c.ESTADO,
-               c.CONSULTORIO,
-               c.OBSERVACIONES
+    OPEN v_cursor FOR
+        SELECT JSON_OBJECT(
+                   'CITA_ID' VALUE c.CITA_ID,
+                   'PACIENTE_ID' VALUE c.PACIENTE_ID,
+                   'PACIENTE_NOMBRE' VALUE p.NOMBRE || ' ' || p.APELLIDO,
+                   'FECHA' VALUE TO_CHAR(c.FECHA_HORA_INICIO, 'YYYY-MM-DD'),
+                   'HORA_INICIO' VALUE TO_CHAR(c.FECHA_HORA_INICIO, 'HH24:MI'),
+                   'HORA_FIN' VALUE TO_CHAR(c.FECHA_HORA_FIN, 'HH24:MI'),
+                   'DURACION_MINUTOS' VALUE c.DURACION_MINUTOS,
+                   'MOTIVO_CONSULTA' VALUE c.MOTIVO_CONSULTA,
+                   'TIPO_CITA' VALUE c.TIPO_CITA,
+                   'ESTADO' VALUE c.ESTADO,
+                   'CONSULTORIO' VALUE c.CONSULTORIO,
+                   'OBSERVACIONES' VALUE c.OBSERVACIONES
+                   ABSENT ON NULL RETURNING CLOB)
         FROM ODO_CITAS c
         JOIN ODO_PACIENTES p ON c.PACIENTE_ID = p.PACIENTE_ID
         WHERE c.DOCTOR_ID = v_doctor_id
-          AND (v_fecha IS NULL OR TO_CHAR(c.FECHA_HORA_INICIO, 'YYYY-MM-DD') = v_fecha)
+          AND c.FECHA_HORA_INICIO >= v_desde
+          AND c.FECHA_HORA_INICIO < v_hasta
           AND c.ESTADO != 'CANCELADA'
-        ORDER BY c.FECHA_HORA_INICIO
-    ) LOOP
-        APEX_JSON.OPEN_OBJECT;
-        APEX_JSON.WRITE('CITA_ID', cita.CITA_ID);
-        APEX_JSON.WRITE('PACIENTE_ID', cita.PACIENTE_ID);
-        APEX_JSON.WRITE('PACIENTE_NOMBRE', cita.PACIENTE_NOMBRE);
-        APEX_JSON.WRITE('FECHA', cita.FECHA);
-        APEX_JSON.WRITE('HORA_INICIO', cita.HORA_INICIO);
-        APEX_JSON.WRITE('HORA_FIN', cita.HORA_FIN);
-        APEX_JSON.WRITE('DURACION_MINUTOS', cita.DURACION_MINUTOS);
-        APEX_JSON.WRITE('MOTIVO_CONSULTA', cita.MOTIVO_CONSULTA);
-        APEX_JSON.WRITE('TIPO_CITA', cita.TIPO_CITA);
-        APEX_JSON.WRITE('ESTADO', cita.ESTADO);
-        APEX_JSON.WRITE('CONSULTORIO', cita.CONSULTORIO);
-        APEX_JSON.WRITE('OBSERVACIONES', cita.OBSERVACIONES);
-        APEX_JSON.CLOSE_OBJECT;
-    END LOOP;
+        ORDER BY c.FECHA_HORA_INICIO;
 
-    APEX_JSON.CLOSE_ARRAY;
-    APEX_JSON.CLOSE_OBJECT;
+    PKG_JSON_RESPONSE.print_items(v_cursor, 'ITEMS');
+END;
+""", "Agenda del doctor por fecha o rango")
+
+    # GET /api/v1/citas/disponibilidad - Free slots for one or more doctors
+    manifest.add('odontologia', 'citas/disponibilidad', 'GET', 'plsql/block', """
+DECLARE
+    v_cursor SYS_REFCURSOR;
+    v_resultado NUMBER;
+    v_mensaje VARCHAR2(4000);
+BEGIN
+    PKG_CITAS.get_horarios_libres(
+        p_empresa_id       => :empresa_id,
+        p_doctor_ids       => :doctores,
+        p_fecha_desde      => NVL(TO_DATE(NVL(:desde, :fecha), 'YYYY-MM-DD'), TRUNC(SYSDATE)),
+        p_fecha_hasta      => TO_DATE(NVL(:hasta, :fecha), 'YYYY-MM-DD'),
+        p_duracion_minutos => NVL(TO_NUMBER(:duracion_minutos), 30),
+        p_hora_inicio      => NVL(:hora_inicio, '08:00'),
+        p_hora_fin         => NVL(:hora_fin, '18:00'),
+        p_cursor           => v_cursor,
+        p_resultado        => v_resultado,
+        p_mensaje          => v_mensaje
+    );
+
+    :content_type := 'application/json';
+    APEX_JSON.initialize_clob_output;
+    APEX_JSON.open_object;
+    APEX_JSON.write('RESULTADO', v_resultado);
+    APEX_JSON.write('MENSAJE', v_mensaje);
+    IF v_resultado = 1 THEN
+        APEX_JSON.write('ITEMS', v_cursor);
+        :status := 200;
+    ELSE
+        :status := 400;
+    END IF;
+    APEX_JSON.close_object;
+    PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
+    APEX_JSON.free_output;
+END;
+""", "Horarios libres de doctores")
+
+    # POST /api/v1/citas/recordatorios/reclamar - Claim a batch of due reminders
+    manifest.add('odontologia', 'citas/recordatorios/reclamar', 'POST', 'plsql/block', """
+DECLARE
+    v_cursor SYS_REFCURSOR;
+    v_resultado NUMBER;
+    v_mensaje VARCHAR2(4000);
+BEGIN
+    -- Cada emisor recibe un lote distinto (SKIP LOCKED); las citas quedan
+    -- reclamadas hasta que se informan en citas/recordatorios/marcar
+    PKG_CITAS.reclamar_recordatorios(
+        p_empresa_id         => :empresa_id,
+        p_horas_anticipacion => NVL(TO_NUMBER(:horas), 24),
+        p_max                => NVL(TO_NUMBER(:limit), 50),
+        p_cursor             => v_cursor,
+        p_resultado          => v_resultado,
+        p_mensaje            => v_mensaje
+    );
+
+    :content_type := 'application/json';
+    APEX_JSON.initialize_clob_output;
+    APEX_JSON.open_object;
+    APEX_JSON.write('RESULTADO', v_resultado);
+    APEX_JSON.write('MENSAJE', v_mensaje);
+    IF v_resultado = 1 THEN
+        APEX_JSON.write('ITEMS', v_cursor);
+        :status := 200;
+    ELSE
+        :status := 500;
+    END IF;
+    APEX_JSON.close_object;
+    PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
+    APEX_JSON.free_output;
 END;
-""", "Agenda del doctor por fecha")
+""", "Reclamar lote de recordatorios")
+
+    # POST /api/v1/citas/recordatorios/marcar - Close a claimed batch
+    # Body: {"enviados": [cita_id, ...], "fallidos": [cita_id, ...]}
+    manifest.add('odontologia', 'citas/recordatorios/marcar', 'POST', 'plsql/block', """
+DECLARE
+    v_body CLOB := :body_text;
+    v_enviados SYS.ODCINUMBERLIST;
+    v_fallidos SYS.ODCINUMBERLIST;
+    v_resultado NUMBER;
+    v_mensaje VARCHAR2(4000);
+BEGIN
+    SELECT id BULK COLLECT INTO v_enviados
+    FROM JSON_TABLE(v_body, '$.enviados[*]' COLUMNS (id NUMBER PATH '$'));
+
+    SELECT id BULK COLLECT INTO v_fallidos
+    FROM JSON_TABLE(v_body, '$.fallidos[*]' COLUMNS (id NUMBER PATH '$'));
+
+    PKG_CITAS.marcar_recordatorios_lote(
+        p_enviados  => v_enviados,
+        p_fallidos  => v_fallidos,
+        p_resultado => v_resultado,
+        p_mensaje   => v_mensaje
+    );
+
+    :status := CASE WHEN v_resultado = 1 THEN 200 ELSE 500 END;
+    :content_type := 'application/json';
+    APEX_JSON.initialize_clob_output;
+    APEX_JSON.open_object;
+    APEX_JSON.write('RESULTADO', v_resultado);
+    APEX_JSON.write('MENSAJE', v_mensaje);
+    APEX_JSON.close_object;
+    PKG_JSON_RESPONSE.print_clob(APEX_JSON.get_clob_output);
+    APEX_JSON.free_output;
+END;
+""", "Marcar lote de recordatorios")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Despliega los endpoints ORDS de Citas y Doctores")
+    parser.add_argument('--parallel', type=int, default=0, metavar='N',
+                        help="Desplegar templates en N sesiones del pool en paralelo")
+    return parser.parse_args()
 
 
 def main():
+    args = parse_args()
     print("=== Desplegando endpoints ORDS: Citas y Doctores ===")
 
     conn = get_connection()
     cursor = conn.cursor()
 
     try:
-        deploy_doctores(cursor)
-        deploy_citas(cursor)
+        manifest = Manifest()
+        manifest.require_package('PKG_JSON_RESPONSE')
+        manifest.require_package('PKG_CITAS')
+        manifest.require_schema('citas_fechas')
+        manifest.require_schema('citas_recordatorios')
+        deploy_doctores(manifest)
+        deploy_citas(manifest)
+
+        print(f"\n--- Desplegando {len(manifest)} handlers ---")
+        results = deploy_manifest(conn, manifest, parallel=args.parallel)
+        if not print_summary(results):
+            raise RuntimeError("Algunos handlers no se pudieron desplegar")
 
-        conn.commit()
         print("\n=== Todos los endpoints desplegados exitosamente ===")
 
         # Verify
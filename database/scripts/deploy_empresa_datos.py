@@ -4,19 +4,7 @@ Deploy endpoints GET/PUT /facturas/empresa/:id
 y agrega columnas SLOGAN, LOGO_URL, SITIO_WEB a ODO_EMPRESAS si no existen.
 """
 from connect_db import get_connection
-
-
-def add_column_if_missing(cursor, table, column, col_type):
-    cursor.execute("""
-        SELECT COUNT(*) FROM user_tab_columns
-        WHERE table_name = :t AND column_name = :c
-    """, {'t': table.upper(), 'c': column.upper()})
-    exists = cursor.fetchone()[0]
-    if not exists:
-        cursor.execute(f"ALTER TABLE {table} ADD ({column} {col_type})")
-        print(f"  [OK] Columna {column} agregada a {table}")
-    else:
-        print(f"  [--] Columna {column} ya existe en {table}")
+from ensure_schema import empresa_datos_spec, ensure_schema
 
 
 def deploy(cursor, pattern, method, source_type, source, desc):
@@ -50,9 +38,7 @@ def main():
     try:
         # 1. Agregar columnas faltantes a ODO_EMPRESAS
         print("--- Verificando columnas en ODO_EMPRESAS ---")
-        add_column_if_missing(cursor, 'ODO_EMPRESAS', 'SLOGAN',    'VARCHAR2(300)')
-        add_column_if_missing(cursor, 'ODO_EMPRESAS', 'LOGO_URL',  'VARCHAR2(1000)')
-        add_column_if_missing(cursor, 'ODO_EMPRESAS', 'SITIO_WEB', 'VARCHAR2(500)')
+        ensure_schema(conn, empresa_datos_spec())
         conn.commit()
 
         # 2. GET /facturas/empresa/:id
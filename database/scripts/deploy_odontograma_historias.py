@@ -4,13 +4,15 @@ Deploy/fix ORDS endpoints for Odontograma and Historias modules.
 
 Fixes:
   - Odontograma endpoints missing from v1 module (404)
-  - PKG_HISTORIAS_CLINICAS invalid (555)
+  - PKG_HISTORIAS_CLINICAS invalid (555): invalid PKG_* packages are
+    recompiled in dependency order (recompile.py)
 
 Endpoints deployed:
   GET  /api/v1/odontograma/paciente/:id             - Get odontograma actual
   POST /api/v1/odontograma                          - Create odontograma
   POST /api/v1/odontograma/hallazgo                 - Register hallazgo
   PUT  /api/v1/odontograma/:id/diente               - Update diente
+  PUT  /api/v1/odontograma/:id/dientes              - Update dientes (bulk, JSON array)
   GET  /api/v1/odontograma/diente/:id/hallazgos     - Get hallazgos de diente
   GET  /api/v1/odontograma/tratamientos/paciente/:id - Get tratamientos paciente
   GET  /api/v1/odontograma/diente/:id/tratamientos  - Get tratamientos de diente
@@ -25,102 +27,29 @@ Endpoints deployed:
   GET  /api/v1/historias/:id/prescripciones          - Get prescripciones
   POST /api/v1/historias/:id/prescripciones          - Add prescripcion
 """
+import argparse
+
 from connect_db import get_connection
+from ords_deploy import Manifest, deploy_manifest, print_summary
+from recompile import print_errors, recompile_packages
 
-_deployed_templates = set()
+def fix_packages(conn):
+    """Recompile invalid PKG_* packages in dependency order."""
+    print("\n--- Recompiling packages ---")
+    result = recompile_packages(conn)
+    if result.invalid:
+        print_errors(result.errors)
 
+    # Historias endpoints use PKG_HISTORIAS_CLINICAS only if it is valid
+    return result.is_valid('PKG_HISTORIAS_CLINICAS') and result.is_valid('PKG_ODONTOGRAMA')
 
-def deploy(cursor, module, pattern, method, source_type, source, desc):
-    """Helper to deploy an ORDS endpoint, creating template only once per pattern."""
-    if pattern not in _deployed_templates:
-        cursor.execute("""
-BEGIN
-    ORDS.DEFINE_TEMPLATE(
-        p_module_name => :module,
-        p_pattern     => :pattern
-    );
-    COMMIT;
-END;
-""", {'module': module, 'pattern': pattern})
-        _deployed_templates.add(pattern)
 
-    cursor.execute("""
-BEGIN
-    ORDS.DEFINE_HANDLER(
-        p_module_name    => :module,
-        p_pattern        => :pattern,
-        p_method         => :method,
-        p_source_type    => :source_type,
-        p_source         => :source,
-        p_items_per_page => 0
-    );
-    COMMIT;
-END;
-""", {
-        'module': module,
-        'pattern': pattern,
-        'method': method,
-        'source_type': source_type,
-        'source': source,
-    })
-    print(f"  [OK] {method} /{module}/{pattern} - {desc}")
-
-
-def fix_packages(cursor):
-    """Recompile invalid packages."""
-    print("\n--- Recompiling packages ---")
-
-    # Check which packages are invalid
-    cursor.execute("""
-        SELECT object_name, object_type, status
-        FROM user_objects
-        WHERE object_type IN ('PACKAGE', 'PACKAGE BODY')
-          AND object_name IN ('PKG_HISTORIAS_CLINICAS', 'PKG_ODONTOGRAMA')
-        ORDER BY object_name, object_type
-    """)
-    rows = cursor.fetchall()
-    for name, otype, status in rows:
-        print(f"  {name} ({otype}): {status}")
-
-    # Recompile
-    for pkg in ['PKG_HISTORIAS_CLINICAS', 'PKG_ODONTOGRAMA']:
-        try:
-            cursor.execute(f"ALTER PACKAGE {pkg} COMPILE")
-            print(f"  [OK] {pkg} spec compiled")
-        except Exception as e:
-            print(f"  [WARN] {pkg} spec: {e}")
-        try:
-            cursor.execute(f"ALTER PACKAGE {pkg} COMPILE BODY")
-            print(f"  [OK] {pkg} body compiled")
-        except Exception as e:
-            print(f"  [WARN] {pkg} body: {e}")
-
-    # Check status after recompile
-    cursor.execute("""
-        SELECT object_name, object_type, status
-        FROM user_objects
-        WHERE object_type IN ('PACKAGE', 'PACKAGE BODY')
-          AND object_name IN ('PKG_HISTORIAS_CLINICAS', 'PKG_ODONTOGRAMA')
-        ORDER BY object_name, object_type
-    """)
-    rows = cursor.fetchall()
-    print("\n  After recompile:")
-    all_valid = True
-    for name, otype, status in rows:
-        flag = "OK" if status == 'VALID' else "FAIL"
-        print(f"  [{flag}] {name} ({otype}): {status}")
-        if status != 'VALID':
-            all_valid = False
-
-    return all_valid
-
-
-def deploy_odontograma(cursor):
+def deploy_odontograma(manifest):
     """Deploy all odontograma ORDS endpoints."""
     print("\n--- Endpoints de Odontograma ---")
 
     # GET odontograma/paciente/:id - Get current odontograma for patient
-    deploy(cursor, 'odontologia', 'odontograma/paciente/:id', 'GET', 'json/query', """
+    manifest.add('odontologia', 'odontograma/paciente/:id', 'GET', 'json/query', """
 SELECT o.ODONTOGRAMA_ID, o.PACIENTE_ID,
        p.NOMBRE || ' ' || p.APELLIDO AS PACIENTE_NOMBRE,
        p.NUMERO_HISTORIA, o.TIPO, o.OBSERVACIONES AS ODONTOGRAMA_OBS,
@@ -143,7 +72,7 @@ ORDER BY d.CUADRANTE, d.POSICION
 """, "Get odontograma actual del paciente")
 
     # POST odontograma - Create new odontograma
-    deploy(cursor, 'odontologia', 'odontograma', 'POST', 'plsql/block', """
+    manifest.add('odontologia', 'odontograma', 'POST', 'plsql/block', """
 DECLARE
     v_status NUMBER;
     v_msg VARCHAR2(4000);
@@ -173,7 +102,7 @@ END;
 """, "Crear odontograma")
 
     # POST odontograma/hallazgo - Register hallazgo
-    deploy(cursor, 'odontologia', 'odontograma/hallazgo', 'POST', 'plsql/block', """
+    manifest.add('odontologia', 'odontograma/hallazgo', 'POST', 'plsql/block', """
 DECLARE
     v_status NUMBER;
     v_msg VARCHAR2(4000);
@@ -201,7 +130,7 @@ END;
 """, "Registrar hallazgo")
 
     # PUT odontograma/:id/diente - Update tooth
-    deploy(cursor, 'odontologia', 'odontograma/:id/diente', 'PUT', 'plsql/block', """
+    manifest.add('odontologia', 'odontograma/:id/diente', 'PUT', 'plsql/block', """
 DECLARE
     v_status NUMBER;
     v_msg VARCHAR2(4000);
@@ -228,32 +157,36 @@ EXCEPTION
 END;
 """, "Actualizar diente")
 
-    # PUT odontograma/:id/dientes - Bulk update teeth
-    deploy(cursor, 'odontologia', 'odontograma/:id/dientes', 'PUT', 'plsql/block', """
+    # PUT odontograma/:id/dientes - Bulk update teeth (one request per charting session)
+    # Body: [{"numero_fdi": 16, "estado": "CARIES", "observaciones": "..."}, ...]
+    #   or  {"dientes": [...], "modificado_por": 1}
+    manifest.add('odontologia', 'odontograma/:id/dientes', 'PUT', 'plsql/block', """
 DECLARE
+    v_body CLOB := :body_text;
+    v_dientes CLOB;
+    v_modificado_por NUMBER := :modificado_por;
     v_status NUMBER;
     v_msg VARCHAR2(4000);
 BEGIN
-    -- Update single tooth by numero_fdi within the odontograma
-    UPDATE ODO_DIENTES
-    SET ESTADO = :estado,
-        OBSERVACIONES = NVL(:observaciones, OBSERVACIONES),
-        FECHA_MODIFICACION = SYSTIMESTAMP
-    WHERE ODONTOGRAMA_ID = :id
-      AND NUMERO_FDI = :numero_fdi
-      AND ACTIVO = 'S';
-
-    IF SQL%ROWCOUNT > 0 THEN
-        APEX_JSON.open_object;
-        APEX_JSON.write('success', TRUE);
-        APEX_JSON.write('message', 'Diente actualizado');
-        APEX_JSON.close_object;
+    v_dientes := JSON_QUERY(v_body, '$.dientes' RETURNING CLOB);
+    IF v_dientes IS NULL THEN
+        v_dientes := v_body;
     ELSE
-        APEX_JSON.open_object;
-        APEX_JSON.write('success', FALSE);
-        APEX_JSON.write('message', 'Diente no encontrado');
-        APEX_JSON.close_object;
+        v_modificado_por := NVL(JSON_VALUE(v_body, '$.modificado_por' RETURNING NUMBER),
+                                v_modificado_por);
     END IF;
+
+    PKG_ODONTOGRAMA.actualizar_dientes_bulk(
+        p_odontograma_id => :id,
+        p_dientes_json   => v_dientes,
+        p_modificado_por => v_modificado_por,
+        p_resultado      => v_status,
+        p_mensaje        => v_msg
+    );
+    APEX_JSON.open_object;
+    APEX_JSON.write('success', v_status = 1);
+    APEX_JSON.write('message', v_msg);
+    APEX_JSON.close_object;
 EXCEPTION
     WHEN OTHERS THEN
         APEX_JSON.open_object;
@@ -264,7 +197,7 @@ END;
 """, "Actualizar dientes (bulk)")
 
     # GET odontograma/diente/:id/hallazgos - Get hallazgos for a tooth
-    deploy(cursor, 'odontologia', 'odontograma/diente/:id/hallazgos', 'GET', 'json/query', """
+    manifest.add('odontologia', 'odontograma/diente/:id/hallazgos', 'GET', 'json/query', """
 SELECT h.HALLAZGO_ID, h.DIENTE_ID, h.TIPO_HALLAZGO, h.DESCRIPCION,
        h.FECHA_DETECCION, h.ACTIVO,
        u.NOMBRE || ' ' || u.APELLIDO AS DOCTOR_NOMBRE
@@ -275,7 +208,7 @@ ORDER BY h.FECHA_DETECCION DESC
 """, "Get hallazgos de un diente")
 
     # GET odontograma/paciente/:id/hallazgos-all - Get all hallazgos for patient
-    deploy(cursor, 'odontologia', 'odontograma/paciente/:id/hallazgos-all', 'GET', 'json/query', """
+    manifest.add('odontologia', 'odontograma/paciente/:id/hallazgos-all', 'GET', 'json/query', """
 SELECT h.HALLAZGO_ID, h.DIENTE_ID, d.NUMERO_FDI, h.TIPO_HALLAZGO,
        h.DESCRIPCION, h.FECHA_DETECCION, h.ACTIVO,
        u.NOMBRE || ' ' || u.APELLIDO AS DOCTOR_NOMBRE
@@ -288,7 +221,7 @@ ORDER BY h.FECHA_DETECCION DESC
 """, "Get todos los hallazgos del paciente")
 
     # GET odontograma/tratamientos/paciente/:id - Get tratamientos for patient
-    deploy(cursor, 'odontologia', 'odontograma/tratamientos/paciente/:id', 'GET', 'json/query', """
+    manifest.add('odontologia', 'odontograma/tratamientos/paciente/:id', 'GET', 'json/query', """
 SELECT td.TRATAMIENTO_DIENTE_ID as ID,
        td.DIENTE_ID, d.NUMERO_FDI,
        td.TIPO_TRATAMIENTO, td.TIPO_TRATAMIENTO as NOMBRE,
@@ -305,7 +238,7 @@ ORDER BY td.FECHA_TRATAMIENTO DESC
 """, "Get tratamientos del paciente")
 
     # GET odontograma/diente/:id/tratamientos - Get tratamientos for a tooth
-    deploy(cursor, 'odontologia', 'odontograma/diente/:id/tratamientos', 'GET', 'json/query', """
+    manifest.add('odontologia', 'odontograma/diente/:id/tratamientos', 'GET', 'json/query', """
 SELECT td.TRATAMIENTO_DIENTE_ID as ID,
        td.TIPO_TRATAMIENTO, td.TIPO_TRATAMIENTO as NOMBRE,
        td.DESCRIPCION, td.COSTO,
@@ -319,7 +252,7 @@ ORDER BY td.FECHA_TRATAMIENTO DESC
 """, "Get tratamientos de un diente")
 
     # POST odontograma/diente/:id/tratamiento - Assign treatment to tooth
-    deploy(cursor, 'odontologia', 'odontograma/diente/:id/tratamiento', 'POST', 'plsql/block', """
+    manifest.add('odontologia', 'odontograma/diente/:id/tratamiento', 'POST', 'plsql/block', """
 DECLARE
     v_id NUMBER;
     v_nombre VARCHAR2(200);
@@ -350,7 +283,7 @@ END;
 """, "Asignar tratamiento a diente")
 
     # DELETE odontograma/tratamiento/:id - Delete treatment
-    deploy(cursor, 'odontologia', 'odontograma/tratamiento/:id', 'DELETE', 'plsql/block', """
+    manifest.add('odontologia', 'odontograma/tratamiento/:id', 'DELETE', 'plsql/block', """
 BEGIN
     DELETE FROM ODO_TRATAMIENTOS_DIENTE
     WHERE TRATAMIENTO_DIENTE_ID = :id;
@@ -364,7 +297,7 @@ END;
 """, "Eliminar tratamiento de diente")
 
     # GET tratamientos/sugeridos/:tipo - Suggested treatments by hallazgo type
-    deploy(cursor, 'odontologia', 'tratamientos/sugeridos/:tipo', 'GET', 'json/query', """
+    manifest.add('odontologia', 'tratamientos/sugeridos/:tipo', 'GET', 'json/query', """
 SELECT CATALOGO_ID as ID, CODIGO, NOMBRE, DESCRIPCION, CATEGORIA,
        PRECIO_BASE as COSTO_BASE, DURACION_ESTIMADA
 FROM ODO_CATALOGOS_TRATAMIENTOS
@@ -386,7 +319,7 @@ ORDER BY NOMBRE
 """, "Tratamientos sugeridos por tipo hallazgo")
 
 
-def deploy_historias(cursor, packages_valid):
+def deploy_historias(manifest, packages_valid):
     """Deploy historias ORDS endpoints."""
     print("\n--- Endpoints de Historias ---")
 
@@ -394,7 +327,7 @@ def deploy_historias(cursor, packages_valid):
         # Use PKG_HISTORIAS_CLINICAS (more robust)
         print("  Using PKG_HISTORIAS_CLINICAS (packages valid)")
 
-        deploy(cursor, 'odontologia', 'historias/paciente/:id', 'GET', 'plsql/block', """
+        manifest.add('odontologia', 'historias/paciente/:id', 'GET', 'plsql/block', """
 DECLARE
     v_cursor SYS_REFCURSOR;
     v_res    NUMBER;
@@ -418,7 +351,7 @@ BEGIN
 END;
 """, "Get historias del paciente (PKG)")
 
-        deploy(cursor, 'odontologia', 'historias/:id', 'GET', 'plsql/block', """
+        manifest.add('odontologia', 'historias/:id', 'GET', 'plsql/block', """
 DECLARE
     v_cursor SYS_REFCURSOR;
     v_res    NUMBER;
@@ -440,7 +373,7 @@ BEGIN
 END;
 """, "Get historia por ID (PKG)")
 
-        deploy(cursor, 'odontologia', 'historias/:id/prescripciones', 'GET', 'plsql/block', """
+        manifest.add('odontologia', 'historias/:id/prescripciones', 'GET', 'plsql/block', """
 DECLARE
     v_cursor SYS_REFCURSOR;
     v_res    NUMBER;
@@ -462,7 +395,7 @@ BEGIN
 END;
 """, "Get prescripciones de historia (PKG)")
 
-        deploy(cursor, 'odontologia', 'historias/:id/prescripciones', 'POST', 'plsql/block', """
+        manifest.add('odontologia', 'historias/:id/prescripciones', 'POST', 'plsql/block', """
 DECLARE
     v_prescripcion_id NUMBER;
     v_res             NUMBER;
@@ -498,7 +431,7 @@ END;
         # Fallback: use direct SQL queries
         print("  WARNING: PKG invalid, using direct SQL fallback")
 
-        deploy(cursor, 'odontologia', 'historias/paciente/:id', 'GET', 'json/query', """
+        manifest.add('odontologia', 'historias/paciente/:id', 'GET', 'json/query', """
 SELECT h.HISTORIA_ID, h.PACIENTE_ID, h.DOCTOR_ID,
        u.NOMBRE || ' ' || u.APELLIDO as DOCTOR_NOMBRE,
        h.FECHA_CONSULTA, h.MOTIVO_CONSULTA, h.ANAMNESIS,
@@ -512,7 +445,7 @@ WHERE h.PACIENTE_ID = :id
 ORDER BY h.FECHA_CONSULTA DESC
 """, "Get historias del paciente (SQL fallback)")
 
-        deploy(cursor, 'odontologia', 'historias/:id', 'GET', 'json/query', """
+        manifest.add('odontologia', 'historias/:id', 'GET', 'json/query', """
 SELECT h.HISTORIA_ID, h.PACIENTE_ID, h.DOCTOR_ID,
        u.NOMBRE || ' ' || u.APELLIDO as DOCTOR_NOMBRE,
        h.FECHA_CONSULTA, h.MOTIVO_CONSULTA, h.ANAMNESIS,
@@ -524,7 +457,7 @@ LEFT JOIN ODO_USUARIOS u ON h.DOCTOR_ID = u.USUARIO_ID
 WHERE h.HISTORIA_ID = :id
 """, "Get historia por ID (SQL fallback)")
 
-        deploy(cursor, 'odontologia', 'historias/:id/prescripciones', 'GET', 'json/query', """
+        manifest.add('odontologia', 'historias/:id/prescripciones', 'GET', 'json/query', """
 SELECT p.PRESCRIPCION_ID, p.HISTORIA_ID, p.PACIENTE_ID, p.DOCTOR_ID,
        p.MEDICAMENTO, p.PRINCIPIO_ACTIVO, p.PRESENTACION, p.CONCENTRACION,
        p.DOSIS, p.VIA_ADMINISTRACION, p.DURACION_DIAS, p.INDICACIONES,
@@ -534,7 +467,7 @@ WHERE p.HISTORIA_ID = :id
 ORDER BY p.FECHA_PRESCRIPCION DESC
 """, "Get prescripciones (SQL fallback)")
 
-        deploy(cursor, 'odontologia', 'historias/:id/prescripciones', 'POST', 'plsql/block', """
+        manifest.add('odontologia', 'historias/:id/prescripciones', 'POST', 'plsql/block', """
 DECLARE
     v_id NUMBER;
 BEGIN
@@ -565,7 +498,7 @@ END;
 """, "Agregar prescripcion (SQL fallback)")
 
     # POST historias - Always use direct SQL (simpler, more reliable)
-    deploy(cursor, 'odontologia', 'historias', 'POST', 'plsql/block', """
+    manifest.add('odontologia', 'historias', 'POST', 'plsql/block', """
 DECLARE
     v_id NUMBER;
 BEGIN
@@ -598,7 +531,7 @@ END;
 """, "Crear historia clinica")
 
     # PUT historias/:id - Update historia
-    deploy(cursor, 'odontologia', 'historias/:id', 'PUT', 'plsql/block', """
+    manifest.add('odontologia', 'historias/:id', 'PUT', 'plsql/block', """
 BEGIN
     UPDATE ODO_HISTORIAS_CLINICAS
     SET MOTIVO_CONSULTA     = NVL(:motivo_consulta, MOTIVO_CONSULTA),
@@ -635,23 +568,36 @@ END;
 """, "Actualizar historia clinica")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Despliega los endpoints ORDS de Odontograma e Historias")
+    parser.add_argument('--parallel', type=int, default=0, metavar='N',
+                        help="Desplegar templates en N sesiones del pool en paralelo")
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
     print("=" * 60)
     print("Deploy Odontograma + Historias ORDS Endpoints")
     print("=" * 60)
 
     conn = get_connection()
-    cursor = conn.cursor()
 
     try:
         # Step 1: Fix packages
-        packages_valid = fix_packages(cursor)
+        packages_valid = fix_packages(conn)
+
+        # Step 2: Collect odontograma endpoints
+        manifest = Manifest()
+        deploy_odontograma(manifest)
 
-        # Step 2: Deploy odontograma endpoints
-        deploy_odontograma(cursor)
+        # Step 3: Collect historias endpoints
+        deploy_historias(manifest, packages_valid)
 
-        # Step 3: Deploy historias endpoints
-        deploy_historias(cursor, packages_valid)
+        # Step 4: Deploy everything in batched PL/SQL blocks
+        print(f"\n--- Deploying {len(manifest)} handlers ---")
+        results = deploy_manifest(conn, manifest, parallel=args.parallel)
+        print_summary(results)
 
         conn.commit()
         print("\n" + "=" * 60)
@@ -664,7 +610,6 @@ def main():
         import traceback
         traceback.print_exc()
     finally:
-        cursor.close()
         conn.close()
 
 
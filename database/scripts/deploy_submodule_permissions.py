@@ -1,4 +1,4 @@
-from connect_db import get_connection
+from connect_db import get_connection, execute_many
 import sys
 
 def execute_dml(cursor, sql, description):
@@ -20,6 +20,23 @@ def execute_dml(cursor, sql, description):
             print(f"  ✗ Error en {description}: {e}")
             return False
 
+def execute_batch(cursor, sql, rows, describe):
+    """Execute a DML for many rows in one round trip per batch and report each row"""
+    result = execute_many(sql, rows, cursor=cursor)
+    success = True
+    for row, status in zip(rows, result['rows']):
+        description = describe(row)
+        if status['status'] == 'existe':
+            print(f"  ⊙ {description} (ya existe)")
+        elif status['status'] == 'error':
+            print(f"  ✗ Error en {description}: {status['error']}")
+            success = False
+        elif status['count'] > 0:
+            print(f"  ✓ {description} ({status['count']} filas)")
+        else:
+            print(f"  ⊙ {description} (sin cambios)")
+    return success
+
 def main():
     print("="*60)
     print("DEPLOY: SUB-PROGRAMAS GRANULARES POR MÓDULO")
@@ -53,12 +70,11 @@ def main():
             ("Registro de Compra", "COMPRAS_REGISTRO", "Registro de facturas de compra", "/compras/facturas/nueva", "🧾", 4),
         ]
 
-        for nombre, codigo, desc, ruta, icono, orden in compras_submodules:
-            execute_dml(cursor, f"""
-                INSERT INTO ODO_PROGRAMAS (NOMBRE, CODIGO, DESCRIPCION, RUTA_FRONTEND, ICONO, MODULO_PADRE_ID, ORDEN, CREADO_POR)
-                SELECT '{nombre}', '{codigo}', '{desc}', '{ruta}', '{icono}', PROGRAMA_ID, {orden}, 1
-                FROM ODO_PROGRAMAS WHERE CODIGO = 'COMPRAS'
-            """, f"Sub-programa {codigo}")
+        execute_batch(cursor, """
+            INSERT INTO ODO_PROGRAMAS (NOMBRE, CODIGO, DESCRIPCION, RUTA_FRONTEND, ICONO, MODULO_PADRE_ID, ORDEN, CREADO_POR)
+            SELECT :1, :2, :3, :4, :5, PROGRAMA_ID, :6, 1
+            FROM ODO_PROGRAMAS WHERE CODIGO = 'COMPRAS'
+        """, compras_submodules, lambda row: f"Sub-programa {row[1]}")
 
         # ============================================================
         # 2. SUB-MÓDULOS DE CONFIGURACIONES (nuevos - los 3 existentes ya están)
@@ -74,12 +90,11 @@ def main():
             ("Sucursales", "CONFIG_SUCURSALES", "Gestión de sucursales", "/configuraciones/sucursales", "📍", 8),
         ]
 
-        for nombre, codigo, desc, ruta, icono, orden in config_submodules:
-            execute_dml(cursor, f"""
-                INSERT INTO ODO_PROGRAMAS (NOMBRE, CODIGO, DESCRIPCION, RUTA_FRONTEND, ICONO, MODULO_PADRE_ID, ORDEN, CREADO_POR)
-                SELECT '{nombre}', '{codigo}', '{desc}', '{ruta}', '{icono}', PROGRAMA_ID, {orden}, 1
-                FROM ODO_PROGRAMAS WHERE CODIGO = 'CONFIGURACIONES'
-            """, f"Sub-programa {codigo}")
+        execute_batch(cursor, """
+            INSERT INTO ODO_PROGRAMAS (NOMBRE, CODIGO, DESCRIPCION, RUTA_FRONTEND, ICONO, MODULO_PADRE_ID, ORDEN, CREADO_POR)
+            SELECT :1, :2, :3, :4, :5, PROGRAMA_ID, :6, 1
+            FROM ODO_PROGRAMAS WHERE CODIGO = 'CONFIGURACIONES'
+        """, config_submodules, lambda row: f"Sub-programa {row[1]}")
 
         # ============================================================
         # 3. PESTAÑAS DE PACIENTE
@@ -96,13 +111,11 @@ def main():
             ("Archivos / Rayos X", "PAC_ARCHIVOS", "Pestaña de archivos y rayos X", None, "📁", 6),
         ]
 
-        for nombre, codigo, desc, ruta, icono, orden in paciente_tabs:
-            ruta_sql = f"'{ruta}'" if ruta else "NULL"
-            execute_dml(cursor, f"""
-                INSERT INTO ODO_PROGRAMAS (NOMBRE, CODIGO, DESCRIPCION, RUTA_FRONTEND, ICONO, MODULO_PADRE_ID, ORDEN, CREADO_POR)
-                SELECT '{nombre}', '{codigo}', '{desc}', {ruta_sql}, '{icono}', PROGRAMA_ID, {orden}, 1
-                FROM ODO_PROGRAMAS WHERE CODIGO = 'PACIENTES'
-            """, f"Sub-programa {codigo}")
+        execute_batch(cursor, """
+            INSERT INTO ODO_PROGRAMAS (NOMBRE, CODIGO, DESCRIPCION, RUTA_FRONTEND, ICONO, MODULO_PADRE_ID, ORDEN, CREADO_POR)
+            SELECT :1, :2, :3, :4, :5, PROGRAMA_ID, :6, 1
+            FROM ODO_PROGRAMAS WHERE CODIGO = 'PACIENTES'
+        """, paciente_tabs, lambda row: f"Sub-programa {row[1]}")
 
         conn.commit()
         print("\n✓ Programas insertados correctamente")
@@ -121,13 +134,12 @@ def main():
         ]
 
         print("\n  ADMIN:")
-        for prog_code in admin_programs:
-            execute_dml(cursor, f"""
-                INSERT INTO ODO_ROL_PROGRAMAS (ROL_ID, PROGRAMA_ID, ASIGNADO_POR)
-                SELECT r.ROL_ID, p.PROGRAMA_ID, 1
-                FROM ODO_ROLES r, ODO_PROGRAMAS p
-                WHERE r.CODIGO = 'ADMIN' AND p.CODIGO = '{prog_code}'
-            """, f"  ADMIN -> {prog_code}")
+        execute_batch(cursor, """
+            INSERT INTO ODO_ROL_PROGRAMAS (ROL_ID, PROGRAMA_ID, ASIGNADO_POR)
+            SELECT r.ROL_ID, p.PROGRAMA_ID, 1
+            FROM ODO_ROLES r, ODO_PROGRAMAS p
+            WHERE r.CODIGO = 'ADMIN' AND p.CODIGO = :1
+        """, [(code,) for code in admin_programs], lambda row: f"  ADMIN -> {row[0]}")
 
         # DOCTOR - Solo tabs relevantes
         doctor_programs = [
@@ -135,13 +147,12 @@ def main():
         ]
 
         print("\n  DOCTOR:")
-        for prog_code in doctor_programs:
-            execute_dml(cursor, f"""
-                INSERT INTO ODO_ROL_PROGRAMAS (ROL_ID, PROGRAMA_ID, ASIGNADO_POR)
-                SELECT r.ROL_ID, p.PROGRAMA_ID, 1
-                FROM ODO_ROLES r, ODO_PROGRAMAS p
-                WHERE r.CODIGO = 'DOCTOR' AND p.CODIGO = '{prog_code}'
-            """, f"  DOCTOR -> {prog_code}")
+        execute_batch(cursor, """
+            INSERT INTO ODO_ROL_PROGRAMAS (ROL_ID, PROGRAMA_ID, ASIGNADO_POR)
+            SELECT r.ROL_ID, p.PROGRAMA_ID, 1
+            FROM ODO_ROLES r, ODO_PROGRAMAS p
+            WHERE r.CODIGO = 'DOCTOR' AND p.CODIGO = :1
+        """, [(code,) for code in doctor_programs], lambda row: f"  DOCTOR -> {row[0]}")
 
         # SECRETARIA - Info, historia, facturación + compras
         secretaria_programs = [
@@ -150,13 +161,12 @@ def main():
         ]
 
         print("\n  SECRETARIA:")
-        for prog_code in secretaria_programs:
-            execute_dml(cursor, f"""
-                INSERT INTO ODO_ROL_PROGRAMAS (ROL_ID, PROGRAMA_ID, ASIGNADO_POR)
-                SELECT r.ROL_ID, p.PROGRAMA_ID, 1
-                FROM ODO_ROLES r, ODO_PROGRAMAS p
-                WHERE r.CODIGO = 'SECRETARIA' AND p.CODIGO = '{prog_code}'
-            """, f"  SECRETARIA -> {prog_code}")
+        execute_batch(cursor, """
+            INSERT INTO ODO_ROL_PROGRAMAS (ROL_ID, PROGRAMA_ID, ASIGNADO_POR)
+            SELECT r.ROL_ID, p.PROGRAMA_ID, 1
+            FROM ODO_ROLES r, ODO_PROGRAMAS p
+            WHERE r.CODIGO = 'SECRETARIA' AND p.CODIGO = :1
+        """, [(code,) for code in secretaria_programs], lambda row: f"  SECRETARIA -> {row[0]}")
 
         # CAJERO - Solo info y facturación
         cajero_programs = [
@@ -164,13 +174,12 @@ def main():
         ]
 
         print("\n  CAJERO:")
-        for prog_code in cajero_programs:
-            execute_dml(cursor, f"""
-                INSERT INTO ODO_ROL_PROGRAMAS (ROL_ID, PROGRAMA_ID, ASIGNADO_POR)
-                SELECT r.ROL_ID, p.PROGRAMA_ID, 1
-                FROM ODO_ROLES r, ODO_PROGRAMAS p
-                WHERE r.CODIGO = 'CAJERO' AND p.CODIGO = '{prog_code}'
-            """, f"  CAJERO -> {prog_code}")
+        execute_batch(cursor, """
+            INSERT INTO ODO_ROL_PROGRAMAS (ROL_ID, PROGRAMA_ID, ASIGNADO_POR)
+            SELECT r.ROL_ID, p.PROGRAMA_ID, 1
+            FROM ODO_ROLES r, ODO_PROGRAMAS p
+            WHERE r.CODIGO = 'CAJERO' AND p.CODIGO = :1
+        """, [(code,) for code in cajero_programs], lambda row: f"  CAJERO -> {row[0]}")
 
         conn.commit()
 
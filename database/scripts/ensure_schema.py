@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Asegura declarativamente tablas, columnas, índices y secuencias.
+
+Se describe el esquema deseado y ensure_schema() lee el diccionario una
+sola vez (tablas, columnas, índices con sus columnas y secuencias en una
+única consulta), calcula lo que falta y emite:
+  - CREATE SEQUENCE / CREATE TABLE para lo que no existe
+  - un único ALTER TABLE ... ADD (c1, c2, ...) por tabla existente
+  - CREATE INDEX para los índices faltantes (por nombre o por columnas)
+
+Uso desde Python:
+    from ensure_schema import SchemaSpec, ensure_schema
+
+    spec = SchemaSpec()
+    spec.table('ODO_EMPRESAS') \\
+        .column('SLOGAN', 'VARCHAR2(300)') \\
+        .column('LOGO_URL', 'VARCHAR2(1000)')
+    ensure_schema(conn, spec)
+
+Uso desde línea de comandos (esquemas registrados en SPECS):
+    python3 ensure_schema.py cuotas tratamientos_facturados
+    python3 ensure_schema.py --all --dry-run
+"""
+import argparse
+import sys
+from dataclasses import dataclass, field
+
+from connect_db import get_connection
+
+
+@dataclass
+class Column:
+    name: str
+    definition: str          # tipo + DEFAULT/NOT NULL/CHECK/REFERENCES
+
+    @property
+    def ddl(self):
+        return f"{self.name} {self.definition}"
+
+
+@dataclass
+class Index:
+    name: str
+    columns: tuple
+    unique: bool = False
+
+    def ddl(self, table):
+        unique = "UNIQUE " if self.unique else ""
+        return f"CREATE {unique}INDEX {self.name} ON {table}({', '.join(self.columns)})"
+
+
+@dataclass
+class Table:
+    name: str
+    columns: list = field(default_factory=list)
+    indexes: list = field(default_factory=list)
+    constraints: list = field(default_factory=list)   # solo para CREATE TABLE
+
+    def column(self, name, definition):
+        self.columns.append(Column(name.upper(), definition))
+        return self
+
+    def index(self, name, *columns, unique=False):
+        self.indexes.append(Index(name.upper(), tuple(c.upper() for c in columns), unique))
+        return self
+
+    def constraint(self, ddl):
+        self.constraints.append(ddl)
+        return self
+
+    def create_ddl(self):
+        parts = [c.ddl for c in self.columns] + self.constraints
+        body = ",\n    ".join(parts)
+        return f"CREATE TABLE {self.name} (\n    {body}\n)"
+
+
+class SchemaSpec:
+    """Esquema deseado: secuencias y tablas (en orden de creación)."""
+
+    def __init__(self):
+        self.sequences = {}
+        self.tables = {}
+
+    def sequence(self, name, options="START WITH 1 INCREMENT BY 1 NOCACHE NOCYCLE"):
+        self.sequences[name.upper()] = options
+        return self
+
+    def table(self, name):
+        name = name.upper()
+        if name not in self.tables:
+            self.tables[name] = Table(name)
+        return self.tables[name]
+
+    def merge(self, other):
+        self.sequences.update(other.sequences)
+        for name, table in other.tables.items():
+            target = self.table(name)
+            columns = {c.name for c in target.columns}
+            indexes = {i.name for i in target.indexes}
+            target.columns.extend(c for c in table.columns if c.name not in columns)
+            target.indexes.extend(i for i in table.indexes if i.name not in indexes)
+            target.constraints.extend(table.constraints)
+        return self
+
+
+def _in_list(prefix, names):
+    binds = {f"{prefix}{i}": n for i, n in enumerate(names)}
+    placeholders = ", ".join(f":{b}" for b in binds) or "NULL"
+    return placeholders, binds
+
+
+def read_dictionary(cursor, spec):
+    """
+    Lee en una sola consulta el estado actual de todo lo que describe spec.
+
+    Returns:
+        dict: {'tables': set, 'columns': {tabla: set},
+               'indexes': {tabla: {nombre: (columnas)}}, 'sequences': set}
+    """
+    tables, table_binds = _in_list('t', list(spec.tables))
+    sequences, seq_binds = _in_list('s', list(spec.sequences))
+    cursor.execute(f"""
+        SELECT 'TABLE', table_name, NULL, NULL
+        FROM user_tables WHERE table_name IN ({tables})
+        UNION ALL
+        SELECT 'COLUMN', table_name, column_name, NULL
+        FROM user_tab_columns WHERE table_name IN ({tables})
+        UNION ALL
+        SELECT 'INDEX', table_name, index_name,
+               LISTAGG(column_name, ',') WITHIN GROUP (ORDER BY column_position)
+        FROM user_ind_columns WHERE table_name IN ({tables})
+        GROUP BY table_name, index_name
+        UNION ALL
+        SELECT 'SEQUENCE', NULL, sequence_name, NULL
+        FROM user_sequences WHERE sequence_name IN ({sequences})
+    """, {**table_binds, **seq_binds})
+
+    state = {'tables': set(), 'columns': {}, 'indexes': {}, 'sequences': set()}
+    for kind, table, name, extra in cursor.fetchall():
+        if kind == 'TABLE':
+            state['tables'].add(table)
+        elif kind == 'COLUMN':
+            state['columns'].setdefault(table, set()).add(name)
+        elif kind == 'INDEX':
+            state['indexes'].setdefault(table, {})[name] = tuple(extra.split(','))
+        else:
+            state['sequences'].add(name)
+    return state
+
+
+def plan_schema(spec, state):
+    """
+    Calcula el DDL necesario para llegar a spec desde state.
+
+    Returns:
+        list: Tuplas (descripción, ddl) en orden de ejecución
+    """
+    plan = []
+    for name, options in spec.sequences.items():
+        if name not in state['sequences']:
+            plan.append((f"Secuencia {name}", f"CREATE SEQUENCE {name} {options}"))
+
+    for table in spec.tables.values():
+        if table.name not in state['tables']:
+            plan.append((f"Tabla {table.name}", table.create_ddl()))
+            existing_indexes = {}
+        else:
+            existing = state['columns'].get(table.name, set())
+            missing = [c for c in table.columns if c.name not in existing]
+            if missing:
+                names = ", ".join(c.name for c in missing)
+                ddl = f"ALTER TABLE {table.name} ADD (\n    " + \
+                      ",\n    ".join(c.ddl for c in missing) + "\n)"
+                plan.append((f"Columnas {names} en {table.name}", ddl))
+            existing_indexes = state['indexes'].get(table.name, {})
+
+        covered = set(existing_indexes.values())
+        for index in table.indexes:
+            # Oracle no permite dos índices con la misma lista de columnas (ORA-01408)
+            if index.name in existing_indexes or index.columns in covered:
+                continue
+            plan.append((f"Índice {index.name}", index.ddl(table.name)))
+            covered.add(index.columns)
+    return plan
+
+
+def ensure_schema(conn, spec, dry_run=False, verbose=True):
+    """
+    Aplica el DDL que falta para llegar a spec.
+
+    Returns:
+        list: Tuplas (descripción, ddl, error) con error=None si se aplicó
+    """
+    cursor = conn.cursor()
+    try:
+        plan = plan_schema(spec, read_dictionary(cursor, spec))
+        if verbose and not plan:
+            print("  [--] Esquema al día, nada que aplicar")
+
+        results = []
+        for desc, ddl in plan:
+            if dry_run:
+                print(f"  [PLAN] {desc}\n{ddl}\n")
+                continue
+            try:
+                cursor.execute(ddl)
+                results.append((desc, ddl, None))
+                if verbose:
+                    print(f"  [OK] {desc}")
+            except Exception as e:
+                results.append((desc, ddl, str(e)))
+                if verbose:
+                    print(f"  [ERROR] {desc}: {e}")
+        return results
+    finally:
+        cursor.close()
+
+
+# ============================================================================
+# ESQUEMAS REGISTRADOS
+# ============================================================================
+
+def empresa_datos_spec():
+    spec = SchemaSpec()
+    spec.table('ODO_EMPRESAS') \
+        .column('SLOGAN', 'VARCHAR2(300)') \
+        .column('LOGO_URL', 'VARCHAR2(1000)') \
+        .column('SITIO_WEB', 'VARCHAR2(500)')
+    return spec
+
+
+def cuotas_spec():
+    """Esquema de cuotas_factura.sql (secciones 1 a 5)."""
+    spec = SchemaSpec()
+    spec.sequence('SEQ_CUOTAS_FACTURA')
+    spec.table('ODO_CUOTAS_FACTURA') \
+        .column('CUOTA_ID', 'NUMBER DEFAULT SEQ_CUOTAS_FACTURA.NEXTVAL PRIMARY KEY') \
+        .column('FACTURA_ID', 'NUMBER NOT NULL REFERENCES ODO_FACTURAS(FACTURA_ID)') \
+        .column('NUMERO_CUOTA', 'NUMBER NOT NULL') \
+        .column('MONTO_CUOTA', 'NUMBER(15,2) NOT NULL') \
+        .column('MONTO_PAGADO', 'NUMBER(15,2) DEFAULT 0') \
+        .column('SALDO_CUOTA', 'NUMBER(15,2) NOT NULL') \
+        .column('FECHA_VENCIMIENTO', 'DATE NOT NULL') \
+        .column('ESTADO', "VARCHAR2(20) DEFAULT 'PENDIENTE' "
+                          "CHECK (ESTADO IN ('PENDIENTE', 'PARCIAL', 'PAGADA', 'VENCIDA'))") \
+        .column('FECHA_PAGO', 'TIMESTAMP') \
+        .column('OBSERVACIONES', 'VARCHAR2(500)') \
+        .column('FECHA_CREACION', 'TIMESTAMP DEFAULT SYSTIMESTAMP') \
+        .column('FECHA_MODIFICACION', 'TIMESTAMP') \
+        .index('IDX_CUOTAS_FACTURA', 'FACTURA_ID') \
+        .index('IDX_CUOTAS_VENCIMIENTO', 'FECHA_VENCIMIENTO', 'ESTADO')
+    spec.table('ODO_FACTURAS') \
+        .column('CANTIDAD_CUOTAS', 'NUMBER DEFAULT 0') \
+        .column('FRECUENCIA_CUOTAS', "VARCHAR2(20) DEFAULT 'MENSUAL'")
+    spec.table('ODO_PAGOS') \
+        .column('CUOTA_ID', 'NUMBER REFERENCES ODO_CUOTAS_FACTURA(CUOTA_ID)')
+    return spec
+
+
+def tratamientos_facturados_spec():
+    """Esquema de fix_tratamientos_facturados.sql (secciones 1 y 2)."""
+    spec = SchemaSpec()
+    spec.table('ODO_TRATAMIENTOS_DIENTE') \
+        .column('FACTURADO', "CHAR(1) DEFAULT 'N' CHECK (FACTURADO IN ('S', 'N'))")
+    spec.table('ODO_DETALLES_FACTURA') \
+        .column('TRATAMIENTO_DIENTE_ID',
+                'NUMBER REFERENCES ODO_TRATAMIENTOS_DIENTE(TRATAMIENTO_DIENTE_ID)')
+    return spec
+
+
+def citas_fechas_spec():
+    """Índices para filtrar citas por rango de FECHA_HORA_INICIO."""
+    spec = SchemaSpec()
+    spec.table('ODO_CITAS') \
+        .index('IDX_CITAS_EMPRESA_FECHA', 'EMPRESA_ID', 'FECHA_HORA_INICIO') \
+        .index('IDX_CITAS_DOCTOR_FECHA', 'DOCTOR_ID', 'FECHA_HORA_INICIO')
+    return spec
+
+
+def citas_recordatorios_spec():
+    """
+    Cola de recordatorios (PKG_CITAS.reclamar_recordatorios): índice por
+    función que solo tiene clave para citas activas con recordatorio sin
+    enviar, así que contiene únicamente las pendientes.
+    """
+    spec = SchemaSpec()
+    spec.table('ODO_CITAS') \
+        .index('IDX_CITAS_RECORDATORIO_PEND',
+               "CASE WHEN ESTADO IN ('PENDIENTE', 'CONFIRMADA') "
+               "AND NVL(RECORDATORIO_ENVIADO, 'N') <> 'S' "
+               "THEN FECHA_HORA_INICIO END")
+    return spec
+
+
+def metricas_diarias_spec():
+    """Métricas diarias del dashboard (PKG_METRICAS) e índices de sus fuentes."""
+    spec = citas_fechas_spec()
+    spec.table('ODO_METRICAS_DIARIAS') \
+        .column('EMPRESA_ID', 'NUMBER NOT NULL') \
+        .column('FECHA', 'DATE NOT NULL') \
+        .column('CITAS_TOTAL', 'NUMBER DEFAULT 0 NOT NULL') \
+        .column('CITAS_FINALIZADAS', 'NUMBER DEFAULT 0 NOT NULL') \
+        .column('CITAS_CANCELADAS', 'NUMBER DEFAULT 0 NOT NULL') \
+        .column('INGRESOS', 'NUMBER(15,2) DEFAULT 0 NOT NULL') \
+        .column('PACIENTES_NUEVOS', 'NUMBER DEFAULT 0 NOT NULL') \
+        .column('TRATAMIENTOS_ACTIVOS', 'NUMBER DEFAULT 0 NOT NULL') \
+        .column('FECHA_ACTUALIZACION', 'TIMESTAMP DEFAULT SYSTIMESTAMP') \
+        .constraint('CONSTRAINT PK_METRICAS_DIARIAS PRIMARY KEY (EMPRESA_ID, FECHA)')
+    spec.table('ODO_METRICAS_PENDIENTES') \
+        .column('EMPRESA_ID', 'NUMBER NOT NULL') \
+        .column('FECHA', 'DATE NOT NULL') \
+        .column('FECHA_MARCA', 'TIMESTAMP DEFAULT SYSTIMESTAMP') \
+        .constraint('CONSTRAINT PK_METRICAS_PENDIENTES PRIMARY KEY (EMPRESA_ID, FECHA)')
+    spec.table('ODO_PAGOS') \
+        .index('IDX_PAGOS_EMPRESA_FECHA', 'EMPRESA_ID', 'FECHA_PAGO')
+    spec.table('ODO_PACIENTES') \
+        .index('IDX_PACIENTES_EMPRESA_REGISTRO', 'EMPRESA_ID', 'FECHA_REGISTRO')
+    return spec
+
+
+def pacientes_import_spec():
+    """Staging de la importación masiva de pacientes (PKG_PACIENTES_IMPORT)."""
+    spec = SchemaSpec()
+    spec.sequence('SEQ_PACIENTES_IMPORT', "START WITH 1 INCREMENT BY 1 CACHE 20 NOCYCLE")
+    spec.table('ODO_PACIENTES_IMPORT') \
+        .column('IMPORT_ID', 'NUMBER NOT NULL') \
+        .column('FILA', 'NUMBER NOT NULL') \
+        .column('NOMBRE', 'VARCHAR2(400)') \
+        .column('APELLIDO', 'VARCHAR2(400)') \
+        .column('DOCUMENTO_TIPO', 'VARCHAR2(50)') \
+        .column('DOCUMENTO_NUMERO', 'VARCHAR2(100)') \
+        .column('FECHA_NACIMIENTO', 'DATE') \
+        .column('GENERO', 'VARCHAR2(20)') \
+        .column('GRUPO_SANGUINEO', 'VARCHAR2(20)') \
+        .column('EMAIL', 'VARCHAR2(400)') \
+        .column('TELEFONO_PRINCIPAL', 'VARCHAR2(100)') \
+        .column('TELEFONO_SECUNDARIO', 'VARCHAR2(100)') \
+        .column('DIRECCION', 'VARCHAR2(1000)') \
+        .column('OBSERVACIONES', 'VARCHAR2(4000)') \
+        .column('ESTADO', "VARCHAR2(20) DEFAULT 'CARGADO' NOT NULL") \
+        .column('ORDEN', 'NUMBER') \
+        .column('FECHA_CARGA', 'TIMESTAMP DEFAULT SYSTIMESTAMP') \
+        .constraint('CONSTRAINT PK_PACIENTES_IMPORT PRIMARY KEY (IMPORT_ID, FILA)')
+    spec.table('ODO_PACIENTES') \
+        .index('IDX_PACIENTES_EMPRESA_DOC', 'EMPRESA_ID', 'DOCUMENTO_TIPO', 'DOCUMENTO_NUMERO')
+    return spec
+
+
+SPECS = {
+    'empresa_datos': empresa_datos_spec,
+    'cuotas': cuotas_spec,
+    'tratamientos_facturados': tratamientos_facturados_spec,
+    'citas_fechas': citas_fechas_spec,
+    'citas_recordatorios': citas_recordatorios_spec,
+    'metricas_diarias': metricas_diarias_spec,
+    'pacientes_import': pacientes_import_spec,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asegura tablas, columnas e índices")
+    parser.add_argument('specs', nargs='*', help=f"Esquemas: {', '.join(SPECS)}")
+    parser.add_argument('--all', action='store_true', help="Todos los esquemas registrados")
+    parser.add_argument('--dry-run', action='store_true', help="Solo mostrar el DDL")
+    args = parser.parse_args()
+
+    names = list(SPECS) if args.all else args.specs
+    unknown = [n for n in names if n not in SPECS]
+    if not names or unknown:
+        parser.error(f"Esquemas válidos: {', '.join(SPECS)}")
+
+    # Un solo spec: una lectura del diccionario para todos los esquemas
+    spec = SchemaSpec()
+    for name in names:
+        spec.merge(SPECS[name]())
+
+    conn = get_connection()
+    try:
+        print(f"=== Ensure schema: {', '.join(names)} ===")
+        results = ensure_schema(conn, spec, dry_run=args.dry_run)
+        if any(error for _, _, error in results):
+            sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
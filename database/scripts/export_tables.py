@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+"""
+Exportación masiva de tablas ODO_* a Parquet o CSV comprimido.
+
+Cada tabla se divide en tramos que se leen en paralelo, cada uno en una
+sesión del pool y con iter_query (lotes de --arraysize filas por round trip,
+memoria constante):
+
+  - rowid: tramos de bloques armados con DBMS_PARALLEL_EXECUTE
+    (create_chunks_by_rowid); cada tramo es un ROWID BETWEEN.
+  - pk:    si la tabla no admite tramos por ROWID (p.ej. index-organized),
+    NTILE sobre la clave primaria numérica de una columna, calculado AS OF
+    el mismo SCN. Los tramos son semiabiertos [desde, siguiente desde) y el
+    primero y el último no tienen límite, así que cubren toda la clave.
+  - unica: sin ninguna de las dos, la tabla sale en un solo archivo.
+
+Todas las lecturas usan AS OF SCN con el mismo SCN, tomado al inicio: la
+exportación es una foto consistente aunque haya escrituras en paralelo.
+
+Salida (--out):
+    <TABLA>/part-00001.parquet   (o .csv.gz con --format csv)
+    manifest.json                tablas, columnas, archivos, filas, SCN
+
+Parquet requiere pyarrow (pip3 install pyarrow); sin él usar --format csv.
+Tipos en Parquet:
+  - NUMBER(p,0) con p <= 18 -> int64; NUMBER(p,s) con s > 0 o p > 18 ->
+    decimal(p,s), leído como Decimal (exacto, p.ej. TOTAL, MONTO, SALDO).
+  - NUMBER sin precisión (la mayoría de los *_ID): int64 si en la foto
+    exportada todos sus valores son enteros de 64 bits; si no, double y la
+    columna queda marcada "aproximado" en el manifest.
+  - BINARY_* -> double, fechas -> timestamp, RAW/BLOB -> binary, el resto
+    -> string.
+
+Uso:
+    python3 export_tables.py ODO_CITAS ODO_PAGOS
+    python3 export_tables.py --all --format csv --workers 4 --chunks 16
+    python3 export_tables.py --all --out /tmp/backup --arraysize 5000
+
+Desde Python:
+    from export_tables import export_tables
+    manifest = export_tables(['ODO_AUDITORIA'], '/tmp/export')
+"""
+import argparse
+import csv
+import decimal
+import gzip
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime
+
+import oracledb
+
+from connect_db import PROJECT_ROOT, acquire, acquire_cursor, iter_query, list_tables, reserve_pool
+
+DEFAULT_OUT = str(PROJECT_ROOT / 'exports')
+DEFAULT_WORKERS = 4
+DEFAULT_CHUNKS = 8
+DEFAULT_ARRAYSIZE = 2000
+FORMATS = ('parquet', 'csv')
+EXTENSIONS = {'parquet': '.parquet', 'csv': '.csv.gz'}
+
+# Tramos por ROWID: la tarea de DBMS_PARALLEL_EXECUTE solo se usa para
+# calcular los rangos (no se ejecuta) y se borra enseguida
+ROWID_CHUNKS_SQL = """
+DECLARE
+    v_blocks NUMBER;
+BEGIN
+    SELECT NVL(SUM(blocks), 0) INTO v_blocks
+    FROM user_segments
+    WHERE segment_name = :tabla AND segment_type LIKE 'TABLE%';
+
+    DBMS_PARALLEL_EXECUTE.create_task(:tarea);
+    DBMS_PARALLEL_EXECUTE.create_chunks_by_rowid(
+        task_name   => :tarea,
+        table_owner => USER,
+        table_name  => :tabla,
+        by_row      => FALSE,
+        chunk_size  => GREATEST(CEIL(v_blocks / :tramos), 8)
+    );
+
+    OPEN :rangos FOR
+        SELECT ROWIDTOCHAR(start_rowid), ROWIDTOCHAR(end_rowid)
+        FROM user_parallel_execute_chunks
+        WHERE task_name = :tarea
+        ORDER BY chunk_id;
+END;
+"""
+
+DROP_TASK_SQL = "BEGIN DBMS_PARALLEL_EXECUTE.drop_task(:tarea); END;"
+
+# Clave primaria de una sola columna NUMBER
+NUMERIC_PK_SQL = """
+    SELECT MIN(cc.column_name)
+    FROM user_constraints c
+    JOIN user_cons_columns cc ON cc.constraint_name = c.constraint_name
+    JOIN user_tab_columns tc ON tc.table_name = cc.table_name
+                            AND tc.column_name = cc.column_name
+    WHERE c.table_name = :tabla
+      AND c.constraint_type = 'P'
+    GROUP BY c.constraint_name
+    HAVING COUNT(*) = 1 AND MIN(tc.data_type) = 'NUMBER'
+"""
+
+# Columnas NUMBER sin precisión ni escala (NUMBER "libre")
+FREE_NUMBER_COLUMNS_SQL = """
+    SELECT column_name
+    FROM user_tab_columns
+    WHERE table_name = :tabla
+      AND data_type = 'NUMBER'
+      AND data_precision IS NULL
+      AND data_scale IS NULL
+    ORDER BY column_id
+"""
+
+# Precisión y escala que informa el driver para un NUMBER libre
+FREE_NUMBER = (0, -127)
+INT64_MAX = 9223372036854775807
+
+
+@dataclass
+class Chunk:
+    """Un tramo de una tabla: un archivo de salida."""
+    table: str
+    number: int
+    mode: str               # rowid, pk o unica
+    low: object = None      # modo pk: None = sin límite inferior
+    high: object = None     # modo pk: exclusivo, None = sin límite superior
+    column: str = None      # columna de la PK (modo pk)
+
+    def query(self, scn):
+        as_of = " AS OF SCN :scn" if scn else ""
+        params = {'scn': scn} if scn else {}
+        sql = f"SELECT * FROM {self.table}{as_of}"
+        if self.mode == 'rowid':
+            sql += " WHERE ROWID BETWEEN CHARTOROWID(:lo) AND CHARTOROWID(:hi)"
+            params.update(lo=self.low, hi=self.high)
+        elif self.mode == 'pk':
+            bounds = []
+            if self.low is not None:
+                bounds.append(f"{self.column} >= :lo")
+                params['lo'] = self.low
+            if self.high is not None:
+                bounds.append(f"{self.column} < :hi")
+                params['hi'] = self.high
+            if bounds:
+                sql += " WHERE " + " AND ".join(bounds)
+        return sql, params
+
+
+# ============================================================================
+# DIVISIÓN EN TRAMOS
+# ============================================================================
+
+def current_scn(cursor):
+    """SCN actual, o None si el usuario no puede leerlo (sin AS OF)."""
+    try:
+        return cursor.callfunc('DBMS_FLASHBACK.GET_SYSTEM_CHANGE_NUMBER', int)
+    except oracledb.DatabaseError as e:
+        print(f"  [--] Sin SCN ({e}); cada tramo lee su propia foto")
+        return None
+
+
+def rowid_chunks(cursor, table, chunks):
+    """Rangos ROWID de la tabla, o None si la tabla no los admite."""
+    task = f"ODO_EXPORT_{table}_{os.getpid()}"[:128]
+    ranges = cursor.var(oracledb.DB_TYPE_CURSOR)
+    try:
+        cursor.execute(ROWID_CHUNKS_SQL, tabla=table, tarea=task, tramos=chunks, rangos=ranges)
+        result = ranges.getvalue().fetchall()
+    except oracledb.DatabaseError:
+        return None
+    finally:
+        try:
+            cursor.execute(DROP_TASK_SQL, tarea=task)
+        except oracledb.DatabaseError:
+            pass
+    return [Chunk(table, i, 'rowid', lo, hi) for i, (lo, hi) in enumerate(result, 1)]
+
+
+def pk_chunks(cursor, table, chunks, scn=None):
+    """
+    Rangos de la PK numérica (un recorrido del índice), o None si no hay.
+
+    Los cortes se calculan sobre la misma foto que se exporta: cada tramo
+    va desde el primer valor de su NTILE hasta el primero del siguiente
+    (exclusivo), con el primero y el último abiertos.
+    """
+    cursor.execute(NUMERIC_PK_SQL, tabla=table)
+    row = cursor.fetchone()
+    if not row:
+        return None
+    column = row[0]
+    as_of = " AS OF SCN :scn" if scn else ""
+    params = {'tramos': chunks, **({'scn': scn} if scn else {})}
+    cursor.execute(f"""
+        SELECT MIN({column})
+        FROM (SELECT {column}, NTILE(:tramos) OVER (ORDER BY {column}) AS tramo
+              FROM {table}{as_of})
+        GROUP BY tramo
+        ORDER BY tramo
+    """, params)
+    starts = [lo for (lo,) in cursor.fetchall()]
+    if not starts:
+        return None
+    lows = [None] + starts[1:]
+    highs = starts[1:] + [None]
+    return [Chunk(table, i, 'pk', lo, hi, column)
+            for i, (lo, hi) in enumerate(zip(lows, highs), 1)]
+
+
+def integral_columns(cursor, table, scn=None):
+    """
+    Columnas NUMBER libres cuyos valores son todos enteros de 64 bits.
+
+    Un recorrido de la tabla (AS OF el SCN de la exportación) para que
+    todos los tramos usen el mismo tipo en Parquet.
+
+    Returns:
+        frozenset: Nombres de columna que se escriben como int64
+    """
+    cursor.execute(FREE_NUMBER_COLUMNS_SQL, tabla=table)
+    columns = [name for (name,) in cursor.fetchall()]
+    if not columns:
+        return frozenset()
+    checks = ", ".join(
+        f"MAX(CASE WHEN {c} <> TRUNC({c}) OR ABS({c}) > {INT64_MAX} THEN 1 END)"
+        for c in columns
+    )
+    as_of = " AS OF SCN :scn" if scn else ""
+    cursor.execute(f"SELECT {checks} FROM {table}{as_of}", {'scn': scn} if scn else {})
+    flags = cursor.fetchone()
+    return frozenset(c for c, flag in zip(columns, flags) if flag is None)
+
+
+def plan_chunks(cursor, table, chunks, scn=None):
+    """
+    Divide una tabla en tramos: ROWID, si no PK numérica, si no uno solo.
+
+    Las tablas vacías (sin segmento ni filas) salen en un solo tramo para
+    que igual quede el archivo con las columnas.
+    """
+    if chunks > 1:
+        plan = rowid_chunks(cursor, table, chunks) or pk_chunks(cursor, table, chunks, scn)
+        if plan:
+            return plan
+    return [Chunk(table, 1, 'unica')]
+
+
+# ============================================================================
+# ESCRITURA
+# ============================================================================
+
+def _is_decimal(type_code, precision, scale):
+    """NUMBER con escala o con más dígitos de los que entran en int64."""
+    return (type_code is oracledb.DB_TYPE_NUMBER and scale != FREE_NUMBER[1]
+            and scale >= 0 and (scale > 0 or precision > 18))
+
+
+def _decimals_handler(cursor, name, default_type, size, precision, scale):
+    # Los NUMBER con escala llegan como Decimal en lugar de float
+    if _is_decimal(default_type, precision, scale):
+        return cursor.var(decimal.Decimal, arraysize=cursor.arraysize)
+
+
+def _arrow_type(pa, column, integral=frozenset()):
+    name, type_code, _, _, precision, scale = column[:6]
+    if type_code is oracledb.DB_TYPE_NUMBER:
+        if (precision, scale) == FREE_NUMBER:
+            return pa.int64() if name in integral else pa.float64()
+        if scale == FREE_NUMBER[1]:
+            return pa.float64()   # FLOAT(n): precisión binaria
+        if _is_decimal(type_code, precision, scale):
+            return pa.decimal128(max(precision, scale), scale)
+        return pa.int64()
+    if type_code in (oracledb.DB_TYPE_BINARY_DOUBLE, oracledb.DB_TYPE_BINARY_FLOAT,
+                     oracledb.DB_TYPE_BINARY_INTEGER):
+        return pa.float64()
+    if type_code in (oracledb.DB_TYPE_DATE, oracledb.DB_TYPE_TIMESTAMP,
+                     oracledb.DB_TYPE_TIMESTAMP_TZ, oracledb.DB_TYPE_TIMESTAMP_LTZ):
+        return pa.timestamp('us')
+    if type_code in (oracledb.DB_TYPE_RAW, oracledb.DB_TYPE_LONG_RAW, oracledb.DB_TYPE_BLOB):
+        return pa.binary()
+    return pa.string()
+
+
+class ParquetChunkWriter:
+    """Un archivo Parquet por tramo; cada lote del cursor es un row group."""
+
+    def __init__(self, path, description, integral=frozenset()):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.schema = pa.schema([(d[0], _arrow_type(pa, d, integral)) for d in description])
+        # NUMBER libres con decimales: se escriben como double
+        self.approximate = {
+            d[0] for d, field in zip(description, self.schema)
+            if d[1] is oracledb.DB_TYPE_NUMBER and field.type == pa.float64()
+        }
+        self.writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+
+    def write(self, batch):
+        columns = []
+        for values, field in zip(zip(*batch), self.schema):
+            if field.type == self.pa.string():
+                values = [None if v is None else str(v) for v in values]
+            columns.append(self.pa.array(values, type=field.type))
+        self.writer.write_table(self.pa.Table.from_arrays(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class CsvChunkWriter:
+    """Un CSV con encabezado, comprimido con gzip, por tramo."""
+
+    approximate = frozenset()
+
+    def __init__(self, path, description, integral=frozenset()):
+        self.file = gzip.open(path, 'wt', encoding='utf-8', newline='', compresslevel=6)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([d[0] for d in description])
+
+    def write(self, batch):
+        self.writer.writerows(batch)
+
+    def close(self):
+        self.file.close()
+
+
+WRITERS = {'parquet': ParquetChunkWriter, 'csv': CsvChunkWriter}
+
+
+def export_chunk(chunk, out_dir, fmt, scn, arraysize, integral=frozenset()):
+    """
+    Lee un tramo en una sesión del pool y lo escribe en su archivo.
+
+    integral son las columnas NUMBER libres que se escriben como int64
+    (ver integral_columns).
+
+    Returns:
+        dict: Entrada del manifest (archivo, filas, bytes, rango, columnas)
+    """
+    name = f"part-{chunk.number:05d}{EXTENSIONS[fmt]}"
+    path = os.path.join(out_dir, chunk.table, name)
+    sql, params = chunk.query(scn)
+
+    rows = 0
+    writer = None
+    with acquire_cursor() as cursor:
+        cursor.outputtypehandler = _decimals_handler
+        try:
+            for batch in iter_query(sql, params, arraysize=arraysize, batches=True, cursor=cursor):
+                if writer is None:
+                    writer = WRITERS[fmt](path, cursor.description, integral)
+                writer.write(batch)
+                rows += len(batch)
+            if writer is None:
+                writer = WRITERS[fmt](path, cursor.description, integral)
+        finally:
+            if writer is not None:
+                writer.close()
+        columns = [{'nombre': d[0], 'tipo': d[1].name} for d in cursor.description]
+        for column in columns:
+            if column['nombre'] in writer.approximate:
+                column['aproximado'] = True
+
+    return {
+        'archivo': f"{chunk.table}/{name}",
+        'filas': rows,
+        'bytes': os.path.getsize(path),
+        'rango': None if chunk.mode == 'unica' else [chunk.low, chunk.high],
+        'columnas': columns,
+    }
+
+
+# ============================================================================
+# EXPORTACIÓN
+# ============================================================================
+
+def export_tables(tables, out_dir=DEFAULT_OUT, fmt='parquet', workers=DEFAULT_WORKERS,
+                  chunks=DEFAULT_CHUNKS, arraysize=DEFAULT_ARRAYSIZE, verbose=True):
+    """
+    Exporta tablas en paralelo y escribe manifest.json en out_dir.
+
+    Args:
+        tables (list): Nombres de tabla
+        out_dir (str): Directorio de salida (se crea si no existe)
+        fmt (str): 'parquet' o 'csv' (gzip)
+        workers (int): Tramos leídos a la vez (sesiones del pool)
+        chunks (int): Tramos por tabla
+        arraysize (int): Filas por round trip
+
+    Returns:
+        dict: El manifest escrito
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato inválido: {fmt} (usar {', '.join(FORMATS)})")
+    if fmt == 'parquet':
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise RuntimeError("Parquet requiere pyarrow (pip3 install pyarrow) o usar --format csv")
+
+    # CLOB/BLOB llegan como str/bytes en el mismo fetch (sin un round trip por LOB)
+    oracledb.defaults.fetch_lobs = False
+
+    started = time.perf_counter()
+    tables = [t.upper() for t in tables]
+    with acquire() as conn:
+        cursor = conn.cursor()
+        try:
+            scn = current_scn(cursor)
+            plan = {table: plan_chunks(cursor, table, chunks, scn) for table in tables}
+            integral = {table: integral_columns(cursor, table, scn) for table in tables
+                        if fmt == 'parquet'}
+        finally:
+            cursor.close()
+
+    for table, table_chunks in plan.items():
+        os.makedirs(os.path.join(out_dir, table), exist_ok=True)
+        if verbose:
+            print(f"  {table}: {len(table_chunks)} tramo(s) por {table_chunks[0].mode}")
+
+    files = {table: [] for table in tables}
+    errors = {}
+    workers = max(workers, 1)
+    reserve_pool(workers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(export_chunk, chunk, out_dir, fmt, scn, arraysize,
+                            integral.get(chunk.table, frozenset())): chunk
+            for table_chunks in plan.values() for chunk in table_chunks
+        }
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                entry = future.result()
+            except Exception as e:
+                errors.setdefault(chunk.table, []).append(f"tramo {chunk.number}: {e}")
+                if verbose:
+                    print(f"  [FAIL] {chunk.table} tramo {chunk.number}: {e}")
+                continue
+            files[chunk.table].append(entry)
+            if verbose:
+                print(f"  [OK] {entry['archivo']} ({entry['filas']} filas)")
+
+    manifest = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'formato': fmt,
+        'scn': scn,
+        'segundos': round(time.perf_counter() - started, 1),
+        'tablas': [],
+    }
+    for table in tables:
+        entries = sorted(files[table], key=lambda e: e['archivo'])
+        manifest['tablas'].append({
+            'tabla': table,
+            'division': plan[table][0].mode,
+            'columnas': entries[0]['columnas'] if entries else [],
+            'filas': sum(e['filas'] for e in entries),
+            'bytes': sum(e['bytes'] for e in entries),
+            'archivos': [{k: v for k, v in e.items() if k != 'columnas'} for e in entries],
+            'errores': errors.get(table, []),
+        })
+
+    with open(os.path.join(out_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False, default=str)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta tablas a Parquet o CSV (gzip) en paralelo")
+    parser.add_argument('tables', nargs='*', help="Tablas a exportar")
+    parser.add_argument('--all', action='store_true', help="Todas las tablas ODO_*")
+    parser.add_argument('--format', choices=FORMATS, default='parquet')
+    parser.add_argument('--out', default=DEFAULT_OUT, help=f"Directorio de salida (default: {DEFAULT_OUT})")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="Tramos en paralelo (sesiones del pool)")
+    parser.add_argument('--chunks', type=int, default=DEFAULT_CHUNKS, help="Tramos por tabla")
+    parser.add_argument('--arraysize', type=int, default=DEFAULT_ARRAYSIZE,
+                        help="Filas por round trip")
+    args = parser.parse_args()
+
+    tables = [t for t in list_tables(snapshot=False) if t.startswith('ODO_')] if args.all else args.tables
+    if not tables:
+        parser.error("Indicar tablas o --all")
+
+    print(f"=== Exportando {len(tables)} tabla(s) a {args.out} ({args.format}) ===")
+    manifest = export_tables(tables, args.out, args.format, args.workers,
+                             args.chunks, args.arraysize)
+
+    total_rows = sum(t['filas'] for t in manifest['tablas'])
+    total_bytes = sum(t['bytes'] for t in manifest['tablas'])
+    print(f"\n  {total_rows} filas, {total_bytes / 1048576:.1f} MB en {manifest['segundos']}s "
+          f"(SCN {manifest['scn']})")
+    if any(t['errores'] for t in manifest['tablas']):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
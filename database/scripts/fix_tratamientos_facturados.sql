@@ -1,31 +1,25 @@
--- 1. Agregar columna FACTURADO a ODO_TRATAMIENTOS_DIENTE si no existe
+-- 1 y 2. Agregar FACTURADO a ODO_TRATAMIENTOS_DIENTE y TRATAMIENTO_DIENTE_ID
+--        a ODO_DETALLES_FACTURA si no existen (una sola lectura del diccionario;
+--        equivalente Python: python3 ensure_schema.py tratamientos_facturados)
 DECLARE
-    v_count NUMBER;
+    v_facturado   NUMBER;
+    v_tratamiento NUMBER;
 BEGIN
-    SELECT COUNT(*) INTO v_count
+    SELECT COUNT(CASE WHEN TABLE_NAME = 'ODO_TRATAMIENTOS_DIENTE' AND COLUMN_NAME = 'FACTURADO' THEN 1 END),
+           COUNT(CASE WHEN TABLE_NAME = 'ODO_DETALLES_FACTURA' AND COLUMN_NAME = 'TRATAMIENTO_DIENTE_ID' THEN 1 END)
+    INTO v_facturado, v_tratamiento
     FROM USER_TAB_COLUMNS
-    WHERE TABLE_NAME = 'ODO_TRATAMIENTOS_DIENTE'
-    AND COLUMN_NAME = 'FACTURADO';
+    WHERE TABLE_NAME IN ('ODO_TRATAMIENTOS_DIENTE', 'ODO_DETALLES_FACTURA')
+      AND COLUMN_NAME IN ('FACTURADO', 'TRATAMIENTO_DIENTE_ID');
 
-    IF v_count = 0 THEN
+    IF v_facturado = 0 THEN
         EXECUTE IMMEDIATE 'ALTER TABLE ODO_TRATAMIENTOS_DIENTE ADD FACTURADO CHAR(1) DEFAULT ''N'' CHECK (FACTURADO IN (''S'', ''N''))';
         DBMS_OUTPUT.PUT_LINE('Columna FACTURADO agregada a ODO_TRATAMIENTOS_DIENTE');
     ELSE
         DBMS_OUTPUT.PUT_LINE('Columna FACTURADO ya existe');
     END IF;
-END;
-/
-
--- 2. Agregar columna TRATAMIENTO_DIENTE_ID a ODO_DETALLES_FACTURA si no existe
-DECLARE
-    v_count NUMBER;
-BEGIN
-    SELECT COUNT(*) INTO v_count
-    FROM USER_TAB_COLUMNS
-    WHERE TABLE_NAME = 'ODO_DETALLES_FACTURA'
-    AND COLUMN_NAME = 'TRATAMIENTO_DIENTE_ID';
 
-    IF v_count = 0 THEN
+    IF v_tratamiento = 0 THEN
         EXECUTE IMMEDIATE 'ALTER TABLE ODO_DETALLES_FACTURA ADD TRATAMIENTO_DIENTE_ID NUMBER REFERENCES ODO_TRATAMIENTOS_DIENTE(TRATAMIENTO_DIENTE_ID)';
         DBMS_OUTPUT.PUT_LINE('Columna TRATAMIENTO_DIENTE_ID agregada a ODO_DETALLES_FACTURA');
     ELSE
@@ -1,4 +1,5 @@
 from connect_db import get_connection
+from ords_deploy import ensure_packages
 
 conn = get_connection()
 cursor = conn.cursor()
@@ -6,6 +7,8 @@ cursor = conn.cursor()
 print("Actualizando endpoint GET /facturas/usuarios...")
 
 try:
+    ensure_packages(conn, ['PKG_JSON_RESPONSE'])
+
     cursor.execute("""
         BEGIN
             ORDS.DEFINE_HANDLER(
@@ -15,38 +18,51 @@ try:
                 p_source_type => 'plsql/block',
                 p_source => '
 DECLARE
-    v_cursor SYS_REFCURSOR;
+    v_token     VARCHAR2(4000) := :next;
+    v_limit     PLS_INTEGER := PKG_JSON_RESPONSE.page_size(:limit, 100);
+    v_key       VARCHAR2(4000) := PKG_JSON_RESPONSE.token_key(v_token);
+    v_apellido  ODO_USUARIOS.APELLIDO%TYPE := JSON_VALUE(v_key, ''$[0]'');
+    v_nombre    ODO_USUARIOS.NOMBRE%TYPE := JSON_VALUE(v_key, ''$[1]'');
+    v_id        NUMBER := JSON_VALUE(v_key, ''$[2]'' RETURNING NUMBER);
+    v_total     NUMBER;
+    v_cursor    SYS_REFCURSOR;
 BEGIN
+    IF PKG_JSON_RESPONSE.include_total(:incluir_total) THEN
+        SELECT COUNT(*) INTO v_total FROM ODO_USUARIOS;
+    END IF;
+
     OPEN v_cursor FOR
         SELECT
-            u.USUARIO_ID,
-            u.USERNAME,
-            u.NOMBRE,
-            u.APELLIDO,
-            u.EMAIL,
-            u.TELEFONO,
-            u.ESPECIALIDAD,
-            u.DOCUMENTO_TIPO,
-            u.DOCUMENTO_NUMERO,
-            u.ACTIVO,
-            u.EMPRESA_ID,
-            u.ULTIMO_LOGIN,
-            u.ROL_ID,
-            r.NOMBRE AS ROL_NOMBRE,
-            r.CODIGO AS ROL_CODIGO
+            JSON_OBJECT(
+                ''USUARIO_ID'' VALUE u.USUARIO_ID,
+                ''USERNAME'' VALUE u.USERNAME,
+                ''NOMBRE'' VALUE u.NOMBRE,
+                ''APELLIDO'' VALUE u.APELLIDO,
+                ''EMAIL'' VALUE u.EMAIL,
+                ''TELEFONO'' VALUE u.TELEFONO,
+                ''ESPECIALIDAD'' VALUE u.ESPECIALIDAD,
+                ''DOCUMENTO_TIPO'' VALUE u.DOCUMENTO_TIPO,
+                ''DOCUMENTO_NUMERO'' VALUE u.DOCUMENTO_NUMERO,
+                ''ACTIVO'' VALUE u.ACTIVO,
+                ''EMPRESA_ID'' VALUE u.EMPRESA_ID,
+                ''ULTIMO_LOGIN'' VALUE u.ULTIMO_LOGIN,
+                ''ROL_ID'' VALUE u.ROL_ID,
+                ''ROL_NOMBRE'' VALUE r.NOMBRE,
+                ''ROL_CODIGO'' VALUE r.CODIGO
+                ABSENT ON NULL RETURNING CLOB),
+            JSON_ARRAY(u.APELLIDO, u.NOMBRE, u.USUARIO_ID NULL ON NULL)
         FROM ODO_USUARIOS u
         LEFT JOIN ODO_ROLES r ON u.ROL_ID = r.ROL_ID
-        ORDER BY u.APELLIDO, u.NOMBRE;
-
-    APEX_JSON.initialize_clob_output;
-    APEX_JSON.open_object;
-    APEX_JSON.write(''items'', v_cursor);
-    APEX_JSON.close_object;
+        WHERE v_key IS NULL
+           OR u.APELLIDO > v_apellido
+           OR (u.APELLIDO = v_apellido AND u.NOMBRE > v_nombre)
+           OR (u.APELLIDO = v_apellido AND u.NOMBRE = v_nombre AND u.USUARIO_ID > v_id)
+        ORDER BY u.APELLIDO, u.NOMBRE, u.USUARIO_ID
+        FETCH FIRST v_limit + 1 ROWS ONLY;
 
     :status := 200;
     :content_type := ''application/json'';
-    htp.p(APEX_JSON.get_clob_output);
-    APEX_JSON.free_output;
+    PKG_JSON_RESPONSE.print_page(v_cursor, v_limit, v_token, ''items'', v_total);
 END;'
             );
             COMMIT;
@@ -57,6 +73,7 @@ END;'
     print("  Campos retornados: USERNAME, NOMBRE, APELLIDO, EMAIL, TELEFONO,")
     print("  ESPECIALIDAD, DOCUMENTO_TIPO, DOCUMENTO_NUMERO, ACTIVO, EMPRESA_ID,")
     print("  ULTIMO_LOGIN, ROL_ID, ROL_NOMBRE, ROL_CODIGO")
+    print("  Paginado: ?limit=N (máx. 500) y ?next=<token de la respuesta anterior>")
 
 except Exception as e:
     print(f"✗ Error: {e}")
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+Importación masiva de pacientes desde CSV o XLSX (alta de clínicas nuevas).
+
+El archivo se lee en streaming y se procesa por lotes de --batch filas:
+
+  1. Validación y normalización en Python, columna por columna sobre el
+     lote: documentos sin puntos ni guiones, teléfonos en formato local
+     (0981...), fechas DD/MM/AAAA o AAAA-MM-DD (o fecha de Excel), género,
+     grupo sanguíneo, email. Los largos se validan contra ODO_PACIENTES.
+  2. Carga de las filas válidas en ODO_PACIENTES_IMPORT con array binds
+     (execute_many, un round trip por lote).
+  3. PKG_PACIENTES_IMPORT.importar resuelve todo el lote en SQL: descarta
+     documentos ya registrados o repetidos, reserva un bloque de números de
+     historia en PKG_CONTADORES y da de alta con un único MERGE.
+
+Las filas rechazadas (inválidas, ya existentes o duplicadas en el archivo)
+se escriben en un CSV de rechazos con el número de fila y el motivo.
+
+Encabezados reconocidos (sin importar mayúsculas ni acentos): nombre,
+apellido, documento / cedula / ci, tipo_documento, fecha_nacimiento,
+sexo / genero, grupo_sanguineo, email / correo, telefono / celular,
+telefono_secundario, direccion, observaciones.
+
+XLSX requiere openpyxl (pip3 install openpyxl).
+
+Uso:
+    python3 import_pacientes.py pacientes.csv --empresa 3 --usuario 1
+    python3 import_pacientes.py pacientes.xlsx --empresa 3 --usuario 1 --hoja Pacientes
+    python3 import_pacientes.py pacientes.csv --empresa 3 --usuario 1 --dry-run
+"""
+import argparse
+import csv
+import re
+import time
+import unicodedata
+from datetime import date, datetime
+from pathlib import Path
+
+from connect_db import acquire, execute_many, execute_query, iter_query
+from ensure_schema import ensure_schema, pacientes_import_spec
+from ords_deploy import ensure_packages
+
+DEFAULT_BATCH = 1000
+
+# Columnas de staging, en el orden del INSERT
+FIELDS = (
+    'nombre', 'apellido', 'documento_tipo', 'documento_numero', 'fecha_nacimiento',
+    'genero', 'grupo_sanguineo', 'email', 'telefono_principal', 'telefono_secundario',
+    'direccion', 'observaciones',
+)
+REQUIRED = ('nombre', 'apellido', 'documento_numero')
+
+HEADER_ALIASES = {
+    'nombre': ('nombre', 'nombres', 'first_name'),
+    'apellido': ('apellido', 'apellidos', 'last_name'),
+    'documento_tipo': ('documento_tipo', 'tipo_documento', 'tipo_doc'),
+    'documento_numero': ('documento_numero', 'documento', 'nro_documento', 'numero_documento',
+                         'cedula', 'ci', 'nro_ci'),
+    'fecha_nacimiento': ('fecha_nacimiento', 'fecha_de_nacimiento', 'nacimiento', 'fec_nac'),
+    'genero': ('genero', 'sexo'),
+    'grupo_sanguineo': ('grupo_sanguineo', 'tipo_sangre', 'grupo'),
+    'email': ('email', 'e_mail', 'correo', 'correo_electronico'),
+    'telefono_principal': ('telefono_principal', 'telefono', 'celular', 'movil', 'tel'),
+    'telefono_secundario': ('telefono_secundario', 'telefono_2', 'telefono2', 'otro_telefono'),
+    'direccion': ('direccion', 'domicilio'),
+    'observaciones': ('observaciones', 'notas', 'comentarios'),
+}
+
+DOCUMENTO_TIPOS = {
+    'CI': 'CI', 'CEDULA': 'CI',
+    'RUC': 'RUC',
+    'PASAPORTE': 'PASAPORTE', 'PAS': 'PASAPORTE', 'PASS': 'PASAPORTE',
+    'DNI': 'DNI',
+}
+GENEROS = {'M': 'M', 'MASCULINO': 'M', 'HOMBRE': 'M', 'F': 'F', 'FEMENINO': 'F', 'MUJER': 'F'}
+DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%d/%m/%y', '%d.%m.%Y')
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[a-z]{2,}$')
+GRUPO_RE = re.compile(r'^(A|B|AB|O)[+-]$')
+
+INSERT_STAGING = f"""
+    INSERT INTO ODO_PACIENTES_IMPORT (IMPORT_ID, FILA, {', '.join(f.upper() for f in FIELDS)})
+    VALUES (:1, :2, {', '.join(f':{i}' for i in range(3, len(FIELDS) + 3))})
+"""
+
+
+# ============================================================================
+# LECTURA
+# ============================================================================
+
+def _header_key(name):
+    name = unicodedata.normalize('NFKD', str(name or '')).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+
+def map_headers(headers):
+    """Índice de columna del archivo para cada campo reconocido."""
+    aliases = {alias: field for field, names in HEADER_ALIASES.items() for alias in names}
+    mapping = {}
+    for i, header in enumerate(headers):
+        field = aliases.get(_header_key(header))
+        if field and field not in mapping:
+            mapping[field] = i
+    missing = [f for f in REQUIRED if f not in mapping]
+    if missing:
+        raise ValueError(f"Faltan columnas obligatorias: {', '.join(missing)}")
+    return mapping
+
+
+def read_rows(path, sheet=None):
+    """
+    Genera (fila, valores) del archivo, sin cargarlo entero en memoria.
+
+    fila es el número de línea en el archivo (el encabezado es la 1).
+    """
+    path = Path(path)
+    if path.suffix.lower() in ('.xlsx', '.xlsm'):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise RuntimeError("XLSX requiere openpyxl (pip3 install openpyxl) o exportar a CSV")
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = iter((workbook[sheet] if sheet else workbook.active).iter_rows(values_only=True))
+            yield from _mapped(rows)
+        finally:
+            workbook.close()
+    else:
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            dialect = csv.Sniffer().sniff(f.read(8192), delimiters=',;\t')
+            f.seek(0)
+            yield from _mapped(csv.reader(f, dialect))
+
+
+def _mapped(rows):
+    mapping = map_headers(next(rows, ()))
+    for number, values in enumerate(rows, 2):
+        if not any(v not in (None, '') for v in values):
+            continue
+        yield number, {field: values[i] if i < len(values) else None
+                       for field, i in mapping.items()}
+
+
+def batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ============================================================================
+# NORMALIZACIÓN (cada función recibe un valor y devuelve (valor, error))
+# ============================================================================
+
+def _text(value):
+    if value is None:
+        return None, None
+    value = ' '.join(str(value).split())
+    return value or None, None
+
+
+def _documento(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    value, _ = _text(value)
+    if value is None:
+        return None, None
+    value = re.sub(r'[\s.\-]', '', value).upper()
+    if not value.isalnum():
+        return None, f"documento inválido: {value}"
+    return value, None
+
+
+def _documento_tipo(value):
+    value, _ = _text(value)
+    if value is None:
+        return 'CI', None
+    tipo = DOCUMENTO_TIPOS.get(_header_key(value).replace('_', '').upper())
+    if tipo is None:
+        return None, f"tipo de documento inválido: {value}"
+    return tipo, None
+
+
+def _telefono(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    value, _ = _text(value)
+    if value is None:
+        return None, None
+    digits = re.sub(r'\D', '', value)
+    if digits.startswith('595') and len(digits) >= 11:
+        digits = '0' + digits[3:]
+    elif len(digits) == 9 and digits.startswith('9'):
+        digits = '0' + digits
+    if not 6 <= len(digits) <= 15:
+        return None, f"teléfono inválido: {value}"
+    return digits, None
+
+
+def _fecha(value):
+    if value in (None, ''):
+        return None, None
+    if isinstance(value, datetime):
+        parsed = value.date()
+    elif isinstance(value, date):
+        parsed = value
+    else:
+        text = str(value).strip()
+        for fmt in DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(text, fmt).date()
+                break
+            except ValueError:
+                continue
+        else:
+            return None, f"fecha inválida: {text}"
+    if not date(1900, 1, 1) <= parsed <= date.today():
+        return None, f"fecha fuera de rango: {parsed.isoformat()}"
+    return parsed, None
+
+
+def _genero(value):
+    value, _ = _text(value)
+    if value is None:
+        return None, None
+    genero = GENEROS.get(_header_key(value).upper())
+    if genero is None:
+        return None, f"género inválido: {value}"
+    return genero, None
+
+
+def _grupo_sanguineo(value):
+    value, _ = _text(value)
+    if value is None:
+        return None, None
+    grupo = value.upper().replace(' ', '').replace('0', 'O')
+    if not GRUPO_RE.match(grupo):
+        return None, f"grupo sanguíneo inválido: {value}"
+    return grupo, None
+
+
+def _email(value):
+    value, _ = _text(value)
+    if value is None:
+        return None, None
+    value = value.lower()
+    if not EMAIL_RE.match(value):
+        return None, f"email inválido: {value}"
+    return value, None
+
+
+NORMALIZERS = {
+    'nombre': _text,
+    'apellido': _text,
+    'documento_tipo': _documento_tipo,
+    'documento_numero': _documento,
+    'fecha_nacimiento': _fecha,
+    'genero': _genero,
+    'grupo_sanguineo': _grupo_sanguineo,
+    'email': _email,
+    'telefono_principal': _telefono,
+    'telefono_secundario': _telefono,
+    'direccion': _text,
+    'observaciones': _text,
+}
+
+
+def column_limits():
+    """
+    Largo máximo de cada campo de texto según ODO_PACIENTES (consulta en
+    vivo de user_tab_columns).
+
+    Returns:
+        dict: campo -> (largo, unidad); unidad 'C' si la columna se declaró
+            en caracteres, 'B' si en bytes (se mide el valor en UTF-8)
+    """
+    limits = {'observaciones': (4000, 'C')}
+    rows = execute_query("""
+        SELECT column_name, char_length, char_used
+        FROM user_tab_columns
+        WHERE table_name = 'ODO_PACIENTES'
+          AND data_type IN ('VARCHAR2', 'CHAR', 'NVARCHAR2', 'NCHAR')
+    """)
+    for column, length, unit in rows:
+        if column.lower() in NORMALIZERS:
+            limits[column.lower()] = (length, unit or 'C')
+    return limits
+
+
+def _too_long(value, length, unit):
+    if not isinstance(value, str):
+        return False
+    size = len(value.encode('utf-8')) if unit == 'B' else len(value)
+    return size > length
+
+
+def normalize_batch(batch, limits):
+    """
+    Normaliza un lote columna por columna.
+
+    Returns:
+        tuple: (válidas, rechazadas). válidas: (fila, {campo: valor});
+            rechazadas: (fila, valores originales, motivo)
+    """
+    columns = {}
+    for field in FIELDS:
+        normalize = NORMALIZERS[field]
+        limit = limits.get(field)
+        results = [normalize(values.get(field)) for _, values in batch]
+        if limit:
+            length, unit = limit
+            label = 'bytes' if unit == 'B' else 'caracteres'
+            results = [
+                (v, e or (f"{field} excede {length} {label}"
+                          if _too_long(v, length, unit) else None))
+                for v, e in results
+            ]
+        columns[field] = results
+
+    valid, rejected = [], []
+    for i, (number, raw) in enumerate(batch):
+        errors = [columns[f][i][1] for f in FIELDS if columns[f][i][1]]
+        errors += [f"falta {f}" for f in REQUIRED if columns[f][i][0] is None and not columns[f][i][1]]
+        if errors:
+            rejected.append((number, raw, '; '.join(errors)))
+        else:
+            valid.append((number, {f: columns[f][i][0] for f in FIELDS}))
+    return valid, rejected
+
+
+# ============================================================================
+# IMPORTACIÓN
+# ============================================================================
+
+class RejectWriter:
+    """CSV de rechazos: fila, motivo y los valores de la fila."""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self.file = open(path, 'w', encoding='utf-8', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(('fila', 'motivo') + FIELDS)
+
+    def write(self, number, values, reason):
+        self.writer.writerow((number, reason) + tuple(values.get(f) for f in FIELDS))
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+
+def validated_batches(path, sheet, batch_size, limits, rejects, result):
+    """Lotes de filas válidas; las inválidas van directo a rejects."""
+    for batch in batches(read_rows(path, sheet), batch_size):
+        result['leidas'] += len(batch)
+        valid, rejected = normalize_batch(batch, limits)
+        for number, raw, reason in rejected:
+            rejects.write(number, raw, reason)
+        yield valid
+
+
+def import_pacientes(path, empresa_id, usuario_id, rejects_path=None, sheet=None,
+                     batch_size=DEFAULT_BATCH, dry_run=False, verbose=True):
+    """
+    Importa un archivo de pacientes a una empresa.
+
+    Returns:
+        dict: leidas, insertados, existentes, duplicados, rechazadas, rechazos (ruta)
+    """
+    rejects_path = rejects_path or str(Path(path).with_suffix('')) + '.rechazos.csv'
+    rejects = RejectWriter(rejects_path)
+    result = {'leidas': 0, 'insertados': 0, 'existentes': 0, 'duplicados': 0,
+              'rechazadas': 0, 'rechazos': rejects_path}
+    try:
+        stream = validated_batches(path, sheet, batch_size, column_limits(), rejects, result)
+        if dry_run:
+            for _ in stream:
+                pass
+        else:
+            with acquire() as conn:
+                _load_and_import(conn, stream, empresa_id, usuario_id, rejects, result, verbose)
+    finally:
+        rejects.close()
+
+    result['rechazadas'] = rejects.count
+    return result
+
+
+def _load_and_import(conn, stream, empresa_id, usuario_id, rejects, result, verbose):
+    ensure_schema(conn, pacientes_import_spec(), verbose=False)
+    ensure_packages(conn, ['PKG_CONTADORES', 'PKG_PACIENTES_IMPORT'], verbose=False)
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT SEQ_PACIENTES_IMPORT.NEXTVAL FROM DUAL")
+        import_id = cursor.fetchone()[0]
+
+        # Staging por lotes con array binds (sin commit: lo hace importar)
+        for valid in stream:
+            if valid:
+                rows = [(import_id, number) + tuple(v[f] for f in FIELDS) for number, v in valid]
+                loaded = execute_many(INSERT_STAGING, rows, batch_size=len(rows), cursor=cursor)
+                for (number, values), status in zip(valid, loaded['rows']):
+                    if status['error']:
+                        rejects.write(number, values, status['error'])
+            if verbose:
+                print(f"  {result['leidas']} filas leídas, {rejects.count} rechazadas")
+
+        # Alta set-based de todo el lote
+        out = {k: cursor.var(int) for k in ('insertados', 'existentes', 'duplicados')}
+        status, message = cursor.var(str), cursor.var(str)
+        cursor.callproc('PKG_PACIENTES_IMPORT.importar', [
+            import_id, empresa_id, usuario_id,
+            out['insertados'], out['existentes'], out['duplicados'], status, message,
+        ])
+        if status.getvalue() != 'SUCCESS':
+            raise RuntimeError(message.getvalue())
+        result.update({k: v.getvalue() for k, v in out.items()})
+        if verbose:
+            print(f"  [OK] {message.getvalue()}")
+
+        # Filas descartadas por la base (documento existente o repetido)
+        for row in iter_query(f"""
+                SELECT FILA, ESTADO, {', '.join(f.upper() for f in FIELDS)}
+                FROM ODO_PACIENTES_IMPORT
+                WHERE IMPORT_ID = :import_id AND ESTADO IN ('EXISTE', 'DUPLICADO')
+                ORDER BY FILA
+                """, {'import_id': import_id}, rows='dict', cursor=cursor):
+            reason = ('documento ya registrado en la empresa' if row['estado'] == 'EXISTE'
+                      else 'documento repetido en el archivo')
+            rejects.write(row['fila'], row, reason)
+
+        cursor.callproc('PKG_PACIENTES_IMPORT.limpiar', [import_id])
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa pacientes desde CSV o XLSX")
+    parser.add_argument('archivo', help="Archivo .csv o .xlsx con encabezados")
+    parser.add_argument('--empresa', type=int, required=True, help="EMPRESA_ID destino")
+    parser.add_argument('--usuario', type=int, required=True, help="USUARIO_ID que registra")
+    parser.add_argument('--hoja', help="Hoja del XLSX (default: la activa)")
+    parser.add_argument('--rechazos', help="CSV de rechazos (default: <archivo>.rechazos.csv)")
+    parser.add_argument('--batch', type=int, default=DEFAULT_BATCH, help="Filas por lote")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Solo validar y escribir rechazos, sin cargar")
+    args = parser.parse_args()
+
+    print(f"=== Importando pacientes de {args.archivo} (empresa {args.empresa}) ===")
+    started = time.perf_counter()
+    result = import_pacientes(args.archivo, args.empresa, args.usuario, args.rechazos,
+                              args.hoja, args.batch, args.dry_run)
+
+    print(f"\n  Leídas: {result['leidas']}  Insertadas: {result['insertados']}  "
+          f"Existentes: {result['existentes']}  Duplicadas: {result['duplicados']}  "
+          f"Rechazadas: {result['rechazadas']}  ({time.perf_counter() - started:.1f}s)")
+    if result['rechazadas']:
+        print(f"  Rechazos en {result['rechazos']}")
+
+
+if __name__ == '__main__':
+    main()
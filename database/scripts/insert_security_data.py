@@ -1,4 +1,4 @@
-from connect_db import get_connection
+from connect_db import get_connection, execute_many
 import sys
 
 def execute_dml(cursor, sql, description):
@@ -20,6 +20,23 @@ def execute_dml(cursor, sql, description):
             print(f"✗ Error en {description}: {e}")
             return False
 
+def execute_batch(cursor, sql, rows, describe):
+    """Execute a DML for many rows in one round trip per batch and report each row"""
+    result = execute_many(sql, rows, cursor=cursor)
+    success = True
+    for row, status in zip(rows, result['rows']):
+        description = describe(row)
+        if status['status'] == 'existe':
+            print(f"⊙ {description} (datos ya existen)")
+        elif status['status'] == 'error':
+            print(f"✗ Error en {description}: {status['error']}")
+            success = False
+        elif status['count'] > 0:
+            print(f"✓ {description} ({status['count']} filas)")
+        else:
+            print(f"⊙ {description} (sin cambios)")
+    return success
+
 def main():
     print("="*60)
     print("INSERTANDO DATOS INICIALES - MÓDULO DE SEGURIDAD")
@@ -54,11 +71,10 @@ def main():
             ("Configuraciones", "CONFIGURACIONES", "Configuraciones del sistema", "/configuraciones", "⚙️", 10)
         ]
         
-        for nombre, codigo, desc, ruta, icono, orden in programs:
-            execute_dml(cursor, f"""
-                INSERT INTO ODO_PROGRAMAS (NOMBRE, CODIGO, DESCRIPCION, RUTA_FRONTEND, ICONO, ORDEN, CREADO_POR)
-                VALUES ('{nombre}', '{codigo}', '{desc}', '{ruta}', '{icono}', {orden}, 1)
-            """, f"Programa {codigo}")
+        execute_batch(cursor, """
+            INSERT INTO ODO_PROGRAMAS (NOMBRE, CODIGO, DESCRIPCION, RUTA_FRONTEND, ICONO, ORDEN, CREADO_POR)
+            VALUES (:1, :2, :3, :4, :5, :6, 1)
+        """, programs, lambda row: f"Programa {row[1]}")
         
         # Sub-módulos de Configuraciones
         print("\n3. Insertando Sub-Módulos de Configuraciones...")
@@ -95,11 +111,10 @@ def main():
             ("Exportar datos", "EXPORTAR", "Permiso para exportar información")
         ]
         
-        for nombre, codigo, desc in general_perms:
-            execute_dml(cursor, f"""
-                INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, CREADO_POR)
-                VALUES ('{nombre}', '{codigo}', '{desc}', 1)
-            """, f"Permiso {codigo}")
+        execute_batch(cursor, """
+            INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, CREADO_POR)
+            VALUES (:1, :2, :3, 1)
+        """, general_perms, lambda row: f"Permiso {row[1]}")
         
         # 5. PERMISOS ESPECÍFICOS
         print("\n5. Insertando Permisos Específicos...")
@@ -114,12 +129,11 @@ def main():
             ("Ver todas las empresas", "EMPRESA_VER_TODAS", "Ver listado completo de empresas")
         ]
         
-        for nombre, codigo, desc in empresa_perms:
-            execute_dml(cursor, f"""
-                INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID, CREADO_POR)
-                SELECT '{nombre}', '{codigo}', '{desc}', PROGRAMA_ID, 1
-                FROM ODO_PROGRAMAS WHERE CODIGO = 'CONFIG_EMPRESAS'
-            """, f"Permiso {codigo}")
+        execute_batch(cursor, """
+            INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID, CREADO_POR)
+            SELECT :1, :2, :3, PROGRAMA_ID, 1
+            FROM ODO_PROGRAMAS WHERE CODIGO = 'CONFIG_EMPRESAS'
+        """, empresa_perms, lambda row: f"Permiso {row[1]}")
         
         # Facturación
         factura_perms = [
@@ -129,12 +143,11 @@ def main():
             ("Aplicar descuentos", "FACTURA_DESCUENTO", "Aplicar descuentos en facturas")
         ]
         
-        for nombre, codigo, desc in factura_perms:
-            execute_dml(cursor, f"""
-                INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID, CREADO_POR)
-                SELECT '{nombre}', '{codigo}', '{desc}', PROGRAMA_ID, 1
-                FROM ODO_PROGRAMAS WHERE CODIGO = 'FACTURACION'
-            """, f"Permiso {codigo}")
+        execute_batch(cursor, """
+            INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID, CREADO_POR)
+            SELECT :1, :2, :3, PROGRAMA_ID, 1
+            FROM ODO_PROGRAMAS WHERE CODIGO = 'FACTURACION'
+        """, factura_perms, lambda row: f"Permiso {row[1]}")
         
         # Caja
         caja_perms = [
@@ -145,12 +158,11 @@ def main():
             ("Ver arqueo de otras cajas", "CAJA_VER_TODAS", "Ver movimientos de todas las cajas")
         ]
         
-        for nombre, codigo, desc in caja_perms:
-            execute_dml(cursor, f"""
-                INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID, CREADO_POR)
-                SELECT '{nombre}', '{codigo}', '{desc}', PROGRAMA_ID, 1
-                FROM ODO_PROGRAMAS WHERE CODIGO = 'CAJA'
-            """, f"Permiso {codigo}")
+        execute_batch(cursor, """
+            INSERT INTO ODO_PERMISOS (NOMBRE, CODIGO, DESCRIPCION, PROGRAMA_ID, CREADO_POR)
+            SELECT :1, :2, :3, PROGRAMA_ID, 1
+            FROM ODO_PROGRAMAS WHERE CODIGO = 'CAJA'
+        """, caja_perms, lambda row: f"Permiso {row[1]}")
         
         conn.commit()
         print("\n¡Datos iniciales insertados con éxito!")
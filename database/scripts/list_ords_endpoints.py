@@ -1,26 +1,28 @@
-from connect_db import get_connection
+import sys
 
-conn = get_connection()
-cursor = conn.cursor()
+from catalog_snapshot import ensure_snapshot, query
+from connect_db import get_connection
 
 print("="*60)
 print("LISTANDO TODOS LOS ENDPOINTS ORDS DEL MÓDULO FACTURAS")
 print("="*60)
 
+# 1. Listar todos los templates (snapshot local; --refresh para actualizarlo)
+ensure_snapshot('--refresh' in sys.argv)
+print("\n1. Templates registrados:")
+templates = query("""
+    SELECT m.uri_prefix, t.uri_template
+    FROM user_ords_templates t JOIN user_ords_modules m ON m.id = t.module_id
+    ORDER BY t.uri_template
+""")
+print(f"\nTotal templates: {len(templates)}")
+for template in templates:
+    print(f"  - {template[0]}{template[1]}")
+
+conn = get_connection()
+cursor = conn.cursor()
+
 try:
-    # 1. Listar todos los templates del módulo facturas
-    print("\n1. Templates registrados:")
-    cursor.execute("""
-        SELECT uri_prefix, uri_template
-        FROM user_ords_templates
-        ORDER BY uri_template
-    """)
-    
-    templates = cursor.fetchall()
-    print(f"\nTotal templates: {len(templates)}")
-    for template in templates:
-        print(f"  - {template[0]}{template[1]}")
-    
     # 2. Verificar si existen datos en ODO_USUARIOS
     print("\n2. Verificando datos en ODO_USUARIOS:")
     cursor.execute("SELECT COUNT(*) FROM ODO_USUARIOS")
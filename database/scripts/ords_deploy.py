@@ -0,0 +1,735 @@
+#!/usr/bin/env python3
+"""
+Motor único de despliegue de endpoints ORDS.
+
+Los endpoints se describen en un manifiesto (módulo -> template -> handler ->
+fuente PL/SQL) y se despliegan en lote: todos los DEFINE_TEMPLATE van en un
+único bloque PL/SQL y los DEFINE_HANDLER se agrupan de a HANDLER_BATCH_SIZE
+por bloque, en lugar de un round trip + COMMIT por endpoint.
+
+El despliegue es incremental: se leen user_ords_modules/templates/handlers
+una sola vez, se compara un hash de la fuente y metadatos de cada handler
+con la definición local y solo se define, actualiza o elimina lo que
+cambió. Los templates existentes no se redefinen (DEFINE_TEMPLATE borra
+sus handlers), salvo que haya que quitarles un handler que ya no está en
+el manifiesto.
+
+Uso desde Python:
+    from ords_deploy import Manifest, deploy_manifest
+
+    manifest = Manifest()
+    manifest.add('odontologia', 'citas', 'GET', 'plsql/block', source, 'Listar citas')
+    manifest.add('odontologia', 'citas/:id', 'GET', 'plsql/block',
+                 source_file='handlers/citas_get.sql')
+
+    with acquire() as conn:
+        deploy_manifest(conn, manifest)
+
+Los packages de database/packages que usan las fuentes (p.ej.
+PKG_JSON_RESPONSE) se declaran con manifest.require_package() y se
+compilan antes de los handlers si no existen, están inválidos o su
+archivo cambió desde el último despliegue. Los esquemas de ensure_schema.py
+que necesitan (p.ej. índices) se declaran con manifest.require_schema() y
+se aseguran antes de los handlers.
+
+Uso desde línea de comandos (manifiesto JSON):
+    python3 ords_deploy.py manifiesto.json             # incremental
+    python3 ords_deploy.py manifiesto.json --dry-run   # solo mostrar el plan
+    python3 ords_deploy.py manifiesto.json --full      # redefinir todo
+    python3 ords_deploy.py manifiesto.json --parallel 4  # 4 sesiones en paralelo
+
+Formato JSON (source_file es relativo al manifiesto):
+    {
+      "packages": ["PKG_JSON_RESPONSE"],
+      "schemas": ["citas_fechas"],
+      "modules": [
+        {"name": "odontologia", "templates": [
+          {"pattern": "citas", "handlers": [
+            {"method": "GET", "source_type": "plsql/block",
+             "source_file": "citas/listar.sql", "items_per_page": 0,
+             "description": "Listar citas"}
+          ]}
+        ]}
+      ]
+    }
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import oracledb
+
+from apply_sql_changes import PACKAGES_DIR, apply_migration, ensure_ledger, file_checksum, load_ledger
+from connect_db import acquire, reserve_pool
+from ensure_schema import SPECS, SchemaSpec, ensure_schema
+
+# Handlers por bloque PL/SQL (cada uno usa 6 binds)
+HANDLER_BATCH_SIZE = 25
+
+# Fuentes más largas que esto se envían como CLOB (límite de VARCHAR2 en PL/SQL)
+MAX_VARCHAR_SOURCE = 32000
+
+# Identificador de cada round trip de define_handlers (compartido entre hilos)
+_batch_ids = itertools.count(1)
+
+
+def handler_hash(method, source_type, items_per_page, source):
+    """Hash de la fuente y metadatos de un handler (ignora espacios en los extremos)."""
+    items_per_page = None if items_per_page is None else int(items_per_page)
+    payload = json.dumps([method.upper(), source_type.lower(), items_per_page, (source or '').strip()])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class Module:
+    """Módulo ORDS; solo se define si todavía no existe."""
+    name: str
+    base_path: str
+    items_per_page: int = None
+    comments: str = None
+
+
+@dataclass
+class Handler:
+    """Un handler ORDS: método HTTP sobre un template de un módulo."""
+    module: str
+    pattern: str
+    method: str
+    source_type: str
+    source: str = None
+    source_file: str = None
+    items_per_page: int = 0
+    description: str = ''
+    base_dir: Path = field(default=None, repr=False)
+
+    @property
+    def key(self):
+        return (self.module, self.pattern, self.method.upper())
+
+    @property
+    def label(self):
+        return f"{self.method.upper()} /{self.module}/{self.pattern}"
+
+    @property
+    def content_hash(self):
+        return handler_hash(self.method, self.source_type, self.items_per_page, self.get_source())
+
+    def get_source(self):
+        """Retorna la fuente PL/SQL (inline o leída de source_file)."""
+        if self.source is not None:
+            return self.source
+        if not self.source_file:
+            raise ValueError(f"{self.label}: falta source o source_file")
+        path = Path(self.source_file)
+        if not path.is_absolute() and self.base_dir is not None:
+            path = self.base_dir / path
+        return path.read_text(encoding='utf-8')
+
+
+class Manifest:
+    """Colección ordenada de handlers ORDS a desplegar."""
+
+    def __init__(self):
+        self.handlers = []
+        self.modules = {}
+        self.packages = []
+        self.schemas = []
+
+    def define_module(self, name, base_path, items_per_page=None, comments=None):
+        """Declara un módulo para crearlo si no existe en la base."""
+        self.modules[name] = Module(name, base_path, items_per_page, comments)
+        return self.modules[name]
+
+    def require_package(self, name):
+        """Declara un package de database/packages que usan los handlers."""
+        name = name.upper()
+        if name not in self.packages:
+            self.packages.append(name)
+        return self
+
+    def require_schema(self, name):
+        """Declara un esquema registrado en ensure_schema.SPECS (tablas, índices)."""
+        if name not in SPECS:
+            raise ValueError(f"Esquema desconocido: {name}. Válidos: {', '.join(SPECS)}")
+        if name not in self.schemas:
+            self.schemas.append(name)
+        return self
+
+    def add(self, module, pattern, method, source_type, source=None, description='',
+            source_file=None, items_per_page=0, base_dir=None):
+        """
+        Registra un handler. Si ya existía uno para (módulo, patrón, método)
+        se reemplaza.
+
+        Returns:
+            Handler: El handler registrado
+        """
+        handler = Handler(module, pattern, method.upper(), source_type, source, source_file,
+                          items_per_page, description, base_dir)
+        self.handlers = [h for h in self.handlers if h.key != handler.key]
+        self.handlers.append(handler)
+        return handler
+
+    def templates(self):
+        """Lista única de (módulo, patrón) en orden de aparición."""
+        seen = []
+        for h in self.handlers:
+            if (h.module, h.pattern) not in seen:
+                seen.append((h.module, h.pattern))
+        return seen
+
+    def __len__(self):
+        return len(self.handlers)
+
+    def __iter__(self):
+        return iter(self.handlers)
+
+    @classmethod
+    def from_json(cls, path):
+        """
+        Carga un manifiesto JSON (ver formato en el docstring del módulo).
+
+        Args:
+            path (str | Path): Ruta al manifiesto
+
+        Returns:
+            Manifest: Manifiesto cargado
+        """
+        path = Path(path)
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+
+        manifest = cls()
+        for name in data.get('packages', []):
+            manifest.require_package(name)
+        for name in data.get('schemas', []):
+            manifest.require_schema(name)
+        for module in data.get('modules', []):
+            if module.get('base_path'):
+                manifest.define_module(module['name'], module['base_path'],
+                                       module.get('items_per_page'), module.get('comments'))
+            for template in module.get('templates', []):
+                for h in template.get('handlers', []):
+                    manifest.add(
+                        module['name'], template['pattern'], h['method'], h['source_type'],
+                        source=h.get('source'),
+                        description=h.get('description', ''),
+                        source_file=h.get('source_file'),
+                        items_per_page=h.get('items_per_page'),
+                        base_dir=path.parent,
+                    )
+        return manifest
+
+
+@dataclass
+class DeployPlan:
+    """Diferencias entre el manifiesto local y lo desplegado en ORDS."""
+    new_modules: list = field(default_factory=list)
+    new_templates: list = field(default_factory=list)
+    rebuild_templates: list = field(default_factory=list)
+    delete_templates: list = field(default_factory=list)
+    stale_handlers: list = field(default_factory=list)
+    create: list = field(default_factory=list)
+    update: list = field(default_factory=list)
+    unchanged: list = field(default_factory=list)
+
+    @property
+    def templates_to_define(self):
+        return self.new_templates + self.rebuild_templates
+
+    @property
+    def handlers_to_define(self):
+        return self.create + self.update
+
+    def is_empty(self):
+        return not (self.new_modules or self.templates_to_define or self.delete_templates
+                    or self.handlers_to_define)
+
+    def print(self):
+        for module in self.new_modules:
+            print(f"  [+] módulo {module.name} ({module.base_path})")
+        for module, pattern in self.delete_templates:
+            print(f"  [-] template /{module}/{pattern}")
+        for module, pattern, method in self.stale_handlers:
+            print(f"  [-] {method} /{module}/{pattern}")
+        for module, pattern in self.rebuild_templates:
+            print(f"  [~] template /{module}/{pattern} (se redefine para quitar handlers)")
+        for h in self.create:
+            print(f"  [+] {h.label}")
+        for h in self.update:
+            print(f"  [~] {h.label}")
+        print(f"  [=] {len(self.unchanged)} handlers sin cambios")
+
+
+def _lobs_as_strings(cursor, name, default_type, size, precision, scale):
+    """outputtypehandler: trae los CLOB como str en el mismo fetch."""
+    if default_type == oracledb.DB_TYPE_CLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG, arraysize=cursor.arraysize)
+
+
+def fetch_remote_state(cursor, module_names):
+    """
+    Lee módulos, templates y handlers ORDS de los módulos indicados en una
+    sola consulta.
+
+    Returns:
+        tuple: (módulos existentes, templates existentes, {clave handler: hash})
+    """
+    module_names = sorted(set(module_names))
+    if not module_names:
+        return set(), set(), {}
+
+    binds = {f'n{i}': name for i, name in enumerate(module_names)}
+    placeholders = ', '.join(f':{k}' for k in binds)
+    cursor.outputtypehandler = _lobs_as_strings
+    try:
+        cursor.execute(f"""
+            SELECT m.name, t.uri_template, h.method, h.source_type, h.items_per_page, h.source
+            FROM user_ords_modules m
+            LEFT JOIN user_ords_templates t ON t.module_id = m.id
+            LEFT JOIN user_ords_handlers h ON h.template_id = t.id
+            WHERE m.name IN ({placeholders})
+        """, binds)
+        rows = cursor.fetchall()
+    finally:
+        cursor.outputtypehandler = None
+
+    modules, templates, handlers = set(), set(), {}
+    for module, pattern, method, source_type, items_per_page, source in rows:
+        modules.add(module)
+        if pattern is not None:
+            templates.add((module, pattern))
+        if method is not None:
+            handlers[(module, pattern, method.upper())] = handler_hash(
+                method, source_type, items_per_page, source)
+    return modules, templates, handlers
+
+
+def plan_deployment(cursor, manifest, prune_modules=False):
+    """
+    Calcula qué hay que definir, actualizar o eliminar.
+
+    Los handlers remotos que no están en el manifiesto se eliminan solo si su
+    template figura en el manifiesto (el template se redefine con los
+    handlers locales). Con prune_modules=True también se eliminan los
+    templates remotos de los módulos del manifiesto que no figuran en él.
+
+    Returns:
+        DeployPlan: Plan de despliegue
+    """
+    module_names = {h.module for h in manifest} | set(manifest.modules)
+    remote_modules, remote_templates, remote_handlers = fetch_remote_state(cursor, module_names)
+
+    plan = DeployPlan()
+    plan.new_modules = [m for name, m in manifest.modules.items() if name not in remote_modules]
+
+    local_templates = manifest.templates()
+    local_keys = {h.key for h in manifest}
+
+    for module, pattern, method in sorted(remote_handlers):
+        if (module, pattern) in local_templates and (module, pattern, method) not in local_keys:
+            plan.stale_handlers.append((module, pattern, method))
+
+    plan.rebuild_templates = sorted({(m, p) for m, p, _ in plan.stale_handlers})
+    plan.new_templates = [t for t in local_templates if t not in remote_templates]
+
+    if prune_modules:
+        plan.delete_templates = sorted(t for t in remote_templates
+                                       if t[0] in module_names and t not in local_templates)
+
+    for h in manifest:
+        remote_hash = remote_handlers.get(h.key)
+        if (h.module, h.pattern) in plan.rebuild_templates or remote_hash is None:
+            plan.create.append(h)
+        elif remote_hash != h.content_hash:
+            plan.update.append(h)
+        else:
+            plan.unchanged.append(h)
+
+    return plan
+
+
+def full_plan(manifest):
+    """Plan que redefine todos los templates y handlers (sin comparar)."""
+    return DeployPlan(new_modules=list(manifest.modules.values()),
+                      new_templates=manifest.templates(),
+                      create=list(manifest))
+
+
+def _define_modules_block(modules):
+    """Arma un único bloque PL/SQL con un DEFINE_MODULE por módulo nuevo."""
+    calls = []
+    binds = {}
+    for i, m in enumerate(modules):
+        calls.append(
+            f"    ORDS.DEFINE_MODULE(p_module_name => :m{i}, p_base_path => :b{i}, "
+            f"p_items_per_page => :n{i}, p_status => 'PUBLISHED', p_comments => :c{i});"
+        )
+        binds.update({f'm{i}': m.name, f'b{i}': m.base_path,
+                      f'n{i}': m.items_per_page, f'c{i}': m.comments})
+    return "BEGIN\n" + "\n".join(calls) + "\n    COMMIT;\nEND;", binds
+
+
+def _delete_templates_block(templates):
+    """Arma un único bloque PL/SQL con un DELETE_TEMPLATE por template."""
+    calls = []
+    binds = {}
+    for i, (module, pattern) in enumerate(templates):
+        calls.append(f"    ORDS.DELETE_TEMPLATE(p_module_name => :m{i}, p_pattern => :p{i});")
+        binds[f'm{i}'] = module
+        binds[f'p{i}'] = pattern
+    return "BEGIN\n" + "\n".join(calls) + "\n    COMMIT;\nEND;", binds
+
+
+def _define_templates_block(templates):
+    """Arma un único bloque PL/SQL con un DEFINE_TEMPLATE por patrón."""
+    calls = []
+    binds = {}
+    for i, (module, pattern) in enumerate(templates):
+        calls.append(f"    ORDS.DEFINE_TEMPLATE(p_module_name => :m{i}, p_pattern => :p{i});")
+        binds[f'm{i}'] = module
+        binds[f'p{i}'] = pattern
+    return "BEGIN\n" + "\n".join(calls) + "\n    COMMIT;\nEND;", binds
+
+
+def _define_handlers_block(handlers):
+    """Arma un único bloque PL/SQL con un DEFINE_HANDLER por handler."""
+    calls = []
+    binds = {}
+    clobs = {}
+    for i, h in enumerate(handlers):
+        calls.append(
+            f"    ORDS.DEFINE_HANDLER(p_module_name => :m{i}, p_pattern => :p{i}, "
+            f"p_method => :x{i}, p_source_type => :t{i}, p_source => :s{i}, "
+            f"p_items_per_page => :n{i});"
+        )
+        source = h.get_source()
+        binds.update({
+            f'm{i}': h.module,
+            f'p{i}': h.pattern,
+            f'x{i}': h.method,
+            f't{i}': h.source_type,
+            f's{i}': source,
+            f'n{i}': h.items_per_page,
+        })
+        if len(source) > MAX_VARCHAR_SOURCE:
+            clobs[f's{i}'] = oracledb.DB_TYPE_CLOB
+    return "BEGIN\n" + "\n".join(calls) + "\n    COMMIT;\nEND;", binds, clobs
+
+
+def _execute_block(cursor, sql, binds, clobs=None):
+    if clobs:
+        cursor.setinputsizes(**clobs)
+    cursor.execute(sql, binds)
+
+
+def define_templates(cursor, templates):
+    """Define todos los templates en un solo round trip."""
+    if templates:
+        sql, binds = _define_templates_block(templates)
+        _execute_block(cursor, sql, binds)
+
+
+@dataclass
+class HandlerResult:
+    """
+    Resultado del despliegue de un handler.
+
+    elapsed es el tiempo del round trip (batch) en que se definió, común a
+    los batch_size handlers de ese bloque: no es el costo de este handler.
+    """
+    handler: Handler
+    error: str = None
+    elapsed: float = 0.0
+    batch: int = None
+    batch_size: int = 1
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def print(self):
+        if self.ok:
+            timing = f"{self.elapsed * 1000:.0f} ms"
+            if self.batch_size > 1:
+                timing += f" en bloque de {self.batch_size}"
+            print(f"  [OK] {self.handler.label} - {self.handler.description} ({timing})")
+        else:
+            print(f"  [ERROR] {self.handler.label}: {self.error}")
+
+
+def define_handlers(cursor, handlers, batch_size=HANDLER_BATCH_SIZE, verbose=True):
+    """
+    Define handlers en bloques de batch_size por round trip.
+
+    Si un bloque falla, sus handlers se reintentan de a uno para identificar
+    cuál produjo el error (el bloque fallido no deja cambios aplicados).
+    Cada resultado lleva el tiempo y el número del round trip en el que se
+    definió su handler.
+
+    Returns:
+        list: HandlerResult de cada handler
+    """
+    results = []
+    for start in range(0, len(handlers), batch_size):
+        batch = handlers[start:start + batch_size]
+        batch_id = next(_batch_ids)
+        started = time.perf_counter()
+        try:
+            sql, binds, clobs = _define_handlers_block(batch)
+            _execute_block(cursor, sql, binds, clobs)
+            elapsed = time.perf_counter() - started
+            batch_results = [HandlerResult(h, None, elapsed, batch_id, len(batch)) for h in batch]
+        except Exception as batch_error:
+            if len(batch) == 1:
+                batch_results = [HandlerResult(batch[0], str(batch_error),
+                                               time.perf_counter() - started, batch_id)]
+            else:
+                batch_results = []
+                for h in batch:
+                    batch_results.extend(define_handlers(cursor, [h], 1, verbose=False))
+
+        if verbose:
+            for result in batch_results:
+                result.print()
+        results.extend(batch_results)
+    return results
+
+
+def _prepare_templates(conn, plan, verbose):
+    """Módulos nuevos, templates a eliminar y templates a (re)definir."""
+    cursor = conn.cursor()
+    try:
+        if plan.new_modules:
+            _execute_block(cursor, *_define_modules_block(plan.new_modules))
+        if plan.delete_templates:
+            _execute_block(cursor, *_delete_templates_block(plan.delete_templates))
+        define_templates(cursor, plan.templates_to_define)
+        if verbose and plan.templates_to_define:
+            print(f"  [OK] {len(plan.templates_to_define)} templates definidos")
+    finally:
+        cursor.close()
+
+
+def execute_plan(conn, plan, batch_size=HANDLER_BATCH_SIZE, verbose=True):
+    """
+    Aplica un plan: módulos nuevos, templates a eliminar, templates a
+    (re)definir y por último handlers nuevos o modificados.
+
+    Returns:
+        list: HandlerResult de cada handler
+    """
+    _prepare_templates(conn, plan, verbose)
+    cursor = conn.cursor()
+    try:
+        return define_handlers(cursor, plan.handlers_to_define, batch_size, verbose)
+    finally:
+        cursor.close()
+
+
+def execute_plan_parallel(conn, plan, workers, batch_size=HANDLER_BATCH_SIZE, verbose=True):
+    """
+    Aplica un plan repartiendo los templates entre varias sesiones del pool.
+
+    Los módulos y templates se definen primero sobre conn; luego los
+    handlers de cada template se despliegan juntos en un hilo, con una
+    sesión propia del pool por hilo (el pool se amplía a workers + 1
+    sesiones, contando la de conn). Los resultados se imprimen al final
+    en el orden del manifiesto.
+
+    Returns:
+        list: HandlerResult de cada handler
+    """
+    _prepare_templates(conn, plan, verbose)
+    reserve_pool(workers + 1)
+
+    groups = {}
+    for h in plan.handlers_to_define:
+        groups.setdefault((h.module, h.pattern), []).append(h)
+
+    def deploy_group(handlers):
+        with acquire() as worker_conn:
+            cursor = worker_conn.cursor()
+            try:
+                return define_handlers(cursor, handlers, batch_size, verbose=False)
+            finally:
+                cursor.close()
+
+    by_key = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(deploy_group, handlers): handlers
+                   for handlers in groups.values()}
+        for future in as_completed(futures):
+            try:
+                group_results = future.result()
+            except Exception as e:
+                # No se pudo obtener sesión: todo el grupo falla
+                group_results = [HandlerResult(h, str(e)) for h in futures[future]]
+            for result in group_results:
+                by_key[result.handler.key] = result
+
+    results = [by_key[h.key] for h in plan.handlers_to_define]
+    if verbose:
+        for result in results:
+            result.print()
+    return results
+
+
+def ensure_packages(conn, names, verbose=True):
+    """
+    Compila los packages de database/packages/<NOMBRE>.sql que falten, estén
+    inválidos o cuyo archivo cambió desde la última vez que se aplicó (según
+    el checksum registrado en el ledger de apply_sql_changes).
+
+    Returns:
+        list: Nombres de los packages compilados
+    """
+    names = [n.upper() for n in names]
+    cursor = conn.cursor()
+    try:
+        ensure_ledger(cursor)
+        applied = load_ledger(cursor)
+        binds = {f"n{i}": n for i, n in enumerate(names)}
+        cursor.execute(f"""
+            SELECT object_name, MIN(status)
+            FROM user_objects
+            WHERE object_type IN ('PACKAGE', 'PACKAGE BODY')
+              AND object_name IN ({', '.join(':' + b for b in binds)})
+            GROUP BY object_name
+        """, binds)
+        status = dict(cursor.fetchall())
+    finally:
+        cursor.close()
+
+    compiled = []
+    for name in names:
+        path = PACKAGES_DIR / f"{name}.sql"
+        checksum = file_checksum(path)
+        if status.get(name) == 'VALID' and applied.get(path.name) == checksum:
+            continue
+        apply_migration(conn, path, checksum)
+        compiled.append(name)
+    if verbose and not compiled:
+        print(f"  [--] Packages al día: {', '.join(names)}")
+    return compiled
+
+
+def deploy_manifest(conn, manifest, batch_size=HANDLER_BATCH_SIZE, verbose=True,
+                    incremental=True, prune_modules=False, dry_run=False, parallel=0):
+    """
+    Despliega un manifiesto.
+
+    En modo incremental solo se tocan los handlers cuyo hash difiere de lo
+    desplegado; con incremental=False se redefine todo (DEFINE_TEMPLATE
+    reemplaza el template y sus handlers, por lo que el manifiesto debe
+    incluir todos los handlers de cada template).
+
+    Args:
+        conn (oracledb.Connection): Conexión a usar
+        manifest (Manifest): Endpoints a desplegar
+        batch_size (int): Handlers por bloque PL/SQL
+        verbose (bool): Imprimir el plan y el resultado de cada handler
+        incremental (bool): Comparar con lo desplegado antes de aplicar
+        prune_modules (bool): Eliminar templates remotos que no están en el manifiesto
+        dry_run (bool): Solo calcular (e imprimir) el plan
+        parallel (int): Si es > 1, cantidad de sesiones del pool en paralelo
+
+    Returns:
+        list: HandlerResult de cada handler
+    """
+    if incremental:
+        cursor = conn.cursor()
+        try:
+            plan = plan_deployment(cursor, manifest, prune_modules)
+        finally:
+            cursor.close()
+    else:
+        plan = full_plan(manifest)
+
+    if verbose:
+        plan.print()
+
+    if dry_run:
+        return []
+    if manifest.schemas:
+        spec = SchemaSpec()
+        for name in manifest.schemas:
+            spec.merge(SPECS[name]())
+        ensure_schema(conn, spec, verbose=verbose)
+    if manifest.packages:
+        ensure_packages(conn, manifest.packages, verbose)
+    if plan.is_empty():
+        return []
+
+    if parallel > 1:
+        return execute_plan_parallel(conn, plan, parallel, batch_size, verbose)
+    return execute_plan(conn, plan, batch_size, verbose)
+
+
+def print_summary(results, slowest=5):
+    """
+    Imprime el resumen final de un despliegue: handlers fallidos y los
+    round trips más lentos (el tiempo se mide por bloque, no por handler).
+
+    Returns:
+        bool: True si todos los handlers se desplegaron bien
+    """
+    failed = [r for r in results if not r.ok]
+    print(f"\n  Handlers desplegados: {len(results) - len(failed)}/{len(results)}")
+    if results and slowest:
+        batches = {}
+        for r in results:
+            batches.setdefault(r.batch if r.batch is not None else id(r), []).append(r)
+        print("  Round trips más lentos:")
+        for group in sorted(batches.values(), key=lambda g: g[0].elapsed, reverse=True)[:slowest]:
+            others = f" (+{len(group) - 1} handlers)" if len(group) > 1 else ""
+            print(f"    {group[0].elapsed * 1000:8.0f} ms  {group[0].handler.label}{others}")
+    for r in failed:
+        print(f"  [FAIL] {r.handler.label}: {r.error}")
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Despliega endpoints ORDS desde un manifiesto JSON")
+    parser.add_argument('manifests', nargs='+', help="Manifiestos JSON")
+    parser.add_argument('--batch-size', type=int, default=HANDLER_BATCH_SIZE,
+                        help="Handlers por bloque PL/SQL")
+    parser.add_argument('--full', action='store_true',
+                        help="Redefinir todo sin comparar con lo desplegado")
+    parser.add_argument('--prune', action='store_true',
+                        help="Eliminar templates de los módulos que no están en el manifiesto")
+    parser.add_argument('--dry-run', action='store_true', help="Solo mostrar el plan")
+    parser.add_argument('--parallel', type=int, default=0, metavar='N',
+                        help="Desplegar templates en N sesiones del pool en paralelo")
+    args = parser.parse_args()
+
+    manifest = Manifest()
+    for path in args.manifests:
+        loaded = Manifest.from_json(path)
+        manifest.modules.update(loaded.modules)
+        for name in loaded.packages:
+            manifest.require_package(name)
+        for name in loaded.schemas:
+            manifest.require_schema(name)
+        for h in loaded:
+            manifest.add(h.module, h.pattern, h.method, h.source_type, h.source, h.description,
+                         h.source_file, h.items_per_page, h.base_dir)
+
+    print(f"=== Desplegando {len(manifest)} handlers ORDS ===")
+    with acquire() as conn:
+        results = deploy_manifest(conn, manifest, args.batch_size, incremental=not args.full,
+                                  prune_modules=args.prune, dry_run=args.dry_run,
+                                  parallel=args.parallel)
+
+    sys.exit(0 if print_summary(results) else 1)
+
+
+if __name__ == '__main__':
+    main()
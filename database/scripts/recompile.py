@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Recompilación de packages PL/SQL en orden de dependencias y en paralelo.
+
+Lee user_objects y user_dependencies una sola vez, arma el grafo entre
+las specs de los packages (PKG_% por defecto) y las compila por oleadas:
+cada oleada contiene specs cuyas dependencias ya se compilaron, y sus
+objetos se compilan en paralelo, cada uno en una sesión del pool. Los
+bodies dependen solo de specs, así que van todos juntos en la última
+oleada. Al final se leen todos los errores de user_errors en una consulta.
+
+Uso:
+    python3 recompile.py                  # solo objetos inválidos PKG_%
+    python3 recompile.py --all            # recompilar todos
+    python3 recompile.py --pattern 'PKG_F%' --workers 2
+    python3 recompile.py --errors         # solo listar errores
+
+Desde Python:
+    from recompile import recompile_packages, print_errors
+    result = recompile_packages(conn)
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+from connect_db import acquire, get_connection, reserve_pool
+
+DEFAULT_PATTERN = 'PKG_%'
+DEFAULT_WORKERS = 3
+
+SPEC = 'PACKAGE'
+BODY = 'PACKAGE BODY'
+
+COMPILE_SQL = {
+    SPEC: "ALTER PACKAGE {name} COMPILE SPECIFICATION",
+    BODY: "ALTER PACKAGE {name} COMPILE BODY",
+}
+
+
+@dataclass
+class RecompileResult:
+    """Estado final de una recompilación."""
+    waves: list = field(default_factory=list)
+    status: dict = field(default_factory=dict)      # (name, type) -> VALID/INVALID
+    errors: list = field(default_factory=list)      # filas de user_errors
+    failures: dict = field(default_factory=dict)    # (name, type) -> excepción del ALTER
+    elapsed: float = 0.0
+
+    @property
+    def invalid(self):
+        return sorted(k for k, v in self.status.items() if v != 'VALID')
+
+    def is_valid(self, name):
+        """True si spec y body (si existe) del package están VALID."""
+        states = [v for (n, _), v in self.status.items() if n == name.upper()]
+        return bool(states) and all(v == 'VALID' for v in states)
+
+
+def load_packages(cursor, pattern=DEFAULT_PATTERN):
+    """Devuelve {(name, type): status} de specs y bodies que cumplen pattern."""
+    cursor.execute("""
+        SELECT object_name, object_type, status
+        FROM user_objects
+        WHERE object_type IN ('PACKAGE', 'PACKAGE BODY')
+          AND object_name LIKE :pattern
+    """, pattern=pattern)
+    return {(name, otype): status for name, otype, status in cursor.fetchall()}
+
+
+def load_dependencies(cursor, pattern=DEFAULT_PATTERN):
+    """
+    Lee user_dependencies una sola vez.
+
+    Returns:
+        dict: {package: set(packages cuya spec referencia)} para las specs
+    """
+    cursor.execute("""
+        SELECT DISTINCT name, referenced_name
+        FROM user_dependencies
+        WHERE type = 'PACKAGE'
+          AND referenced_type = 'PACKAGE'
+          AND referenced_owner = USER
+          AND name LIKE :pattern
+          AND referenced_name LIKE :pattern
+          AND name <> referenced_name
+    """, pattern=pattern)
+    graph = {}
+    for name, referenced in cursor.fetchall():
+        graph.setdefault(name, set()).add(referenced)
+    return graph
+
+
+def plan_waves(objects, graph):
+    """
+    Agrupa los objetos a compilar en oleadas independientes.
+
+    Args:
+        objects: Iterable de (name, type) a compilar
+        graph: Dependencias entre specs (load_dependencies)
+
+    Returns:
+        list: Lista de oleadas; cada oleada es una lista de (name, type)
+    """
+    specs = {name for name, otype in objects if otype == SPEC}
+    bodies = sorted((name, otype) for name, otype in objects if otype == BODY)
+
+    remaining = {name: graph.get(name, set()) & specs for name in specs}
+    waves = []
+    while remaining:
+        ready = sorted(name for name, deps in remaining.items() if not deps)
+        if not ready:
+            # Ciclo (no debería darse entre specs): compilar el resto junto
+            ready = sorted(remaining)
+        waves.append([(name, SPEC) for name in ready])
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+    if bodies:
+        waves.append(bodies)
+    return waves
+
+
+def _compile(name, otype):
+    with acquire() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(COMPILE_SQL[otype].format(name=name))
+        finally:
+            cursor.close()
+
+
+def compile_wave(wave, workers=DEFAULT_WORKERS):
+    """
+    Compila una oleada en paralelo.
+
+    Returns:
+        dict: {(name, type): excepción} de los ALTER que fallaron
+    """
+    failures = {}
+    if len(wave) == 1 or workers <= 1:
+        for obj in wave:
+            try:
+                _compile(*obj)
+            except Exception as e:
+                failures[obj] = e
+        return failures
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(wave))) as executor:
+        futures = {executor.submit(_compile, *obj): obj for obj in wave}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                failures[futures[future]] = e
+    return failures
+
+
+def fetch_errors(cursor, pattern=DEFAULT_PATTERN, names=None):
+    """
+    Todos los errores de compilación en una sola consulta.
+
+    Args:
+        pattern: Filtro LIKE sobre el nombre
+        names: Lista opcional de nombres exactos (tiene prioridad sobre pattern)
+
+    Returns:
+        list: Tuplas (name, type, line, position, text)
+    """
+    if names:
+        binds = {f"n{i}": n.upper() for i, n in enumerate(names)}
+        where = "name IN (" + ", ".join(f":{b}" for b in binds) + ")"
+    else:
+        binds = {'pattern': pattern}
+        where = "name LIKE :pattern"
+    cursor.execute(f"""
+        SELECT name, type, line, position, text
+        FROM user_errors
+        WHERE {where}
+        ORDER BY name, type, sequence
+    """, binds)
+    return cursor.fetchall()
+
+
+def print_errors(errors):
+    if not errors:
+        print("  Sin errores en user_errors.")
+        return
+    current = None
+    for name, otype, line, pos, text in errors:
+        if (name, otype) != current:
+            current = (name, otype)
+            print(f"\n  {name} ({otype})")
+        print(f"    Línea {line}, Pos {pos}: {text.strip()}")
+
+
+def recompile_packages(conn, pattern=DEFAULT_PATTERN, only_invalid=True,
+                       workers=DEFAULT_WORKERS, verbose=True):
+    """
+    Recompila los packages que cumplen pattern en orden de dependencias.
+
+    Args:
+        conn: Conexión para las consultas al diccionario (los ALTER usan el pool)
+        pattern: Filtro LIKE de nombres de package
+        only_invalid: Compilar solo objetos no VALID
+        workers: Sesiones en paralelo por oleada
+
+    Returns:
+        RecompileResult
+    """
+    started = time.perf_counter()
+    result = RecompileResult()
+    cursor = conn.cursor()
+    try:
+        status = load_packages(cursor, pattern)
+        targets = [obj for obj, st in status.items()
+                   if not only_invalid or st != 'VALID']
+        if not targets:
+            if verbose:
+                print("  Todos los packages están VALID.")
+            result.status = status
+            return result
+
+        waves = plan_waves(targets, load_dependencies(cursor, pattern))
+        if workers > 1:
+            # conn ya ocupa una sesión del pool; los ALTER usan workers más
+            reserve_pool(workers + 1)
+        if only_invalid:
+            # compilar specs puede invalidar bodies que estaban VALID: la
+            # oleada de bodies se arma después, con el estado actualizado
+            waves = [w for w in waves if w[0][1] == SPEC] + [None]
+
+        for i, wave in enumerate(waves, 1):
+            if wave is None:
+                wave = sorted(obj for obj, st in load_packages(cursor, pattern).items()
+                              if obj[1] == BODY and st != 'VALID')
+                if not wave:
+                    continue
+            result.waves.append(wave)
+            wave_started = time.perf_counter()
+            failures = compile_wave(wave, workers)
+            result.failures.update(failures)
+            if verbose:
+                names = ", ".join(f"{n}{' BODY' if t == BODY else ''}" for n, t in wave)
+                print(f"  Oleada {i} ({len(wave)} objetos, "
+                      f"{time.perf_counter() - wave_started:.1f}s): {names}")
+                for (name, otype), e in failures.items():
+                    print(f"    [WARN] {name} ({otype}): {e}")
+
+        result.status = load_packages(cursor, pattern)
+        if result.invalid:
+            result.errors = fetch_errors(cursor, pattern)
+    finally:
+        cursor.close()
+
+    result.elapsed = time.perf_counter() - started
+    if verbose:
+        for name, otype in result.invalid:
+            print(f"  [FAIL] {name} ({otype}): {result.status[(name, otype)]}")
+        print(f"  {len(status) - len(result.invalid)}/{len(status)} objetos VALID "
+              f"({result.elapsed:.1f}s)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompila packages PL/SQL por dependencias")
+    parser.add_argument('--pattern', default=DEFAULT_PATTERN,
+                        help="Filtro LIKE de nombres (default: PKG_%%)")
+    parser.add_argument('--all', action='store_true', help="Recompilar también los VALID")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="Sesiones en paralelo por oleada")
+    parser.add_argument('--errors', action='store_true',
+                        help="Solo listar user_errors, sin recompilar")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        if args.errors:
+            cursor = conn.cursor()
+            print_errors(fetch_errors(cursor, args.pattern))
+            cursor.close()
+            return
+
+        print(f"=== Recompilando {args.pattern} ===")
+        result = recompile_packages(conn, args.pattern, not args.all, args.workers)
+        if result.invalid:
+            print_errors(result.errors)
+            sys.exit(1)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
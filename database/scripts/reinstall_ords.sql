@@ -44,12 +44,28 @@ BEGIN
                              p_cursor     => :cursor,
                              p_total      => :total,
                              p_status     => :status,
-                             p_message    => :message
+                             p_message    => :message,
+                             p_token      => :next,
+                             p_next_token => :next_token,
+                             p_incluir_total => :incluir_total
                            ); 
                          END;',
     p_items_per_page => 0
   );
 
+  -- Token de la página siguiente: se devuelve como "next" y el cliente lo
+  -- reenvía como ?next=
+  ORDS.define_parameter(
+    p_module_name        => 'odontologia',
+    p_pattern            => 'pacientes',
+    p_method             => 'GET',
+    p_name               => 'next',
+    p_bind_variable_name => 'next_token',
+    p_source_type        => 'RESPONSE',
+    p_param_type         => 'STRING',
+    p_access_method      => 'OUT'
+  );
+
   -- 4. Template: Detalle Paciente (GET /pacientes/:id)
   ORDS.define_template(
    p_module_name    => 'odontologia',
@@ -88,15 +104,30 @@ BEGIN
                            PKG_PACIENTES.search_pacientes(
                              p_empresa_id  => :empresa_id,
                              p_search_term => :q,
+                             p_limit       => :limit,
                              p_cursor      => :cursor,
                              p_total       => :total,
                              p_status      => :status,
-                             p_message     => :message
+                             p_message     => :message,
+                             p_token       => :next,
+                             p_next_token  => :next_token,
+                             p_incluir_total => :incluir_total
                            ); 
                          END;',
     p_items_per_page => 0
   );
 
+  ORDS.define_parameter(
+    p_module_name        => 'odontologia',
+    p_pattern            => 'pacientes/search',
+    p_method             => 'GET',
+    p_name               => 'next',
+    p_bind_variable_name => 'next_token',
+    p_source_type        => 'RESPONSE',
+    p_param_type         => 'STRING',
+    p_access_method      => 'OUT'
+  );
+
   -- Parametros Implícitos de ORDS (Cargar Bind Variables)
   -- NOTA: ORDS mapea automáticamente parámetros de la URL (:empresa_id, :id, etc)
   -- Pero el cursor de salida DEBE llamarse 'cursor' para que ORDS lo convierta a JSON.
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Tokenizador de scripts SQL*Plus para ejecutarlos desde python-oracledb.
+
+Reconoce literales ('...', q'[...]', "IDENT"), comentarios (-- y /* */),
+bloques PL/SQL (BEGIN/DECLARE y CREATE [OR REPLACE] PACKAGE/PACKAGE BODY/
+PROCEDURE/FUNCTION/TRIGGER/TYPE) y directivas SQL*Plus (PROMPT, SET,
+SHOW ERRORS, @archivo, EXEC, WHENEVER...).
+
+Reglas de corte (las mismas que SQL*Plus):
+  - SQL simple: termina en ';' fuera de literales/comentarios, o en '/'
+    solo en una línea. El ';' no se envía a la base.
+  - PL/SQL: termina en '/' solo en una línea. Si falta la '/', un nuevo
+    CREATE al inicio de línea después de 'END xxx;' también corta
+    (spec y body de un package en el mismo archivo).
+  - WITH FUNCTION/PROCEDURE (PL/SQL dentro de una consulta): como en
+    SQL*Plus termina solo en '/'; se quita el ';' final de la consulta.
+
+Los statements se generan a medida que se leen las líneas, así que un
+archivo de varios MB nunca se carga entero en memoria:
+
+    from sql_script import read_script
+
+    for stmt in read_script('06_compras_schema.sql'):
+        print(stmt.line, stmt.kind, stmt.text[:40])
+"""
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+SQL = 'sql'
+PLSQL = 'plsql'
+SQLPLUS = 'sqlplus'
+
+# Primeras palabras de un bloque que SQL*Plus ejecuta como PL/SQL
+PLSQL_START = re.compile(
+    r"^(BEGIN|DECLARE)\b"
+    r"|^WITH\s+(FUNCTION|PROCEDURE)\b"
+    r"|^CREATE\s+(OR\s+REPLACE\s+)?((NON)?EDITIONABLE\s+)?"
+    r"(PACKAGE|PROCEDURE|FUNCTION|TRIGGER|TYPE|LIBRARY)\b"
+)
+
+# Comandos SQL*Plus (solo al inicio de un statement)
+SQLPLUS_COMMANDS = {
+    'PROMPT', 'PRO', 'REM', 'REMARK', 'SET', 'SHOW', 'SHO', 'SPOOL',
+    'WHENEVER', 'EXIT', 'QUIT', 'DEFINE', 'DEF', 'UNDEFINE', 'COLUMN', 'COL',
+    'TTITLE', 'BTITLE', 'BREAK', 'COMPUTE', 'CLEAR', 'PAUSE', 'ACCEPT',
+    'DESC', 'DESCRIBE', 'START', 'EXEC', 'EXECUTE',
+}
+
+# Consulta con funciones PL/SQL en el WITH (se ejecuta como SQL)
+WITH_PLSQL = re.compile(r"^WITH\s+(FUNCTION|PROCEDURE)\b")
+
+# SET que sí es SQL (SET TRANSACTION, SET ROLE, SET CONSTRAINTS)
+SQL_SET = re.compile(r"^SET\s+(TRANSACTION|ROLE|CONSTRAINTS?)\b", re.IGNORECASE)
+
+Q_QUOTE_CLOSE = {'[': ']', '{': '}', '(': ')', '<': '>'}
+
+HEAD_LENGTH = 80
+
+
+@dataclass
+class Statement:
+    """Un statement listo para cursor.execute() o una directiva SQL*Plus."""
+    text: str
+    kind: str
+    line: int
+
+    @property
+    def command(self):
+        """Primera palabra en mayúsculas (p.ej. 'CREATE', 'PROMPT', '@@')."""
+        if self.text.startswith('@'):
+            return '@@' if self.text.startswith('@@') else '@'
+        return self.text.split(None, 1)[0].upper()
+
+    @property
+    def argument(self):
+        """Resto de la directiva después del comando."""
+        if self.text.startswith('@'):
+            return self.text.lstrip('@').strip().rstrip(';')
+        parts = self.text.split(None, 1)
+        return parts[1].strip() if len(parts) > 1 else ''
+
+    def summary(self, width=60):
+        first = " ".join(self.text.split())
+        return first if len(first) <= width else first[:width - 3] + "..."
+
+
+class ScriptTokenizer:
+    """
+    Máquina de estados que recibe líneas y devuelve statements completos.
+
+    Uso:
+        tokenizer = ScriptTokenizer()
+        for line in f:
+            yield from tokenizer.feed(line)
+        yield from tokenizer.finish()
+    """
+
+    def __init__(self):
+        self.line_no = 0
+        self._reset()
+        self._quote = None          # delimitador de cierre del literal abierto
+        self._comment = False       # dentro de /* ... */
+
+    def _reset(self):
+        self._buffer = []
+        self._head = []             # texto significativo inicial (sin literales/comentarios)
+        self._head_len = 0
+        self._kind = None
+        self._start = None
+        self._last_sig = ''         # último carácter significativo
+
+    # ------------------------------------------------------------------
+    # Estado
+    # ------------------------------------------------------------------
+    @property
+    def _has_code(self):
+        return self._start is not None
+
+    def _add_head(self, text):
+        if self._head_len < HEAD_LENGTH:
+            self._head.append(text)
+            self._head_len += len(text)
+        if self._kind is None and self._head_len >= HEAD_LENGTH:
+            self._kind = self._classify()
+
+    def _normalized_head(self):
+        return " ".join("".join(self._head).split()).upper()
+
+    def _classify(self):
+        return PLSQL if PLSQL_START.match(self._normalized_head()) else SQL
+
+    def _emit(self):
+        kind = self._kind or self._classify()
+        text = "".join(self._buffer).strip()
+        start = self._start
+        with_plsql = kind == PLSQL and WITH_PLSQL.match(self._normalized_head())
+        self._reset()
+        if kind == SQL or with_plsql:
+            text = text.rstrip(';').rstrip()
+        if not text:
+            return None
+        return Statement(text, kind, start)
+
+    # ------------------------------------------------------------------
+    # Entrada
+    # ------------------------------------------------------------------
+    def feed(self, line):
+        """Procesa una línea y devuelve la lista de statements completados."""
+        self.line_no += 1
+        line = line.rstrip('\r\n')
+        out = []
+        in_text = self._quote is not None or self._comment
+
+        if not in_text:
+            stripped = line.strip()
+            if stripped == '/':
+                if self._has_code:
+                    stmt = self._emit()
+                    if stmt:
+                        out.append(stmt)
+                else:
+                    self._reset()
+                return out
+
+            if not self._has_code:
+                directive = self._directive(stripped)
+                if directive:
+                    self._reset()
+                    out.append(directive)
+                    return out
+            elif (self._kind == PLSQL and self._last_sig == ';'
+                  and re.match(r"CREATE\b", stripped, re.IGNORECASE)):
+                # package spec y body sin '/' entre ambos
+                stmt = self._emit()
+                if stmt:
+                    out.append(stmt)
+
+        self._scan(line + '\n', out)
+        return out
+
+    def finish(self):
+        """Devuelve el último statement si el archivo no terminó en ';' o '/'."""
+        if self._has_code:
+            stmt = self._emit()
+            if stmt:
+                return [stmt]
+        self._reset()
+        return []
+
+    def _directive(self, stripped):
+        """Reconoce una directiva SQL*Plus al inicio de un statement."""
+        if not stripped:
+            return None
+        if stripped.startswith('@'):
+            return Statement(stripped, SQLPLUS, self.line_no)
+        word = stripped.split(None, 1)[0].rstrip(';').upper()
+        if word not in SQLPLUS_COMMANDS or SQL_SET.match(stripped):
+            return None
+        if word in ('EXEC', 'EXECUTE'):
+            call = stripped.split(None, 1)[1] if ' ' in stripped else ''
+            call = call.rstrip().rstrip(';')
+            return Statement(f"BEGIN {call}; END;", PLSQL, self.line_no)
+        return Statement(stripped, SQLPLUS, self.line_no)
+
+    def _scan(self, line, out):
+        """Recorre la línea carácter a carácter cortando en ';' de SQL simple."""
+        i = 0
+        seg_start = 0
+        n = len(line)
+        in_comment = self._comment      # la línea abre, cierra o sigue un /* */
+        while i < n:
+            if self._quote:
+                j = line.find(self._quote, i)
+                if j < 0:
+                    i = n
+                    break
+                if self._quote == "'" and line.startswith("''", j):
+                    i = j + 2
+                    continue
+                i = j + len(self._quote)
+                self._quote = None
+                continue
+
+            if self._comment:
+                j = line.find('*/', i)
+                if j < 0:
+                    i = n
+                    break
+                i = j + 2
+                self._comment = False
+                continue
+
+            c = line[i]
+            if c == '-' and line.startswith('--', i):
+                break
+            if c == '/' and line.startswith('/*', i):
+                self._comment = True
+                in_comment = True
+                i += 2
+                continue
+            if c in 'qQ' and line.startswith("'", i + 1) and i + 2 < n and _q_quote_at(line, i):
+                self._start_code()
+                delim = line[i + 2]
+                self._quote = Q_QUOTE_CLOSE.get(delim, delim) + "'"
+                self._add_head(' ')
+                self._last_sig = "'"
+                i += 3
+                continue
+            if c in ("'", '"'):
+                self._start_code()
+                self._quote = c
+                self._add_head(' ' if c == "'" else '"')
+                self._last_sig = c
+                i += 1
+                continue
+
+            if not c.isspace():
+                self._start_code()
+                self._last_sig = c
+            if self._has_code or not c.isspace():
+                self._add_head(c)
+
+            if c == ';':
+                if self._kind is None:
+                    self._kind = self._classify()
+                if self._kind == SQL:
+                    self._buffer.append(line[seg_start:i])
+                    stmt = self._emit()
+                    if stmt:
+                        out.append(stmt)
+                    seg_start = i + 1
+            i += 1
+
+        # las líneas de solo comentarios -- antes del statement se descartan;
+        # las de un /* */ se conservan enteras para no cortar el comentario
+        if self._has_code or self._quote or in_comment:
+            self._buffer.append(line[seg_start:])
+
+    def _start_code(self):
+        if self._start is None:
+            self._start = self.line_no
+
+
+def _is_ident(c):
+    return c.isalnum() or c in '_$#'
+
+
+def _q_quote_at(line, i):
+    """True si la q de line[i] abre un q-quote (q'[...]' o nq'[...]')."""
+    if i == 0 or not _is_ident(line[i - 1]):
+        return True
+    return line[i - 1] in 'nN' and (i == 1 or not _is_ident(line[i - 2]))
+
+
+def iter_statements(lines):
+    """
+    Genera los statements de un iterable de líneas (archivo, lista, stdin).
+
+    Yields:
+        Statement: texto, tipo (sql, plsql o sqlplus) y línea de inicio
+    """
+    tokenizer = ScriptTokenizer()
+    for line in lines:
+        yield from tokenizer.feed(line)
+    yield from tokenizer.finish()
+
+
+def read_script(path, encoding='utf-8'):
+    """
+    Genera los statements de un archivo .sql leyéndolo línea a línea.
+
+    Args:
+        path: Ruta del script
+        encoding: Codificación del archivo
+
+    Yields:
+        Statement
+    """
+    with open(Path(path), 'r', encoding=encoding) as f:
+        yield from iter_statements(f)
+
+
+def split_script(text):
+    """Divide un script en memoria. Devuelve la lista de Statement."""
+    return list(iter_statements(text.splitlines()))
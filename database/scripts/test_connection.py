@@ -10,9 +10,8 @@ Descripción:
     configuradas en config/oracle/credentials.json
 """
 
-import sys
-import json
 import os
+import sys
 from pathlib import Path
 
 try:
@@ -22,19 +21,18 @@ except ImportError:
     print("Instalar con: pip3 install oracledb")
     sys.exit(1)
 
+from connect_db import load_config, init_client, connect_params
 
-def load_credentials():
-    """Carga las credenciales desde el archivo JSON"""
-    cred_path = Path(__file__).parent.parent.parent / "config" / "oracle" / "credentials.json"
 
-    if not cred_path.exists():
-        print(f"❌ Error: Archivo de credenciales no encontrado: {cred_path}")
+def load_credentials():
+    """Carga las credenciales (caché compartida con connect_db)"""
+    try:
+        return load_config()
+    except FileNotFoundError as e:
+        print(f"❌ Error: {e}")
         print("Crear el archivo desde credentials.example.json")
         sys.exit(1)
 
-    with open(cred_path) as f:
-        return json.load(f)["oracle_cloud"]
-
 
 def test_connection():
     """Prueba la conexión a Oracle Cloud"""
@@ -44,25 +42,20 @@ def test_connection():
     print(f"📁 Usuario: {config['user']}")
     print(f"📁 DSN: {config['dsn']}")
 
-    # Inicializar cliente Oracle (thick mode) si es necesario
-    if "config_dir" in config and config["config_dir"]:
-        wallet_path = Path(__file__).parent.parent.parent / config["config_dir"]
-        if wallet_path.exists():
-            print(f"🔐 Inicializando con wallet: {wallet_path}")
-            try:
-                oracledb.init_oracle_client(config_dir=str(wallet_path))
-                print("✅ Cliente Oracle inicializado (thick mode)")
-            except Exception as e:
-                print(f"⚠️  Advertencia al inicializar cliente: {e}")
-                print("Intentando continuar en thin mode...")
+    # Inicializar cliente Oracle (misma lógica que connect_db)
+    if config.get("config_dir") and Path(config["config_dir"]).exists():
+        print(f"🔐 Inicializando con wallet: {config['config_dir']}")
+    try:
+        mode = init_client(config)
+        print(f"✅ Cliente Oracle inicializado ({mode} mode)")
+    except Exception as e:
+        print(f"⚠️  Advertencia al inicializar cliente: {e}")
+        print("Intentando continuar en thin mode (ORACLE_CLIENT_MODE=thin)...")
+        os.environ["ORACLE_CLIENT_MODE"] = "thin"
 
     try:
         print("\n🔄 Intentando conectar...")
-        connection = oracledb.connect(
-            user=config["user"],
-            password=config["password"],
-            dsn=config["dsn"]
-        )
+        connection = oracledb.connect(**connect_params(config))
 
         print("✅ ¡Conexión exitosa!")
 
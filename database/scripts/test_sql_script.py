@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Pruebas del tokenizador de scripts SQL*Plus (no requiere base de datos).
+
+Uso:
+    python3 test_sql_script.py
+"""
+import unittest
+from pathlib import Path
+
+from sql_script import PLSQL, SQL, SQLPLUS, read_script, split_script
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+PACKAGES_DIR = SCRIPTS_DIR.parent / 'packages'
+
+
+class ComentariosDeBloqueTest(unittest.TestCase):
+
+    def test_cabecera_con_barra_sola(self):
+        stmts = split_script("/* header\n/\n*/\nSELECT 1 FROM dual;")
+        self.assertEqual(len(stmts), 1)
+        self.assertEqual(stmts[0].kind, SQL)
+        self.assertEqual(stmts[0].text, "/* header\n/\n*/\nSELECT 1 FROM dual")
+
+    def test_cabecera_antes_de_package(self):
+        script = (
+            "/*\n"
+            "==========\n"
+            "/\n"
+            "==========\n"
+            "*/\n"
+            "CREATE OR REPLACE PACKAGE p AS\n"
+            "    PROCEDURE x;\n"
+            "END p;\n"
+            "/\n"
+        )
+        stmts = split_script(script)
+        self.assertEqual([s.kind for s in stmts], [PLSQL])
+        self.assertTrue(stmts[0].text.startswith("/*\n"))
+        self.assertIn("*/\nCREATE OR REPLACE PACKAGE p AS", stmts[0].text)
+        self.assertTrue(stmts[0].text.endswith("END p;"))
+
+    def test_comentario_de_linea_se_descarta(self):
+        stmts = split_script("-- comentario\nSELECT 1 FROM dual;")
+        self.assertEqual(stmts[0].text, "SELECT 1 FROM dual")
+
+    def test_packages_con_cabecera(self):
+        for name in ('PKG_CITAS', 'PKG_PACIENTES', 'PKG_USUARIOS', 'PKG_HISTORIAS_CLINICAS'):
+            with self.subTest(package=name):
+                for stmt in read_script(PACKAGES_DIR / f'{name}.sql'):
+                    self.assertEqual(stmt.text.count('/*'), stmt.text.count('*/'))
+
+
+
+class LiteralesTest(unittest.TestCase):
+
+    def test_q_quote_con_punto_y_coma(self):
+        stmts = split_script("SELECT q'[a;b]' FROM dual;\nSELECT 2 FROM dual;")
+        self.assertEqual([s.text for s in stmts],
+                         ["SELECT q'[a;b]' FROM dual", "SELECT 2 FROM dual"])
+
+    def test_q_quote_con_comilla_simple(self):
+        stmts = split_script("SELECT q'{it's; ok}' FROM dual;\nSELECT 2 FROM dual;")
+        self.assertEqual(len(stmts), 2)
+        self.assertEqual(stmts[0].text, "SELECT q'{it's; ok}' FROM dual")
+
+    def test_comillas_duplicadas(self):
+        stmts = split_script("INSERT INTO t VALUES ('it''s; fine');\nSELECT 1 FROM dual;")
+        self.assertEqual([s.text for s in stmts],
+                         ["INSERT INTO t VALUES ('it''s; fine')", "SELECT 1 FROM dual"])
+
+    def test_barra_sola_dentro_de_literal(self):
+        stmts = split_script("INSERT INTO t VALUES ('a\n/\nb;');\nSELECT 1 FROM dual;")
+        self.assertEqual(len(stmts), 2)
+        self.assertEqual(stmts[0].text, "INSERT INTO t VALUES ('a\n/\nb;')")
+
+    def test_barra_sola_dentro_de_q_quote_en_plsql(self):
+        script = (
+            "BEGIN\n"
+            "    EXECUTE IMMEDIATE q'[\n"
+            "/\n"
+            "]';\n"
+            "END;\n"
+            "/\n"
+        )
+        stmts = split_script(script)
+        self.assertEqual([s.kind for s in stmts], [PLSQL])
+        self.assertTrue(stmts[0].text.endswith("END;"))
+
+    def test_identificador_entre_comillas_dobles(self):
+        stmts = split_script('SELECT 1 AS "a;b" FROM dual;')
+        self.assertEqual([s.text for s in stmts], ['SELECT 1 AS "a;b" FROM dual'])
+
+
+class ComentariosTest(unittest.TestCase):
+
+    def test_punto_y_coma_en_comentario_de_bloque(self):
+        stmts = split_script("SELECT 1 /* a; b */ FROM dual;")
+        self.assertEqual([s.text for s in stmts], ["SELECT 1 /* a; b */ FROM dual"])
+
+    def test_punto_y_coma_en_comentario_de_linea(self):
+        stmts = split_script("SELECT 1 -- a; b\nFROM dual;")
+        self.assertEqual(len(stmts), 1)
+        self.assertTrue(stmts[0].text.endswith("FROM dual"))
+
+    def test_barra_en_comentario_de_bloque_multilinea(self):
+        stmts = split_script("SELECT 1 /*\n/\n;\n*/ FROM dual;")
+        self.assertEqual(len(stmts), 1)
+        self.assertTrue(stmts[0].text.endswith("*/ FROM dual"))
+
+
+class PlsqlTest(unittest.TestCase):
+
+    def test_spec_y_body_sin_barra(self):
+        script = (
+            "CREATE OR REPLACE PACKAGE p AS\n"
+            "    PROCEDURE x;\n"
+            "END p;\n"
+            "CREATE OR REPLACE PACKAGE BODY p AS\n"
+            "    PROCEDURE x IS BEGIN NULL; END;\n"
+            "END p;\n"
+            "/\n"
+        )
+        stmts = split_script(script)
+        self.assertEqual([s.kind for s in stmts], [PLSQL, PLSQL])
+        self.assertTrue(stmts[0].text.endswith("END p;"))
+        self.assertTrue(stmts[1].text.startswith("CREATE OR REPLACE PACKAGE BODY p AS"))
+        self.assertEqual(stmts[1].line, 4)
+
+    def test_bloque_anonimo_no_se_corta_en_punto_y_coma(self):
+        stmts = split_script("BEGIN\n    NULL;\n    NULL;\nEND;\n/\nSELECT 1 FROM dual;")
+        self.assertEqual([s.kind for s in stmts], [PLSQL, SQL])
+        self.assertEqual(stmts[0].text, "BEGIN\n    NULL;\n    NULL;\nEND;")
+
+    def test_exec(self):
+        stmts = split_script("EXEC dbms_stats.gather_table_stats(USER, 'T');")
+        self.assertEqual(len(stmts), 1)
+        self.assertEqual(stmts[0].kind, PLSQL)
+        self.assertEqual(stmts[0].text, "BEGIN dbms_stats.gather_table_stats(USER, 'T'); END;")
+
+    def test_with_function(self):
+        script = (
+            "WITH FUNCTION doble(n NUMBER) RETURN NUMBER IS\n"
+            "BEGIN\n"
+            "    RETURN n * 2;\n"
+            "END;\n"
+            "SELECT doble(2) FROM dual;\n"
+            "/\n"
+            "SELECT 1 FROM dual;\n"
+        )
+        stmts = split_script(script)
+        self.assertEqual([s.kind for s in stmts], [PLSQL, SQL])
+        self.assertIn("RETURN n * 2;", stmts[0].text)
+        self.assertTrue(stmts[0].text.endswith("SELECT doble(2) FROM dual"))
+
+
+class DirectivasTest(unittest.TestCase):
+
+    def test_directivas_sqlplus(self):
+        stmts = split_script("SET DEFINE OFF\nPROMPT hola; mundo\n@PKG_CITAS.sql\nSET TRANSACTION READ ONLY;")
+        self.assertEqual([s.kind for s in stmts], [SQLPLUS, SQLPLUS, SQLPLUS, SQL])
+        self.assertEqual(stmts[1].argument, "hola; mundo")
+        self.assertEqual(stmts[2].command, '@')
+        self.assertEqual(stmts[2].argument, 'PKG_CITAS.sql')
+
+
+class ScriptsRealesTest(unittest.TestCase):
+
+    def test_script_de_solo_ddl(self):
+        stmts = list(read_script(SCRIPTS_DIR / '01_billing_schema_changes.sql'))
+        self.assertEqual(len(stmts), 21)
+        self.assertEqual({s.kind for s in stmts}, {SQL})
+        self.assertTrue(all(not s.text.endswith(';') for s in stmts))
+
+    def test_script_mixto(self):
+        # bloques ORDS con ';' dentro de literales, consultas y PROMPT
+        stmts = list(read_script(SCRIPTS_DIR / '03_install_ords_billing.sql'))
+        self.assertEqual([s.kind for s in stmts], [PLSQL] * 18 + [SQL] * 2 + [SQLPLUS] * 7)
+        self.assertTrue(all(s.text.endswith("END;") for s in stmts if s.kind == PLSQL))
+        self.assertEqual(stmts[-1].command, 'PROMPT')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,30 @@
 
 const ORDS_BASE = process.env.ORDS_BASE_URL || 'https://g04d6b70b49b5da-escanor.adb.sa-vinhedo-1.oraclecloudapps.com/ords/admin';
 const APP_URL   = process.env.VERCEL_URL ? `https://${process.env.VERCEL_URL}` : 'http://localhost:3000';
+const LOTE_RECORDATORIOS = 50;   // citas reclamadas por llamada
+
+async function reclamarRecordatorios(empresaId, horas) {
+    const res  = await fetch(`${ORDS_BASE}/api/v1/citas/recordatorios/reclamar?empresa_id=${empresaId}&horas=${horas}&limit=${LOTE_RECORDATORIOS}`, { method: 'POST' });
+    const data = await res.json();
+    if (data.RESULTADO !== 1) throw new Error(data.MENSAJE || `HTTP ${res.status}`);
+    // APEX_JSON devuelve las columnas del cursor en mayúsculas
+    return (data.ITEMS || []).map(item =>
+        Object.fromEntries(Object.entries(item).map(([k, v]) => [k.toLowerCase(), v])));
+}
+
+async function marcarRecordatorios(enviados, fallidos) {
+    if (enviados.length === 0 && fallidos.length === 0) return;
+    try {
+        await fetch(`${ORDS_BASE}/api/v1/citas/recordatorios/marcar`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ enviados, fallidos }),
+        });
+    } catch (err) {
+        // Sin marcar, el reclamo vence solo (PKG_CITAS.c_minutos_reclamo)
+        console.warn(`Marcar recordatorios falló: ${err.message}`);
+    }
+}
 
 export default async function handler(req, res) {
     // Verificar que es llamado por Vercel Cron o con clave secreta
@@ -26,41 +50,56 @@ export default async function handler(req, res) {
         for (const empresa of empresas) {
             const { empresa_id, horas_anticipacion, plantilla_recordatorio } = empresa;
 
-            // 2. Obtener citas pendientes de recordatorio
-            const citasRes = await fetch(
-                `${ORDS_BASE}/api/v1/whatsapp/citas-pendientes?empresa_id=${empresa_id}&horas=${horas_anticipacion || 24}`
-            );
-            const citasData = await citasRes.json();
-            const citas = citasData.items || [];
+            // 2. Reclamar citas por lotes (PKG_CITAS.reclamar_recordatorios) y
+            //    cerrar cada lote antes del siguiente; igual que whatsapp-server
+            const intentados = new Set();
+            for (;;) {
+                const citas = await reclamarRecordatorios(empresa_id, horas_anticipacion || 24);
+                if (citas.length === 0) break;
 
-            for (const cita of citas) {
-                if (!cita.paciente_telefono) continue;
+                const enviados = [];
+                const fallidos = [];
+                let nuevas = 0;
+                for (const cita of citas) {
+                    if (intentados.has(cita.cita_id) || !cita.paciente_telefono) {
+                        fallidos.push(cita.cita_id);
+                        continue;
+                    }
+                    intentados.add(cita.cita_id);
+                    nuevas++;
 
-                // 3. Interpolar plantilla
-                const mensaje = (plantilla_recordatorio || 'Hola {nombre}, recordatorio de cita el {fecha} a las {hora}.')
-                    .replace('{nombre}', cita.paciente_nombre || 'paciente')
-                    .replace('{fecha}', cita.fecha_cita || '')
-                    .replace('{hora}', cita.hora_cita || '')
-                    .replace('{doctor}', cita.doctor_nombre || 'el doctor');
+                    // 3. Interpolar plantilla
+                    const mensaje = (plantilla_recordatorio || 'Hola {nombre}, recordatorio de cita el {fecha} a las {hora}.')
+                        .replace('{nombre}', cita.paciente_nombre || 'paciente')
+                        .replace('{fecha}', cita.fecha_cita || '')
+                        .replace('{hora}', cita.hora_cita || '')
+                        .replace('{doctor}', cita.doctor_nombre || 'el doctor');
 
-                // 4. Enviar via serverless send
-                try {
-                    const sendRes = await fetch(`${APP_URL}/api/whatsapp/send`, {
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({
-                            phone: cita.paciente_telefono,
-                            message: mensaje,
-                            empresa_id,
-                            paciente_id: cita.paciente_id,
-                            cita_id: cita.cita_id,
-                        }),
-                    });
-                    const sendData = await sendRes.json();
-                    resultados.push({ cita_id: cita.cita_id, ...sendData });
-                } catch (err) {
-                    resultados.push({ cita_id: cita.cita_id, success: false, error: err.message });
+                    // 4. Enviar via serverless send
+                    try {
+                        const sendRes = await fetch(`${APP_URL}/api/whatsapp/send`, {
+                            method: 'POST',
+                            headers: { 'Content-Type': 'application/json' },
+                            body: JSON.stringify({
+                                phone: cita.paciente_telefono,
+                                message: mensaje,
+                                empresa_id,
+                                paciente_id: cita.paciente_id,
+                                cita_id: cita.cita_id,
+                            }),
+                        });
+                        const sendData = await sendRes.json();
+                        (sendData.success ? enviados : fallidos).push(cita.cita_id);
+                        resultados.push({ cita_id: cita.cita_id, ...sendData });
+                    } catch (err) {
+                        fallidos.push(cita.cita_id);
+                        resultados.push({ cita_id: cita.cita_id, success: false, error: err.message });
+                    }
                 }
+
+                // 5. Enviados a 'S', fallidos liberados para la próxima corrida
+                await marcarRecordatorios(enviados, fallidos);
+                if (nuevas === 0 || citas.length < LOTE_RECORDATORIOS) break;
             }
         }
     } catch (err) {
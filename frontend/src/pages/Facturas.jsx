@@ -34,7 +34,7 @@ const Facturas = () => {
         queryKey: ['facturas', filters],
         queryFn: () => {
             // Filtrar parámetros vacíos - NO enviar limit ni offset
-            const params = { empresa_id: empresaId };
+            const params = { empresa_id: empresaId, incluir_total: 'S' };
             if (filters.estado) params.estado = filters.estado;
             if (filters.fecha_desde) params.fecha_desde = filters.fecha_desde;
             if (filters.fecha_hasta) params.fecha_hasta = filters.fecha_hasta;
@@ -25,7 +25,7 @@ const ReporteFinanciero = () => {
 
     const { data: facturasRes, isLoading } = useQuery({
         queryKey: ['reporte-facturas', empresaId, fechaDesde, fechaHasta],
-        queryFn: () => billingService.getFacturas({ empresa_id: empresaId, fecha_desde: fechaDesde, fecha_hasta: fechaHasta }),
+        queryFn: () => billingService.getFacturasTodas({ empresa_id: empresaId, fecha_desde: fechaDesde, fecha_hasta: fechaHasta }),
         enabled: !!empresaId,
     });
 
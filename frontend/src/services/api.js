@@ -46,6 +46,20 @@ api.interceptors.response.use(
     }
 );
 
+// Listados con paginación keyset: sigue el token `next` hasta la última página
+// y devuelve una respuesta con todos los items concatenados.
+const fetchAllPages = async (url, params = {}) => {
+    const first = await api.get(url, { params });
+    const items = [...(first.data?.items || [])];
+    let next = first.data?.next;
+    while (next) {
+        const page = await api.get(url, { params: { ...params, next } });
+        items.push(...(page.data?.items || []));
+        next = page.data?.next;
+    }
+    return { ...first, data: { ...first.data, items, count: items.length, next: undefined } };
+};
+
 export const pacientesService = {
     getAll: (params) => api.get('/pacientes', { params }),
     getById: (id) => api.get(`/pacientes/${id}`),
@@ -56,10 +70,14 @@ export const pacientesService = {
 };
 
 export const citasService = {
-    getAll: (params) => api.get('/citas', { params }),
+    getAll: (params) => fetchAllPages('/citas', params),
+    getPage: (params) => api.get('/citas', { params }),
     getById: (id) => api.get(`/citas/${id}`),
-    getAgenda: (doctorId, fecha) =>
-        api.get(`/citas/agenda/${doctorId}`, { params: { fecha } }),
+    // Con hasta: rango [fecha, hasta] (p.ej. la semana) en una sola llamada
+    getAgenda: (doctorId, fecha, hasta = null) =>
+        api.get(`/citas/agenda/${doctorId}`, { params: hasta ? { desde: fecha, hasta } : { fecha } }),
+    // Turnos libres: { doctores: '3,5', desde, hasta, duracion_minutos, hora_inicio, hora_fin }
+    getDisponibilidad: (params) => api.get('/citas/disponibilidad', { params }),
     create: (data) => api.post('/citas', data),
     update: (id, data) => api.put(`/citas/${id}`, data),
     cambiarEstado: (id, estado, motivo) =>
@@ -120,7 +138,7 @@ export const odontogramaService = {
 };
 
 export const usersService = {
-    getAll: (empresaId) => api.get('/facturas/usuarios', empresaId ? { params: { empresa_id: empresaId } } : {}),
+    getAll: (empresaId) => fetchAllPages('/facturas/usuarios', empresaId ? { empresa_id: empresaId } : {}),
     getById: (id) => api.get(`/facturas/usuarios/${id}`),
     create: (data) => api.post('/facturas/usuarios', data),
     update: (id, data) => api.put(`/facturas/usuarios/${id}`, data),
@@ -204,6 +222,7 @@ export const billingService = {
 
     // Facturas
     getFacturas: (params) => api.get('/facturas/lista', { params }),
+    getFacturasTodas: (params) => fetchAllPages('/facturas/lista', params),
     getFacturaById: (id) => api.get(`/facturas/factura/${id}`),
     getFacturaDetalles: (id) => api.get(`/facturas/factura/${id}/detalles`),
     getFacturaPagos: (id) => api.get(`/facturas/factura/${id}/pagos`),
@@ -240,7 +259,7 @@ export const cajaService = {
     abrir: (id, data) => api.post(`/facturas/caja/${id}/abrir`, data),
     cerrar: (id, data) => api.post(`/facturas/caja/${id}/cerrar`, data),
     getMovimientos: (cajaId, params = {}) =>
-        api.get(`/facturas/caja/${cajaId}/movimientos`, { params }),
+        fetchAllPages(`/facturas/caja/${cajaId}/movimientos`, params),
     registrarMovimiento: (cajaId, data) =>
         api.post(`/facturas/caja/${cajaId}/movimientos`, data),
     getResumen: (cajaId) => api.get(`/facturas/caja/${cajaId}/resumen`),
@@ -256,6 +275,8 @@ export const cajaService = {
 export const dashboardService = {
     getStats: (empresaId) => api.get('/facturas/dashboard/stats', { params: { empresa_id: empresaId } }),
     getActividadSemanal: (empresaId) => api.get('/facturas/dashboard/actividad-semanal', { params: { empresa_id: empresaId } }),
+    getMetricas: (empresaId, desde, hasta) =>
+        api.get('/facturas/dashboard/metricas', { params: { empresa_id: empresaId, desde, hasta } }),
 };
 
 export const comprasService = {
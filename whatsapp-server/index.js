@@ -18,6 +18,7 @@ const PORT      = process.env.PORT || 3001;
 const ORDS_BASE = process.env.ORDS_BASE_URL || 'https://g04d6b70b49b5da-escanor.adb.sa-vinhedo-1.oraclecloudapps.com/ords/admin';
 const CFG_FILE  = './server-config.json';
 const AUTH_DIR  = './auth_sessions';
+const LOTE_RECORDATORIOS = 50;   // citas reclamadas por llamada
 
 const logger = pino({ level: 'silent' });
 
@@ -269,34 +270,78 @@ async function ejecutarRecordatoriosEmpresa(empresa) {
         return [];
     }
 
-    const citasRes  = await fetch(`${ORDS_BASE}/api/v1/whatsapp/citas-pendientes?empresa_id=${empresa_id}&horas=${horas_anticipacion || 24}`);
-    const citasData = await citasRes.json();
-    const citas     = citasData.items || [];
+    // Las citas se reclaman por lotes (FOR UPDATE SKIP LOCKED en PKG_CITAS):
+    // otro emisor en paralelo nunca recibe las mismas. Cada lote se cierra
+    // antes de reclamar el siguiente (enviados a 'S', fallidos liberados), así
+    // ningún reclamo queda abierto más que lo que dura un lote. Un fallido
+    // liberado puede volver en un lote posterior de la misma corrida: no se
+    // reintenta (se libera de nuevo) y la corrida termina cuando un lote no
+    // trae citas nuevas. PKG_CITAS no reclama citas de pacientes sin teléfono.
     const resultados = [];
+    const intentados = new Set();
+    for (;;) {
+        const citas = await reclamarRecordatorios(empresa_id, horas_anticipacion || 24);
+        if (citas.length === 0) break;
+
+        const enviados = [];
+        const fallidos = [];
+        let nuevas = 0;
+        for (const cita of citas) {
+            if (intentados.has(cita.cita_id) || !cita.paciente_telefono) {
+                fallidos.push(cita.cita_id);
+                continue;
+            }
+            intentados.add(cita.cita_id);
+            nuevas++;
+            const mensaje = (plantilla_recordatorio || 'Hola {nombre}, recordatorio de cita el {fecha} a las {hora}.')
+                .replace('{nombre}', cita.paciente_nombre  || 'paciente')
+                .replace('{fecha}',  cita.fecha_cita       || '')
+                .replace('{hora}',   cita.hora_cita        || '')
+                .replace('{doctor}', cita.doctor_nombre    || 'el doctor');
+
+            let estado = 'ENVIADO', errorDetalle = null, phoneClean;
+            try {
+                phoneClean = await enviarMensaje(empresa_id, cita.paciente_telefono, mensaje);
+                enviados.push(cita.cita_id);
+            } catch (err) {
+                estado       = 'ERROR';
+                errorDetalle = err.message;
+                phoneClean   = String(cita.paciente_telefono).replace(/[\s\-\+\(\)]/g, '');
+                fallidos.push(cita.cita_id);
+            }
 
-    for (const cita of citas) {
-        if (!cita.paciente_telefono) continue;
-        const mensaje = (plantilla_recordatorio || 'Hola {nombre}, recordatorio de cita el {fecha} a las {hora}.')
-            .replace('{nombre}', cita.paciente_nombre  || 'paciente')
-            .replace('{fecha}',  cita.fecha_cita       || '')
-            .replace('{hora}',   cita.hora_cita        || '')
-            .replace('{doctor}', cita.doctor_nombre    || 'el doctor');
-
-        let estado = 'ENVIADO', errorDetalle = null, phoneClean;
-        try {
-            phoneClean = await enviarMensaje(empresa_id, cita.paciente_telefono, mensaje);
-        } catch (err) {
-            estado       = 'ERROR';
-            errorDetalle = err.message;
-            phoneClean   = String(cita.paciente_telefono).replace(/[\s\-\+\(\)]/g, '');
+            await logMensaje({ empresa_id, paciente_id: cita.paciente_id, cita_id: cita.cita_id, telefono: phoneClean, mensaje, estado, error_detalle: errorDetalle });
+            resultados.push({ cita_id: cita.cita_id, estado, error: errorDetalle });
         }
-
-        await logMensaje({ empresa_id, paciente_id: cita.paciente_id, cita_id: cita.cita_id, telefono: phoneClean, mensaje, estado, error_detalle: errorDetalle });
-        resultados.push({ cita_id: cita.cita_id, estado, error: errorDetalle });
+        await marcarRecordatorios(enviados, fallidos);
+        if (nuevas === 0 || citas.length < LOTE_RECORDATORIOS) break;
     }
     return resultados;
 }
 
+async function reclamarRecordatorios(empresaId, horas) {
+    const res  = await fetch(`${ORDS_BASE}/api/v1/citas/recordatorios/reclamar?empresa_id=${empresaId}&horas=${horas}&limit=${LOTE_RECORDATORIOS}`, { method: 'POST' });
+    const data = await res.json();
+    if (data.RESULTADO !== 1) throw new Error(data.MENSAJE || `HTTP ${res.status}`);
+    // APEX_JSON devuelve las columnas del cursor en mayúsculas
+    return (data.ITEMS || []).map(item =>
+        Object.fromEntries(Object.entries(item).map(([k, v]) => [k.toLowerCase(), v])));
+}
+
+async function marcarRecordatorios(enviados, fallidos) {
+    if (enviados.length === 0 && fallidos.length === 0) return;
+    try {
+        await fetch(`${ORDS_BASE}/api/v1/citas/recordatorios/marcar`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ enviados, fallidos }),
+        });
+    } catch (err) {
+        // Sin marcar, el reclamo vence solo (PKG_CITAS.c_minutos_reclamo)
+        console.warn(`⚠️  Marcar recordatorios falló: ${err.message}`);
+    }
+}
+
 async function ejecutarRecordatorios(filtroEmpresaId = null) {
     const resultados = [];
     try {